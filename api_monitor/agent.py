@@ -0,0 +1,253 @@
+"""Module for probe agents pushing results to a central aggregator."""
+
+import gzip
+import json
+import logging
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .loader import Config
+from .checker import CheckResult, check_all_apis
+from .sessions import create_session_registry_from_config
+from .dispatch import create_host_limits_from_config
+from .circuit import create_circuit_breakers_from_config
+from .hedging import create_hedger_from_config
+from .workers import create_worker_pool
+
+
+BATCH_VERSION = 1
+# Columns of one record; records are sent as arrays to keep batches small
+RECORD_FIELDS = ('name', 'url', 'method', 'status_code', 'latency_ms', 'success', 'error', 'timeout',
+                 'circuit_open')
+PUSH_TIMEOUT = 10.0  # Seconds
+MAX_BATCH_BYTES = 64 * 1024 * 1024  # Largest decompressed batch accepted
+
+
+@dataclass
+class ResultBatch:
+    """Results of one agent sweep."""
+    location: str
+    results: List[CheckResult] = field(default_factory=list)
+    interval: Optional[float] = None  # Agent check interval (seconds)
+    sent_at: Optional[float] = None  # Agent wall-clock time of the sweep (Unix time)
+
+
+def encode_batch(batch: ResultBatch) -> bytes:
+    """
+    Encodes batch as gzip-compressed JSON.
+
+    Args:
+        batch: Results of one sweep
+
+    Returns:
+        Request body for /api/ingest
+    """
+    payload = {
+        'version': BATCH_VERSION,
+        'location': batch.location,
+        'interval': batch.interval,
+        'sent_at': batch.sent_at,
+        'fields': RECORD_FIELDS,
+        'records': [
+            [r.name, r.url, r.method, r.status_code, round(r.latency_ms, 2), r.success, r.error, r.timeout,
+             r.circuit_open]
+            for r in batch.results
+        ]
+    }
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(data, compresslevel=6)
+
+
+def decode_batch(body: bytes, compressed: bool = True, max_size: int = MAX_BATCH_BYTES) -> ResultBatch:
+    """
+    Decodes batch sent by an agent.
+
+    Args:
+        body: Request body
+        compressed: Body is gzip-compressed
+        max_size: Largest decompressed size accepted (bytes)
+
+    Returns:
+        ResultBatch
+
+    Raises:
+        ValueError: If body is not a valid batch
+    """
+    try:
+        if compressed:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip container
+            body = decompressor.decompress(body, max_size + 1)
+            if len(body) > max_size:
+                raise ValueError(f"Batch larger than {max_size} bytes")
+        payload = json.loads(body.decode('utf-8'))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid batch: {e}")
+
+    if not isinstance(payload, dict) or payload.get('version') != BATCH_VERSION:
+        raise ValueError("Unsupported batch version")
+    location = payload.get('location')
+    if not isinstance(location, str) or not location.strip():
+        raise ValueError("Batch must name its location")
+    fields = payload.get('fields')
+    records = payload.get('records')
+    if not isinstance(fields, list) or not isinstance(records, list):
+        raise ValueError("Batch must contain 'fields' and 'records'")
+
+    results = []
+    for record in records:
+        if not isinstance(record, list) or len(record) != len(fields):
+            raise ValueError("Record does not match 'fields'")
+        values: Dict[str, Any] = dict(zip(fields, record))
+        try:
+            method = str(values.get('method') or 'GET').upper()
+            status_code = values.get('status_code')
+            results.append(CheckResult(
+                name=str(values['name']),
+                url=str(values['url']),
+                status_code=int(status_code) if status_code is not None else None,
+                latency_ms=float(values.get('latency_ms') or 0.0),
+                success=bool(values.get('success')),
+                error=values.get('error'),
+                timeout=bool(values.get('timeout')),
+                method=method,
+                circuit_open=bool(values.get('circuit_open'))
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid record: {e}")
+
+    interval = payload.get('interval')
+    sent_at = payload.get('sent_at')
+    return ResultBatch(
+        location=location.strip(),
+        results=results,
+        interval=float(interval) if isinstance(interval, (int, float)) else None,
+        sent_at=float(sent_at) if isinstance(sent_at, (int, float)) else None
+    )
+
+
+class Agent:
+    """
+    Runs checks on a schedule and pushes results to an aggregator.
+
+    Batches that cannot be delivered are kept (up to max_pending) and sent
+    in order with the next push.
+    """
+
+    def __init__(self, config: Config, aggregator_url: str, location: str, token: Optional[str] = None,
+                 processes: int = 1, max_pending: int = 100):
+        """
+        Initializes agent.
+
+        Args:
+            config: Monitoring configuration
+            aggregator_url: Base URL of the aggregator (e.g. http://monitor:8080)
+            location: Name of this agent's location
+            token: Shared secret expected by the aggregator (optional)
+            processes: Worker processes to shard checks across
+            max_pending: Undelivered batches kept for retry
+        """
+        if not location or not location.strip():
+            raise ValueError("Location must be a non-empty string")
+
+        self.config = config
+        self.ingest_url = aggregator_url.rstrip('/') + '/api/ingest'
+        self.location = location.strip()
+        self.token = token
+        self.running = True
+        self.pending: deque = deque(maxlen=max_pending)
+        self.sessions = create_session_registry_from_config(config.connection_pool)
+        self.host_limits = create_host_limits_from_config(config.concurrency)
+        self.breakers = create_circuit_breakers_from_config(config.circuit_breaker)
+        self.hedger = create_hedger_from_config(config.hedging)
+        self.pool = create_worker_pool(processes, config)
+        self._http = requests.Session()
+
+    def sweep(self, interval: Optional[float] = None) -> List[CheckResult]:
+        """
+        Checks all APIs and queues the results for the aggregator.
+
+        Args:
+            interval: Check interval reported to the aggregator
+
+        Returns:
+            List of check results
+        """
+        apis = self.config.apis
+        results = check_all_apis(apis, use_async=len(apis) > 5, sessions=self.sessions,
+                                 phases=self.config.phase_timing, host_limits=self.host_limits, pool=self.pool,
+                                 breakers=self.breakers, hedger=self.hedger)
+        self.sessions.evict_idle()
+        self.pending.append(ResultBatch(self.location, results, interval, time.time()))
+        return results
+
+    def push(self) -> bool:
+        """
+        Sends queued batches to the aggregator, oldest first.
+
+        Returns:
+            True if all batches were delivered
+        """
+        headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+
+        while self.pending:
+            try:
+                response = self._http.post(self.ingest_url, data=encode_batch(self.pending[0]), headers=headers,
+                                           timeout=PUSH_TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"Aggregator unreachable, {len(self.pending)} batches pending: {e}")
+                return False
+            if response.status_code >= 500:
+                logging.warning(f"Aggregator error HTTP {response.status_code}, {len(self.pending)} batches pending")
+                return False
+            if response.status_code >= 400:
+                # Retrying would not help (bad token, rejected batch)
+                logging.error(f"Aggregator rejected batch: HTTP {response.status_code}")
+            self.pending.popleft()
+        return True
+
+    def run(self, interval: float, once: bool = False) -> None:
+        """
+        Checks and pushes every interval seconds until stopped.
+
+        Args:
+            interval: Seconds between sweeps
+            once: Run one sweep and push, then return
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be a positive number")
+
+        logging.info(f"Agent '{self.location}' checking {len(self.config.apis)} APIs every {interval} seconds, "
+                     f"pushing to {self.ingest_url}")
+        next_run = time.monotonic()
+        try:
+            while self.running:
+                results = self.sweep(interval)
+                delivered = self.push()
+                successful = sum(1 for r in results if r.success)
+                logging.info(f"Sweep: {successful}/{len(results)} successful, "
+                             f"{'pushed' if delivered else 'queued'}")
+                if once:
+                    break
+                # Stay on a fixed grid, skipping missed slots
+                next_run += interval * ((time.monotonic() - next_run) // interval + 1)
+                while self.running and time.monotonic() < next_run:
+                    time.sleep(min(next_run - time.monotonic(), 1.0))
+        except KeyboardInterrupt:
+            logging.info("Agent stopped by user")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Releases connections and worker processes."""
+        self.sessions.close()
+        self._http.close()
+        if self.pool:
+            self.pool.close()
+
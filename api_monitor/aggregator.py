@@ -0,0 +1,257 @@
+"""Module for the aggregator merging results pushed by probe agents."""
+
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .loader import Config
+from .checker import CheckResult
+from .agent import ResultBatch
+from .web_server import MonitoringHandler, WebMonitoringServer
+
+
+DEFAULT_LOCATION_TTL = 180.0  # Seconds a location counts without news when it did not report its interval
+LOCATION_TTL_INTERVALS = 3  # Missed agent intervals after which a location is stale
+INGEST_PUBLISH_DELAY = 0.25  # Seconds batches arriving together are pushed to dashboards as one update
+
+
+@dataclass
+class LocationState:
+    """Latest results reported from one location."""
+    name: str
+    results: Dict[Tuple[str, str, str], CheckResult] = field(default_factory=dict)  # (name, url, method) -> result
+    interval: Optional[float] = None
+    last_seen: float = 0.0  # Monotonic time of the last batch
+    last_seen_at: Optional[float] = None  # Wall-clock time of the last batch (Unix time)
+    batches: int = 0
+
+
+def consensus_result(key: Tuple[str, str, str], reports: Dict[str, CheckResult]) -> CheckResult:
+    """
+    Merges results of one check from several locations.
+
+    The check is up when more than half of the locations see it up. Latency
+    is the median over locations.
+
+    Args:
+        key: Check key (name, url, method)
+        reports: Location name -> latest result
+
+    Returns:
+        Consensus CheckResult
+    """
+    name, url, method = key
+    up = sorted(location for location, result in reports.items() if result.success)
+    down = sorted(location for location, result in reports.items() if not result.success)
+    success = len(up) * 2 > len(reports)
+
+    statuses = [result.status_code for result in reports.values() if result.status_code is not None]
+    status_code = statistics.mode(statuses) if statuses else None
+    error = None
+    if not success:
+        error = f"Down in {len(down)}/{len(reports)} locations: {', '.join(down)}"
+    return CheckResult(
+        name=name,
+        url=url,
+        status_code=status_code,
+        latency_ms=statistics.median(result.latency_ms for result in reports.values()),
+        success=success,
+        error=error,
+        timeout=all(result.timeout for result in reports.values()),
+        method=method
+    )
+
+
+class AggregatorServer(WebMonitoringServer):
+    """
+    Dashboard of results pushed by agents (POST /api/ingest) instead of own checks.
+
+    Keeps the latest result per check and location. The dashboard, event
+    stream, history and notifications show the consensus over locations
+    that reported recently; /api/locations and /api/consensus break it
+    down per location.
+    """
+
+    def __init__(self, config: Optional[Config] = None, port: int = 8080, interval: int = 60,
+                 token: Optional[str] = None, location_ttl: Optional[float] = None, **kwargs):
+        """
+        Initializes aggregator.
+
+        Args:
+            config: Configuration (notifications, history); APIs are not checked
+            port: Port for web server
+            interval: Seconds between recorded consensus snapshots (history, notifications)
+            token: Shared secret agents must send as Bearer token (optional)
+            location_ttl: Seconds without batches after which a location is ignored
+                (default: 3 agent intervals)
+        """
+        super().__init__(config or Config(apis=[]), port=port, interval=interval, **kwargs)
+        self.token = token
+        self.location_ttl = location_ttl
+        self.locations: Dict[str, LocationState] = {}
+        self._order: Dict[Tuple[str, str, str], None] = {}  # Checks in first-seen order
+        self._merged: Dict[Tuple[str, str, str], Tuple[Tuple[CheckResult, ...], CheckResult]] = {}
+        self._state_lock = threading.Lock()
+        self._ingest_timer: Optional[threading.Timer] = None
+        self.ingested = 0  # Results received
+
+    def _ttl(self, state: LocationState) -> float:
+        """Returns seconds a location stays fresh without news."""
+        if self.location_ttl is not None:
+            return self.location_ttl
+        if state.interval:
+            return LOCATION_TTL_INTERVALS * state.interval
+        return DEFAULT_LOCATION_TTL
+
+    def ingest(self, batch: ResultBatch) -> int:
+        """
+        Stores batch from an agent and pushes changed consensus to dashboards.
+
+        Batches landing within INGEST_PUBLISH_DELAY of each other are pushed
+        together (see publish_consensus).
+
+        Args:
+            batch: Decoded batch
+
+        Returns:
+            Number of results accepted
+        """
+        now = time.monotonic()
+        with self._state_lock:
+            state = self.locations.get(batch.location)
+            if state is None:
+                state = self.locations[batch.location] = LocationState(batch.location)
+            for result in batch.results:
+                key = (result.name, result.url, result.method)
+                state.results[key] = result
+                self._order.setdefault(key, None)
+            state.interval = batch.interval or state.interval
+            state.last_seen = now
+            state.last_seen_at = time.time()
+            state.batches += 1
+            self.ingested += len(batch.results)
+            if self._ingest_timer is None:
+                self._ingest_timer = threading.Timer(INGEST_PUBLISH_DELAY, self.publish_consensus)
+                self._ingest_timer.daemon = True
+                self._ingest_timer.start()
+        return len(batch.results)
+
+    def publish_consensus(self) -> None:
+        """Pushes current consensus to dashboards once for the batches ingested since the last push."""
+        with self._state_lock:
+            self._ingest_timer = None
+            results = self._consensus(time.monotonic())
+        self.show_results(results)
+
+    def _consensus(self, now: float) -> List[CheckResult]:
+        """
+        Computes consensus over fresh locations (caller holds state lock).
+
+        A check whose reports are the same result objects as last time keeps
+        its previous consensus object, so metrics, latency sketches and
+        rolling windows (which skip a result they have already seen) only
+        count consensus built from new agent results.
+        """
+        fresh = [state for state in self.locations.values() if now - state.last_seen <= self._ttl(state)]
+        results = []
+        for key in self._order:
+            reports = {state.name: state.results[key] for state in fresh if key in state.results}
+            if not reports:
+                continue
+            seen = tuple(reports.values())
+            merged = self._merged.get(key)
+            if merged is None or len(merged[0]) != len(seen) or any(a is not b for a, b in zip(merged[0], seen)):
+                merged = self._merged[key] = (seen, consensus_result(key, reports))
+            results.append(merged[1])
+        return results
+
+    def consensus(self) -> List[CheckResult]:
+        """Returns consensus over locations that reported recently."""
+        with self._state_lock:
+            return self._consensus(time.monotonic())
+
+    def show_results(self, results: List[CheckResult]) -> None:
+        """
+        Replaces dashboard results without counting a check (see record_results).
+
+        Args:
+            results: Current consensus
+        """
+        with self._results_lock:
+            MonitoringHandler.monitoring_data['results'] = results
+            self.events.publish([self._result_to_dict(r) for r in results],
+                                MonitoringHandler.monitoring_data['stats'], datetime.now().isoformat())
+
+    def collect_results(self, max_age: Optional[float] = None, on_result=None,
+                        allow_stale: bool = True) -> List[CheckResult]:
+        """Returns current consensus instead of checking APIs (see WebMonitoringServer.sweep)."""
+        results = self.consensus()
+        if on_result:
+            for result in results:
+                on_result(result)
+        return results
+
+    def location_summary(self) -> List[Dict[str, Any]]:
+        """
+        Returns per-location status.
+
+        Returns:
+            List of dictionaries (one per location, sorted by name)
+        """
+        now = time.monotonic()
+        with self._state_lock:
+            summary = []
+            for state in sorted(self.locations.values(), key=lambda s: s.name):
+                failed = sum(1 for r in state.results.values() if not r.success)
+                summary.append({
+                    'location': state.name,
+                    'stale': now - state.last_seen > self._ttl(state),
+                    'last_seen': state.last_seen_at,
+                    'age_seconds': round(now - state.last_seen, 3),
+                    'interval': state.interval,
+                    'batches': state.batches,
+                    'checks': len(state.results),
+                    'successful': len(state.results) - failed,
+                    'failed': failed
+                })
+            return summary
+
+    def consensus_details(self) -> List[Dict[str, Any]]:
+        """
+        Returns consensus status with each location's latest result.
+
+        Returns:
+            List of dictionaries (one per check, first-seen order)
+        """
+        now = time.monotonic()
+        with self._state_lock:
+            fresh = {state.name for state in self.locations.values() if now - state.last_seen <= self._ttl(state)}
+            details = []
+            for key in self._order:
+                reports = {state.name: state.results[key] for state in self.locations.values()
+                           if key in state.results}
+                current = {location: result for location, result in reports.items() if location in fresh}
+                merged = consensus_result(key, current) if current else None
+                details.append({
+                    'name': key[0],
+                    'url': key[1],
+                    'method': key[2],
+                    'success': merged.success if merged else None,
+                    'up': sum(1 for r in current.values() if r.success),
+                    'down': sum(1 for r in current.values() if not r.success),
+                    'latency_ms': merged.latency_ms if merged else None,
+                    'locations': {
+                        location: {
+                            'success': result.success,
+                            'status_code': result.status_code,
+                            'latency_ms': result.latency_ms,
+                            'error': result.error,
+                            'stale': location not in fresh
+                        }
+                        for location, result in sorted(reports.items())
+                    }
+                })
+            return details
@@ -0,0 +1,679 @@
+"""Native asyncio engine for checking many APIs concurrently."""
+
+import asyncio
+import base64
+import functools
+import os
+import socket
+import ssl
+import threading
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit, urljoin, unquote
+
+from requests.utils import get_environ_proxies
+
+from .clock import SYSTEM_CLOCK, Clock, elapsed_ms
+from .loader import APIConfig
+from .dispatch import HostDispatcher, HostLimits, host_of
+from .checker import (
+    HEAD_UNSUPPORTED, CheckResult, PhaseTimings, _probe_api, body_budget, cached_or_revalidate, check_api,
+    circuit_open_result, head_first, plain_status, probe_flights, probe_key, ranged_headers, request_fingerprint,
+    share_result
+)
+
+# Import for type hints
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .circuit import CircuitBreakers
+    from .hedging import Hedger
+    from .sessions import SessionRegistry
+
+
+DEFAULT_CONCURRENCY = 200
+MAX_REDIRECTS = 30  # Same limit as requests
+USER_AGENT = "api-health-monitor/1.0.0"
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ProbeError(Exception):
+    """Malformed or unsupported HTTP exchange."""
+
+
+def _default_ssl_context() -> ssl.SSLContext:
+    """Returns SSL context trusting the same CA bundle as requests (REQUESTS_CA_BUNDLE included)."""
+    return _ssl_context(os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE'))
+
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context(ca_bundle: Optional[str]) -> ssl.SSLContext:
+    """Creates SSL context once per CA bundle (file or directory; None: bundle shipped with requests)."""
+    if ca_bundle:
+        if os.path.isdir(ca_bundle):
+            return ssl.create_default_context(capath=ca_bundle)
+        return ssl.create_default_context(cafile=ca_bundle)
+    try:
+        from requests.certs import where
+        return ssl.create_default_context(cafile=where())
+    except Exception:
+        return ssl.create_default_context()
+
+
+def _proxied(url: str) -> bool:
+    """Whether requests would send a request to url through a proxy (HTTP(S)_PROXY, ALL_PROXY, NO_PROXY)."""
+    proxies = get_environ_proxies(url)
+    return bool(proxies.get(urlsplit(url).scheme.lower()) or proxies.get('all'))
+
+
+class AsyncChecker:
+    """
+    Checks APIs on a single asyncio event loop.
+
+    Every probe is a coroutine, so thousands of requests can be in flight
+    at once; `concurrency` caps how many run at the same time, and
+    `host_limits` how many of them (and how often) go to one host.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, cache: Optional['ResultCache'] = None,
+                 phases: bool = False, sessions: Optional['SessionRegistry'] = None,
+                 max_age: Optional[float] = None, allow_stale: bool = True,
+                 on_result: Optional[Callable[[CheckResult], None]] = None,
+                 host_limits: Optional[HostLimits] = None, breakers: Optional['CircuitBreakers'] = None,
+                 hedger: Optional['Hedger'] = None, clock: Clock = SYSTEM_CLOCK):
+        """
+        Initializes checker.
+
+        Args:
+            concurrency: Maximum number of probes in flight at the same time
+            cache: Optional cache for results (ResultCache)
+            phases: Record DNS, connect, TLS, TTFB and body timings in CheckResult.phases
+            sessions: Keep-alive sessions (SessionRegistry): probes reuse its pooled asyncio
+                connections (except with phases), background refreshes of stale cached results its sessions
+            max_age: Cached results older than this are stale (default: entry TTL)
+            allow_stale: Serve stale cached results (otherwise expired results are checked now)
+            on_result: Called with each result as soon as it is available (progress reporting)
+            host_limits: Per-host concurrency caps and spacing (see HostDispatcher)
+            breakers: Circuit breakers; endpoints with an open circuit fail fast
+            hedger: Sends a second request for probes slower than usual (see Hedger)
+            clock: Time source (latency from its high-resolution counter, checked_at from its wall clock)
+        """
+        if concurrency <= 0:
+            raise ValueError("Concurrency must be a positive number")
+
+        self.concurrency = concurrency
+        self.cache = cache
+        self.phases = phases
+        self.sessions = sessions
+        self.max_age = max_age
+        self.allow_stale = allow_stale
+        self.on_result = on_result
+        self.host_limits = host_limits
+        self.breakers = breakers
+        self.hedger = hedger
+        self.clock = clock
+
+    async def check_api(self, api_config: APIConfig) -> CheckResult:
+        """
+        Checks API availability.
+
+        The client here has no proxy support: an API the proxy environment
+        variables route through a proxy is checked with requests on the
+        loop's executor instead (without phase timings).
+
+        Args:
+            api_config: API configuration to check
+
+        Returns:
+            CheckResult with check results
+        """
+        if _proxied(api_config.url):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, _probe_api, api_config, None, self.clock)
+
+        checked_at = self.clock.time()
+        start_ns = self.clock.perf_counter_ns()
+        status_code = None
+        bytes_read = None
+        reused = False
+        error = None
+        timeout_occurred = False
+        success = False
+        timings = PhaseTimings() if self.phases else None
+
+        try:
+            status_code, bytes_read, reused = await asyncio.wait_for(self._fetch(api_config, timings),
+                                                                     timeout=api_config.timeout)
+            success = status_code == api_config.expected_status
+
+        except asyncio.TimeoutError:
+            timeout_occurred = True
+            error = f"Timeout after {api_config.timeout}s"
+
+        except (OSError, ssl.SSLError, asyncio.IncompleteReadError):
+            error = "Connection error"
+
+        except ProbeError as e:
+            error = str(e)
+
+        except Exception as e:
+            error = f"Unexpected error: {str(e)}"
+
+        latency_ms = elapsed_ms(start_ns, self.clock.perf_counter_ns())
+
+        return CheckResult(
+            name=api_config.name,
+            url=api_config.url,
+            status_code=status_code,
+            latency_ms=round(latency_ms, 2),
+            success=success,
+            error=error,
+            timeout=timeout_occurred,
+            phases=_round_timings(timings) if timings else None,
+            method=api_config.method.upper(),
+            fingerprint=request_fingerprint(api_config),
+            connection_reused=reused,
+            checked_at=checked_at,
+            bytes_read=bytes_read
+        )
+
+    async def check_api_hedged(self, api_config: APIConfig) -> CheckResult:
+        """
+        Checks API, sending a hedge request if the first one is slow.
+
+        The first request that gets a response wins. The other one is left
+        to finish (up to the API timeout) so the latency saved can be
+        measured; if the event loop stops first, the saving is counted up
+        to that point.
+
+        Args:
+            api_config: API configuration to check
+
+        Returns:
+            CheckResult of the winning request (latency counted from the first request)
+        """
+        hedger = self.hedger
+        key = probe_key(api_config)
+        delay = hedger.delay(key)
+        started = self.clock.perf_counter_ns()
+        primary = asyncio.ensure_future(self.check_api(api_config))
+        if delay is not None:
+            await asyncio.wait({primary}, timeout=delay)
+        if primary.done() or delay is None or not hedger.acquire():
+            result = await primary
+            hedger.observe(key, result)
+            return result
+
+        hedge = asyncio.ensure_future(self.check_api(api_config))
+        pending = {primary, hedge}
+        winner = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (primary, hedge):
+                if task in done:
+                    hedger.observe(key, task.result())
+                    if winner is None and task.result().status_code is not None:
+                        winner = task
+        if winner is None:
+            return primary.result()  # Neither got a response
+
+        latency_ms = round(elapsed_ms(started, self.clock.perf_counter_ns()), 2)
+        result = replace(winner.result(), latency_ms=latency_ms)
+        if winner is hedge:
+            if primary.done():
+                hedger.record_win(primary.result().latency_ms - latency_ms)
+            else:
+                primary.add_done_callback(lambda task: self._record_saving(task, key, started, latency_ms))
+        elif not hedge.done():
+            hedge.add_done_callback(lambda task: task.cancelled() or hedger.observe(key, task.result()))
+        return result
+
+    def _record_saving(self, primary: 'asyncio.Future', key: Tuple, started: int, latency_ms: float) -> None:
+        """Records latency saved by a hedge once the primary request it beat ends."""
+        if primary.cancelled():
+            primary_ms = elapsed_ms(started, self.clock.perf_counter_ns())
+        else:
+            primary_ms = primary.result().latency_ms
+            self.hedger.observe(key, primary.result())
+        self.hedger.record_win(primary_ms - latency_ms)
+
+    async def check_many(self, api_configs: List[APIConfig]) -> List[CheckResult]:
+        """
+        Checks all APIs concurrently.
+
+        APIs sharing a request (method, URL and headers) with a probe already
+        in flight wait for that probe instead of sending their own.
+
+        Args:
+            api_configs: List of API configurations
+
+        Returns:
+            List of check results in the same order as api_configs
+        """
+        if not api_configs:
+            return []
+
+        # Created here so it is bound to the running loop
+        dispatcher = HostDispatcher(self.concurrency, self.host_limits)
+
+        async def check_with_cache(api_config: APIConfig) -> CheckResult:
+            """Checks one API considering cache."""
+            if self.cache:
+                # Stale results are refreshed on the cache's threads, not on this loop
+                cached_result = cached_or_revalidate(self.cache, api_config, self.max_age,
+                                                     lambda api: check_api(api, self.sessions, self.phases,
+                                                                           self.breakers, self.hedger),
+                                                     self.allow_stale)
+                if cached_result:
+                    return cached_result
+
+            circuit = probe_key(api_config)
+            if self.breakers is not None:
+                retry_in = self.breakers.allow(circuit)
+                if retry_in is not None:
+                    return circuit_open_result(api_config, retry_in, self.clock)
+
+            key = probe_key(api_config, self.phases)
+            future, leader = probe_flights.begin(key)
+            if not leader:
+                # Same request already in flight (in this sweep or elsewhere): wait for it
+                result = await asyncio.wrap_future(future)
+                if self.breakers is not None:
+                    self.breakers.release(circuit)  # The leader recorded the outcome
+                return share_result(result, api_config)
+
+            try:
+                async with dispatcher.slot(host_of(api_config.url)):
+                    if self.hedger is not None:
+                        result = await self.check_api_hedged(api_config)
+                    else:
+                        result = await self.check_api(api_config)
+            except Exception as e:
+                result = CheckResult(
+                    name=api_config.name,
+                    url=api_config.url,
+                    status_code=None,
+                    latency_ms=0.0,
+                    success=False,
+                    error=f"Error during check: {str(e)}",
+                    method=api_config.method.upper(),
+                    fingerprint=request_fingerprint(api_config),
+                    checked_at=self.clock.time()
+                )
+                if self.breakers is not None:
+                    self.breakers.record(circuit, False)
+                probe_flights.finish(key, future, result)
+                return result
+            except BaseException as e:
+                if self.breakers is not None:
+                    self.breakers.release(circuit)
+                probe_flights.finish(key, future, error=e)
+                raise
+            if self.breakers is not None:
+                self.breakers.record(circuit, result.status_code is not None)
+            probe_flights.finish(key, future, result)
+
+            # Save to cache (only successful results, unless stale results are served)
+            if self.cache and (result.success or self.cache.stale_while_revalidate):
+                self.cache.set(result)
+
+            return result
+
+        async def check_and_report(api_config: APIConfig) -> CheckResult:
+            result = await check_with_cache(api_config)
+            if self.on_result:
+                self.on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(check_and_report(api) for api in api_configs)))
+
+    def run(self, api_configs: List[APIConfig]) -> List[CheckResult]:
+        """
+        Synchronous wrapper around check_many.
+
+        With keep-alive sessions, the sweep runs on the sessions' event loop
+        so connections are reused across sweeps (see SessionRegistry.run).
+        Otherwise it runs a private event loop; if the calling thread already
+        runs one, the sweep is executed in a helper thread instead.
+
+        Args:
+            api_configs: List of API configurations
+
+        Returns:
+            List of check results in the same order as api_configs
+        """
+        if self.sessions is not None:
+            return self.sessions.run(self.check_many(api_configs))
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.check_many(api_configs))
+
+        outcome: Dict[str, object] = {}
+
+        def run_in_thread():
+            try:
+                outcome['results'] = asyncio.run(self.check_many(api_configs))
+            except BaseException as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=run_in_thread, daemon=True)
+        thread.start()
+        thread.join()
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['results']
+
+    async def _fetch(self, api_config: APIConfig, timings: Optional[PhaseTimings] = None) -> Tuple[int, int, bool]:
+        """
+        Performs probe in the API's probe mode (see APIConfig.probe).
+
+        Returns:
+            Tuple (final status code, body bytes read, whether the last request reused a kept-alive connection)
+        """
+        budget = body_budget(api_config)
+        read = 0
+        if head_first(api_config):
+            status_code, read, reused = await self._follow('HEAD', api_config.url, api_config.headers, budget,
+                                                           timings)
+            if status_code not in HEAD_UNSUPPORTED:
+                return status_code, read, reused
+
+        ranged = ranged_headers(api_config)
+        status_code, bytes_read, reused = await self._follow(api_config.method.upper(), api_config.url,
+                                                             ranged or api_config.headers, budget, timings)
+        return plain_status(status_code, ranged is not None), read + bytes_read, reused
+
+    async def _follow(self, method: str, url: str, headers: Dict[str, str], budget: Optional[int],
+                      timings: Optional[PhaseTimings] = None) -> Tuple[int, int, bool]:
+        """
+        Performs request (following redirects); returns final status code, body bytes read and connection reuse.
+
+        Phase timings and body bytes of redirect hops are summed.
+        """
+        bytes_read = 0
+        for _ in range(MAX_REDIRECTS + 1):
+            status_code, location, read, reused = await self._request_once(method, url, headers, budget, timings)
+            bytes_read += read
+            if status_code not in REDIRECT_STATUSES or not location:
+                return status_code, bytes_read, reused
+
+            url = urljoin(url, location)
+            # Same method rewriting rules as requests
+            if status_code == 303 and method != 'HEAD':
+                method = 'GET'
+            elif status_code in (301, 302) and method == 'POST':
+                method = 'GET'
+
+        raise ProbeError(f"Exceeded {MAX_REDIRECTS} redirects.")
+
+    async def _request_once(self, method: str, url: str, headers: Dict[str, str], budget: Optional[int] = None,
+                            timings: Optional[PhaseTimings] = None) -> Tuple[int, Optional[str], int, bool]:
+        """
+        Sends one HTTP/1.1 request and reads the response body up to budget bytes (None: all).
+
+        With keep-alive sessions (and no phase timings), the request goes
+        over an idle connection of the sessions' pool if there is one, and
+        the connection goes back to the pool after a complete exchange.
+
+        Returns:
+            Tuple (status code, Location header or None, body bytes read, whether the connection was reused)
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ProbeError(f"No connection adapters were found for '{url}'")
+        if not parts.hostname:
+            raise ProbeError(f"Invalid URL '{url}': No host supplied")
+
+        default_port = 443 if scheme == 'https' else 80
+        port = parts.port or default_port
+        ssl_context = _default_ssl_context() if scheme == 'https' else None
+        server_hostname = parts.hostname if ssl_context else None
+        pool = self.sessions.connections if self.sessions is not None and timings is None else None
+        key = (scheme, parts.hostname.lower(), port)
+        request = _build_request(method, parts, port == default_port, headers, keep_alive=pool is not None)
+
+        connection = pool.acquire(key) if pool is not None else None
+        if connection is not None:
+            try:
+                status_code, location, read, keep_alive = await self._exchange(connection.reader, connection.writer,
+                                                                               request, method, budget, timings)
+            except (OSError, asyncio.IncompleteReadError):
+                pass  # Server closed the idle connection meanwhile: retry on a new one
+            else:
+                if keep_alive:
+                    pool.release(key, connection)
+                else:
+                    connection.writer.close()
+                return status_code, location, read, True
+
+        if timings is None:
+            reader, writer = await asyncio.open_connection(
+                parts.hostname, port, ssl=ssl_context, server_hostname=server_hostname
+            )
+        else:
+            reader, writer = await _open_connection_timed(parts.hostname, port, ssl_context, server_hostname, timings,
+                                                          self.clock)
+        status_code, location, read, keep_alive = await self._exchange(reader, writer, request, method, budget,
+                                                                       timings)
+        if pool is not None and keep_alive:
+            pool.release(key, pool.connection(reader, writer))
+        else:
+            writer.close()
+        return status_code, location, read, False
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes,
+                        method: str, budget: Optional[int],
+                        timings: Optional[PhaseTimings]) -> Tuple[int, Optional[str], int, bool]:
+        """
+        Sends request and reads response; the connection is closed if this fails.
+
+        Returns:
+            Tuple (status code, Location header or None, body bytes read, whether the connection can be reused)
+        """
+        try:
+            writer.write(request)
+            await writer.drain()
+            return await _read_response(reader, method, budget, timings, self.clock)
+        except BaseException:
+            writer.close()
+            raise
+
+
+def _round_timings(timings: PhaseTimings) -> PhaseTimings:
+    """Rounds timings to 0.01 ms like latency_ms."""
+    return PhaseTimings(**timings.to_dict())
+
+
+async def _open_connection_timed(host: str, port: int, ssl_context: Optional[ssl.SSLContext],
+                                 server_hostname: Optional[str], timings: PhaseTimings,
+                                 clock: Clock = SYSTEM_CLOCK):
+    """Opens connection step by step, adding DNS, connect and TLS durations (on clock) to timings."""
+    loop = asyncio.get_running_loop()
+
+    started = clock.perf_counter_ns()
+    addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    resolved = clock.perf_counter_ns()
+    timings.dns_ms += elapsed_ms(started, resolved)
+
+    sock = None
+    last_error: Optional[OSError] = None
+    for family, sock_type, proto, _, address in addresses:
+        candidate = socket.socket(family, sock_type, proto)
+        candidate.setblocking(False)
+        try:
+            await loop.sock_connect(candidate, address)
+        except OSError as e:
+            candidate.close()
+            last_error = e
+            continue
+        except BaseException:
+            candidate.close()
+            raise
+        sock = candidate
+        break
+    connected = clock.perf_counter_ns()
+    timings.connect_ms += elapsed_ms(resolved, connected)
+    if sock is None:
+        raise last_error or OSError(f"Could not connect to {host}:{port}")
+
+    try:
+        streams = await asyncio.open_connection(sock=sock, ssl=ssl_context, server_hostname=server_hostname)
+    except BaseException:
+        sock.close()
+        raise
+    if ssl_context is not None:
+        timings.tls_ms += elapsed_ms(connected, clock.perf_counter_ns())
+    return streams
+
+
+def _build_request(method: str, parts, default_port: bool, headers: Dict[str, str],
+                   keep_alive: bool = False) -> bytes:
+    """Builds raw HTTP/1.1 request bytes (asking the server to close the connection unless keep_alive is set)."""
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+
+    host = parts.hostname
+    if ':' in host:
+        host = f"[{host}]"  # IPv6 literal
+    if not default_port:
+        host = f"{host}:{parts.port}"
+
+    request_headers = {
+        'Host': host,
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': 'gzip, deflate',
+        'Accept': '*/*',
+    }
+    if not keep_alive:
+        request_headers['Connection'] = 'close'
+    if parts.username:
+        credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        request_headers['Authorization'] = 'Basic ' + base64.b64encode(credentials.encode('latin-1')).decode('ascii')
+    if method not in ('GET', 'HEAD', 'OPTIONS'):
+        request_headers['Content-Length'] = '0'
+
+    # User headers override defaults (case-insensitively)
+    lowered = {name.lower(): name for name in request_headers}
+    for name, value in (headers or {}).items():
+        existing = lowered.get(name.lower())
+        if existing:
+            del request_headers[existing]
+        request_headers[name] = str(value)
+
+    lines = [f"{method} {target} HTTP/1.1"]
+    lines.extend(f"{name}: {value}" for name, value in request_headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """Reads header block (lower-cased names)."""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b'', None)
+        if line in (b'\r\n', b'\n'):
+            return headers
+        name, sep, value = line.decode('latin-1').partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+
+async def _read_response(reader: asyncio.StreamReader, method: str, budget: Optional[int] = None,
+                         timings: Optional[PhaseTimings] = None,
+                         clock: Clock = SYSTEM_CLOCK) -> Tuple[int, Optional[str], int, bool]:
+    """
+    Reads status line and headers, then discards up to budget body bytes.
+
+    Returns status, Location, bytes read and whether the connection can
+    carry another request (HTTP/1.1 without Connection: close, whole body read).
+    """
+    if timings is not None:
+        sent = clock.perf_counter_ns()
+        first_line = await reader.readline()
+        first_byte = clock.perf_counter_ns()
+        timings.ttfb_ms += elapsed_ms(sent, first_byte)
+    else:
+        first_line = None
+
+    while True:
+        status_line = first_line if first_line is not None else await reader.readline()
+        first_line = None
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        fields = status_line.decode('latin-1').split(None, 2)
+        if len(fields) < 2 or not fields[0].startswith('HTTP/'):
+            raise ProbeError(f"Invalid HTTP status line: {status_line[:100]!r}")
+        try:
+            status_code = int(fields[1])
+        except ValueError:
+            raise ProbeError(f"Invalid HTTP status line: {status_line[:100]!r}")
+
+        headers = await _read_headers(reader)
+        # Skip interim responses (100 Continue, 103 Early Hints)
+        if not (100 <= status_code < 200) or status_code == 101:
+            break
+
+    bytes_read = 0
+    complete = True
+    if method != 'HEAD' and status_code not in (204, 304):
+        bytes_read, complete = await _drain_body(reader, headers, budget)
+
+    if timings is not None:
+        timings.body_ms += elapsed_ms(first_byte, clock.perf_counter_ns())
+
+    keep_alive = complete and fields[0] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    return status_code, headers.get('location'), bytes_read, keep_alive
+
+
+async def _drain_body(reader: asyncio.StreamReader, headers: Dict[str, str],
+                      budget: Optional[int] = None) -> Tuple[int, bool]:
+    """
+    Reads response body without keeping it in memory.
+
+    Stops after `budget` bytes (None: whole body); the connection is closed
+    afterwards, so the rest is never downloaded. Returns bytes read and
+    whether the whole (framed) body was read.
+    """
+    limit = float('inf') if budget is None else budget
+    read = 0
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while read < limit:
+            size_line = await reader.readline()
+            if not size_line:
+                return read, False
+            try:
+                size = int(size_line.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                raise ProbeError("Invalid chunked encoding")
+            if size == 0:
+                await _read_headers(reader)  # Trailers
+                return read, True
+            if read + size > limit:
+                await reader.readexactly(int(limit - read))
+                return int(limit), False
+            await reader.readexactly(size + 2)  # Chunk data and CRLF
+            read += size
+        return read, False
+
+    content_length = headers.get('content-length')
+    if content_length is not None:
+        try:
+            length = int(content_length)
+        except ValueError:
+            raise ProbeError(f"Invalid Content-Length: {content_length}")
+        remaining = min(length, limit)
+    else:
+        length = None
+        remaining = limit  # No framing: body ends when the server closes the connection
+    while remaining > 0:
+        chunk = await reader.read(int(min(READ_CHUNK_SIZE, remaining)))
+        if not chunk:
+            break
+        read += len(chunk)
+        remaining -= len(chunk)
+    return read, read == length
@@ -1,17 +1,33 @@
 """Module for caching API check results."""
 
-import time
-from typing import Optional, Dict, Tuple
-from dataclasses import dataclass
-from .checker import CheckResult
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Dict, Set, Tuple
+from dataclasses import dataclass, replace
+from .checker import CheckResult, request_fingerprint
+from .clock import SYSTEM_CLOCK, Clock
+from .loader import APIConfig
+
+
+DEFAULT_MAX_SIZE = 10000  # Entries kept before least recently used ones are evicted
+DEFAULT_REFRESH_WORKERS = 8  # Background revalidation threads (stale-while-revalidate mode)
+
+CacheKey = Tuple[str, str, str, str]  # (method, url, name, request fingerprint)
 
 
 @dataclass
 class CacheEntry:
     """Cache entry."""
     result: CheckResult
-    timestamp: float
+    timestamp: float  # Monotonic time when stored
     ttl: float  # Time to live in seconds
+    
+    @property
+    def expires_at(self) -> float:
+        """Monotonic time after which entry is expired."""
+        return self.timestamp + self.ttl
 
 
 class ResultCache:
@@ -20,23 +36,66 @@ class ResultCache:
     
     Used to reduce the number of API requests
     and improve performance.
+    
+    Entries are kept in LRU order and evicted beyond max_size. For expiry,
+    entries are queued in one FIFO bucket per TTL: entries with equal TTL
+    expire in insertion order, so cleanup only looks at bucket heads and
+    costs O(1) per expired entry instead of a scan of the whole cache.
+    
+    With stale_while_revalidate set, an expired entry is still served for
+    that many seconds (flagged stale) while one background probe per key
+    refreshes it, so callers never wait for slow endpoints.
     """
     
-    def __init__(self, default_ttl: float = 60.0):
+    def __init__(self, default_ttl: float = 60.0, max_size: int = DEFAULT_MAX_SIZE,
+                 stale_while_revalidate: float = 0.0,
+                 on_revalidated: Optional[Callable[[CheckResult], None]] = None,
+                 refresh_workers: int = DEFAULT_REFRESH_WORKERS, clock: Clock = SYSTEM_CLOCK):
         """
         Initializes cache.
         
         Args:
             default_ttl: Default time to live for cache entries (seconds)
+            max_size: Maximum number of entries (least recently used are evicted)
+            stale_while_revalidate: Seconds after expiry during which entry is served
+                stale while being refreshed in background (0 = disabled)
+            on_revalidated: Called with each result of a background refresh
+            refresh_workers: Maximum number of background refreshes running at once
+            clock: Time source (entries expire on its monotonic clock)
         """
-        self._cache: Dict[str, CacheEntry] = {}
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if stale_while_revalidate < 0:
+            raise ValueError("stale_while_revalidate cannot be negative")
+        
+        self.stale_while_revalidate = stale_while_revalidate
+        self.on_revalidated = on_revalidated
+        self.refresh_workers = refresh_workers
+        self.clock = clock
+        self._lock = threading.RLock()  # Background refreshes write from other threads
+        self._refreshing: Set[CacheKey] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Future] = set()  # Submitted refreshes not finished yet
+        self._cache: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._buckets: Dict[float, deque] = {}  # TTL -> deque of (key, entry) in expiry order
+        self._queued = 0  # Items in all buckets, including superseded ones
         self.default_ttl = default_ttl
+        self.max_size = max_size
+        
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.revalidations = 0
     
-    def _make_key(self, name: str, url: str, method: str) -> str:
+    def _make_key(self, name: str, url: str, method: str, fingerprint: str = "") -> CacheKey:
         """Creates cache key."""
-        return f"{method}:{url}:{name}"
+        return (method.upper(), url, name, fingerprint)
     
-    def get(self, name: str, url: str, method: str = "GET", ttl: Optional[float] = None) -> Optional[CheckResult]:
+    def get(self, name: str, url: str, method: str = "GET", ttl: Optional[float] = None,
+            fingerprint: str = "") -> Optional[CheckResult]:
         """
         Gets result from cache.
         
@@ -45,24 +104,113 @@ class ResultCache:
             url: API URL
             method: HTTP method
             ttl: Time to live for entry (if None, uses TTL from entry or default_ttl)
+            fingerprint: Request fingerprint (see checker.request_fingerprint)
             
         Returns:
             CheckResult if entry found and not expired, None otherwise
         """
-        key = self._make_key(name, url, method)
-        entry = self._cache.get(key)
-        
-        if entry is None:
-            return None
+        return self.lookup(name, url, method, fingerprint, max_age=ttl, allow_stale=False)[0]
+    
+    def lookup(self, name: str, url: str, method: str = "GET", fingerprint: str = "",
+               max_age: Optional[float] = None, allow_stale: bool = True) -> Tuple[Optional[CheckResult], bool]:
+        """
+        Gets result from cache, including stale entries in stale-while-revalidate mode.
         
-        # Check if entry expired (use TTL from entry)
-        cache_ttl = ttl if ttl is not None else entry.ttl
-        if time.time() - entry.timestamp > cache_ttl:
+        Args:
+            name: API name
+            url: API URL
+            method: HTTP method
+            fingerprint: Request fingerprint (see checker.request_fingerprint)
+            max_age: Entries older than this are stale (default: entry TTL)
+            allow_stale: Return stale entries (otherwise they count as misses)
+            
+        Returns:
+            Tuple (result or None, True if result is stale)
+        """
+        key = self._make_key(name, url, method, fingerprint)
+        with self._lock:
+            entry = self._cache.get(key)
+            
+            if entry is None:
+                self.misses += 1
+                return None, False
+            
+            # Check if entry expired (use TTL from entry)
+            age = self.clock.monotonic() - entry.timestamp
+            fresh_for = max_age if max_age is not None else entry.ttl
+            if age <= fresh_for:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry.result, False
+            
+            if self.stale_while_revalidate and age <= entry.ttl + self.stale_while_revalidate:
+                if not allow_stale:
+                    self.misses += 1
+                    return None, False
+                self._cache.move_to_end(key)
+                self.stale_hits += 1
+                return replace(entry.result, stale=True), True
+            
             # Entry expired, remove it
             del self._cache[key]
-            return None
+            self.expirations += 1
+            self.misses += 1
+            return None, False
+    
+    def revalidate(self, api_config: APIConfig, probe: Callable[[APIConfig], CheckResult]) -> bool:
+        """
+        Refreshes entry in background unless a refresh of it is already in flight.
         
-        return entry.result
+        Args:
+            api_config: API configuration of the entry
+            probe: Function checking the API (e.g. checker.check_api)
+            
+        Returns:
+            True if a refresh was started
+        """
+        key = self._make_key(api_config.name, api_config.url, api_config.method, request_fingerprint(api_config))
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.revalidations += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                                    thread_name_prefix='cache-refresh')
+            future = self._executor.submit(self._refresh, key, api_config, probe)
+            self._pending.add(future)
+        future.add_done_callback(self._refresh_done)
+        return True
+    
+    def _refresh_done(self, future: Future) -> None:
+        """Forgets finished (or cancelled) refresh."""
+        with self._lock:
+            self._pending.discard(future)
+    
+    def _refresh(self, key: CacheKey, api_config: APIConfig, probe: Callable[[APIConfig], CheckResult]) -> None:
+        """Runs one background refresh."""
+        try:
+            result = probe(api_config)
+            # Failures are stored too, so an outage replaces the stale success
+            self.set(result)
+            if self.on_revalidated:
+                self.on_revalidated(result)
+        except Exception as e:
+            logging.warning(f"Cache refresh error for {api_config.name}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+    
+    def close(self) -> None:
+        """Stops background refreshes (queued ones are cancelled, running ones finish)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pending, self._pending = self._pending, set()
+        # Cancelled by hand: shutdown(cancel_futures=True) needs Python 3.9
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
     
     def set(self, result: CheckResult, ttl: Optional[float] = None) -> None:
         """
@@ -72,20 +220,48 @@ class ResultCache:
             result: API check result
             ttl: Time to live for entry (if None, uses default_ttl)
         """
-        key = self._make_key(result.name, result.url, "GET")  # TODO: add method to CheckResult
+        key = self._make_key(result.name, result.url, result.method, result.fingerprint)
         cache_ttl = ttl if ttl is not None else self.default_ttl
         
-        self._cache[key] = CacheEntry(
+        entry = CacheEntry(
             result=result,
-            timestamp=time.time(),
+            timestamp=self.clock.monotonic(),
             ttl=cache_ttl
         )
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            
+            bucket = self._buckets.get(cache_ttl)
+            if bucket is None:
+                bucket = self._buckets[cache_ttl] = deque()
+            bucket.append((key, entry))
+            self._queued += 1
+            
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+            
+            # Superseded items leave the buckets when they expire; compact if they pile up
+            if self._queued > 2 * self.max_size:
+                self._compact()
+    
+    def _compact(self) -> None:
+        """Rebuilds expiry buckets from live entries."""
+        live = sorted(self._cache.items(), key=lambda item: item[1].timestamp)
+        self._buckets = {}
+        for key, entry in live:
+            self._buckets.setdefault(entry.ttl, deque()).append((key, entry))
+        self._queued = len(live)
     
     def clear(self) -> None:
         """Clears entire cache."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._buckets.clear()
+            self._queued = 0
     
-    def remove(self, name: str, url: str, method: str = "GET") -> None:
+    def remove(self, name: str, url: str, method: str = "GET", fingerprint: str = "") -> None:
         """
         Removes specific entry from cache.
         
@@ -93,9 +269,11 @@ class ResultCache:
             name: API name
             url: API URL
             method: HTTP method
+            fingerprint: Request fingerprint (see checker.request_fingerprint)
         """
-        key = self._make_key(name, url, method)
-        self._cache.pop(key, None)
+        key = self._make_key(name, url, method, fingerprint)
+        with self._lock:
+            self._cache.pop(key, None)
     
     def cleanup_expired(self) -> int:
         """
@@ -104,17 +282,25 @@ class ResultCache:
         Returns:
             Number of removed entries
         """
-        current_time = time.time()
-        expired_keys = []
+        # Entries in the stale window are kept for lookup()
+        cutoff = self.clock.monotonic() - self.stale_while_revalidate
+        removed = 0
         
-        for key, entry in self._cache.items():
-            if current_time - entry.timestamp > entry.ttl:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self._cache[key]
-        
-        return len(expired_keys)
+        with self._lock:
+            for ttl in list(self._buckets):
+                bucket = self._buckets[ttl]
+                while bucket and bucket[0][1].expires_at < cutoff:
+                    key, entry = bucket.popleft()
+                    self._queued -= 1
+                    # Skip items superseded by a newer set, removal or eviction
+                    if self._cache.get(key) is entry:
+                        del self._cache[key]
+                        removed += 1
+                if not bucket:
+                    del self._buckets[ttl]
+            
+            self.expirations += removed
+        return removed
     
     def size(self) -> int:
         """Returns number of entries in cache."""
@@ -124,22 +310,36 @@ class ResultCache:
         """
         Returns cache statistics.
         
+        Counts only expired entries not yet cleaned up (bucket heads),
+        never the whole cache.
+        
         Returns:
             Dictionary with statistics
         """
-        current_time = time.time()
+        current_time = self.clock.monotonic()
         expired_count = 0
-        valid_count = 0
         
-        for entry in self._cache.values():
-            if current_time - entry.timestamp > entry.ttl:
-                expired_count += 1
-            else:
-                valid_count += 1
+        with self._lock:
+            for bucket in self._buckets.values():
+                for key, entry in bucket:
+                    if entry.expires_at >= current_time:
+                        break
+                    if self._cache.get(key) is entry:
+                        expired_count += 1
         
+        lookups = self.hits + self.stale_hits + self.misses
         return {
             'total': len(self._cache),
-            'valid': valid_count,
+            'valid': len(self._cache) - expired_count,
             'expired': expired_count,
-            'default_ttl': self.default_ttl
+            'default_ttl': self.default_ttl,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'revalidations': self.revalidations,
+            'refreshing': len(self._refreshing)
         }
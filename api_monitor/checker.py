@@ -1,14 +1,43 @@
 """Module for checking API availability."""
 
-import time
+import hashlib
+import threading
 import requests
-from typing import Dict, Any, Optional, List, TYPE_CHECKING
-from dataclasses import dataclass
+from concurrent.futures import Future
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from typing import Callable, Dict, Any, Optional, List, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, replace
+from .clock import SYSTEM_CLOCK, Clock, elapsed_ms
 from .loader import APIConfig
 
 # Import for type hints
 if TYPE_CHECKING:
     from .cache import ResultCache
+    from .circuit import CircuitBreakers
+    from .hedging import Hedger
+    from .dispatch import HostLimits
+    from .sessions import SessionRegistry
+    from .workers import WorkerPool
+
+
+@dataclass
+class PhaseTimings:
+    """Per-phase latency breakdown of a probe (milliseconds)."""
+    dns_ms: float = 0.0
+    connect_ms: float = 0.0
+    tls_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    body_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Converts timings to dictionary rounded to 0.01 ms."""
+        return {
+            'dns_ms': round(self.dns_ms, 2),
+            'connect_ms': round(self.connect_ms, 2),
+            'tls_ms': round(self.tls_ms, 2),
+            'ttfb_ms': round(self.ttfb_ms, 2),
+            'body_ms': round(self.body_ms, 2)
+        }
 
 
 @dataclass
@@ -21,53 +50,337 @@ class CheckResult:
     success: bool
     error: Optional[str] = None
     timeout: bool = False
+    connection_reused: bool = False  # True if request went over a kept-alive connection
+    phases: Optional[PhaseTimings] = None  # Set only by instrumented probes
+    method: str = "GET"
+    fingerprint: str = ""  # Digest of request headers (see request_fingerprint)
+    stale: bool = False  # Served from cache past its TTL while a refresh runs
+    circuit_open: bool = False  # Failed fast without a probe (endpoint's circuit breaker is open)
+    checked_at: Optional[float] = None  # Wall-clock Unix time the check started (metadata, not for durations)
+    bytes_read: Optional[int] = None  # Response body bytes read by the probe (None if no response)
+
+
+def request_fingerprint(api_config: APIConfig) -> str:
+    """
+    Returns short digest of request parameters besides method and URL.
+    
+    Probes of the same URL with different headers (e.g. credentials)
+    may get different answers, so the digest is part of the cache key.
+    
+    Args:
+        api_config: API configuration
+        
+    Returns:
+        Hex digest of headers (empty string if there are none)
+    """
+    if not api_config.headers:
+        return ""
+    items = sorted((str(name).lower(), str(value)) for name, value in api_config.headers.items())
+    return hashlib.blake2b(repr(items).encode('utf-8'), digest_size=8).hexdigest()
+
+
+HEAD_UNSUPPORTED = (405, 501)  # Answers of servers that do not implement HEAD
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def head_first(api_config: APIConfig) -> bool:
+    """Tells whether probe starts with HEAD (probe: head on a GET API)."""
+    return api_config.probe == 'head' and api_config.method.upper() == 'GET'
+
+
+def body_budget(api_config: APIConfig) -> Optional[int]:
+    """Returns most response body bytes a probe reads (None: whole body)."""
+    return None if api_config.probe == 'full' else api_config.body_budget
+
+
+def ranged_headers(api_config: APIConfig) -> Optional[Dict[str, str]]:
+    """
+    Returns request headers of a range probe.
+    
+    Args:
+        api_config: API configuration
+        
+    Returns:
+        Headers with a Range header for the first body_budget bytes, or None
+        if no Range header is sent (other probe modes and methods, an empty
+        budget, or a Range header set in the configuration)
+    """
+    if (api_config.probe != 'range' or api_config.method.upper() != 'GET' or api_config.body_budget <= 0
+            or any(str(name).lower() == 'range' for name in api_config.headers)):
+        return None
+    return {**api_config.headers, 'Range': f"bytes=0-{api_config.body_budget - 1}"}
+
+
+def plain_status(status_code: int, ranged: bool) -> int:
+    """
+    Returns status code a plain GET would have got.
+    
+    206 (partial content) and 416 (range not satisfiable: the body is empty)
+    answer the probe's own Range header, so they are reported as 200.
+    """
+    return 200 if ranged and status_code in (206, 416) else status_code
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent probes of the same request.
+    
+    The first caller for a key runs the probe; callers arriving while it is
+    in flight wait for it (threads via Future.result, coroutines via
+    asyncio.wrap_future) and share its result.
+    """
+    
+    def __init__(self):
+        """Initializes empty registry of in-flight probes."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple, Future] = {}
+        self.probes = 0  # Probes actually sent
+        self.shared = 0  # Callers served by another caller's probe
+    
+    def begin(self, key: Tuple) -> Tuple[Future, bool]:
+        """
+        Joins in-flight probe for key or registers a new one.
+        
+        Args:
+            key: Probe key (see probe_key)
+            
+        Returns:
+            Tuple (future with the probe result, True if caller must run the probe)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.probes += 1
+            return future, True
+    
+    def finish(self, key: Tuple, future: Future, result: Optional['CheckResult'] = None,
+               error: Optional[BaseException] = None) -> None:
+        """
+        Publishes probe outcome to waiting callers.
+        
+        Args:
+            key: Probe key
+            future: Future returned by begin()
+            result: Probe result
+            error: Exception raised by the probe (instead of result)
+        """
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Returns deduplication counters."""
+        with self._lock:
+            in_flight = len(self._calls)
+        requested = self.probes + self.shared
+        return {
+            'probes': self.probes,
+            'shared': self.shared,
+            'dedup_rate': self.shared / requested if requested else 0.0,
+            'in_flight': in_flight
+        }
+
+
+# Shared by both engines, so the monitoring loop and refresh requests
+# never probe the same endpoint twice at the same time
+probe_flights = SingleFlight()
+
+
+def probe_key(api_config: APIConfig, phases: bool = False) -> Tuple[str, str, str, bool]:
+    """Returns singleflight key: (method, url, request fingerprint, instrumented)."""
+    return (api_config.method.upper(), api_config.url, request_fingerprint(api_config), phases)
+
+
+def share_result(result: 'CheckResult', api_config: APIConfig) -> 'CheckResult':
+    """
+    Adapts result of a shared probe to the waiting API configuration.
+    
+    Args:
+        result: Result of the probe run for another caller
+        api_config: Configuration of the waiting caller (name and expected status may differ)
+        
+    Returns:
+        CheckResult for api_config
+    """
+    success = result.status_code is not None and result.status_code == api_config.expected_status
+    return replace(result, name=api_config.name, success=success)
+
+
+def circuit_open_result(api_config: APIConfig, retry_in: float, clock: Clock = SYSTEM_CLOCK) -> CheckResult:
+    """
+    Returns fast-fail result of an endpoint whose circuit breaker is open.
+    
+    Args:
+        api_config: API configuration
+        retry_in: Seconds until the next trial probe
+        clock: Time source of the checked_at timestamp
+        
+    Returns:
+        Failed CheckResult with circuit_open set (no request was sent)
+    """
+    return CheckResult(
+        name=api_config.name,
+        url=api_config.url,
+        status_code=None,
+        latency_ms=0.0,
+        success=False,
+        error=f"Circuit open after repeated failures (next probe in {retry_in:.0f}s)",
+        method=api_config.method.upper(),
+        fingerprint=request_fingerprint(api_config),
+        circuit_open=True,
+        checked_at=clock.time()
+    )
 
 
-def check_api(api_config: APIConfig) -> CheckResult:
+def check_api(api_config: APIConfig, sessions: Optional['SessionRegistry'] = None, phases: bool = False,
+              breakers: Optional['CircuitBreakers'] = None, hedger: Optional['Hedger'] = None,
+              clock: Clock = SYSTEM_CLOCK) -> CheckResult:
     """
     Checks API availability.
     
     Args:
         api_config: API configuration to check
+        sessions: Optional registry of keep-alive sessions (SessionRegistry)
+        phases: Instrumented probe recording DNS, connect, TLS, TTFB and body
+            timings (always opens a new connection, so sessions are not used)
+        breakers: Optional circuit breakers (CircuitBreakers); while the
+            endpoint's circuit is open, a failed result is returned at once
+        hedger: Optional hedging (Hedger): a probe slower than the endpoint's
+            usual latency gets a second request and the first response wins
+            (runs on the asyncio engine, so sessions are not used)
+        clock: Time source; latency is measured with its high-resolution
+            counter, the wall clock only sets checked_at
         
     Returns:
         CheckResult with check results
     """
-    start_time = time.time()
+    if phases or hedger is not None:
+        from .async_checker import AsyncChecker
+        return AsyncChecker(concurrency=1, phases=phases, breakers=breakers, hedger=hedger,
+                            clock=clock).run([api_config])[0]
+    
+    key = probe_key(api_config)
+    if breakers is not None:
+        retry_in = breakers.allow(key)
+        if retry_in is not None:
+            return circuit_open_result(api_config, retry_in, clock)
+    
+    future, leader = probe_flights.begin(key)
+    if not leader:
+        result = future.result()
+        if breakers is not None:
+            breakers.release(key)  # The leader recorded the outcome
+        return share_result(result, api_config)
+    
+    try:
+        result = _probe_api(api_config, sessions, clock)
+    except BaseException as e:
+        if breakers is not None:
+            breakers.release(key)
+        probe_flights.finish(key, future, error=e)
+        raise
+    if breakers is not None:
+        breakers.record(key, result.status_code is not None)
+    probe_flights.finish(key, future, result)
+    return result
+
+
+def _send(api_config: APIConfig, sessions: Optional['SessionRegistry'], method: str,
+          headers: Dict[str, str]) -> requests.Response:
+    """Sends request, returning as soon as the response headers arrived (body is not read)."""
+    if sessions is not None:
+        return sessions.get(api_config.url).request(method=method, url=api_config.url, headers=headers,
+                                                    timeout=api_config.timeout, stream=True)
+    return requests.request(method=method, url=api_config.url, headers=headers,
+                            timeout=api_config.timeout, stream=True)
+
+
+def _read_body(response: requests.Response, budget: Optional[int]) -> int:
+    """
+    Reads at most `budget` body bytes (None: whole body) and closes response.
+    
+    A fully read response returns its connection to the pool; one closed
+    early drops the connection instead of downloading the rest.
+    
+    Returns:
+        Number of body bytes read (as sent, before decompression)
+    """
+    read = 0
+    try:
+        while budget is None or read < budget:
+            size = READ_CHUNK_SIZE if budget is None else min(READ_CHUNK_SIZE, budget - read)
+            chunk = response.raw.read(size)
+            if not chunk:
+                break
+            read += len(chunk)
+    # Same exceptions as a non-streamed request
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e)
+    except ProtocolError as e:
+        raise requests.exceptions.ConnectionError(e)
+    finally:
+        response.close()
+    return read
+
+
+def _probe_api(api_config: APIConfig, sessions: Optional['SessionRegistry'] = None,
+               clock: Clock = SYSTEM_CLOCK) -> CheckResult:
+    """Sends probe request (see check_api)."""
+    checked_at = clock.time()
+    start_ns = clock.perf_counter_ns()
     status_code = None
     error = None
     timeout_occurred = False
+    reused = False
+    bytes_read = None
     
     try:
-        response = requests.request(
-            method=api_config.method,
-            url=api_config.url,
-            headers=api_config.headers,
-            timeout=api_config.timeout
-        )
-        status_code = response.status_code
-        latency_ms = (time.time() - start_time) * 1000
+        budget = body_budget(api_config)
+        read = 0
+        response = None
+        ranged = None
+        if head_first(api_config):
+            response = _send(api_config, sessions, 'HEAD', api_config.headers)
+            if response.status_code in HEAD_UNSUPPORTED:
+                read = _read_body(response, budget)
+                response = None  # Server does not implement HEAD: fall back to GET
+        if response is None:
+            ranged = ranged_headers(api_config)
+            response = _send(api_config, sessions, api_config.method, ranged or api_config.headers)
+        if sessions is not None:
+            from .sessions import connection_reused
+            reused = connection_reused(response)
+        bytes_read = read + _read_body(response, budget)
+        status_code = plain_status(response.status_code, ranged is not None)
+        latency_ms = elapsed_ms(start_ns, clock.perf_counter_ns())
         
         success = status_code == api_config.expected_status
         
     except requests.exceptions.Timeout:
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = elapsed_ms(start_ns, clock.perf_counter_ns())
         timeout_occurred = True
         error = f"Timeout after {api_config.timeout}s"
         success = False
         
     except requests.exceptions.ConnectionError:
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = elapsed_ms(start_ns, clock.perf_counter_ns())
         error = "Connection error"
         success = False
         
     except requests.exceptions.RequestException as e:
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = elapsed_ms(start_ns, clock.perf_counter_ns())
         error = str(e)
         success = False
         
     except Exception as e:
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = elapsed_ms(start_ns, clock.perf_counter_ns())
         error = f"Unexpected error: {str(e)}"
         success = False
     
@@ -78,104 +391,196 @@ def check_api(api_config: APIConfig) -> CheckResult:
         latency_ms=round(latency_ms, 2),
         success=success,
         error=error,
-        timeout=timeout_occurred
+        timeout=timeout_occurred,
+        connection_reused=reused,
+        method=api_config.method.upper(),
+        fingerprint=request_fingerprint(api_config),
+        checked_at=checked_at,
+        bytes_read=bytes_read
     )
 
 
-def check_all_apis(api_configs: List[APIConfig], cache: Optional['ResultCache'] = None, use_async: bool = False) -> List[CheckResult]:
+def check_all_apis(api_configs: List[APIConfig], cache: Optional['ResultCache'] = None, use_async: bool = False,
+                   max_concurrency: Optional[int] = None,
+                   sessions: Optional['SessionRegistry'] = None, phases: bool = False,
+                   max_age: Optional[float] = None,
+                   on_result: Optional[Callable[[CheckResult], None]] = None,
+                   host_limits: Optional['HostLimits'] = None,
+                   pool: Optional['WorkerPool'] = None,
+                   breakers: Optional['CircuitBreakers'] = None,
+                   hedger: Optional['Hedger'] = None, allow_stale: bool = True) -> List[CheckResult]:
     """
     Checks all APIs from the configuration list.
     
     Args:
         api_configs: List of API configurations
         cache: Optional cache for results (ResultCache)
-        use_async: Use async requests (requires additional dependencies)
+        use_async: Check all APIs concurrently on an asyncio event loop
+        max_concurrency: Maximum number of requests in flight when use_async is set
+        sessions: Optional registry of keep-alive sessions (SessionRegistry); the asyncio
+            engine keeps its connections alive in the registry's connection pool
+        phases: Record per-phase latency breakdown (see check_api); like hedger,
+            runs the sweep on the asyncio engine even without use_async
+        max_age: Cached results older than this are stale (default: entry TTL);
+            0 serves every cached result stale and refreshes all of them
+        on_result: Called with each result as soon as it is available (progress reporting)
+        host_limits: Global and per-host concurrency settings when use_async is set
+            (global cap from max_concurrency takes precedence)
+        pool: Worker processes to shard the probes across (WorkerPool); cache
+            lookups stay in this process, so use_async and host_limits are ignored
+        breakers: Circuit breakers failing fast on unreachable endpoints (CircuitBreakers);
+            worker processes keep their own (see WorkerPool)
+        hedger: Hedged requests for slow probes (Hedger); worker processes keep their own
+        allow_stale: Serve stale cached results (refreshed in background); otherwise
+            expired results are checked now
         
     Returns:
         List of check results
     """
+    if pool is not None:
+        return _check_all_apis_sharded(api_configs, pool, cache, sessions, phases, max_age, on_result, breakers,
+                                       hedger, allow_stale)
+    
     if use_async:
-        return _check_all_apis_async(api_configs, cache)
+        return _check_all_apis_async(api_configs, cache, max_concurrency, phases, sessions, max_age, on_result,
+                                     host_limits, breakers, hedger, allow_stale)
+    
+    if phases or hedger is not None:
+        # These probes run on the asyncio engine anyway (see check_api): one event loop
+        # for the whole sweep, still one probe at a time
+        return _check_all_apis_async(api_configs, cache, 1, phases, sessions, max_age, on_result,
+                                     None, breakers, hedger, allow_stale)
     
     results = []
     for api_config in api_configs:
         # Check cache
         if cache:
-            cached_result = cache.get(api_config.name, api_config.url, api_config.method)
+            cached_result = cached_or_revalidate(cache, api_config, max_age,
+                                                 lambda api: check_api(api, sessions, phases, breakers, hedger),
+                                                 allow_stale)
             if cached_result:
                 results.append(cached_result)
+                if on_result:
+                    on_result(cached_result)
                 continue
         
         # Perform check
-        result = check_api(api_config)
+        result = check_api(api_config, sessions, phases, breakers, hedger)
         results.append(result)
         
-        # Save to cache (only successful results)
-        if cache and result.success:
+        # Save to cache (only successful results, unless stale results are served;
+        # fast failures of an open circuit are not probe results)
+        if cache and not result.circuit_open and (result.success or cache.stale_while_revalidate):
             cache.set(result)
+        
+        if on_result:
+            on_result(result)
     
     return results
 
 
-def _check_all_apis_async(api_configs: List[APIConfig], cache: Optional['ResultCache'] = None) -> List[CheckResult]:
+def cached_or_revalidate(cache: 'ResultCache', api_config: APIConfig, max_age: Optional[float],
+                         probe: Callable[[APIConfig], CheckResult],
+                         allow_stale: bool = True) -> Optional[CheckResult]:
+    """
+    Looks up cached result, starting a background refresh if it is stale.
+    
+    Args:
+        cache: Result cache
+        api_config: API configuration
+        max_age: Cached results older than this are stale (default: entry TTL)
+        probe: Function checking the API in background
+        allow_stale: Serve stale result (otherwise it counts as a miss)
+        
+    Returns:
+        Cached (possibly stale) result, or None if API has to be checked now
+    """
+    result, stale = cache.lookup(api_config.name, api_config.url, api_config.method,
+                                 request_fingerprint(api_config), max_age=max_age, allow_stale=allow_stale)
+    if stale:
+        cache.revalidate(api_config, probe)
+    return result
+
+
+def _check_all_apis_sharded(api_configs: List[APIConfig], pool: 'WorkerPool',
+                            cache: Optional['ResultCache'] = None,
+                            sessions: Optional['SessionRegistry'] = None, phases: bool = False,
+                            max_age: Optional[float] = None,
+                            on_result: Optional[Callable[[CheckResult], None]] = None,
+                            breakers: Optional['CircuitBreakers'] = None,
+                            hedger: Optional['Hedger'] = None, allow_stale: bool = True) -> List[CheckResult]:
     """
-    Async check of all APIs (uses threading for parallelism).
+    Check of all APIs on worker processes; cached results are served here.
     
     Args:
         api_configs: List of API configurations
+        pool: Worker processes (WorkerPool)
         cache: Optional cache for results
+        sessions: Keep-alive sessions for background refreshes of stale results
+        phases: Record per-phase latency breakdown (background refreshes)
+        max_age: Cached results older than this are stale (default: entry TTL)
+        on_result: Called with each result as soon as it is available
+        breakers: Circuit breakers for background refreshes
+        hedger: Hedged requests for background refreshes
+        allow_stale: Serve stale cached results
         
     Returns:
         List of check results
     """
-    import concurrent.futures
-    from threading import Lock
-    
-    results = []
-    results_lock = Lock()
-    
-    def check_with_cache(api_config: APIConfig) -> CheckResult:
-        """Checks one API considering cache."""
-        # Check cache
+    results: List[Optional[CheckResult]] = [None] * len(api_configs)
+    to_check = []
+    for index, api_config in enumerate(api_configs):
         if cache:
-            cached_result = cache.get(api_config.name, api_config.url, api_config.method)
+            cached_result = cached_or_revalidate(cache, api_config, max_age,
+                                                 lambda api: check_api(api, sessions, phases, breakers, hedger),
+                                                 allow_stale)
             if cached_result:
-                return cached_result
-        
-        # Perform check
-        result = check_api(api_config)
-        
-        # Save to cache (only successful results)
-        if cache and result.success:
+                results[index] = cached_result
+                if on_result:
+                    on_result(cached_result)
+                continue
+        to_check.append(index)
+    
+    checked = pool.check_all([api_configs[index] for index in to_check], on_result=on_result)
+    for index, result in zip(to_check, checked):
+        results[index] = result
+        # Save to cache (only successful results, unless stale results are served)
+        if cache and not result.circuit_open and (result.success or cache.stale_while_revalidate):
             cache.set(result)
-        
-        return result
-    
-    # Use ThreadPoolExecutor for parallel requests
-    with concurrent.futures.ThreadPoolExecutor(max_workers=min(10, len(api_configs))) as executor:
-        future_to_api = {executor.submit(check_with_cache, api_config): api_config for api_config in api_configs}
-        
-        for future in concurrent.futures.as_completed(future_to_api):
-            try:
-                result = future.result()
-                with results_lock:
-                    results.append(result)
-            except Exception as e:
-                api_config = future_to_api[future]
-                error_result = CheckResult(
-                    name=api_config.name,
-                    url=api_config.url,
-                    status_code=None,
-                    latency_ms=0.0,
-                    success=False,
-                    error=f"Error during check: {str(e)}"
-                )
-                with results_lock:
-                    results.append(error_result)
-    
-    # Sort results in the same order as input configurations
-    result_map = {r.name: r for r in results}
-    sorted_results = [result_map.get(api.name) for api in api_configs if api.name in result_map]
-    
-    return sorted_results if sorted_results else results
+    return results
+
 
+def _check_all_apis_async(api_configs: List[APIConfig], cache: Optional['ResultCache'] = None,
+                          max_concurrency: Optional[int] = None, phases: bool = False,
+                          sessions: Optional['SessionRegistry'] = None,
+                          max_age: Optional[float] = None,
+                          on_result: Optional[Callable[[CheckResult], None]] = None,
+                          host_limits: Optional['HostLimits'] = None,
+                          breakers: Optional['CircuitBreakers'] = None,
+                          hedger: Optional['Hedger'] = None, allow_stale: bool = True) -> List[CheckResult]:
+    """
+    Async check of all APIs (runs the native asyncio engine).
+    
+    Args:
+        api_configs: List of API configurations
+        cache: Optional cache for results
+        max_concurrency: Maximum number of requests in flight (default: DEFAULT_CONCURRENCY)
+        phases: Record per-phase latency breakdown
+        sessions: Keep-alive sessions (probes reuse pooled connections, background refreshes sessions)
+        max_age: Cached results older than this are stale (default: entry TTL)
+        on_result: Called with each result as soon as it is available
+        host_limits: Global and per-host concurrency settings
+        breakers: Circuit breakers failing fast on unreachable endpoints
+        hedger: Hedged requests for slow probes
+        allow_stale: Serve stale cached results
+        
+    Returns:
+        List of check results
+    """
+    from .async_checker import AsyncChecker, DEFAULT_CONCURRENCY
+    
+    concurrency = max_concurrency or (host_limits and host_limits.max_in_flight) or DEFAULT_CONCURRENCY
+    checker = AsyncChecker(concurrency=concurrency, cache=cache, phases=phases, sessions=sessions,
+                           max_age=max_age, allow_stale=allow_stale, on_result=on_result,
+                           host_limits=host_limits, breakers=breakers, hedger=hedger)
+    return checker.run(api_configs)
@@ -0,0 +1,168 @@
+"""Module for per-endpoint circuit breakers."""
+
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from .clock import SYSTEM_CLOCK, Clock
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 3  # Consecutive failed probes that open the circuit
+DEFAULT_BACKOFF = 30.0  # Seconds before the first trial probe
+DEFAULT_MAX_BACKOFF = 600.0  # Longest wait between trial probes
+DEFAULT_JITTER = 0.2  # Backoff is spread by up to ±20%
+
+
+@dataclass
+class Circuit:
+    """Breaker state of one endpoint."""
+    state: str = CLOSED
+    failures: int = 0  # Consecutive failed probes
+    openings: int = 0  # Consecutive openings without a successful probe (backoff exponent)
+    retry_at: float = 0.0  # Monotonic time of the next trial probe (open state)
+
+
+class CircuitBreakers:
+    """
+    Circuit breaker per endpoint (method, URL and headers).
+
+    A probe fails when no response arrives (timeout, connection error).
+    After `failure_threshold` failures in a row the circuit opens: checks
+    fail fast without sending a request until the backoff has passed. Then
+    one trial probe is let through (half-open) while other checks keep
+    failing fast. A response closes the circuit; another failure reopens it
+    with twice the backoff (up to `max_backoff`), spread by `jitter` so
+    endpoints that failed together are not retried together.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF, jitter: float = DEFAULT_JITTER,
+                 clock: Clock = SYSTEM_CLOCK, rng: Optional[random.Random] = None):
+        """
+        Initializes breakers (all circuits closed).
+
+        Args:
+            failure_threshold: Consecutive failed probes that open a circuit
+            backoff: Seconds an opened circuit waits before the first trial probe
+            max_backoff: Longest wait between trial probes
+            jitter: Relative spread of every wait (0 to 1)
+            clock: Time source (backoff runs on its monotonic clock)
+            rng: Random generator for jitter
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be a positive number")
+        if backoff <= 0 or max_backoff < backoff:
+            raise ValueError("backoff must be positive and not larger than max_backoff")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._circuits: Dict[Tuple, Circuit] = {}
+        self.fast_failures = 0  # Checks answered without a probe
+
+    def allow(self, key: Tuple) -> Optional[float]:
+        """
+        Decides whether an endpoint may be probed now.
+
+        Args:
+            key: Endpoint key (see checker.probe_key)
+
+        Returns:
+            None if the probe may be sent, otherwise seconds until the next
+            trial probe (0 while a trial probe is in flight)
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.state == CLOSED:
+                return None
+            now = self.clock.monotonic()
+            if circuit.state == OPEN and now >= circuit.retry_at:
+                circuit.state = HALF_OPEN  # This caller sends the trial probe
+                return None
+            self.fast_failures += 1
+            return max(0.0, circuit.retry_at - now)
+
+    def record(self, key: Tuple, responded: bool) -> None:
+        """
+        Records outcome of a probe let through by allow().
+
+        Args:
+            key: Endpoint key
+            responded: The endpoint answered (any status code)
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if responded:
+                if circuit is not None:
+                    del self._circuits[key]  # Closed circuits without failures are not kept
+                return
+            if circuit is None:
+                circuit = self._circuits[key] = Circuit()
+            elif circuit.state == OPEN:
+                return  # Probe started before another one opened the circuit
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.openings += 1
+                circuit.state = OPEN
+                circuit.retry_at = self.clock.monotonic() + self._backoff(circuit.openings)
+
+    def release(self, key: Tuple) -> None:
+        """Reopens a half-open circuit whose trial probe ended without a result (e.g. interrupted)."""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None and circuit.state == HALF_OPEN:
+                circuit.state = OPEN
+
+    def _backoff(self, openings: int) -> float:
+        """Returns wait before the next trial probe: doubled per opening, capped, with jitter."""
+        delay = min(self.max_backoff, self.backoff * 2 ** min(openings - 1, 32))
+        return delay * (1 + self.jitter * (2 * self._rng.random() - 1))
+
+    def state(self, key: Tuple) -> str:
+        """Returns circuit state of an endpoint."""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit.state if circuit else CLOSED
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns number of open and half-open circuits and fast failures."""
+        with self._lock:
+            states = [circuit.state for circuit in self._circuits.values()]
+        return {
+            'open': states.count(OPEN),
+            'half_open': states.count(HALF_OPEN),
+            'fast_failures': self.fast_failures
+        }
+
+
+def create_circuit_breakers_from_config(config_data: Optional[Dict[str, Any]],
+                                        clock: Clock = SYSTEM_CLOCK) -> Optional[CircuitBreakers]:
+    """
+    Creates circuit breakers from configuration.
+
+    Args:
+        config_data: Dictionary with circuit_breaker settings (None: breakers are off)
+        clock: Time source of the backoff
+
+    Returns:
+        CircuitBreakers, or None if breakers are not configured or disabled (enabled: false)
+    """
+    if not config_data or not config_data.get('enabled', True):
+        return None
+    return CircuitBreakers(
+        failure_threshold=int(config_data.get('failure_threshold', DEFAULT_FAILURE_THRESHOLD)),
+        backoff=float(config_data.get('backoff', DEFAULT_BACKOFF)),
+        max_backoff=float(config_data.get('max_backoff', DEFAULT_MAX_BACKOFF)),
+        jitter=float(config_data.get('jitter', DEFAULT_JITTER)),
+        clock=clock
+    )
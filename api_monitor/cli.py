@@ -1,14 +1,18 @@
-"""CLI interface for API Health Monitor."""
+"""
+CLI interface for API Health Monitor.
+
+Only what a single `run` needs is imported at module load. Subcommands
+import their own modules (web server, scheduler, notifier, worker
+processes, agent, aggregator) when they start, so short CI invocations
+do not pay for them.
+"""
 
 import sys
 import argparse
 import logging
-from pathlib import Path
 from .loader import load_config
 from .checker import check_all_apis
-from .reporter import print_report, get_exit_code
-from .scheduler import run_monitoring, Scheduler
-from .web_server import WebMonitoringServer
+from .reporter import print_report, get_exit_code, create_jsonl_writer
 
 
 def setup_logging(log_file: str = None):
@@ -24,7 +28,7 @@ def setup_logging(log_file: str = None):
     )
 
 
-def run_command(config_path: str, output_format: str = None, output_file: str = None):
+def run_command(config_path: str, output_format: str = None, output_file: str = None, processes: int = 1):
     """
     Executes API check according to configuration.
     
@@ -32,6 +36,7 @@ def run_command(config_path: str, output_format: str = None, output_file: str =
         config_path: Path to configuration file
         output_format: Output format (overrides config)
         output_file: File to save report
+        processes: Worker processes to shard checks across (1: check in this process)
     """
     # Setup basic logging for error handling
     setup_logging()
@@ -48,7 +53,7 @@ def run_command(config_path: str, output_format: str = None, output_file: str =
         
         # Determine output format with validation
         format_to_use = output_format or config.output_format
-        valid_formats = ['table', 'json', 'csv', 'html']
+        valid_formats = ['table', 'json', 'csv', 'html', 'jsonl']
         if format_to_use not in valid_formats:
             raise ValueError(f"Invalid output format: {format_to_use}. Valid: {', '.join(valid_formats)}")
         
@@ -61,7 +66,21 @@ def run_command(config_path: str, output_format: str = None, output_file: str =
             from .cache import ResultCache
             cache = ResultCache(ttl=getattr(config, 'cache_ttl', 60))
         
-        results = check_all_apis(config.apis, cache=cache)
+        # JSON Lines records are written as checks finish
+        stream = create_jsonl_writer(output_file, config.output_rotation) if format_to_use == 'jsonl' else None
+        
+        pool = None
+        if processes > 1:
+            from .workers import create_worker_pool
+            pool = create_worker_pool(processes, config)
+        try:
+            results = check_all_apis(config.apis, cache=cache, phases=config.phase_timing, pool=pool,
+                                     on_result=stream.write if stream else None)
+        finally:
+            if pool:
+                pool.close()
+            if stream:
+                stream.close()
         
         # Send notifications (if configured)
         if config.notifications:
@@ -71,7 +90,8 @@ def run_command(config_path: str, output_format: str = None, output_file: str =
                 notifier.notify(results)
         
         # Output report
-        print_report(results, format_to_use, output_file)
+        if not stream:
+            print_report(results, format_to_use, output_file)
         
         # Determine exit code
         exit_code = get_exit_code(results)
@@ -107,9 +127,19 @@ Usage examples:
   api-monitor run config.yaml
   api-monitor run config.yaml --format json
   
+  # Append one JSON record per result as checks finish (for log shippers)
+  api-monitor watch config.yaml --format jsonl --output results.jsonl
+  
   # Continuous monitoring
   api-monitor watch config.yaml
   api-monitor watch config.yaml --interval 30
+  
+  # Thousands of APIs: shard checks across 4 worker processes
+  api-monitor watch config.yaml --workers 4
+  
+  # Distributed probes: agents in each region push to one aggregator
+  api-monitor aggregator --port 8080 --token secret
+  api-monitor agent config.yaml --aggregator http://monitor:8080 --location eu-west --token secret
         """
     )
     
@@ -124,7 +154,7 @@ Usage examples:
     )
     run_parser.add_argument(
         '--format', '-f',
-        choices=['table', 'json', 'csv', 'html'],
+        choices=['table', 'json', 'csv', 'html', 'jsonl'],
         help='Output format (overrides config)'
     )
     run_parser.add_argument(
@@ -132,6 +162,12 @@ Usage examples:
         type=str,
         help='File to save report'
     )
+    run_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes to shard checks across (default: 1)'
+    )
     
     # watch command
     watch_parser = subparsers.add_parser('watch', help='Start continuous monitoring')
@@ -147,7 +183,7 @@ Usage examples:
     )
     watch_parser.add_argument(
         '--format', '-f',
-        choices=['table', 'json', 'csv', 'html'],
+        choices=['table', 'json', 'csv', 'html', 'jsonl'],
         help='Output format (overrides config)'
     )
     watch_parser.add_argument(
@@ -166,20 +202,101 @@ Usage examples:
         default=8080,
         help='Port for web server (default: 8080)'
     )
+    watch_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes to shard checks across (default: 1)'
+    )
+    
+    # agent command
+    agent_parser = subparsers.add_parser('agent', help='Check APIs and push results to an aggregator')
+    agent_parser.add_argument(
+        'config',
+        type=str,
+        help='Path to configuration file (config.yaml)'
+    )
+    agent_parser.add_argument(
+        '--aggregator', '-a',
+        type=str,
+        required=True,
+        help='Base URL of the aggregator (e.g. http://monitor:8080)'
+    )
+    agent_parser.add_argument(
+        '--location', '-l',
+        type=str,
+        required=True,
+        help='Name of this agent\'s location (e.g. eu-west)'
+    )
+    agent_parser.add_argument(
+        '--interval', '-i',
+        type=int,
+        help='Check interval in seconds (overrides config.interval)'
+    )
+    agent_parser.add_argument(
+        '--token',
+        type=str,
+        help='Shared secret expected by the aggregator'
+    )
+    agent_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes to shard checks across (default: 1)'
+    )
+    agent_parser.add_argument(
+        '--once',
+        action='store_true',
+        help='Run one sweep, push it and exit'
+    )
+    
+    # aggregator command
+    aggregator_parser = subparsers.add_parser('aggregator', help='Collect results pushed by agents')
+    aggregator_parser.add_argument(
+        'config',
+        type=str,
+        nargs='?',
+        help='Configuration file for notifications and history (optional, APIs are ignored)'
+    )
+    aggregator_parser.add_argument(
+        '--port', '-p',
+        type=int,
+        default=8080,
+        help='Port for web server (default: 8080)'
+    )
+    aggregator_parser.add_argument(
+        '--interval', '-i',
+        type=int,
+        help='Seconds between recorded consensus snapshots (default: config.interval or 60)'
+    )
+    aggregator_parser.add_argument(
+        '--token',
+        type=str,
+        help='Shared secret agents must send'
+    )
+    aggregator_parser.add_argument(
+        '--location-ttl',
+        type=float,
+        help='Seconds without results after which a location is ignored (default: 3 agent intervals)'
+    )
     
     args = parser.parse_args()
     
+    if args.command in ('run', 'watch', 'agent') and args.workers < 1:
+        parser.error("--workers must be a positive number")
+    
     if args.command == 'run':
         # Check if interval is in config
         config = load_config(args.config)
         if config.interval and config.interval > 0:
             # Periodic mode
-            scheduler = Scheduler(config, args.format, args.output)
+            from .scheduler import Scheduler
+            scheduler = Scheduler(config, args.format, args.output, args.workers)
             scheduler.run(config.interval)
             sys.exit(0)
         else:
             # Single mode
-            exit_code = run_command(args.config, args.format, args.output)
+            exit_code = run_command(args.config, args.format, args.output, args.workers)
             sys.exit(exit_code)
     elif args.command == 'watch':
         # Forced periodic mode
@@ -188,13 +305,32 @@ Usage examples:
         
         if args.web:
             # Web interface mode
-            web_server = WebMonitoringServer(config, port=args.port, interval=interval, config_path=args.config)
+            from .web_server import WebMonitoringServer
+            web_server = WebMonitoringServer(config, port=args.port, interval=interval, config_path=args.config,
+                                             processes=args.workers)
             web_server.start()
         else:
             # Console mode
-            scheduler = Scheduler(config, args.format, args.output)
+            from .scheduler import Scheduler
+            scheduler = Scheduler(config, args.format, args.output, args.workers)
             scheduler.run(interval)
         sys.exit(0)
+    elif args.command == 'agent':
+        config = load_config(args.config)
+        setup_logging(config.log_file)
+        interval = args.interval or config.interval or 60
+        from .agent import Agent
+        agent = Agent(config, args.aggregator, args.location, token=args.token, processes=args.workers)
+        agent.run(interval, once=args.once)
+        sys.exit(0 if not agent.pending else 1)
+    elif args.command == 'aggregator':
+        config = load_config(args.config) if args.config else None
+        interval = args.interval or (config.interval if config else None) or 60
+        from .aggregator import AggregatorServer
+        aggregator = AggregatorServer(config, port=args.port, interval=interval, token=args.token,
+                                      location_ttl=args.location_ttl)
+        aggregator.start(open_browser=False)
+        sys.exit(0)
     else:
         parser.print_help()
         sys.exit(1)
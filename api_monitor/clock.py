@@ -0,0 +1,84 @@
+"""Module for time sources (monotonic timers for durations, wall clock for timestamps)."""
+
+import time
+
+
+class Clock:
+    """
+    Time source of checks, cache and scheduler.
+
+    Durations (latency, cache expiry, scheduling) are measured with the
+    monotonic clock and the high-resolution performance counter, which NTP
+    slews and wall-clock jumps do not affect. Wall-clock time is only read
+    for timestamps (CheckResult.checked_at). Components take a clock
+    argument so tests can pass a ManualClock.
+    """
+
+    def monotonic(self) -> float:
+        """Returns monotonic time in seconds (deadlines and expiry)."""
+        return time.monotonic()
+
+    def perf_counter_ns(self) -> int:
+        """Returns high-resolution counter in nanoseconds (latency)."""
+        return time.perf_counter_ns()
+
+    def time(self) -> float:
+        """Returns wall-clock Unix time (timestamps only, never durations)."""
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        """Blocks for given number of seconds."""
+        time.sleep(seconds)
+
+
+SYSTEM_CLOCK = Clock()
+
+
+class ManualClock(Clock):
+    """
+    Clock that only moves when told to (for tests).
+
+    sleep() returns at once and advances the clock, so scheduling loops run
+    without waiting. The wall clock can be stepped on its own to simulate
+    NTP corrections.
+    """
+
+    def __init__(self, start: float = 1000.0, wall: float = 1_700_000_000.0):
+        """
+        Initializes clock.
+
+        Args:
+            start: Initial monotonic time in seconds
+            wall: Initial wall-clock Unix time
+        """
+        self.now = start
+        self.wall_offset = wall - start
+        self.sleeps = 0  # Calls of sleep()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter_ns(self) -> int:
+        return round(self.now * 1_000_000_000)
+
+    def time(self) -> float:
+        return self.now + self.wall_offset
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps += 1
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """Moves monotonic and wall-clock time forward."""
+        if seconds < 0:
+            raise ValueError("Monotonic time cannot go backwards")
+        self.now += seconds
+
+    def step_wall(self, seconds: float) -> None:
+        """Moves only the wall clock (negative: backwards), like an NTP step."""
+        self.wall_offset += seconds
+
+
+def elapsed_ms(start_ns: int, end_ns: int) -> float:
+    """Returns milliseconds between two perf_counter_ns() readings."""
+    return (end_ns - start_ns) / 1_000_000
@@ -0,0 +1,193 @@
+"""Module for host-aware dispatch of probes (per-host limits, spacing, fairness)."""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class HostPolicy:
+    """Politeness settings of one host."""
+    max_in_flight: Optional[int] = None  # Probes to the host at the same time (None = only the global cap)
+    min_interval: float = 0.0  # Minimum time between probe starts to the host (seconds)
+
+
+@dataclass
+class HostLimits:
+    """Global and per-host concurrency settings."""
+    max_in_flight: Optional[int] = None  # Probes in flight at the same time (None = engine default)
+    default: HostPolicy = field(default_factory=HostPolicy)
+    hosts: Dict[str, HostPolicy] = field(default_factory=dict)  # Overrides by host name
+
+    def policy(self, host: str) -> HostPolicy:
+        """Returns settings for host (override or default)."""
+        return self.hosts.get(host, self.default)
+
+
+def host_of(url: str) -> str:
+    """Returns host a URL is dispatched under (lowercase host name, port ignored)."""
+    return (urlsplit(url).hostname or '').lower()
+
+
+class HostDispatcher:
+    """
+    Grants probe slots under a global and per-host limits.
+
+    Waiting probes are queued per host. Whenever a slot frees up, hosts are
+    served round-robin, so one host with many endpoints cannot take every
+    global slot while probes to other hosts wait. A host with min_interval
+    gets its next slot no sooner than that long after the previous one.
+
+    Used from one event loop (created per sweep, like asyncio.Semaphore).
+    """
+
+    def __init__(self, max_in_flight: int, limits: Optional[HostLimits] = None):
+        """
+        Initializes dispatcher.
+
+        Args:
+            max_in_flight: Global number of probes in flight at the same time
+            limits: Per-host settings (default: no per-host limits)
+        """
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be a positive number")
+
+        self.max_in_flight = max_in_flight
+        self.limits = limits or HostLimits()
+        self.in_flight = 0
+        self._host_in_flight: Dict[str, int] = {}
+        self._next_start: Dict[str, float] = {}  # Loop time of the earliest next start per host
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._ring: Deque[str] = deque()  # Hosts with waiters, in round-robin order
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scheduled = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        """
+        Holds one probe slot for host.
+
+        Args:
+            host: Host name (see host_of)
+        """
+        await self.acquire(host)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    async def acquire(self, host: str) -> None:
+        """Waits until a probe to host may start."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        future = self._loop.create_future()
+        waiters = self._waiters.get(host)
+        if waiters is None:
+            waiters = self._waiters[host] = deque()
+            self._ring.append(host)
+        waiters.append(future)
+        self._schedule()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation
+                self.release(host)
+            raise
+
+    def release(self, host: str) -> None:
+        """Frees slot taken by acquire()."""
+        self.in_flight -= 1
+        self._host_in_flight[host] -= 1
+        self._schedule()
+
+    def _schedule(self) -> None:
+        """Runs dispatch once all waiters registered in this loop iteration are queued."""
+        if not self._scheduled:
+            self._scheduled = True
+            self._loop.call_soon(self._dispatch)
+
+    def _dispatch(self) -> None:
+        """Grants free slots round-robin across hosts."""
+        self._scheduled = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = self._loop.time()
+        wake_at = None
+        granted = True
+        while granted and self._ring and self.in_flight < self.max_in_flight:
+            granted = False
+            for _ in range(len(self._ring)):
+                if not self._ring or self.in_flight >= self.max_in_flight:
+                    break
+                host = self._ring[0]
+                self._ring.rotate(-1)
+                waiters = self._waiters[host]
+                while waiters and waiters[0].done():  # Cancelled while waiting
+                    waiters.popleft()
+                if not waiters:
+                    self._ring.pop()
+                    del self._waiters[host]
+                    continue
+
+                policy = self.limits.policy(host)
+                if policy.max_in_flight is not None and self._host_in_flight.get(host, 0) >= policy.max_in_flight:
+                    continue
+                next_start = self._next_start.get(host, 0.0)
+                if next_start > now:
+                    wake_at = next_start if wake_at is None else min(wake_at, next_start)
+                    continue
+
+                waiters.popleft().set_result(None)
+                self.in_flight += 1
+                self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+                if policy.min_interval:
+                    self._next_start[host] = now + policy.min_interval
+                granted = True
+                if not waiters:
+                    self._ring.pop()
+                    del self._waiters[host]
+
+        if wake_at is not None and self.in_flight < self.max_in_flight:
+            self._timer = self._loop.call_at(wake_at, self._dispatch)
+
+
+def _parse_policy(data: Dict[str, Any], default: HostPolicy) -> HostPolicy:
+    """Builds host settings from configuration, falling back to default."""
+    max_in_flight = data.get('per_host', default.max_in_flight)
+    return HostPolicy(
+        max_in_flight=int(max_in_flight) if max_in_flight is not None else None,
+        min_interval=float(data.get('min_interval', default.min_interval))
+    )
+
+
+def create_host_limits_from_config(config_data: Optional[Dict[str, Any]]) -> HostLimits:
+    """
+    Creates dispatch settings from configuration.
+
+    Args:
+        config_data: Dictionary with concurrency settings (may be None)
+
+    Returns:
+        HostLimits
+    """
+    config_data = config_data or {}
+    max_in_flight = config_data.get('max_in_flight')
+    default = _parse_policy(config_data, HostPolicy())
+    hosts = {
+        str(host).lower(): _parse_policy(settings or {}, default)
+        for host, settings in (config_data.get('hosts') or {}).items()
+    }
+    return HostLimits(
+        max_in_flight=int(max_in_flight) if max_in_flight is not None else None,
+        default=default,
+        hosts=hosts
+    )
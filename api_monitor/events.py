@@ -0,0 +1,161 @@
+"""Module for pushing monitoring updates to dashboard clients (Server-Sent Events)."""
+
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+KEEPALIVE_INTERVAL = 15.0  # Seconds between comment frames on an idle stream
+RETRY_MS = 5000  # Client reconnect delay sent to EventSource
+# Result fields that differ on every check; they do not make a result changed
+# (latency counts beyond the broker's latency_tolerance)
+PER_CHECK_FIELDS = frozenset({'latency_ms', 'phases', 'checked_at', 'connection_reused', 'bytes_read'})
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    """
+    Encodes one Server-Sent Events frame.
+
+    Args:
+        event: Event name
+        data: Event payload (encoded as single-line JSON)
+        event_id: Event id (sent back by the client as Last-Event-ID)
+
+    Returns:
+        Encoded frame
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+
+class EventBroker:
+    """
+    Fan-out of sweep updates to connected dashboards.
+
+    Each published sweep is diffed against the previously published state and
+    encoded once as an "update" frame with only the changed results; every
+    stream writes the same bytes. Latency jitter below latency_tolerance and
+    per-check metadata (PER_CHECK_FIELDS, e.g. checked_at) do not count as a
+    change. Streams that reconnect with a Last-Event-ID still in
+    the backlog resume from it, other streams start with a full "snapshot".
+    """
+
+    def __init__(self, backlog: int = 32, latency_tolerance: float = 0.1):
+        """
+        Initializes broker.
+
+        Args:
+            backlog: Number of recent update frames kept for resuming streams
+            latency_tolerance: Relative latency change that makes a result changed
+        """
+        self.latency_tolerance = latency_tolerance
+        self.closed = False
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._frames: deque = deque(maxlen=backlog)  # (seq, frame)
+        self._results: Dict[str, Dict[str, Any]] = {}  # Last published result per API
+        self._order: List[str] = []
+        self._stats: Dict[str, Any] = {}
+        self._timestamp: Optional[str] = None
+        self._snapshot: Optional[Tuple[int, bytes]] = None
+
+    def _changed(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> bool:
+        """Checks whether result differs from the published one."""
+        if old is None:
+            return True
+        for key, value in new.items():
+            if key not in PER_CHECK_FIELDS and old.get(key) != value:
+                return True
+        old_latency = old.get('latency_ms') or 0.0
+        new_latency = new.get('latency_ms') or 0.0
+        return abs(new_latency - old_latency) > self.latency_tolerance * max(old_latency, 1.0)
+
+    def publish(self, results: List[Dict[str, Any]], stats: Dict[str, Any], timestamp: str) -> int:
+        """
+        Publishes results of one sweep.
+
+        Args:
+            results: Check results as dictionaries (full list, in display order)
+            stats: Monitoring statistics
+            timestamp: Sweep time (ISO format)
+
+        Returns:
+            Sequence number of the published update
+        """
+        with self._cond:
+            changed = []
+            current = {}
+            for result in results:
+                old = self._results.get(result['name'])
+                if self._changed(old, result):
+                    changed.append(result)
+                    current[result['name']] = result
+                else:
+                    current[result['name']] = old
+            removed = [name for name in self._results if name not in current]
+            order = [result['name'] for result in results]
+
+            data = {'changed': changed, 'removed': removed, 'stats': stats, 'timestamp': timestamp}
+            if order != self._order:
+                data['order'] = order
+
+            self._seq += 1
+            self._frames.append((self._seq, format_event('update', data, self._seq)))
+            self._results = current
+            self._order = order
+            self._stats = dict(stats)
+            self._timestamp = timestamp
+            self._snapshot = None
+            self._cond.notify_all()
+            return self._seq
+
+    def snapshot(self) -> Tuple[int, bytes]:
+        """
+        Returns full state as a "snapshot" frame.
+
+        Returns:
+            Tuple (sequence number, frame)
+        """
+        with self._cond:
+            if self._snapshot is None:
+                data = {
+                    'results': [self._results[name] for name in self._order],
+                    'stats': self._stats,
+                    'timestamp': self._timestamp
+                }
+                self._snapshot = (self._seq, format_event('snapshot', data, self._seq))
+            return self._snapshot
+
+    def next_frames(self, after: Optional[int], timeout: float = KEEPALIVE_INTERVAL) -> Tuple[int, List[bytes]]:
+        """
+        Returns frames a stream has not seen yet, waiting for a new sweep if needed.
+
+        Args:
+            after: Sequence number of the last frame the stream has (None for a new stream)
+            timeout: Maximum time to wait for a new sweep (seconds)
+
+        Returns:
+            Tuple (new sequence number, list of frames); empty list on timeout or close
+        """
+        with self._cond:
+            if after is not None and after <= self._seq:
+                self._cond.wait_for(lambda: self._seq > after or self.closed, timeout)
+            if self.closed or after == self._seq:
+                return after, []
+
+            oldest = self._frames[0][0] if self._frames else self._seq + 1
+            if after is None or after > self._seq or after + 1 < oldest:
+                seq, frame = self.snapshot()
+                return seq, [frame]
+            return self._seq, [frame for seq, frame in self._frames if seq > after]
+
+    def close(self) -> None:
+        """Releases all waiting streams."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
@@ -0,0 +1,153 @@
+"""Module for hedged probes (a second request when the first one is slow)."""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .checker import CheckResult
+from .sketch import DDSketch
+
+
+DEFAULT_PERCENTILE = 0.95  # Hedge once a probe is slower than this share of earlier probes
+DEFAULT_BUDGET = 0.05  # At most 5% extra requests
+DEFAULT_BURST = 10.0  # Hedges that may be saved up while endpoints are fast
+DEFAULT_MIN_SAMPLES = 20  # Probes of an endpoint before it is hedged
+DEFAULT_MIN_DELAY_MS = 1.0
+SKETCH_ACCURACY = 0.02
+
+
+class Hedger:
+    """
+    Decides when to send a second (hedge) request for a slow probe.
+
+    Each endpoint keeps a latency sketch of its answered probes. A probe
+    that has not been answered after the endpoint's `percentile` latency
+    gets a hedge, and the first response wins. The budget starts with
+    `burst` tokens; every probe adds `budget` tokens (up to `burst`) and
+    every hedge spends one, so hedges add at most `budget` extra load over
+    time.
+    """
+
+    def __init__(self, percentile: float = DEFAULT_PERCENTILE, budget: float = DEFAULT_BUDGET,
+                 burst: float = DEFAULT_BURST, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 min_delay_ms: float = DEFAULT_MIN_DELAY_MS):
+        """
+        Initializes hedger.
+
+        Args:
+            percentile: Latency quantile after which a probe is hedged (0 < p < 1)
+            budget: Hedges allowed per probe on average (0 < budget <= 1)
+            burst: Largest number of hedges that can be sent in a row
+            min_samples: Answered probes of an endpoint before it is hedged
+            min_delay_ms: Shortest wait before a hedge
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        if not 0 < budget <= 1:
+            raise ValueError("budget must be greater than 0 and at most 1")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if min_samples < 1:
+            raise ValueError("min_samples must be a positive number")
+        if min_delay_ms < 0:
+            raise ValueError("min_delay_ms cannot be negative")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.burst = burst
+        self.min_samples = min_samples
+        self.min_delay_ms = min_delay_ms
+        self._lock = threading.Lock()
+        self._sketches: Dict[Tuple, DDSketch] = {}
+        self._tokens = burst
+        self.probes = 0  # Primary requests
+        self.hedges = 0  # Hedge requests sent
+        self.wins = 0  # Hedges answered before the primary request
+        self.saved_ms = 0.0  # Latency saved by winning hedges
+
+    def delay(self, key: Tuple) -> Optional[float]:
+        """
+        Counts a probe and returns how long to wait before hedging it.
+
+        Args:
+            key: Endpoint key (see checker.probe_key)
+
+        Returns:
+            Seconds to wait, or None if the endpoint has too few samples
+        """
+        with self._lock:
+            self.probes += 1
+            self._tokens = min(self.burst, round(self._tokens + self.budget, 9))
+            sketch = self._sketches.get(key)
+            if sketch is None or sketch.count < self.min_samples:
+                return None
+            return max(self.min_delay_ms, sketch.quantile(self.percentile)) / 1000
+
+    def acquire(self) -> bool:
+        """Takes one hedge from the budget; False if it is used up."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def observe(self, key: Tuple, result: CheckResult) -> None:
+        """
+        Adds latency of one answered request (primary or hedge) to the endpoint's sketch.
+
+        Args:
+            key: Endpoint key
+            result: Result of the request (ignored without a response)
+        """
+        if result.status_code is None:
+            return
+        with self._lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = DDSketch(SKETCH_ACCURACY)
+            sketch.add(result.latency_ms)
+
+    def record_win(self, saved_ms: float) -> None:
+        """
+        Records a hedge answered first.
+
+        Args:
+            saved_ms: Primary request latency minus the result's latency
+                (a lower bound if the primary request was abandoned)
+        """
+        with self._lock:
+            self.wins += 1
+            self.saved_ms += max(0.0, saved_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hedge rate, wins and latency saved."""
+        with self._lock:
+            return {
+                'probes': self.probes,
+                'hedges': self.hedges,
+                'hedge_rate': self.hedges / self.probes if self.probes else 0.0,
+                'wins': self.wins,
+                'saved_ms': round(self.saved_ms, 2),
+                'saved_ms_per_win': round(self.saved_ms / self.wins, 2) if self.wins else 0.0
+            }
+
+
+def create_hedger_from_config(config_data: Optional[Dict[str, Any]]) -> Optional[Hedger]:
+    """
+    Creates hedger from configuration.
+
+    Args:
+        config_data: Dictionary with hedging settings (None: hedging is off)
+
+    Returns:
+        Hedger, or None if hedging is not configured or disabled (enabled: false)
+    """
+    if not config_data or not config_data.get('enabled', True):
+        return None
+    return Hedger(
+        percentile=float(config_data.get('percentile', DEFAULT_PERCENTILE)),
+        budget=float(config_data.get('budget', DEFAULT_BUDGET)),
+        burst=float(config_data.get('burst', DEFAULT_BURST)),
+        min_samples=int(config_data.get('min_samples', DEFAULT_MIN_SAMPLES)),
+        min_delay_ms=float(config_data.get('min_delay_ms', DEFAULT_MIN_DELAY_MS))
+    )
@@ -0,0 +1,216 @@
+"""Module for persistent check history (SQLite time-series store)."""
+
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from .checker import CheckResult
+from .clock import SYSTEM_CLOCK, Clock
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apis (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS checks (
+    api_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,            -- Unix time, milliseconds
+    status_code INTEGER,
+    latency_ms REAL NOT NULL,
+    success INTEGER NOT NULL,
+    timeout INTEGER NOT NULL,
+    error TEXT,
+    PRIMARY KEY (api_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_checks_ts ON checks (ts);
+"""
+
+RETENTION_CHECK_INTERVAL = 3600.0  # Seconds between automatic retention passes
+
+
+class HistoryStore:
+    """
+    On-disk history of check results.
+
+    Rows are clustered by (api, timestamp), so a range query for one API
+    reads a contiguous slice of the table. Each sweep is written in a single
+    transaction, and rows older than retention_days are removed. Stale
+    copies and results served again from cache are not new checks and are
+    not stored.
+    """
+
+    def __init__(self, path: str, retention_days: float = 30.0, clock: Clock = SYSTEM_CLOCK):
+        """
+        Initializes store (creates database file if needed).
+
+        Args:
+            path: Database file path (":memory:" for a temporary store)
+            retention_days: Keep results for this many days (0 = forever)
+            clock: Time source (retention passes on its monotonic clock, default timestamps from its wall clock)
+        """
+        if retention_days < 0:
+            raise ValueError("retention_days cannot be negative")
+
+        self.path = path
+        self.retention_days = retention_days
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._api_ids: Dict[str, int] = {}
+        self._last: Dict[Tuple[str, str, str], CheckResult] = {}  # Last stored result per API
+        self._next_retention = 0.0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        for api_id, name in self._conn.execute("SELECT id, name FROM apis"):
+            self._api_ids[name] = api_id
+
+    def _api_id(self, name: str) -> int:
+        """Returns id for API name, creating it if needed (caller holds lock)."""
+        api_id = self._api_ids.get(name)
+        if api_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO apis (name) VALUES (?)", (name,))
+            api_id = self._conn.execute("SELECT id FROM apis WHERE name = ?", (name,)).fetchone()[0]
+            self._api_ids[name] = api_id
+        return api_id
+
+    def record(self, results: List[CheckResult], timestamp: Optional[float] = None) -> None:
+        """
+        Saves results of one sweep in a single transaction.
+
+        Stale results and results already stored (the same object served
+        again from cache) are skipped. Rows are stamped with the time each
+        check started (CheckResult.checked_at), falling back to the sweep time.
+
+        Args:
+            results: List of check results
+            timestamp: Unix time of the sweep, for results without checked_at (default: now)
+        """
+        sweep_time = timestamp if timestamp is not None else self.clock.time()
+
+        with self._lock:
+            new = []
+            for r in results:
+                key = (r.name, r.url, r.method)
+                if r.stale or self._last.get(key) is r:
+                    continue
+                self._last[key] = r
+                new.append(r)
+            if not new:
+                return
+            self._conn.execute("BEGIN")
+            try:
+                rows = []
+                for r in new:
+                    checked_at = r.checked_at if r.checked_at is not None else sweep_time
+                    rows.append((self._api_id(r.name), int(checked_at * 1000), r.status_code, r.latency_ms,
+                                 int(r.success), int(r.timeout), r.error))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checks "
+                    "(api_id, ts, status_code, latency_ms, success, timeout, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        now = self.clock.monotonic()
+        if self.retention_days and now >= self._next_retention:
+            self._next_retention = now + RETENTION_CHECK_INTERVAL
+            self.apply_retention()
+
+    def query(self, api_name: str, start: float, end: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Returns results of one API in a time range (oldest first).
+
+        Args:
+            api_name: API name
+            start: Range start (Unix time, inclusive)
+            end: Range end (Unix time, inclusive; default: now)
+            limit: Maximum number of rows (newest rows are kept)
+
+        Returns:
+            List of dictionaries with check results
+        """
+        end = end if end is not None else self.clock.time()
+        with self._lock:
+            api_id = self._api_ids.get(api_name)
+            if api_id is None:
+                return []
+            sql = ("SELECT ts, status_code, latency_ms, success, timeout, error FROM checks "
+                   "WHERE api_id = ? AND ts BETWEEN ? AND ? ORDER BY ts DESC")
+            params = [api_id, int(start * 1000), int(end * 1000)]
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                'timestamp': ts / 1000,
+                'status_code': status_code,
+                'latency_ms': latency_ms,
+                'success': bool(success),
+                'timeout': bool(timeout),
+                'error': error
+            }
+            for ts, status_code, latency_ms, success, timeout, error in reversed(rows)
+        ]
+
+    def api_names(self) -> List[str]:
+        """Returns names of all APIs with stored history."""
+        with self._lock:
+            return sorted(self._api_ids)
+
+    def apply_retention(self, now: Optional[float] = None) -> int:
+        """
+        Removes results older than retention_days.
+
+        Args:
+            now: Current Unix time (default: now)
+
+        Returns:
+            Number of removed results
+        """
+        if not self.retention_days:
+            return 0
+        cutoff = int(((now if now is not None else self.clock.time()) - self.retention_days * 86400) * 1000)
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM checks WHERE ts < ?", (cutoff,))
+            return cursor.rowcount
+
+    def count(self) -> int:
+        """Returns number of stored results."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes database."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_history_store_from_config(config_data: Optional[Dict[str, Any]],
+                                     clock: Clock = SYSTEM_CLOCK) -> Optional[HistoryStore]:
+    """
+    Creates history store from configuration.
+
+    Args:
+        config_data: Dictionary with history settings (path, retention_days)
+        clock: Time source of the store
+
+    Returns:
+        HistoryStore or None if history is not configured
+    """
+    if not config_data or not config_data.get('path'):
+        return None
+
+    return HistoryStore(
+        path=config_data['path'],
+        retention_days=float(config_data.get('retention_days', 30.0)),
+        clock=clock
+    )
@@ -0,0 +1,114 @@
+"""Module for precompressed, validator-tagged responses of static pages."""
+
+import gzip
+import hashlib
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+ENCODINGS = ('gzip', 'deflate')  # Preference order on equal quality
+
+
+@dataclass
+class CachedResponse:
+    """Response body rendered once and kept in every supported encoding."""
+    content_type: str
+    cache_control: str
+    bodies: Dict[str, bytes] = field(default_factory=dict)  # Encoding ('identity', 'gzip', 'deflate') -> bytes
+    etags: Dict[str, str] = field(default_factory=dict)  # Strong ETag per encoding
+
+    @classmethod
+    def build(cls, body: bytes, content_type: str, cache_control: str = 'no-cache') -> 'CachedResponse':
+        """
+        Compresses body and computes ETags.
+
+        Args:
+            body: Uncompressed response body
+            content_type: Content-Type header value
+            cache_control: Cache-Control header value
+
+        Returns:
+            CachedResponse
+        """
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        response = cls(content_type=content_type, cache_control=cache_control)
+        response.bodies['identity'] = body
+        response.bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        response.bodies['deflate'] = zlib.compress(body, 9)
+        # Each encoding is a different representation, so it gets its own strong ETag
+        for encoding in response.bodies:
+            suffix = '' if encoding == 'identity' else f"-{encoding}"
+            response.etags[encoding] = f'"{digest}{suffix}"'
+        return response
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[str, bytes, str]:
+        """
+        Picks representation for the request.
+
+        Args:
+            accept_encoding: Accept-Encoding request header
+
+        Returns:
+            Tuple (encoding, body, etag)
+        """
+        encoding = choose_encoding(accept_encoding)
+        return encoding, self.bodies[encoding], self.etags[encoding]
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Chooses content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Header value (None if missing)
+
+    Returns:
+        'gzip', 'deflate' or 'identity'
+    """
+    if not accept_encoding:
+        return 'identity'
+
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = 'identity', 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks If-None-Match header against an ETag (weak comparison, RFC 9110).
+
+    Args:
+        if_none_match: Header value (None if missing)
+        etag: Current ETag
+
+    Returns:
+        True if the client copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
@@ -0,0 +1,149 @@
+"""Module for refresh requests handed to the background monitoring worker."""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class RefreshJob:
+    """One requested sweep and its progress."""
+    id: str
+    total: int  # Number of APIs in the sweep
+    status: str = 'pending'  # pending, running, done, failed
+    done: int = 0
+    results: List[Dict[str, Any]] = field(default_factory=list)  # Completed results (completion order)
+    requests: int = 1  # Refresh requests coalesced into this job
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converts job to dictionary."""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'done': self.done,
+            'total': self.total,
+            'requests': self.requests,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'results': list(self.results)
+        }
+
+
+class RefreshQueue:
+    """
+    Refresh requests waiting for the monitoring worker.
+
+    At most one job is pending at a time: refresh requests arriving before the
+    worker picks it up join that job instead of queueing another sweep.
+    Finished jobs are kept (up to max_jobs) so clients can read the outcome.
+    """
+
+    def __init__(self, max_jobs: int = 100):
+        """
+        Initializes queue.
+
+        Args:
+            max_jobs: Number of jobs kept for progress requests
+        """
+        self.max_jobs = max_jobs
+        self.closed = False
+        self._cond = threading.Condition()
+        self._jobs: OrderedDict = OrderedDict()  # id -> RefreshJob, oldest first
+        self._pending: Optional[RefreshJob] = None
+
+    def request(self, total: int) -> Tuple[RefreshJob, bool]:
+        """
+        Requests a sweep.
+
+        Args:
+            total: Number of APIs the sweep will check
+
+        Returns:
+            Tuple (job, True if a new job was created; False if joined the pending one)
+        """
+        with self._cond:
+            if self._pending is not None:
+                self._pending.requests += 1
+                return self._pending, False
+
+            job = RefreshJob(id=uuid.uuid4().hex[:12], total=total)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.status not in ('done', 'failed'):
+                    break
+                self._jobs.popitem(last=False)
+            self._pending = job
+            self._cond.notify_all()
+            return job, True
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        """Returns job by id (None if unknown or already dropped)."""
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns consistent copy of job as a dictionary (None if unknown)."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def wait(self, timeout: float) -> Optional[RefreshJob]:
+        """
+        Waits for a refresh request (used by the worker instead of sleeping).
+
+        Args:
+            timeout: Maximum time to wait (seconds)
+
+        Returns:
+            Job marked as running, or None on timeout or close
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending is not None or self.closed, timeout)
+            job = self._pending
+            if job is None or self.closed:
+                return None
+            self._pending = None
+            job.status = 'running'
+            job.started_at = time.time()
+            return job
+
+    def progress(self, job: RefreshJob, result: Dict[str, Any]) -> None:
+        """
+        Records one completed check of a running job.
+
+        Args:
+            job: Running job
+            result: Check result as dictionary
+        """
+        with self._cond:
+            job.results.append(result)
+            job.done = len(job.results)
+
+    def finish(self, job: RefreshJob, error: Optional[str] = None) -> None:
+        """
+        Marks job as done (or failed with error).
+
+        Args:
+            job: Running job
+            error: Error message if the sweep failed
+        """
+        with self._cond:
+            job.status = 'failed' if error else 'done'
+            job.error = error
+            job.finished_at = time.time()
+
+    def close(self) -> None:
+        """Releases waiting worker."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
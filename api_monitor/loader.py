@@ -6,6 +6,15 @@ from typing import Dict, List, Any
 from dataclasses import dataclass
 
 
+# How much of a response a probe reads:
+#   budget - stream the response, read at most body_budget body bytes, then close
+#   head   - send HEAD first (GET with body budget if the server rejects HEAD)
+#   range  - GET with a Range header for the first body_budget bytes
+#   full   - download the whole body
+PROBE_MODES = ('budget', 'head', 'range', 'full')
+DEFAULT_BODY_BUDGET = 65536
+
+
 @dataclass
 class APIConfig:
     """Configuration for a single API check."""
@@ -15,6 +24,9 @@ class APIConfig:
     timeout: float = 5.0
     expected_status: int = 200
     headers: Dict[str, str] = None
+    interval: float = None  # own check interval (seconds); None = global interval
+    probe: str = "budget"  # how much of the response is read (see PROBE_MODES)
+    body_budget: int = DEFAULT_BODY_BUDGET  # most body bytes read by budget and range probes
 
     def __post_init__(self):
         if self.headers is None:
@@ -25,10 +37,20 @@ class APIConfig:
 class Config:
     """Main monitoring configuration."""
     apis: List[APIConfig]
-    output_format: str = "table"  # table, json, csv
+    output_format: str = "table"  # table, json, csv, html, jsonl
     log_file: str = None
     interval: int = None  # for periodic checks (seconds)
     notifications: Dict[str, Any] = None  # notification settings
+    connection_pool: Dict[str, Any] = None  # keep-alive session settings (pool_size, idle_timeout, max_age)
+    phase_timing: bool = False  # record DNS/connect/TLS/TTFB/body breakdown
+    jitter: float = 0.1  # fraction of interval over which due times are spread
+    history: Dict[str, Any] = None  # persistent history settings (path, retention_days)
+    stale_while_revalidate: float = None  # seconds stale results are served by the web dashboard (0 = off)
+    concurrency: Dict[str, Any] = None  # global and per-host limits (max_in_flight, per_host, min_interval, hosts)
+    output_rotation: Dict[str, Any] = None  # rotation of jsonl output file (max_bytes, interval, backups)
+    metrics: Dict[str, Any] = None  # Prometheus /metrics settings (latency_buckets in seconds)
+    circuit_breaker: Dict[str, Any] = None  # circuit breaker settings (enabled, failure_threshold, backoff, max_backoff, jitter)
+    hedging: Dict[str, Any] = None  # hedged request settings (enabled, percentile, budget, burst, min_samples, min_delay_ms)
 
 
 def load_config(config_path: str) -> Config:
@@ -66,11 +88,165 @@ def load_config(config_path: str) -> Config:
         raise ValueError("API list cannot be empty")
     
     # Output format validation
-    valid_formats = ['table', 'json', 'csv', 'html']
+    valid_formats = ['table', 'json', 'csv', 'html', 'jsonl']
     output_format = data.get('output_format', 'table')
     if output_format not in valid_formats:
         raise ValueError(f"Invalid output format: {output_format}. Valid: {', '.join(valid_formats)}")
     
+    # Output rotation validation
+    output_rotation = data.get('output_rotation')
+    if output_rotation is not None:
+        if not isinstance(output_rotation, dict):
+            raise ValueError("'output_rotation' section must be a dictionary")
+        max_bytes = output_rotation.get('max_bytes')
+        if max_bytes is not None and (isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes <= 0):
+            raise ValueError("output_rotation.max_bytes must be a positive integer")
+        if output_rotation.get('interval') is not None:
+            try:
+                rotation_interval = float(output_rotation['interval'])
+            except (ValueError, TypeError):
+                raise ValueError("output_rotation.interval must be a number")
+            if rotation_interval <= 0:
+                raise ValueError("output_rotation.interval must be a positive number")
+        backups = output_rotation.get('backups', 5)
+        if isinstance(backups, bool) or not isinstance(backups, int) or backups < 0:
+            raise ValueError("output_rotation.backups must be a non-negative integer")
+    
+    # Connection pool validation
+    connection_pool = data.get('connection_pool')
+    if connection_pool is not None:
+        if not isinstance(connection_pool, dict):
+            raise ValueError("'connection_pool' section must be a dictionary")
+        pool_size = connection_pool.get('pool_size')
+        if pool_size is not None and (isinstance(pool_size, bool) or not isinstance(pool_size, int) or pool_size <= 0):
+            raise ValueError("connection_pool.pool_size must be a positive integer")
+        for key in ('idle_timeout', 'max_age'):
+            if key not in connection_pool:
+                continue
+            try:
+                value = float(connection_pool[key])
+            except (ValueError, TypeError):
+                raise ValueError(f"connection_pool.{key} must be a number")
+            if value <= 0:
+                raise ValueError(f"connection_pool.{key} must be a positive number")
+    
+    phase_timing = data.get('phase_timing', False)
+    if not isinstance(phase_timing, bool):
+        raise ValueError("'phase_timing' must be true or false")
+    
+    # Jitter validation
+    jitter = data.get('jitter', 0.1)
+    try:
+        jitter = float(jitter)
+    except (ValueError, TypeError):
+        raise ValueError("'jitter' must be a number")
+    if jitter < 0 or jitter > 1:
+        raise ValueError("'jitter' must be between 0 and 1")
+    
+    # History validation
+    history = data.get('history')
+    if history is not None:
+        if not isinstance(history, dict):
+            raise ValueError("'history' section must be a dictionary")
+        if not isinstance(history.get('path'), str) or not history['path'].strip():
+            raise ValueError("history.path must be a non-empty string")
+        try:
+            retention_days = float(history.get('retention_days', 30))
+        except (ValueError, TypeError):
+            raise ValueError("history.retention_days must be a number")
+        if retention_days < 0:
+            raise ValueError("history.retention_days cannot be negative")
+    
+    # Stale-while-revalidate validation
+    stale_while_revalidate = data.get('stale_while_revalidate')
+    if stale_while_revalidate is not None:
+        try:
+            stale_while_revalidate = float(stale_while_revalidate)
+        except (ValueError, TypeError):
+            raise ValueError("'stale_while_revalidate' must be a number")
+        if stale_while_revalidate < 0:
+            raise ValueError("'stale_while_revalidate' cannot be negative")
+    
+    # Concurrency validation
+    concurrency = data.get('concurrency')
+    if concurrency is not None:
+        if not isinstance(concurrency, dict):
+            raise ValueError("'concurrency' section must be a dictionary")
+        hosts = concurrency.get('hosts') or {}
+        if not isinstance(hosts, dict):
+            raise ValueError("concurrency.hosts must be a dictionary")
+        _validate_limits(concurrency, 'concurrency', ('max_in_flight', 'per_host', 'min_interval'))
+        for host, settings in hosts.items():
+            if settings is not None and not isinstance(settings, dict):
+                raise ValueError(f"concurrency.hosts.{host} must be a dictionary")
+            _validate_limits(settings or {}, f"concurrency.hosts.{host}", ('per_host', 'min_interval'))
+    
+    # Metrics validation
+    metrics = data.get('metrics')
+    if metrics is not None:
+        if not isinstance(metrics, dict):
+            raise ValueError("'metrics' section must be a dictionary")
+        buckets = metrics.get('latency_buckets')
+        if buckets is not None:
+            if not isinstance(buckets, list) or not buckets or \
+                    not all(isinstance(b, (int, float)) and not isinstance(b, bool) for b in buckets):
+                raise ValueError("metrics.latency_buckets must be a non-empty list of numbers")
+            if buckets[0] <= 0 or any(b <= a for a, b in zip(buckets, buckets[1:])):
+                raise ValueError("metrics.latency_buckets must be positive and increasing")
+    
+    # Circuit breaker validation
+    circuit_breaker = data.get('circuit_breaker')
+    if circuit_breaker is not None:
+        if not isinstance(circuit_breaker, dict):
+            raise ValueError("'circuit_breaker' section must be a dictionary")
+        if not isinstance(circuit_breaker.get('enabled', True), bool):
+            raise ValueError("circuit_breaker.enabled must be true or false")
+        threshold = circuit_breaker.get('failure_threshold', 3)
+        if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 1:
+            raise ValueError("circuit_breaker.failure_threshold must be a positive integer")
+        for key in ('backoff', 'max_backoff'):
+            if key not in circuit_breaker:
+                continue
+            try:
+                value = float(circuit_breaker[key])
+            except (ValueError, TypeError):
+                raise ValueError(f"circuit_breaker.{key} must be a number")
+            if value <= 0:
+                raise ValueError(f"circuit_breaker.{key} must be a positive number")
+        if float(circuit_breaker.get('max_backoff', 600)) < float(circuit_breaker.get('backoff', 30)):
+            raise ValueError("circuit_breaker.max_backoff cannot be smaller than circuit_breaker.backoff")
+        try:
+            breaker_jitter = float(circuit_breaker.get('jitter', 0.2))
+        except (ValueError, TypeError):
+            raise ValueError("circuit_breaker.jitter must be a number")
+        if breaker_jitter < 0 or breaker_jitter >= 1:
+            raise ValueError("circuit_breaker.jitter must be at least 0 and less than 1")
+    
+    # Hedged requests validation
+    hedging = data.get('hedging')
+    if hedging is not None:
+        if not isinstance(hedging, dict):
+            raise ValueError("'hedging' section must be a dictionary")
+        if not isinstance(hedging.get('enabled', True), bool):
+            raise ValueError("hedging.enabled must be true or false")
+        hedge_values = {}
+        for key, default in (('percentile', 0.95), ('budget', 0.05), ('burst', 10), ('min_delay_ms', 1.0)):
+            try:
+                hedge_values[key] = float(hedging.get(key, default))
+            except (ValueError, TypeError):
+                raise ValueError(f"hedging.{key} must be a number")
+        if not 0 < hedge_values['percentile'] < 1:
+            raise ValueError("hedging.percentile must be between 0 and 1")
+        if not 0 < hedge_values['budget'] <= 1:
+            raise ValueError("hedging.budget must be greater than 0 and at most 1")
+        if hedge_values['burst'] < 1:
+            raise ValueError("hedging.burst must be at least 1")
+        if hedge_values['min_delay_ms'] < 0:
+            raise ValueError("hedging.min_delay_ms cannot be negative")
+        min_samples = hedging.get('min_samples', 20)
+        if isinstance(min_samples, bool) or not isinstance(min_samples, int) or min_samples < 1:
+            raise ValueError("hedging.min_samples must be a positive integer")
+    
     apis = []
     for idx, api_data in enumerate(data['apis']):
         if not isinstance(api_data, dict):
@@ -107,13 +283,34 @@ def load_config(config_path: str) -> Config:
         if headers is not None and not isinstance(headers, dict):
             raise ValueError(f"API '{api_data['name']}': headers must be a dictionary")
         
+        # Interval validation
+        interval = api_data.get('interval')
+        if interval is not None:
+            try:
+                interval = float(interval)
+            except (ValueError, TypeError):
+                raise ValueError(f"API '{api_data['name']}': interval must be a number")
+            if interval <= 0:
+                raise ValueError(f"API '{api_data['name']}': interval must be a positive number")
+        
+        # Probe mode validation
+        probe = api_data.get('probe', 'budget')
+        if probe not in PROBE_MODES:
+            raise ValueError(f"API '{api_data['name']}': probe must be one of {', '.join(PROBE_MODES)}")
+        body_budget = api_data.get('body_budget', DEFAULT_BODY_BUDGET)
+        if isinstance(body_budget, bool) or not isinstance(body_budget, int) or body_budget < 0:
+            raise ValueError(f"API '{api_data['name']}': body_budget must be a non-negative integer (bytes)")
+        
         api_config = APIConfig(
             name=api_data['name'],
             url=url.strip(),
             method=api_data.get('method', 'GET'),
             timeout=timeout,
             expected_status=expected_status,
-            headers=headers or {}
+            headers=headers or {},
+            interval=interval,
+            probe=probe,
+            body_budget=body_budget
         )
         apis.append(api_config)
     
@@ -122,10 +319,47 @@ def load_config(config_path: str) -> Config:
         output_format=output_format,
         log_file=data.get('log_file'),
         interval=data.get('interval'),
-        notifications=data.get('notifications')
+        notifications=data.get('notifications'),
+        connection_pool=connection_pool,
+        phase_timing=phase_timing,
+        jitter=jitter,
+        history=history,
+        stale_while_revalidate=stale_while_revalidate,
+        concurrency=concurrency,
+        output_rotation=output_rotation,
+        metrics=metrics,
+        circuit_breaker=circuit_breaker,
+        hedging=hedging
     )
 
 
+def _validate_limits(section: Dict[str, Any], prefix: str, keys) -> None:
+    """
+    Validates concurrency limits of one configuration section.
+    
+    Args:
+        section: Section with limits
+        prefix: Section name for error messages
+        keys: Allowed keys (min_interval is a non-negative number, others positive integers)
+        
+    Raises:
+        ValueError: If a value is incorrect
+    """
+    for key in keys:
+        if key not in section:
+            continue
+        value = section[key]
+        if key == 'min_interval':
+            try:
+                value = float(value)
+            except (ValueError, TypeError):
+                raise ValueError(f"{prefix}.{key} must be a number")
+            if value < 0:
+                raise ValueError(f"{prefix}.{key} cannot be negative")
+        elif isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise ValueError(f"{prefix}.{key} must be a positive integer")
+
+
 def save_config(config: Config, config_path: str) -> None:
     """
     Saves configuration to YAML file.
@@ -154,6 +388,36 @@ def save_config(config: Config, config_path: str) -> None:
     if config.notifications:
         data['notifications'] = config.notifications
     
+    if config.connection_pool:
+        data['connection_pool'] = config.connection_pool
+    
+    if config.phase_timing:
+        data['phase_timing'] = True
+    
+    if config.jitter != 0.1:
+        data['jitter'] = config.jitter
+    
+    if config.history:
+        data['history'] = config.history
+    
+    if config.stale_while_revalidate is not None:
+        data['stale_while_revalidate'] = config.stale_while_revalidate
+    
+    if config.concurrency:
+        data['concurrency'] = config.concurrency
+    
+    if config.output_rotation:
+        data['output_rotation'] = config.output_rotation
+    
+    if config.metrics:
+        data['metrics'] = config.metrics
+    
+    if config.circuit_breaker:
+        data['circuit_breaker'] = config.circuit_breaker
+    
+    if config.hedging:
+        data['hedging'] = config.hedging
+    
     # Convert APIConfig to dictionaries
     for api in config.apis:
         api_dict = {
@@ -168,6 +432,15 @@ def save_config(config: Config, config_path: str) -> None:
         if api.headers:
             api_dict['headers'] = api.headers
         
+        if api.interval:
+            api_dict['interval'] = api.interval
+        
+        if api.probe != 'budget':
+            api_dict['probe'] = api.probe
+        
+        if api.body_budget != DEFAULT_BODY_BUDGET:
+            api_dict['body_budget'] = api.body_budget
+        
         data['apis'].append(api_dict)
     
     # Save to YAML
@@ -0,0 +1,266 @@
+"""Module for Prometheus metrics of check results."""
+
+import bisect
+import gzip
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .checker import CheckResult
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SWEEP_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Per-API metric families (name, type, help), in exposition order
+API_FAMILIES = (
+    ('api_monitor_up', 'gauge', 'Whether the last check of the API succeeded (1) or failed (0).'),
+    ('api_monitor_status_code', 'gauge', 'HTTP status code of the last check (0 if there was no response).'),
+    ('api_monitor_last_check_timestamp_seconds', 'gauge', 'Unix time of the last check.'),
+    ('api_monitor_checks_total', 'counter', 'Checks performed, by result.'),
+    ('api_monitor_timeouts_total', 'counter', 'Checks that timed out.'),
+    ('api_monitor_latency_seconds', 'histogram', 'Check latency.'),
+    ('api_monitor_circuit_open', 'gauge', 'Whether checks of the API fail fast because its circuit breaker is open.'),
+)
+
+
+def escape_label(value: str) -> str:
+    """Escapes label value for the text exposition format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    """Formats sample value (integers without decimal point)."""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+@dataclass
+class Histogram:
+    """Cumulative histogram with fixed upper bounds."""
+    bounds: Sequence[float]
+    counts: List[int] = field(default_factory=list)  # Per bucket (not cumulative); last one is +Inf
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """Adds one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str = '') -> str:
+        """
+        Renders bucket, sum and count samples.
+
+        Args:
+            name: Metric family name
+            labels: Rendered label pairs without braces ('' for none)
+
+        Returns:
+            Exposition lines
+        """
+        prefix = f"{labels}," if labels else ''
+        lines = []
+        cumulative = 0
+        for bound, count in zip(list(self.bounds) + [float('inf')], self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}\n')
+        braces = f"{{{labels}}}" if labels else ''
+        lines.append(f"{name}_sum{braces} {format_value(self.total)}\n")
+        lines.append(f"{name}_count{braces} {self.count}\n")
+        return ''.join(lines)
+
+
+@dataclass
+class APIMetrics:
+    """Aggregated metrics of one API."""
+    labels: str  # Rendered label pairs: api, url, method
+    latency: Histogram
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    up: bool = False
+    circuit_open: bool = False
+    status_code: Optional[int] = None
+    last_check: float = 0.0
+    last_result: Optional[CheckResult] = None  # Cached results are the same object and not counted again
+    fragments: Tuple[bytes, ...] = ()  # Rendered samples per API_FAMILIES entry
+
+
+class MetricsRegistry:
+    """
+    Preaggregated metrics of all monitored APIs.
+
+    Every result updates its API's counters and histogram and re-renders
+    that API's samples, so a scrape only joins prerendered text. The joined
+    body (and its gzip copy) is kept until the next update.
+    """
+
+    def __init__(self, latency_buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initializes registry.
+
+        Args:
+            latency_buckets: Upper bounds of latency buckets in seconds (increasing)
+        """
+        self.latency_buckets = tuple(float(bound) for bound in latency_buckets)
+        if not self.latency_buckets:
+            raise ValueError("At least one latency bucket is required")
+        if any(b <= a for a, b in zip(self.latency_buckets, self.latency_buckets[1:])) or \
+                self.latency_buckets[0] <= 0:
+            raise ValueError("Latency buckets must be positive and increasing")
+
+        self._lock = threading.Lock()
+        self._apis: Dict[Tuple[str, str, str], APIMetrics] = {}
+        self._sweeps = Histogram(SWEEP_BUCKETS)
+        self._last_sweep: Optional[float] = None
+        self._bodies: Dict[str, bytes] = {}  # Encoding -> rendered body, cleared on update
+
+    def observe(self, result: CheckResult) -> None:
+        """
+        Records one check result.
+
+        Results served from cache (the same object again, or stale copies)
+        and fast failures of an open circuit update the gauges but are not
+        counted as checks.
+
+        Args:
+            result: Check result
+        """
+        with self._lock:
+            self._observe(result, time.time())
+            self._bodies.clear()
+
+    def observe_all(self, results: List[CheckResult]) -> None:
+        """
+        Records results of a full sweep; APIs missing from it are dropped.
+
+        Args:
+            results: Check results of all monitored APIs
+        """
+        now = time.time()
+        with self._lock:
+            current = set()
+            for result in results:
+                current.add(self._observe(result, now))
+            for key in [key for key in self._apis if key not in current]:
+                del self._apis[key]
+            self._bodies.clear()
+
+    def observe_sweep(self, seconds: float) -> None:
+        """
+        Records duration of one monitoring sweep.
+
+        Args:
+            seconds: Sweep duration
+        """
+        with self._lock:
+            self._sweeps.observe(seconds)
+            self._last_sweep = seconds
+            self._bodies.clear()
+
+    def _observe(self, result: CheckResult, now: float) -> Tuple[str, str, str]:
+        """Updates API metrics (caller holds lock); returns API key."""
+        key = (result.name, result.url, result.method)
+        state = self._apis.get(key)
+        if state is None:
+            labels = (f'api="{escape_label(result.name)}",url="{escape_label(result.url)}",'
+                      f'method="{escape_label(result.method)}"')
+            state = self._apis[key] = APIMetrics(labels, Histogram(self.latency_buckets))
+        elif result is state.last_result:
+            return key
+
+        state.last_result = result
+        state.up = result.success
+        state.circuit_open = result.circuit_open
+        state.status_code = result.status_code
+        if not result.stale and not result.circuit_open:
+            state.last_check = now
+            state.latency.observe(result.latency_ms / 1000)
+            if result.success:
+                state.successes += 1
+            else:
+                state.failures += 1
+            if result.timeout:
+                state.timeouts += 1
+        state.fragments = self._render_api(state)
+        return key
+
+    def _render_api(self, state: APIMetrics) -> Tuple[bytes, ...]:
+        """Renders samples of one API for every family in API_FAMILIES."""
+        labels = state.labels
+        return tuple(fragment.encode('utf-8') for fragment in (
+            f"api_monitor_up{{{labels}}} {1 if state.up else 0}\n",
+            f"api_monitor_status_code{{{labels}}} {state.status_code or 0}\n",
+            f"api_monitor_last_check_timestamp_seconds{{{labels}}} {state.last_check:.3f}\n",
+            f'api_monitor_checks_total{{{labels},result="success"}} {state.successes}\n'
+            f'api_monitor_checks_total{{{labels},result="failure"}} {state.failures}\n',
+            f"api_monitor_timeouts_total{{{labels}}} {state.timeouts}\n",
+            state.latency.render('api_monitor_latency_seconds', labels),
+            f"api_monitor_circuit_open{{{labels}}} {1 if state.circuit_open else 0}\n",
+        ))
+
+    def render(self, encoding: str = 'identity') -> bytes:
+        """
+        Returns metrics in the Prometheus text exposition format.
+
+        Args:
+            encoding: 'identity' or 'gzip'
+
+        Returns:
+            Response body
+        """
+        with self._lock:
+            body = self._bodies.get(encoding)
+            if body is not None:
+                return body
+
+            plain = self._bodies.get('identity')
+            if plain is None:
+                states = list(self._apis.values())
+                parts = []
+                for index, (name, kind, help_text) in enumerate(API_FAMILIES):
+                    parts.append(f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n".encode('utf-8'))
+                    parts.extend(state.fragments[index] for state in states)
+                tail = [
+                    "# HELP api_monitor_apis Monitored APIs.\n# TYPE api_monitor_apis gauge\n"
+                    f"api_monitor_apis {len(states)}\n",
+                    "# HELP api_monitor_sweep_duration_seconds Duration of monitoring sweeps.\n"
+                    "# TYPE api_monitor_sweep_duration_seconds histogram\n",
+                    self._sweeps.render('api_monitor_sweep_duration_seconds')
+                ]
+                if self._last_sweep is not None:
+                    tail.append("# HELP api_monitor_last_sweep_duration_seconds Duration of the last sweep.\n"
+                                "# TYPE api_monitor_last_sweep_duration_seconds gauge\n"
+                                f"api_monitor_last_sweep_duration_seconds {self._last_sweep:.6f}\n")
+                parts.append(''.join(tail).encode('utf-8'))
+                plain = self._bodies['identity'] = b''.join(parts)
+
+            if encoding == 'gzip':
+                # Fast level: the body changes after every sweep
+                self._bodies['gzip'] = gzip.compress(plain, compresslevel=1, mtime=0)
+            return self._bodies[encoding]
+
+
+def create_metrics_registry_from_config(settings: Optional[Dict[str, Any]]) -> MetricsRegistry:
+    """
+    Creates metrics registry from configuration.
+
+    Args:
+        settings: Metrics settings (latency_buckets in seconds), see Config.metrics
+
+    Returns:
+        MetricsRegistry
+    """
+    settings = settings or {}
+    return MetricsRegistry(settings.get('latency_buckets') or DEFAULT_LATENCY_BUCKETS)
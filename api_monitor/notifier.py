@@ -66,6 +66,7 @@ class NotificationService:
         
         # If notify on every error
         if self.config.notify_on_all_failures and is_failed:
+            self.last_notified_state[api_name] = is_failed
             return True
         
         # Notify only on state change
@@ -224,6 +225,9 @@ class NotificationService:
         if has_failures:
             # Check each failed API
             for api in failed_apis:
+                # Fast failures of an open circuit repeat the failure already notified
+                if api.circuit_open and self.last_notified_state.get(api.name):
+                    continue
                 if self.should_notify(api.name, True):
                     should_notify = True
                     break
@@ -3,22 +3,53 @@
 import json
 import csv
 import io
-from typing import List
-from tabulate import tabulate
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from .checker import CheckResult
 
+# Import for type hints
+if TYPE_CHECKING:
+    from .sketch import LatencySketches
 
-def format_table(results: List[CheckResult]) -> str:
+
+PHASE_CSV_HEADERS = ["DNS (ms)", "Connect (ms)", "TLS (ms)", "TTFB (ms)", "Body (ms)"]
+DEFAULT_ROTATION_BACKUPS = 5  # Rotated JSON Lines files kept (<file>.1 ... <file>.N)
+
+
+def format_percentiles(latency: 'LatencySketches', result: CheckResult) -> str:
+    """
+    Formats p50/p95/p99 latency of a result's API.
+    
+    Args:
+        latency: Latency sketches
+        result: Check result
+        
+    Returns:
+        String like "120.5 / 340.2 / 512.0" ("N/A" without data)
+    """
+    percentiles = latency.percentiles(result)
+    if percentiles['p50'] is None:
+        return "N/A"
+    return " / ".join(f"{percentiles[name]:.1f}" for name in ('p50', 'p95', 'p99'))
+
+
+def format_table(results: List[CheckResult], latency: Optional['LatencySketches'] = None) -> str:
     """
     Formats results as a table for CLI.
     
     Args:
         results: List of check results
+        latency: Latency sketches; adds a p50/p95/p99 column (optional)
         
     Returns:
         Formatted table string
     """
     headers = ["API", "URL", "Status", "Latency (ms)", "Result"]
+    if latency is not None:
+        headers.insert(4, "p50 / p95 / p99 (ms)")
     rows = []
     
     for result in results:
@@ -31,7 +62,6 @@ def format_table(results: List[CheckResult]) -> str:
         else:
             status = "N/A"
         
-        latency = f"{result.latency_ms:.2f}"
         result_status = "✓ OK" if result.success else "✗ FAIL"
         if result.error:
             result_status += f" ({result.error})"
@@ -41,14 +71,18 @@ def format_table(results: List[CheckResult]) -> str:
         if len(url_display) > 50:
             url_display = url_display[:47] + "..."
         
-        rows.append([
+        row = [
             result.name,
             url_display,
             status,
-            latency,
+            f"{result.latency_ms:.2f}",
             result_status
-        ])
+        ]
+        if latency is not None:
+            row.insert(4, format_percentiles(latency, result))
+        rows.append(row)
     
+    from tabulate import tabulate
     return tabulate(rows, headers=headers, tablefmt="grid")
 
 
@@ -64,19 +98,205 @@ def format_json(results: List[CheckResult]) -> str:
     """
     data = []
     for result in results:
-        data.append({
+        item = {
             "name": result.name,
             "url": result.url,
             "status_code": result.status_code,
             "latency_ms": result.latency_ms,
             "success": result.success,
             "error": result.error,
-            "timeout": result.timeout
-        })
+            "timeout": result.timeout,
+            "connection_reused": result.connection_reused,
+            "circuit_open": result.circuit_open,
+            "bytes_read": result.bytes_read
+        }
+        if result.checked_at is not None:
+            item["checked_at"] = format_timestamp(result.checked_at)
+        if result.phases is not None:
+            item["phases"] = result.phases.to_dict()
+        data.append(item)
     
     return json.dumps(data, indent=2, ensure_ascii=False)
 
 
+def format_timestamp(timestamp: float) -> str:
+    """Formats Unix time as UTC ISO 8601 with milliseconds."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(timespec='milliseconds')
+
+
+def result_to_record(result: CheckResult, timestamp: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Converts result to a flat record for JSON Lines output.
+    
+    Args:
+        result: Check result
+        timestamp: Time the result was reported (Unix time, default: now)
+        
+    Returns:
+        Dictionary with time, request and outcome fields
+    """
+    record = {
+        "time": format_timestamp(timestamp if timestamp is not None else time.time()),
+        "name": result.name,
+        "url": result.url,
+        "method": result.method,
+        "status_code": result.status_code,
+        "latency_ms": round(result.latency_ms, 2),
+        "success": result.success,
+        "error": result.error,
+        "timeout": result.timeout,
+        "connection_reused": result.connection_reused,
+        "stale": result.stale,
+        "circuit_open": result.circuit_open,
+        "bytes_read": result.bytes_read
+    }
+    if result.checked_at is not None:
+        record["checked_at"] = format_timestamp(result.checked_at)
+    if result.phases is not None:
+        record["phases"] = result.phases.to_dict()
+    return record
+
+
+def format_jsonl(results: List[CheckResult]) -> str:
+    """
+    Formats results as JSON Lines (one compact record per line).
+    
+    Args:
+        results: List of check results
+        
+    Returns:
+        JSON Lines string
+    """
+    now = time.time()
+    return "".join(json.dumps(result_to_record(result, now), ensure_ascii=False, separators=(',', ':')) + "\n"
+                   for result in results)
+
+
+class JsonLinesWriter:
+    """
+    Streams results as JSON Lines to a file or stdout.
+    
+    Each result is written and flushed as soon as its check finishes, so
+    memory use does not depend on the number of APIs and tailing tools see
+    results right away. The file is appended to across sweeps and restarts.
+    It can be rotated by size and/or time: the current file is renamed to
+    <file>.1 (older copies move to .2, .3, ...) and a new file is started.
+    """
+    
+    def __init__(self, output_file: Optional[str] = None, max_bytes: Optional[int] = None,
+                 interval: Optional[float] = None, backups: int = DEFAULT_ROTATION_BACKUPS):
+        """
+        Initializes writer.
+        
+        Args:
+            output_file: Path to file (None: write to stdout, no rotation)
+            max_bytes: Rotate before the file would exceed this size
+            interval: Rotate when a new period of this many seconds begins
+                (periods are aligned to Unix time, e.g. 3600 rotates on the hour)
+            backups: Rotated files kept
+        """
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive number")
+        if interval is not None and interval <= 0:
+            raise ValueError("Rotation interval must be a positive number")
+        if backups < 0:
+            raise ValueError("Number of backups cannot be negative")
+        
+        self.output_file = output_file
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backups = backups
+        self.records = 0
+        self._stream = None
+        self._size = 0
+        self._period = None
+        if output_file is None:
+            self._stream = sys.stdout
+    
+    def _period_of(self, timestamp: float) -> Optional[int]:
+        """Returns rotation period a point in time belongs to."""
+        return int(timestamp // self.interval) if self.interval else None
+    
+    def _open(self) -> None:
+        """Opens output file for appending."""
+        self._stream = open(self.output_file, 'a', encoding='utf-8', newline='')
+        self._size = os.path.getsize(self.output_file)
+        # A file left by an earlier run belongs to the period it was last written in
+        modified = os.path.getmtime(self.output_file) if self._size else time.time()
+        self._period = self._period_of(modified)
+    
+    def write(self, result: CheckResult) -> None:
+        """
+        Appends one result.
+        
+        Args:
+            result: Check result
+        """
+        now = time.time()
+        line = json.dumps(result_to_record(result, now), ensure_ascii=False, separators=(',', ':')) + "\n"
+        
+        if self.output_file is not None:
+            size = len(line.encode('utf-8'))
+            if self._stream is None:
+                self._open()
+            if self._size and (
+                (self.max_bytes and self._size + size > self.max_bytes)
+                or (self.interval and self._period_of(now) != self._period)
+            ):
+                self.rotate()
+            self._period = self._period_of(now)
+            self._size += size
+        
+        self._stream.write(line)
+        self._stream.flush()
+        self.records += 1
+    
+    def rotate(self) -> None:
+        """Moves current file to <file>.1 and starts a new one."""
+        if self.output_file is None:
+            return
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        
+        if self.backups:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.output_file}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.output_file}.{index + 1}")
+            if os.path.exists(self.output_file):
+                os.replace(self.output_file, f"{self.output_file}.1")
+        elif os.path.exists(self.output_file):
+            os.remove(self.output_file)
+        self._open()
+    
+    def close(self) -> None:
+        """Closes output file (stdout is left open)."""
+        if self.output_file is not None and self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+def create_jsonl_writer(output_file: Optional[str], rotation: Optional[Dict[str, Any]] = None) -> JsonLinesWriter:
+    """
+    Creates JSON Lines writer.
+    
+    Args:
+        output_file: Path to file (None: stdout)
+        rotation: Rotation settings (max_bytes, interval, backups), see Config.output_rotation
+        
+    Returns:
+        JsonLinesWriter
+    """
+    rotation = rotation or {}
+    return JsonLinesWriter(
+        output_file,
+        max_bytes=rotation.get('max_bytes'),
+        interval=rotation.get('interval'),
+        backups=rotation.get('backups', DEFAULT_ROTATION_BACKUPS)
+    )
+
+
 def format_csv(results: List[CheckResult]) -> str:
     """
     Formats results as CSV.
@@ -90,12 +310,18 @@ def format_csv(results: List[CheckResult]) -> str:
     output = io.StringIO()
     writer = csv.writer(output)
     
+    # Phase columns are added only when phase timing was recorded
+    with_phases = any(result.phases is not None for result in results)
+    
     # Headers
-    writer.writerow(["API", "URL", "Status Code", "Latency (ms)", "Success", "Error", "Timeout"])
+    headers = ["API", "URL", "Status Code", "Latency (ms)", "Success", "Error", "Timeout"]
+    if with_phases:
+        headers += PHASE_CSV_HEADERS
+    writer.writerow(headers)
     
     # Data
     for result in results:
-        writer.writerow([
+        row = [
             result.name,
             result.url,
             result.status_code or "",
@@ -103,17 +329,21 @@ def format_csv(results: List[CheckResult]) -> str:
             result.success,
             result.error or "",
             result.timeout
-        ])
+        ]
+        if with_phases:
+            row += list(result.phases.to_dict().values()) if result.phases else [""] * len(PHASE_CSV_HEADERS)
+        writer.writerow(row)
     
     return output.getvalue()
 
 
-def format_html(results: List[CheckResult]) -> str:
+def format_html(results: List[CheckResult], latency: Optional['LatencySketches'] = None) -> str:
     """
     Formats results as HTML.
     
     Args:
         results: List of check results
+        latency: Latency sketches; adds a p50/p95/p99 column (optional)
         
     Returns:
         HTML string
@@ -128,6 +358,9 @@ def format_html(results: List[CheckResult]) -> str:
     # Determine status color
     status_color = "#28a745" if successful == total else "#dc3545" if successful == 0 else "#ffc107"
     
+    # Percentile column only when latency sketches are available
+    percentiles_header = "                        <th>p50 / p95 / p99</th>\n" if latency is not None else ""
+    
     html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -310,7 +543,7 @@ def format_html(results: List[CheckResult]) -> str:
                         <th>URL</th>
                         <th>Status</th>
                         <th>Latency</th>
-                        <th>Result</th>
+{percentiles_header}                        <th>Result</th>
                     </tr>
                 </thead>
                 <tbody>
@@ -341,13 +574,18 @@ def format_html(results: List[CheckResult]) -> str:
         
         status_code = str(result.status_code) if result.status_code else "N/A"
         error_text = f"<br><small style='color: #dc3545;'>{result.error}</small>" if result.error else ""
+        percentiles_cell = ""
+        if latency is not None:
+            percentiles = format_percentiles(latency, result)
+            unit = " ms" if percentiles != "N/A" else ""
+            percentiles_cell = f"\n                        <td>{percentiles}{unit}</td>"
         
         html += f"""
                     <tr>
                         <td><strong>{result.name}</strong></td>
                         <td><a href="{result.url}" target="_blank" class="url">{result.url}</a></td>
                         <td>{status_code}</td>
-                        <td><span class="latency {latency_class}">{result.latency_ms:.2f} ms</span></td>
+                        <td><span class="latency {latency_class}">{result.latency_ms:.2f} ms</span></td>{percentiles_cell}
                         <td><span class="status-badge {status_class}">{status_text}</span>{error_text}</td>
                     </tr>
 """
@@ -369,35 +607,42 @@ def format_html(results: List[CheckResult]) -> str:
     return html
 
 
-def print_report(results: List[CheckResult], output_format: str = "table", output_file: str = None):
+def print_report(results: List[CheckResult], output_format: str = "table", output_file: str = None,
+                 latency: Optional['LatencySketches'] = None):
     """
     Outputs report in specified format.
     
     Args:
         results: List of check results
-        output_format: Output format (table, json, csv, html)
+        output_format: Output format (table, json, csv, html, jsonl)
         output_file: Path to file for saving (optional)
+        latency: Latency sketches for percentile columns (table and html)
     """
     if output_format == "json":
         content = format_json(results)
+    elif output_format == "jsonl":
+        content = format_jsonl(results)
     elif output_format == "csv":
         content = format_csv(results)
     elif output_format == "html":
-        content = format_html(results)
+        content = format_html(results, latency)
         # For HTML always save to file, if not specified - use default
         if not output_file:
             output_file = "api_report.html"
     else:  # table
-        content = format_table(results)
+        content = format_table(results, latency)
     
     if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
+        # JSON Lines files collect records, other reports are replaced
+        with open(output_file, 'a' if output_format == "jsonl" else 'w', encoding='utf-8') as f:
             f.write(content)
         print(f"Report saved to {output_file}")
         if output_format == "html":
             import os
             abs_path = os.path.abspath(output_file)
             print(f"Open in browser: file:///{abs_path.replace(os.sep, '/')}")
+    elif output_format == "jsonl":
+        print(content, end="")
     else:
         print(content)
 
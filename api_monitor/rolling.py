@@ -0,0 +1,217 @@
+"""Module for uptime, error rate and latency over rolling time windows."""
+
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .checker import CheckResult
+
+
+# Reported windows (label, seconds)
+WINDOWS = (('1h', 3600), ('24h', 86400), ('7d', 7 * 86400), ('30d', 30 * 86400))
+MINUTE_BUCKETS = 60  # Last hour at minute resolution
+HOUR_BUCKETS = 30 * 24  # Last 30 days at hour resolution
+
+
+class RingCounter:
+    """
+    Check totals in a ring of fixed-width time buckets.
+
+    Slot i holds bucket number b with b % size == i. Moving to a newer
+    bucket clears the slots skipped since the last update, so an update is
+    O(1) amortized and a query is O(size).
+    """
+
+    def __init__(self, resolution: float, size: int):
+        """
+        Initializes empty ring.
+
+        Args:
+            resolution: Bucket width in seconds
+            size: Number of buckets (ring covers resolution * size seconds)
+        """
+        self.resolution = resolution
+        self.size = size
+        self.checks = array('I', bytes(4 * size))
+        self.failures = array('I', bytes(4 * size))
+        self.latency = array('d', bytes(8 * size))  # Sum of latencies (ms)
+        self.timed = array('I', bytes(4 * size))  # Checks with a latency (probes sent)
+        self.head: Optional[int] = None  # Newest bucket number written
+
+    def _advance(self, bucket: int) -> None:
+        """Clears slots of buckets between the head and a newer bucket."""
+        if self.head is None or bucket - self.head >= self.size:
+            for index in range(self.size):
+                self.checks[index] = self.failures[index] = self.timed[index] = 0
+                self.latency[index] = 0.0
+        else:
+            for skipped in range(self.head + 1, bucket + 1):
+                index = skipped % self.size
+                self.checks[index] = self.failures[index] = self.timed[index] = 0
+                self.latency[index] = 0.0
+        self.head = bucket
+
+    def add(self, timestamp: float, success: bool, latency_ms: Optional[float]) -> None:
+        """
+        Counts one check.
+
+        Args:
+            timestamp: Time of the check (Unix time)
+            success: Check succeeded
+            latency_ms: Check latency (None if no request was sent)
+        """
+        bucket = int(timestamp // self.resolution)
+        if self.head is None or bucket > self.head:
+            self._advance(bucket)
+        elif bucket <= self.head - self.size:
+            return  # Older than the ring
+        index = bucket % self.size
+        self.checks[index] += 1
+        if not success:
+            self.failures[index] += 1
+        if latency_ms is not None:
+            self.latency[index] += latency_ms
+            self.timed[index] += 1
+
+    def totals(self, now: float, seconds: float) -> Tuple[int, int, float, int]:
+        """
+        Sums buckets of a window ending now.
+
+        The window covers whole buckets: the current one and the ones before
+        it, up to `seconds` (at most the whole ring).
+
+        Args:
+            now: End of the window (Unix time)
+            seconds: Window length
+
+        Returns:
+            Tuple (checks, failures, latency sum in ms, checks with a latency)
+        """
+        if self.head is None:
+            return 0, 0, 0.0, 0
+        newest = int(now // self.resolution)
+        count = min(self.size, max(1, int(round(seconds / self.resolution))))
+        first = max(newest - count + 1, self.head - self.size + 1)
+        checks = failures = timed = 0
+        latency = 0.0
+        for bucket in range(first, min(newest, self.head) + 1):
+            index = bucket % self.size
+            checks += self.checks[index]
+            failures += self.failures[index]
+            latency += self.latency[index]
+            timed += self.timed[index]
+        return checks, failures, latency, timed
+
+
+class RollingStats:
+    """Rolling totals of one API (or all APIs): minute buckets for 1h, hour buckets for 30 days."""
+
+    def __init__(self):
+        """Initializes empty totals."""
+        self.minutes = RingCounter(60, MINUTE_BUCKETS)
+        self.hours = RingCounter(3600, HOUR_BUCKETS)
+
+    def add(self, timestamp: float, success: bool, latency_ms: Optional[float]) -> None:
+        """Counts one check in both rings (latency None if no request was sent)."""
+        self.minutes.add(timestamp, success, latency_ms)
+        self.hours.add(timestamp, success, latency_ms)
+
+    def window(self, now: float, seconds: float) -> Dict[str, Any]:
+        """
+        Returns statistics of a window ending now.
+
+        Args:
+            now: End of the window (Unix time)
+            seconds: Window length (up to 1 hour at minute resolution, longer at hour resolution)
+
+        Returns:
+            Dictionary with checks, failures, uptime_percent, error_rate and
+            mean_latency_ms (None without checks)
+        """
+        ring = self.minutes if seconds <= self.minutes.resolution * self.minutes.size else self.hours
+        checks, failures, latency, timed = ring.totals(now, seconds)
+        if not checks:
+            return {'checks': 0, 'failures': 0, 'uptime_percent': None, 'error_rate': None,
+                    'mean_latency_ms': None}
+        return {
+            'checks': checks,
+            'failures': failures,
+            'uptime_percent': round((checks - failures) / checks * 100, 3),
+            'error_rate': round(failures / checks, 5),
+            'mean_latency_ms': round(latency / timed, 2) if timed else None
+        }
+
+    def windows(self, now: float) -> Dict[str, Dict[str, Any]]:
+        """Returns statistics of every window in WINDOWS."""
+        return {label: self.window(now, seconds) for label, seconds in WINDOWS}
+
+
+class RollingWindows:
+    """
+    Rolling statistics per API and over all APIs.
+
+    Every fresh result updates its API's rings and the overall rings in
+    O(1). Results served again from cache (the same object, or stale
+    copies) are not counted. Fast failures of an open circuit count as
+    failed checks without a latency.
+    """
+
+    def __init__(self):
+        """Initializes empty statistics."""
+        self._lock = threading.Lock()
+        self.overall = RollingStats()
+        self._apis: Dict[Tuple[str, str, str], RollingStats] = {}
+        self._last: Dict[Tuple[str, str, str], CheckResult] = {}
+
+    def observe(self, result: CheckResult, timestamp: Optional[float] = None) -> None:
+        """
+        Counts one result.
+
+        Args:
+            result: Check result
+            timestamp: Time of the check (Unix time, default: now)
+        """
+        key = (result.name, result.url, result.method)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if result.stale or self._last.get(key) is result:
+                return
+            self._last[key] = result
+            stats = self._apis.get(key)
+            if stats is None:
+                stats = self._apis[key] = RollingStats()
+            latency_ms = None if result.circuit_open else result.latency_ms
+            stats.add(timestamp, result.success, latency_ms)
+            self.overall.add(timestamp, result.success, latency_ms)
+
+    def observe_all(self, results: Iterable[CheckResult], timestamp: Optional[float] = None) -> None:
+        """Counts several results checked at the same time."""
+        timestamp = time.time() if timestamp is None else timestamp
+        for result in results:
+            self.observe(result, timestamp)
+
+    def retain(self, keys: Iterable[Tuple[str, str, str]]) -> None:
+        """Drops statistics of APIs that are no longer monitored (overall totals are kept)."""
+        keep = set(keys)
+        with self._lock:
+            for key in [key for key in self._apis if key not in keep]:
+                del self._apis[key]
+                self._last.pop(key, None)
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns statistics of all windows.
+
+        Args:
+            now: End of the windows (Unix time, default: now)
+
+        Returns:
+            {'overall': {window: stats}, 'apis': {name: {window: stats}}}
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                'overall': self.overall.windows(now),
+                'apis': {key[0]: stats.windows(now) for key, stats in self._apis.items()}
+            }
@@ -1,21 +1,111 @@
 """Module for periodic API checks."""
 
 import time
+import heapq
+import itertools
+import random
 import signal
 import sys
 import logging
-from typing import Optional
-from .loader import Config
+from typing import Optional, List, Tuple
+from .loader import Config, APIConfig
 from .checker import check_all_apis
-from .reporter import print_report, get_exit_code
+from .reporter import print_report, get_exit_code, create_jsonl_writer
+from .sketch import LatencySketches
 from .notifier import create_notifier_from_config
 from .cache import ResultCache
+from .clock import SYSTEM_CLOCK, Clock
+from .sessions import create_session_registry_from_config
+from .dispatch import create_host_limits_from_config
+from .circuit import create_circuit_breakers_from_config
+from .hedging import create_hedger_from_config
+from .history import create_history_store_from_config
+from .workers import create_worker_pool
+
+
+class DueQueue:
+    """
+    Min-heap of APIs keyed on their next due time.
+    
+    Due times stay on a fixed grid (start + offset + k * interval) of the
+    monotonic clock, so they do not drift with check duration. Each API gets
+    a random phase offset within jitter * interval, spreading endpoints with
+    the same interval instead of firing them together. Dispatching one API
+    costs O(log n).
+    """
+    
+    def __init__(self, jitter: float = 0.1, rng: Optional[random.Random] = None):
+        """
+        Initializes queue.
+        
+        Args:
+            jitter: Fraction of interval (0-1) over which first due times are spread
+            rng: Random generator (for reproducible offsets)
+        """
+        if jitter < 0 or jitter > 1:
+            raise ValueError("Jitter must be between 0 and 1")
+        
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self._heap: List[Tuple[float, int, float, APIConfig]] = []
+        self._counter = itertools.count()  # Tie-breaker, APIs are never compared
+    
+    def add(self, api: APIConfig, interval: float, now: float) -> None:
+        """
+        Schedules API; first due time is one interval (plus offset) after now.
+        
+        Args:
+            api: API configuration
+            interval: Check interval in seconds
+            now: Current monotonic time
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be a positive number")
+        offset = self._rng.uniform(0, self.jitter * interval)
+        heapq.heappush(self._heap, (now + interval + offset, next(self._counter), interval, api))
+    
+    def next_due(self) -> Optional[float]:
+        """Returns earliest due time or None if queue is empty."""
+        return self._heap[0][0] if self._heap else None
+    
+    def pop_due(self, now: float, window: float = 0.0) -> List[APIConfig]:
+        """
+        Returns APIs due at `now` and reschedules each one interval later.
+        
+        If checks fell behind by more than one interval, missed slots are
+        skipped and the API stays on its grid. With a window, APIs due
+        within window * interval after `now` are returned along with the
+        due ones, so endpoints spread by jitter are still checked in one
+        batch per interval.
+        
+        Args:
+            now: Current monotonic time
+            window: Fraction of interval (0-1) to look ahead once an API is due
+            
+        Returns:
+            List of due APIs (earliest first)
+        """
+        heap = self._heap
+        due = []
+        if not heap or heap[0][0] > now:
+            return due
+        while heap and heap[0][0] <= now + window * heap[0][2]:
+            due_time, _, interval, api = heap[0]
+            horizon = now + window * interval
+            next_time = due_time + ((horizon - due_time) // interval + 1) * interval
+            heapq.heapreplace(heap, (next_time, next(self._counter), interval, api))
+            due.append(api)
+        return due
+    
+    def __len__(self) -> int:
+        return len(self._heap)
 
 
 class Scheduler:
     """Scheduler for periodic API checks."""
     
-    def __init__(self, config: Config, output_format: str = None, output_file: str = None):
+    def __init__(self, config: Config, output_format: str = None, output_file: str = None, processes: int = 1,
+                 clock: Clock = SYSTEM_CLOCK):
         """
         Initializes scheduler.
         
@@ -23,8 +113,11 @@ class Scheduler:
             config: Monitoring configuration
             output_format: Output format
             output_file: File to save reports
+            processes: Worker processes to shard checks across (1: check in this process)
+            clock: Time source of due times, waits and cache expiry (monotonic clock)
         """
         self.config = config
+        self.clock = clock
         self.output_format = output_format or config.output_format
         self.output_file = output_file
         self.running = True
@@ -33,9 +126,39 @@ class Scheduler:
         # Initialize notification service
         self.notifier = create_notifier_from_config(config.notifications) if config.notifications else None
         
-        # Initialize cache (TTL = check interval or 60 seconds)
-        cache_ttl = config.interval if config.interval else 60.0
-        self.cache = ResultCache(default_ttl=cache_ttl)
+        # Initialize cache (TTL = half of the shortest check interval or 60 seconds,
+        # so a due check never gets the previous result from cache)
+        intervals = [api.interval for api in config.apis if api.interval]
+        if config.interval:
+            intervals.append(config.interval)
+        cache_ttl = min(intervals) / 2 if intervals else 60.0
+        self.cache = ResultCache(default_ttl=cache_ttl, clock=clock)
+        
+        # Keep-alive sessions shared by all checks of this scheduler
+        self.sessions = create_session_registry_from_config(config.connection_pool, clock=clock)
+        
+        # Global and per-host concurrency limits of async sweeps
+        self.host_limits = create_host_limits_from_config(config.concurrency)
+        
+        # Endpoints that stopped answering fail fast until a trial probe gets through
+        self.breakers = create_circuit_breakers_from_config(config.circuit_breaker, clock=clock)
+        
+        # Slow probes get a second request (optional, within a budget)
+        self.hedger = create_hedger_from_config(config.hedging)
+        
+        # Worker processes for very large API lists (optional)
+        self.pool = create_worker_pool(processes, config)
+        
+        # Persistent check history (optional)
+        self.history = create_history_store_from_config(config.history, clock=clock)
+        
+        # Latency percentiles per API over all checks of this run
+        self.latency = LatencySketches()
+        
+        # JSON Lines results are streamed as checks finish instead of printed per sweep
+        self.stream = None
+        if self.output_format == 'jsonl':
+            self.stream = create_jsonl_writer(output_file, config.output_rotation)
         
         # Signal handling for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -46,8 +169,14 @@ class Scheduler:
         logging.info("\nReceived shutdown signal. Stopping monitoring...")
         self.running = False
     
-    def run_once(self):
-        """Performs one check of all APIs."""
+    def run_once(self, apis: Optional[List[APIConfig]] = None):
+        """
+        Performs one check of the given APIs.
+        
+        Args:
+            apis: APIs to check (default: all APIs from config)
+        """
+        apis = self.config.apis if apis is None else apis
         self.check_count += 1
         logging.info(f"\n{'='*60}")
         logging.info(f"Check #{self.check_count} - {time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -55,17 +184,27 @@ class Scheduler:
         
         try:
             # Use cache for optimization
-            results = check_all_apis(self.config.apis, cache=self.cache, use_async=len(self.config.apis) > 5)
+            results = check_all_apis(apis, cache=self.cache, use_async=len(apis) > 5,
+                                     sessions=self.sessions, phases=self.config.phase_timing,
+                                     host_limits=self.host_limits, pool=self.pool, breakers=self.breakers,
+                                     hedger=self.hedger, on_result=self.stream.write if self.stream else None)
             
-            # Cleanup expired cache entries
+            # Cleanup expired cache entries and idle connections
             self.cache.cleanup_expired()
+            self.sessions.evict_idle()
+            
+            # Save history
+            if self.history:
+                self.history.record(results)
             
             # Send notifications
             if self.notifier:
                 self.notifier.notify(results)
             
             # Output report
-            print_report(results, self.output_format, self.output_file)
+            self.latency.observe_all(results)
+            if not self.stream:
+                print_report(results, self.output_format, self.output_file, latency=self.latency)
             
             # Statistics
             total = len(results)
@@ -73,6 +212,10 @@ class Scheduler:
             failed = total - successful
             
             logging.info(f"Result: {successful}/{total} successful, {failed} failed")
+            if self.hedger:
+                hedging = self.hedger.stats()
+                logging.info(f"Hedged requests: {hedging['hedge_rate']:.1%} of probes, "
+                             f"{hedging['wins']} faster, {hedging['saved_ms']} ms saved")
             
             return get_exit_code(results)
             
@@ -84,8 +227,13 @@ class Scheduler:
         """
         Starts periodic checks.
         
+        Every API is checked on its own interval (APIConfig.interval), falling
+        back to `interval`. APIs are dispatched from a DueQueue as they
+        become due; APIs spread by jitter are checked together with the
+        first due one, so every interval still gives one full report.
+        
         Args:
-            interval: Interval between checks in seconds
+            interval: Default interval between checks in seconds
         """
         if interval <= 0:
             raise ValueError("Interval must be a positive number")
@@ -94,15 +242,24 @@ class Scheduler:
         logging.info(f"Monitoring {len(self.config.apis)} APIs")
         logging.info("Press Ctrl+C to stop\n")
         
+        queue = DueQueue(jitter=self.config.jitter)
+        
         try:
             # First check immediately
+            start = self.clock.monotonic()
             self.run_once()
+            for api in self.config.apis:
+                queue.add(api, api.interval or interval, start)
             
             # Periodic checks
             while self.running:
-                time.sleep(interval)
-                if self.running:
-                    self.run_once()
+                now = self.clock.monotonic()
+                due = queue.pop_due(now, window=queue.jitter)
+                if due:
+                    self.run_once(due)
+                else:
+                    # Wake up at least once a second to notice shutdown
+                    self.clock.sleep(min(queue.next_due() - now, 1.0))
                     
         except KeyboardInterrupt:
             logging.info("\nMonitoring stopped by user")
@@ -110,11 +267,18 @@ class Scheduler:
             logging.error(f"Critical error: {e}")
             raise
         finally:
+            self.sessions.close()
+            if self.pool:
+                self.pool.close()
+            if self.history:
+                self.history.close()
+            if self.stream:
+                self.stream.close()
             logging.info(f"\nTotal checks performed: {self.check_count}")
             logging.info("Monitoring completed")
 
 
-def run_monitoring(config_path: str, output_format: str = None, output_file: str = None):
+def run_monitoring(config_path: str, output_format: str = None, output_file: str = None, processes: int = 1):
     """
     Starts API monitoring (once or periodically).
     
@@ -122,6 +286,7 @@ def run_monitoring(config_path: str, output_format: str = None, output_file: str
         config_path: Path to configuration file
         output_format: Output format
         output_file: File to save reports
+        processes: Worker processes to shard checks across
     """
     from .loader import load_config
     
@@ -129,10 +294,16 @@ def run_monitoring(config_path: str, output_format: str = None, output_file: str
     
     # If interval is specified, start periodic monitoring
     if config.interval and config.interval > 0:
-        scheduler = Scheduler(config, output_format, output_file)
+        scheduler = Scheduler(config, output_format, output_file, processes)
         scheduler.run(config.interval)
     else:
         # Single check
-        scheduler = Scheduler(config, output_format, output_file)
-        return scheduler.run_once()
+        scheduler = Scheduler(config, output_format, output_file, processes)
+        try:
+            return scheduler.run_once()
+        finally:
+            if scheduler.pool:
+                scheduler.pool.close()
+            if scheduler.stream:
+                scheduler.stream.close()
 
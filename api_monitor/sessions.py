@@ -0,0 +1,407 @@
+"""Module for pooled keep-alive HTTP sessions."""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .clock import SYSTEM_CLOCK, Clock
+
+
+class _ReuseTrackingMixin:
+    """Marks each response with whether its socket already served a request."""
+
+    _fresh_socket = False
+
+    def connect(self):
+        super().connect()
+        self._fresh_socket = True
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        response.connection_reused = not self._fresh_socket
+        self._fresh_socket = False
+        return response
+
+
+class _TrackedHTTPConnection(_ReuseTrackingMixin, HTTPConnection):
+    pass
+
+
+class _TrackedHTTPSConnection(_ReuseTrackingMixin, HTTPSConnection):
+    pass
+
+
+class _TrackedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TrackedHTTPConnection
+
+
+class _TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TrackedHTTPSConnection
+
+
+class _TrackingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report reuse."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TrackedHTTPConnectionPool,
+            'https': _TrackedHTTPSConnectionPool,
+        }
+
+
+def connection_reused(response: requests.Response) -> bool:
+    """
+    Tells whether response was served over an already open connection.
+
+    Args:
+        response: Response returned by a session from SessionRegistry
+
+    Returns:
+        True if connection was reused, False otherwise (or if unknown)
+    """
+    raw = getattr(response, 'raw', None)
+    for candidate in (raw, getattr(raw, '_original_response', None)):
+        reused = getattr(candidate, 'connection_reused', None)
+        if isinstance(reused, bool):
+            return reused
+    return False
+
+
+T = TypeVar('T')
+
+
+@dataclass
+class PooledConnection:
+    """Kept-alive asyncio connection."""
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    created: float
+    last_used: float
+
+
+class ConnectionPool:
+    """
+    Kept-alive asyncio connections keyed by (scheme, host, port).
+
+    The asyncio engine's counterpart of the requests sessions: at most
+    pool_size idle connections are kept per host, connections idle for
+    longer than idle_timeout or older than max_age are closed. Streams are
+    bound to the event loop they were opened on, so the pool only serves
+    coroutines running on `loop` (see SessionRegistry.run); it is not
+    thread-safe.
+    """
+
+    def __init__(self, pool_size: int, idle_timeout: float, max_age: float, clock: Clock = SYSTEM_CLOCK):
+        """
+        Initializes empty pool.
+
+        Args:
+            pool_size: Maximum number of idle connections kept per host
+            idle_timeout: Close connections unused for this many seconds
+            max_age: Close connections opened this many seconds ago
+            clock: Time source of idle and age limits (monotonic clock)
+        """
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.clock = clock
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Dict[Tuple[str, str, int], List[PooledConnection]] = {}
+
+    def _usable(self) -> bool:
+        """Whether the calling coroutine runs on the pool's loop."""
+        try:
+            return self.loop is not None and asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _expired(self, connection: PooledConnection, now: float) -> bool:
+        """Whether connection is too old, idle for too long or closed by the server."""
+        return (now - connection.last_used > self.idle_timeout or now - connection.created > self.max_age
+                or connection.reader.at_eof() or connection.writer.is_closing())
+
+    def acquire(self, key: Tuple[str, str, int]) -> Optional[PooledConnection]:
+        """
+        Takes idle connection to a host out of the pool.
+
+        Args:
+            key: (scheme, host, port)
+
+        Returns:
+            Most recently used live connection, or None if a new one has to be opened
+        """
+        if not self._usable():
+            return None
+        idle = self._idle.get(key)
+        now = self.clock.monotonic()
+        while idle:
+            connection = idle.pop()
+            if not self._expired(connection, now):
+                return connection
+            connection.writer.close()
+        return None
+
+    def connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> PooledConnection:
+        """Wraps newly opened streams."""
+        now = self.clock.monotonic()
+        return PooledConnection(reader, writer, created=now, last_used=now)
+
+    def release(self, key: Tuple[str, str, int], connection: PooledConnection) -> None:
+        """
+        Returns connection after a complete exchange; it is closed if the host already has pool_size idle ones.
+
+        Args:
+            key: (scheme, host, port)
+            connection: Connection taken by acquire or wrapped by connection()
+        """
+        idle = self._idle.setdefault(key, [])
+        if not self._usable() or len(idle) >= self.pool_size:
+            connection.writer.close()
+            return
+        connection.last_used = self.clock.monotonic()
+        idle.append(connection)
+
+    def evict_idle(self) -> int:
+        """
+        Closes idle and over-age connections.
+
+        Returns:
+            Number of closed connections
+        """
+        now = self.clock.monotonic()
+        closed = 0
+        for key in list(self._idle):
+            keep = []
+            for connection in self._idle[key]:
+                if self._expired(connection, now):
+                    connection.writer.close()
+                    closed += 1
+                else:
+                    keep.append(connection)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        return closed
+
+    def close(self) -> None:
+        """Closes all idle connections."""
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.writer.close()
+        self._idle.clear()
+
+    def size(self) -> int:
+        """Returns number of idle connections."""
+        return sum(len(idle) for idle in self._idle.values())
+
+
+@dataclass
+class _SessionEntry:
+    """Registry entry."""
+    session: requests.Session
+    created: float
+    last_used: float
+
+
+class SessionRegistry:
+    """
+    Long-lived keep-alive sessions keyed by (scheme, host, port).
+
+    Probes to the same host reuse pooled TCP/TLS connections between
+    checks. Sessions idle for longer than idle_timeout are closed, and
+    sessions older than max_age are recycled so connections do not live
+    forever. Safe to use from several threads.
+
+    The asyncio engine keeps its connections in `connections`, on an event
+    loop the registry runs in a background thread (see run), so they
+    outlive a single sweep.
+    """
+
+    def __init__(self, pool_size: int = 10, idle_timeout: float = 90.0, max_age: float = 600.0,
+                 clock: Clock = SYSTEM_CLOCK):
+        """
+        Initializes registry.
+
+        Args:
+            pool_size: Maximum number of kept-alive connections per host
+            idle_timeout: Close host pool after this many seconds without requests
+            max_age: Recycle host pool after this many seconds
+            clock: Time source of idle and age limits (monotonic clock)
+        """
+        if pool_size <= 0:
+            raise ValueError("pool_size must be a positive number")
+        if idle_timeout <= 0 or max_age <= 0:
+            raise ValueError("idle_timeout and max_age must be positive numbers")
+
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.clock = clock
+        self._sessions: Dict[Tuple[str, str, int], _SessionEntry] = {}
+        self._lock = threading.Lock()
+        self._next_eviction = clock.monotonic() + idle_timeout
+        self.connections = ConnectionPool(pool_size, idle_timeout, max_age, clock)
+        self._loop_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _make_key(url: str) -> Tuple[str, str, int]:
+        """Creates registry key."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        return scheme, (parts.hostname or '').lower(), port
+
+    def _create_session(self) -> requests.Session:
+        """Creates session with a pool of pool_size connections."""
+        session = requests.Session()
+        adapter = _TrackingAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get(self, url: str) -> requests.Session:
+        """
+        Returns session for URL's scheme, host and port.
+
+        Args:
+            url: Request URL
+
+        Returns:
+            requests.Session shared by all requests to that host
+        """
+        key = self._make_key(url)
+        now = self.clock.monotonic()
+        retired = []
+
+        with self._lock:
+            if now >= self._next_eviction:
+                retired.extend(self._pop_stale(now))
+                self._next_eviction = now + min(self.idle_timeout, self.max_age) / 2
+
+            entry = self._sessions.get(key)
+            if entry is not None and now - entry.created > self.max_age:
+                retired.append(self._sessions.pop(key).session)
+                entry = None
+            if entry is None:
+                entry = _SessionEntry(session=self._create_session(), created=now, last_used=now)
+                self._sessions[key] = entry
+            entry.last_used = now
+            session = entry.session
+
+        for old_session in retired:
+            old_session.close()
+
+        return session
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Runs coroutine on the registry's event loop (started on first use) and waits for it.
+
+        Coroutines running there can use the kept-alive asyncio connections
+        in `connections`.
+
+        Args:
+            coroutine: Coroutine to run
+
+        Returns:
+            Result of the coroutine
+        """
+        with self._lock:
+            loop = self.connections.loop
+            if loop is None:
+                loop = self.connections.loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=loop.run_forever, name="api-monitor-connections",
+                                                     daemon=True)
+                self._loop_thread.start()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("SessionRegistry.run called from its own event loop")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def _call_in_loop(self, function) -> Any:
+        """Calls function on the registry's event loop (if started) and returns its result."""
+        loop = self.connections.loop
+        if loop is None or not loop.is_running():
+            return None
+
+        async def call():
+            return function()
+
+        return asyncio.run_coroutine_threadsafe(call(), loop).result()
+
+    def _pop_stale(self, now: float):
+        """Removes idle and over-age entries (caller holds lock)."""
+        stale_keys = [
+            key for key, entry in self._sessions.items()
+            if now - entry.last_used > self.idle_timeout or now - entry.created > self.max_age
+        ]
+        return [self._sessions.pop(key).session for key in stale_keys]
+
+    def evict_idle(self) -> int:
+        """
+        Closes idle and over-age sessions.
+
+        Returns:
+            Number of closed sessions
+        """
+        with self._lock:
+            retired = self._pop_stale(self.clock.monotonic())
+        for session in retired:
+            session.close()
+        return len(retired) + (self._call_in_loop(self.connections.evict_idle) or 0)
+
+    def close(self) -> None:
+        """Closes all sessions and kept-alive asyncio connections."""
+        with self._lock:
+            retired = [entry.session for entry in self._sessions.values()]
+            self._sessions.clear()
+            loop, self.connections.loop = self.connections.loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        for session in retired:
+            session.close()
+        if loop is not None:
+            async def shutdown():
+                self.connections.close()
+                await asyncio.sleep(0)  # Let transports finish closing
+
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def size(self) -> int:
+        """Returns number of open host sessions."""
+        return len(self._sessions)
+
+
+def create_session_registry_from_config(config_data: Optional[Dict[str, Any]],
+                                        clock: Clock = SYSTEM_CLOCK) -> SessionRegistry:
+    """
+    Creates session registry from configuration.
+
+    Args:
+        config_data: Dictionary with connection_pool settings (may be None)
+        clock: Time source of idle and age limits
+
+    Returns:
+        SessionRegistry
+    """
+    config_data = config_data or {}
+    return SessionRegistry(
+        pool_size=int(config_data.get('pool_size', 10)),
+        idle_timeout=float(config_data.get('idle_timeout', 90.0)),
+        max_age=float(config_data.get('max_age', 600.0)),
+        clock=clock
+    )
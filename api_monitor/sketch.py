@@ -0,0 +1,276 @@
+"""Module for mergeable latency quantile sketches."""
+
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .checker import CheckResult
+
+
+DEFAULT_RELATIVE_ACCURACY = 0.01  # Quantiles within 1% of the true value
+DEFAULT_MAX_BINS = 2048  # At 1% accuracy, enough for values from 0.001 ms to years
+MIN_INDEXABLE = 1e-3  # Values below this (ms) are counted as zero
+PERCENTILES = (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+
+
+class DDSketch:
+    """
+    Quantile sketch with relative-error guarantee (DDSketch).
+
+    Values are counted in logarithmic bins, so memory depends on the value
+    range, not on the number of values. Two sketches with the same accuracy
+    merge exactly by adding bin counts, so sketches of different time
+    windows or processes can be combined into one.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, max_bins: int = DEFAULT_MAX_BINS):
+        """
+        Initializes empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantiles (0 < a < 1)
+            max_bins: Bin limit; when exceeded, the lowest bins are merged
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1")
+        if max_bins < 2:
+            raise ValueError("max_bins must be at least 2")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        """Returns bin index of a positive value."""
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        """Returns representative value of a bin (relative error ≤ accuracy)."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """
+        Adds value.
+
+        Args:
+            value: Non-negative value (e.g. latency in ms)
+            weight: Number of occurrences
+        """
+        if value < 0:
+            raise ValueError("Sketch values cannot be negative")
+        if value < MIN_INDEXABLE:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        """Merges lowest bins until the bin limit holds (keeps upper quantiles exact)."""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        self.bins[target] += sum(self.bins.pop(key) for key in keys[:excess])
+
+    def merge(self, other: 'DDSketch') -> None:
+        """
+        Adds all values of another sketch.
+
+        Args:
+            other: Sketch with the same relative accuracy
+
+        Raises:
+            ValueError: If accuracies differ
+        """
+        if not math.isclose(other.gamma, self.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns approximate quantile.
+
+        Args:
+            q: Quantile (0 to 1)
+
+        Returns:
+            Value, or None if the sketch is empty
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0 if self.min < MIN_INDEXABLE else self.min
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        """Returns p50, p95 and p99 (rounded to 0.01)."""
+        return {name: (round(value, 2) if value is not None else None)
+                for name, value in ((name, self.quantile(q)) for name, q in PERCENTILES)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializes sketch (for merging in another process)."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'bins': {str(key): count for key, count in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_bins: int = DEFAULT_MAX_BINS) -> 'DDSketch':
+        """
+        Restores serialized sketch.
+
+        Args:
+            data: Output of to_dict
+            max_bins: Bin limit
+
+        Returns:
+            DDSketch
+        """
+        sketch = cls(data['relative_accuracy'], max_bins)
+        sketch.bins = {int(key): int(count) for key, count in data['bins'].items()}
+        sketch.zero_count = int(data['zero_count'])
+        sketch.count = int(data['count'])
+        sketch.sum = float(data['sum'])
+        if sketch.count:
+            sketch.min = float(data['min'])
+            sketch.max = float(data['max'])
+        return sketch
+
+
+class LatencySketches:
+    """
+    Latency sketch per API, updated with every fresh check result.
+
+    Results served again from cache (the same object, or stale copies) and
+    fast failures of an open circuit are not added, so percentiles reflect
+    actual probes.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Initializes empty set of sketches.
+
+        Args:
+            relative_accuracy: Relative accuracy of every sketch
+        """
+        self.relative_accuracy = relative_accuracy
+        self._lock = threading.Lock()
+        self._sketches: Dict[Tuple[str, str, str], DDSketch] = {}
+        self._last: Dict[Tuple[str, str, str], CheckResult] = {}
+
+    @staticmethod
+    def key_of(result: CheckResult) -> Tuple[str, str, str]:
+        """Returns API key of a result (name, url, method)."""
+        return result.name, result.url, result.method
+
+    def observe(self, result: CheckResult) -> None:
+        """
+        Adds latency of one result.
+
+        Args:
+            result: Check result
+        """
+        key = self.key_of(result)
+        with self._lock:
+            if result.stale or result.circuit_open or self._last.get(key) is result:
+                return
+            self._last[key] = result
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = DDSketch(self.relative_accuracy)
+            sketch.add(result.latency_ms)
+
+    def observe_all(self, results: Iterable[CheckResult]) -> None:
+        """Adds latencies of several results."""
+        for result in results:
+            self.observe(result)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[DDSketch]:
+        """Returns sketch of an API (None if it has no results yet)."""
+        return self._sketches.get(key)
+
+    def percentiles(self, result: CheckResult) -> Dict[str, Optional[float]]:
+        """
+        Returns p50/p95/p99 latency of the API a result belongs to.
+
+        Args:
+            result: Any result of the API
+
+        Returns:
+            Dictionary p50, p95, p99 (None if unknown)
+        """
+        with self._lock:
+            sketch = self._sketches.get(self.key_of(result))
+            if sketch is None:
+                return {name: None for name, _ in PERCENTILES}
+            return sketch.percentiles()
+
+    def merge(self, other: 'LatencySketches') -> None:
+        """
+        Merges sketches of another set (other process or time window).
+
+        Args:
+            other: Sketches to add
+        """
+        with other._lock:
+            incoming = {key: DDSketch.from_dict(sketch.to_dict()) for key, sketch in other._sketches.items()}
+        with self._lock:
+            for key, sketch in incoming.items():
+                current = self._sketches.get(key)
+                if current is None:
+                    self._sketches[key] = sketch
+                else:
+                    current.merge(sketch)
+
+    def retain(self, keys: Iterable[Tuple[str, str, str]]) -> None:
+        """Drops sketches of APIs that are no longer monitored."""
+        keep = set(keys)
+        with self._lock:
+            for key in [key for key in self._sketches if key not in keep]:
+                del self._sketches[key]
+                self._last.pop(key, None)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns percentiles of every API.
+
+        Returns:
+            API name -> {'count', 'p50', 'p95', 'p99'} (latency in ms)
+        """
+        with self._lock:
+            return {key[0]: {'count': sketch.count, **sketch.percentiles()}
+                    for key, sketch in self._sketches.items()}
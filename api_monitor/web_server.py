@@ -2,16 +2,72 @@
 
 import time
 import json
+import hmac
 import threading
 import socket
+from collections import deque
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List
+from urllib.parse import urlsplit, parse_qs
 from datetime import datetime
 from .loader import Config
-from .checker import check_all_apis, CheckResult
-from .reporter import format_html
+from .checker import check_all_apis, probe_flights, CheckResult
+from .reporter import format_html, format_timestamp
 from .cache import ResultCache
+from .clock import SYSTEM_CLOCK, Clock
+from .sessions import create_session_registry_from_config
+from .dispatch import create_host_limits_from_config
+from .circuit import create_circuit_breakers_from_config
+from .hedging import create_hedger_from_config
+from .workers import create_worker_pool
+from .history import create_history_store_from_config
+from .events import EventBroker, KEEPALIVE_INTERVAL, RETRY_MS
+from .jobs import RefreshQueue
+from .agent import decode_batch
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, create_metrics_registry_from_config
+from .sketch import LatencySketches
+from .rolling import RollingWindows
+from .http_cache import CachedResponse, choose_encoding, etag_matches
+
+
+HISTORY_LIMIT = 100  # Sweeps kept in memory (older ones live in the history store)
+DEFAULT_WORKERS = 128  # Threads serving dashboard requests
+KEEPALIVE_TIMEOUT = 5.0  # Seconds an idle keep-alive connection may hold a worker
+STATIC_CACHE_CONTROL = 'public, max-age=3600'  # API docs and OpenAPI spec
+STALE_WINDOW_INTERVALS = 5  # Default stale-while-revalidate window, in check intervals
+REFRESH_PUBLISH_DELAY = 0.25  # Seconds background refresh results are collected into one dashboard update
+MAX_INGEST_BYTES = 16 * 1024 * 1024  # Largest compressed batch accepted from an agent
+
+
+def _positive_number(data: dict, key: str, default: Optional[float]) -> Optional[float]:
+    """
+    Reads a positive number from a request body (same rule as load_config).
+    
+    Args:
+        data: Decoded JSON body
+        key: Field name
+        default: Value if the field is missing or null
+        
+    Returns:
+        Field value as float, or default
+        
+    Raises:
+        ValueError: If the field is not a positive number
+    """
+    value = data.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"{key} must be a number")
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{key} must be a number")
+    if value <= 0:
+        raise ValueError(f"{key} must be a positive number")
+    return value
 
 
 def find_free_port(start_port: int = 8080, max_attempts: int = 100) -> int:
@@ -38,12 +94,79 @@ def find_free_port(start_port: int = 8080, max_attempts: int = 100) -> int:
     raise OSError(f"Failed to find free port in range {start_port}-{start_port + max_attempts - 1}")
 
 
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server handling connections on a bounded thread pool.
+    
+    Unlike ThreadingHTTPServer, the number of threads does not grow with
+    the number of clients: connections beyond the pool size wait in the
+    queue until a worker is free.
+    """
+    
+    def __init__(self, server_address, handler_class, workers: int = DEFAULT_WORKERS):
+        """
+        Initializes server.
+        
+        Args:
+            server_address: (host, port) to listen on
+            handler_class: Request handler class
+            workers: Maximum number of connections served at once
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.request_queue_size = max(self.request_queue_size, workers)
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard')
+        self._queued = {}  # Future -> connection not picked up by a worker yet
+        self._queued_lock = threading.Lock()
+    
+    def process_request(self, request, client_address):
+        """Hands connection to the pool."""
+        with self._queued_lock:
+            future = self.executor.submit(self.process_request_thread, request, client_address)
+            self._queued[future] = request
+        future.add_done_callback(self._dequeue)
+    
+    def _dequeue(self, future):
+        """Forgets connection once its worker finished (or it was cancelled)."""
+        with self._queued_lock:
+            self._queued.pop(future, None)
+    
+    def process_request_thread(self, request, client_address):
+        """Serves connection in a worker thread."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        """Closes listening socket and stops workers; queued connections are closed."""
+        super().server_close()
+        with self._queued_lock:
+            queued, self._queued = self._queued, {}
+        # Cancelled by hand: shutdown(cancel_futures=True) needs Python 3.9
+        for future, request in queued.items():
+            if future.cancel():
+                self.shutdown_request(request)
+        self.executor.shutdown(wait=False)
+
+
 class MonitoringHandler(BaseHTTPRequestHandler):
     """HTTP request handler for web interface."""
     
+    # Prerendered dashboard, API docs and OpenAPI spec (see render_static_responses)
+    static_responses = {}
+    
+    # Keep-alive: every response carries Content-Length (see send_body)
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    
     monitoring_data = {
         'results': [],
-        'history': [],
+        'history': deque(maxlen=HISTORY_LIMIT),
         'stats': {
             'total_checks': 0,
             'successful_checks': 0,
@@ -86,8 +209,12 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             self.serve_dashboard()
         elif self.path == '/api/data':
             self.serve_json_data()
+        elif self.path == '/api/events':
+            self.serve_events()
         elif self.path == '/api/stats':
             self.serve_stats()
+        elif self.path == '/metrics':
+            self.serve_metrics()
         elif self.path == '/api/project':
             self.serve_project_info()
         elif self.path == '/api/apis':
@@ -96,6 +223,14 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             self.serve_popular_apis()
         elif self.path == '/api/refresh':
             self.handle_refresh_monitoring()
+        elif self.path.startswith('/api/refresh/'):
+            self.serve_refresh_job(self.path[len('/api/refresh/'):])
+        elif self.path == '/api/history' or self.path.startswith('/api/history?'):
+            self.serve_history()
+        elif self.path == '/api/locations':
+            self.serve_locations()
+        elif self.path == '/api/consensus':
+            self.serve_consensus()
         elif self.path == '/api/swagger.json' or self.path == '/api/openapi.json':
             self.serve_openapi_spec()
         elif self.path == '/api/docs' or self.path == '/swagger':
@@ -107,6 +242,8 @@ class MonitoringHandler(BaseHTTPRequestHandler):
         """Handles POST requests (adding API)."""
         if self.path == '/api/apis':
             self.handle_add_api()
+        elif self.path == '/api/ingest':
+            self.handle_ingest()
         else:
             self.send_error(404)
     
@@ -126,34 +263,247 @@ class MonitoringHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(404)
     
+    def send_body(self, body: bytes, content_type: str, status: int = 200, cors: bool = False):
+        """
+        Sends complete response with Content-Length (keeps connection reusable).
+        
+        Args:
+            body: Response body
+            content_type: Content-Type header value
+            status: HTTP status code
+            cors: Add Access-Control-Allow-Origin header
+        """
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cors:
+            self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_json(self, data, status: int = 200, indent: Optional[int] = None):
+        """
+        Sends data as JSON response.
+        
+        Args:
+            data: JSON-serializable data
+            status: HTTP status code
+            indent: JSON indentation (None for compact output)
+        """
+        body = json.dumps(data, ensure_ascii=False, indent=indent).encode('utf-8')
+        self.send_body(body, 'application/json; charset=utf-8', status=status, cors=True)
+    
+    @classmethod
+    def render_static_responses(cls):
+        """Renders static pages once and keeps them compressed with ETags."""
+        openapi_body = json.dumps(cls.get_openapi_spec(), ensure_ascii=False, indent=2).encode('utf-8')
+        cls.static_responses = {
+            'dashboard': CachedResponse.build(cls.get_dashboard_html().encode('utf-8'), 'text/html; charset=utf-8'),
+            'docs': CachedResponse.build(cls.get_swagger_ui_html().encode('utf-8'), 'text/html; charset=utf-8',
+                                         cache_control=STATIC_CACHE_CONTROL),
+            'openapi': CachedResponse.build(openapi_body, 'application/json; charset=utf-8',
+                                            cache_control=STATIC_CACHE_CONTROL)
+        }
+    
+    def send_cached(self, name: str):
+        """
+        Sends prerendered static page (304 if client copy is current).
+        
+        Args:
+            name: Key in static_responses
+        """
+        if not MonitoringHandler.static_responses:
+            MonitoringHandler.render_static_responses()
+        response = MonitoringHandler.static_responses[name]
+        encoding, body, etag = response.select(self.headers.get('Accept-Encoding'))
+        
+        not_modified = etag_matches(self.headers.get('If-None-Match'), etag)
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', response.cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        if response.content_type.startswith('application/json'):
+            self.send_header('Access-Control-Allow-Origin', '*')
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header('Content-type', response.content_type)
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
     def serve_dashboard(self):
         """Serves dashboard main page."""
-        html_content = self.get_dashboard_html()
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
+        self.send_cached('dashboard')
     
     def serve_json_data(self):
         """Serves monitoring data as JSON."""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
         data = {
             'results': [self.result_to_dict(r) for r in MonitoringHandler.monitoring_data['results']],
             'stats': MonitoringHandler.monitoring_data['stats'],
             'timestamp': datetime.now().isoformat()
         }
-        self.wfile.write(json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'))
+        self.send_json(data, indent=2)
+    
+    def serve_events(self):
+        """
+        Streams monitoring updates as Server-Sent Events.
+        
+        Sends a "snapshot" event with all results (or the missed updates when
+        reconnecting with Last-Event-ID), then one "update" event with changed
+        results per sweep until the client disconnects.
+        """
+        server = MonitoringHandler.monitoring_data.get('server_instance')
+        if not server:
+            self.send_error(503, "Event stream not available")
+            return
+        # Each stream holds a worker; over the limit the dashboard falls back to polling
+        if not server.stream_slots.acquire(blocking=False):
+            self.send_error(503, "Too many event streams")
+            return
+        
+        last_id = self.headers.get('Last-Event-ID')
+        seq = int(last_id) if last_id and last_id.isdigit() else None
+        
+        try:
+            self.send_response(200)
+            self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('X-Accel-Buffering', 'no')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            
+            self.wfile.write(f"retry: {RETRY_MS}\n\n".encode('utf-8'))
+            while not server.events.closed:
+                seq, frames = server.events.next_frames(seq, timeout=KEEPALIVE_INTERVAL)
+                # Comment frame on idle streams detects disconnected clients
+                self.wfile.write(b"".join(frames) if frames else b": keepalive\n\n")
+                self.wfile.flush()
+        except OSError:
+            pass  # Client disconnected or stopped reading
+        finally:
+            server.stream_slots.release()
     
     def serve_stats(self):
-        """Serves statistics."""
+        """Serves statistics (with probe deduplication, latency percentiles, rolling windows, circuit breakers and hedging)."""
+        stats = dict(MonitoringHandler.monitoring_data['stats'])
+        stats['singleflight'] = probe_flights.stats()
+        server = MonitoringHandler.monitoring_data.get('server_instance')
+        if server:
+            stats['latency'] = server.latency.summary()
+            stats['windows'] = server.windows.summary()
+            if server.breakers:
+                stats['circuit_breakers'] = server.breakers.stats()
+            if server.hedger:
+                stats['hedging'] = server.hedger.stats()
+        self.send_json(stats)
+    
+    def serve_metrics(self):
+        """Serves metrics in Prometheus text format (rendered from preaggregated state)."""
+        server = MonitoringHandler.monitoring_data.get('server_instance')
+        if not server:
+            self.send_error(503, "Monitoring is not running")
+            return
+        encoding = 'gzip' if choose_encoding(self.headers.get('Accept-Encoding')) == 'gzip' else 'identity'
+        body = server.metrics.render(encoding)
         self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-type', METRICS_CONTENT_TYPE)
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(MonitoringHandler.monitoring_data['stats'], ensure_ascii=False).encode('utf-8'))
+        self.wfile.write(body)
+    
+    def serve_history(self):
+        """
+        Serves stored history of one API.
+        
+        Query parameters: api (required), from and to (Unix time,
+        default: last 24 hours), limit (maximum number of results).
+        """
+        server = MonitoringHandler.monitoring_data.get('server_instance')
+        if not server or not server.history:
+            self.send_error(404, "History store not configured")
+            return
+        
+        params = parse_qs(urlsplit(self.path).query)
+        api_name = params.get('api', [None])[0]
+        if not api_name:
+            self.send_error(400, "Missing required parameter: api")
+            return
+        
+        try:
+            end = float(params['to'][0]) if 'to' in params else time.time()
+            start = float(params['from'][0]) if 'from' in params else end - 86400
+            limit = int(params['limit'][0]) if 'limit' in params else None
+        except ValueError:
+            self.send_error(400, "Parameters from, to and limit must be numbers")
+            return
+        
+        data = {
+            'api': api_name,
+            'from': start,
+            'to': end,
+            'results': server.history.query(api_name, start, end, limit)
+        }
+        self.send_json(data)
+    
+    def _aggregator(self):
+        """Returns server instance if it aggregates agent results, otherwise sends 404."""
+        server = MonitoringHandler.monitoring_data.get('server_instance')
+        if server is None or not hasattr(server, 'ingest'):
+            self.send_error(404, "Not running as aggregator")
+            return None
+        return server
+    
+    def handle_ingest(self):
+        """Accepts batch of results pushed by a probe agent (aggregator mode)."""
+        server = self._aggregator()
+        if not server:
+            return
+        
+        if server.token and not hmac.compare_digest(self.headers.get('Authorization', ''),
+                                                    f"Bearer {server.token}"):
+            self.send_error(401, "Invalid or missing token")
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length <= 0 or length > MAX_INGEST_BYTES:
+            self.send_error(413 if length > MAX_INGEST_BYTES else 400, "Missing or too large body")
+            return
+        encoding = (self.headers.get('Content-Encoding') or 'identity').strip().lower()
+        if encoding not in ('gzip', 'identity'):
+            self.send_error(415, f"Unsupported Content-Encoding: {encoding}")
+            return
+        
+        body = self.rfile.read(length)
+        try:
+            batch = decode_batch(body, compressed=encoding == 'gzip')
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        
+        accepted = server.ingest(batch)
+        self.send_json({'success': True, 'accepted': accepted}, status=202)
+    
+    def serve_locations(self):
+        """Serves per-location status (aggregator mode)."""
+        server = self._aggregator()
+        if server:
+            self.send_json({'locations': server.location_summary()})
+    
+    def serve_consensus(self):
+        """Serves consensus status of every check with per-location results (aggregator mode)."""
+        server = self._aggregator()
+        if server:
+            self.send_json({'checks': server.consensus_details()})
     
     def serve_project_info(self):
         """Serves project information."""
@@ -180,11 +530,7 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             ],
             'repository': 'https://github.com/maksim4351/api-health-monitor'
         }
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(project_info, ensure_ascii=False, indent=2).encode('utf-8'))
+        self.send_json(project_info, indent=2)
     
     def result_to_dict(self, result: CheckResult):
         """Converts CheckResult to dictionary."""
@@ -196,6 +542,12 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             'success': result.success,
             'error': result.error,
             'timeout': result.timeout,
+            'connection_reused': result.connection_reused,
+            'phases': result.phases.to_dict() if result.phases else None,
+            'stale': result.stale,
+            'circuit_open': result.circuit_open,
+            'checked_at': format_timestamp(result.checked_at) if result.checked_at is not None else None,
+            'bytes_read': result.bytes_read,
             'timestamp': datetime.now().isoformat()
         }
     
@@ -215,456 +567,78 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                 'method': api.method,
                 'timeout': api.timeout,
                 'expected_status': api.expected_status,
-                'headers': api.headers or {}
+                'headers': api.headers or {},
+                'interval': api.interval,
+                'probe': api.probe,
+                'body_budget': api.body_budget
             })
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(apis_list, ensure_ascii=False, indent=2).encode('utf-8'))
+        self.send_json(apis_list, indent=2)
     
     def serve_popular_apis(self):
         """Serves list of popular APIs."""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(MonitoringHandler.POPULAR_APIS, ensure_ascii=False, indent=2).encode('utf-8'))
+        self.send_json(MonitoringHandler.POPULAR_APIS, indent=2)
     
-    def handle_refresh_monitoring(self):
-        """Forces refresh of monitoring for all APIs."""
-        from .checker import check_all_apis
-        server = MonitoringHandler.monitoring_data.get('server_instance')
-        if not server:
-            self.send_error(500, "Server instance not found")
-            return
-        
+    def read_json_body(self):
+        """Reads JSON request body."""
+        content_length = int(self.headers.get('Content-Length', 0))
+        if content_length == 0:
+            return None
+        body = self.rfile.read(content_length)
         try:
-            # Perform check for all APIs
-            results = check_all_apis(server.config.apis)
+            return json.loads(body.decode('utf-8'))
+        except json.JSONDecodeError:
+            return None
+    
+    def handle_add_api(self):
+        """Handles adding new API."""
+        from .loader import APIConfig, DEFAULT_BODY_BUDGET, PROBE_MODES, save_config
+        try:
+            data = self.read_json_body()
+            if not data:
+                self.send_error(400, "Invalid JSON")
+                return
             
-            # Update data
-            MonitoringHandler.monitoring_data['results'] = results
-            MonitoringHandler.monitoring_data['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'results': [self.result_to_dict(r) for r in results]
-            })
+            server = MonitoringHandler.monitoring_data.get('server_instance')
+            if not server:
+                self.send_error(500, "Server instance not found")
+                return
             
-            # Update statistics
-            stats = MonitoringHandler.monitoring_data['stats']
-            stats['total_checks'] = stats.get('total_checks', 0) + 1
-            stats['last_check'] = datetime.now().isoformat()
-            successful = sum(1 for r in results if r.success)
-            stats['successful_checks'] = stats.get('successful_checks', 0) + successful
-            stats['failed_checks'] = stats.get('failed_checks', 0) + (len(results) - successful)
+            # Validation
+            if 'name' not in data or 'url' not in data:
+                self.send_error(400, "Missing required fields: name, url")
+                return
             
-            # Limit history (last 100 checks)
-            if len(MonitoringHandler.monitoring_data['history']) > 100:
-                MonitoringHandler.monitoring_data['history'].pop(0)
+            name = data['name'].strip()
+            url = data['url'].strip()
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            response_data = {
-                'success': True,
-                'message': 'Monitoring refreshed',
-                'results_count': len(results)
-            }
-            self.wfile.write(json.dumps(response_data, ensure_ascii=False).encode('utf-8'))
-        except Exception as e:
-            self.send_error(500, f"Failed to refresh monitoring: {str(e)}")
-    
-    def serve_openapi_spec(self):
-        """Serves OpenAPI specification."""
-        openapi_spec = {
-            'openapi': '3.0.0',
-            'info': {
-                'title': 'API Health Monitor API',
-                'version': '1.0.0',
-                'description': 'REST API for monitoring API endpoint health',
-                'contact': {
-                    'name': 'API Support',
-                    'url': 'https://github.com/maksim4351/api-health-monitor'
+            if not name or not url:
+                self.send_error(400, "Name and URL cannot be empty")
+                return
+            
+            # Check for duplicate by name
+            if any(api.name == name for api in server.config.apis):
+                error_data = {
+                    'success': False,
+                    'error': 'duplicate',
+                    'message': f"API with name '{name}' already exists"
                 }
-            },
-            'servers': [
-                {
-                    'url': 'http://localhost:8080',
-                    'description': 'Local development server'
+                self.send_json(error_data, status=409)
+                return
+            
+            # Check for duplicate by URL
+            if any(api.url == url for api in server.config.apis):
+                error_data = {
+                    'success': False,
+                    'error': 'duplicate_url',
+                    'message': f"API with URL '{url}' already exists"
                 }
-            ],
-            'paths': {
-                '/api/data': {
-                    'get': {
-                        'summary': 'Get monitoring data',
-                        'description': 'Returns current check results for all APIs',
-                        'responses': {
-                            '200': {
-                                'description': 'Success response',
-                                'content': {
-                                    'application/json': {
-                                        'schema': {
-                                            'type': 'object',
-                                            'properties': {
-                                                'results': {
-                                                    'type': 'array',
-                                                    'items': {
-                                                        'type': 'object',
-                                                        'properties': {
-                                                            'name': {'type': 'string'},
-                                                            'url': {'type': 'string'},
-                                                            'status_code': {'type': 'integer', 'nullable': True},
-                                                            'latency_ms': {'type': 'number'},
-                                                            'success': {'type': 'boolean'},
-                                                            'error': {'type': 'string', 'nullable': True}
-                                                        }
-                                                    }
-                                                },
-                                                'stats': {'type': 'object'},
-                                                'timestamp': {'type': 'string', 'format': 'date-time'}
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                },
-                '/api/stats': {
-                    'get': {
-                        'summary': 'Get statistics',
-                        'description': 'Returns overall monitoring statistics',
-                        'responses': {
-                            '200': {
-                                'description': 'Success response',
-                                'content': {
-                                    'application/json': {
-                                        'schema': {
-                                            'type': 'object',
-                                            'properties': {
-                                                'total_checks': {'type': 'integer'},
-                                                'successful_checks': {'type': 'integer'},
-                                                'failed_checks': {'type': 'integer'},
-                                                'last_check': {'type': 'string', 'format': 'date-time'},
-                                                'start_time': {'type': 'string', 'format': 'date-time'}
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                },
-                '/api/apis': {
-                    'get': {
-                        'summary': 'Get API list',
-                        'description': 'Returns list of all configured APIs',
-                        'responses': {
-                            '200': {
-                                'description': 'Success response',
-                                'content': {
-                                    'application/json': {
-                                        'schema': {
-                                            'type': 'array',
-                                            'items': {
-                                                'type': 'object',
-                                                'properties': {
-                                                    'name': {'type': 'string'},
-                                                    'url': {'type': 'string'},
-                                                    'method': {'type': 'string'},
-                                                    'timeout': {'type': 'number'},
-                                                    'expected_status': {'type': 'integer'},
-                                                    'headers': {'type': 'object'}
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    },
-                    'post': {
-                        'summary': 'Add new API',
-                        'description': 'Adds new API to monitoring',
-                        'requestBody': {
-                            'required': True,
-                            'content': {
-                                'application/json': {
-                                    'schema': {
-                                        'type': 'object',
-                                        'required': ['name', 'url'],
-                                        'properties': {
-                                            'name': {'type': 'string', 'description': 'API name'},
-                                            'url': {'type': 'string', 'format': 'uri', 'description': 'API URL'},
-                                            'method': {'type': 'string', 'enum': ['GET', 'POST', 'PUT', 'DELETE', 'PATCH'], 'default': 'GET'},
-                                            'timeout': {'type': 'number', 'default': 5.0, 'description': 'Timeout in seconds'},
-                                            'expected_status': {'type': 'integer', 'default': 200, 'minimum': 100, 'maximum': 599},
-                                            'headers': {'type': 'object', 'description': 'HTTP headers'}
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        'responses': {
-                            '201': {
-                                'description': 'API successfully added',
-                                'content': {
-                                    'application/json': {
-                                        'schema': {
-                                            'type': 'object',
-                                            'properties': {
-                                                'success': {'type': 'boolean'},
-                                                'message': {'type': 'string'}
-                                            }
-                                        }
-                                    }
-                                }
-                            },
-                            '400': {'description': 'Bad request'},
-                            '409': {'description': 'API already exists'},
-                            '500': {'description': 'Server error'}
-                        }
-                    }
-                },
-                '/api/apis/{name}': {
-                    'put': {
-                        'summary': 'Update API',
-                        'description': 'Updates existing API',
-                        'parameters': [
-                            {
-                                'name': 'name',
-                                'in': 'path',
-                                'required': True,
-                                'schema': {'type': 'string'},
-                                'description': 'API name to update'
-                            }
-                        ],
-                        'requestBody': {
-                            'required': True,
-                            'content': {
-                                'application/json': {
-                                    'schema': {
-                                        'type': 'object',
-                                        'properties': {
-                                            'name': {'type': 'string'},
-                                            'url': {'type': 'string', 'format': 'uri'},
-                                            'method': {'type': 'string'},
-                                            'timeout': {'type': 'number'},
-                                            'expected_status': {'type': 'integer'},
-                                            'headers': {'type': 'object'}
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        'responses': {
-                            '200': {'description': 'API successfully updated'},
-                            '404': {'description': 'API not found'},
-                            '500': {'description': 'Server error'}
-                        }
-                    },
-                    'delete': {
-                        'summary': 'Delete API',
-                        'description': 'Removes API from monitoring',
-                        'parameters': [
-                            {
-                                'name': 'name',
-                                'in': 'path',
-                                'required': True,
-                                'schema': {'type': 'string'},
-                                'description': 'API name to delete'
-                            }
-                        ],
-                        'responses': {
-                            '200': {'description': 'API successfully deleted'},
-                            '404': {'description': 'API not found'},
-                            '400': {'description': 'Cannot delete last API'},
-                            '500': {'description': 'Server error'}
-                        }
-                    }
-                },
-                '/api/refresh': {
-                    'get': {
-                        'summary': 'Refresh monitoring',
-                        'description': 'Forces refresh of monitoring results for all APIs',
-                        'responses': {
-                            '200': {
-                                'description': 'Monitoring refreshed',
-                                'content': {
-                                    'application/json': {
-                                        'schema': {
-                                            'type': 'object',
-                                            'properties': {
-                                                'success': {'type': 'boolean'},
-                                                'message': {'type': 'string'},
-                                                'results_count': {'type': 'integer'}
-                                            }
-                                        }
-                                    }
-                                }
-                            },
-                            '500': {'description': 'Server error'}
-                        }
-                    }
-                },
-                '/api/popular': {
-                    'get': {
-                        'summary': 'Get popular APIs',
-                        'description': 'Returns list of popular APIs for quick addition',
-                        'responses': {
-                            '200': {
-                                'description': 'Success response',
-                                'content': {
-                                    'application/json': {
-                                        'schema': {
-                                            'type': 'array',
-                                            'items': {
-                                                'type': 'object',
-                                                'properties': {
-                                                    'name': {'type': 'string'},
-                                                    'url': {'type': 'string'},
-                                                    'method': {'type': 'string'},
-                                                    'timeout': {'type': 'number'},
-                                                    'expected_status': {'type': 'integer'}
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(openapi_spec, ensure_ascii=False, indent=2).encode('utf-8'))
-    
-    def serve_swagger_ui(self):
-        """Serves Swagger UI for interactive documentation."""
-        swagger_ui_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>API Health Monitor - API Documentation</title>
-    <link rel="stylesheet" type="text/css" href="https://unpkg.com/swagger-ui-dist@5.9.0/swagger-ui.css" />
-    <style>
-        body {{
-            margin: 0;
-            background: #fafafa;
-        }}
-        .swagger-ui .topbar {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        }}
-    </style>
-</head>
-<body>
-    <div id="swagger-ui"></div>
-    <script src="https://unpkg.com/swagger-ui-dist@5.9.0/swagger-ui-bundle.js"></script>
-    <script src="https://unpkg.com/swagger-ui-dist@5.9.0/swagger-ui-standalone-preset.js"></script>
-    <script>
-        window.onload = function() {{
-            const ui = SwaggerUIBundle({{
-                url: '/api/openapi.json',
-                dom_id: '#swagger-ui',
-                deepLinking: true,
-                presets: [
-                    SwaggerUIBundle.presets.apis,
-                    SwaggerUIStandalonePreset
-                ],
-                plugins: [
-                    SwaggerUIBundle.plugins.DownloadUrl
-                ],
-                layout: "StandaloneLayout",
-                validatorUrl: null
-            }});
-        }};
-    </script>
-</body>
-</html>"""
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(swagger_ui_html.encode('utf-8'))
-    
-    def read_json_body(self):
-        """Reads JSON request body."""
-        content_length = int(self.headers.get('Content-Length', 0))
-        if content_length == 0:
-            return None
-        body = self.rfile.read(content_length)
-        try:
-            return json.loads(body.decode('utf-8'))
-        except json.JSONDecodeError:
-            return None
-    
-    def handle_add_api(self):
-        """Handles adding new API."""
-        from .loader import APIConfig, save_config
-        try:
-            data = self.read_json_body()
-            if not data:
-                self.send_error(400, "Invalid JSON")
-                return
-            
-            server = MonitoringHandler.monitoring_data.get('server_instance')
-            if not server:
-                self.send_error(500, "Server instance not found")
+                self.send_json(error_data, status=409)
                 return
             
-            # Validation
-            if 'name' not in data or 'url' not in data:
-                self.send_error(400, "Missing required fields: name, url")
-                return
-            
-            name = data['name'].strip()
-            url = data['url'].strip()
-            
-            if not name or not url:
-                self.send_error(400, "Name and URL cannot be empty")
-                return
-            
-            # Check for duplicate by name
-            if any(api.name == name for api in server.config.apis):
-                self.send_response(409)
-                self.send_header('Content-type', 'application/json; charset=utf-8')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                error_data = {
-                    'success': False,
-                    'error': 'duplicate',
-                    'message': f"API with name '{name}' already exists"
-                }
-                self.wfile.write(json.dumps(error_data, ensure_ascii=False).encode('utf-8'))
-                return
-            
-            # Check for duplicate by URL
-            if any(api.url == url for api in server.config.apis):
-                self.send_response(409)
-                self.send_header('Content-type', 'application/json; charset=utf-8')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                error_data = {
-                    'success': False,
-                    'error': 'duplicate_url',
-                    'message': f"API with URL '{url}' already exists"
-                }
-                self.wfile.write(json.dumps(error_data, ensure_ascii=False).encode('utf-8'))
-                return
-            
-            # Timeout validation
-            timeout = float(data.get('timeout', 5.0))
-            if timeout <= 0:
-                self.send_error(400, "Timeout must be positive")
-                return
+            # Timeout and interval validation
+            timeout = _positive_number(data, 'timeout', 5.0)
+            interval = _positive_number(data, 'interval', None)
             
             # Expected status validation
             expected_status = int(data.get('expected_status', 200))
@@ -672,6 +646,16 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                 self.send_error(400, "Expected status must be between 100 and 599")
                 return
             
+            # Probe mode validation
+            probe = data.get('probe', 'budget')
+            if probe not in PROBE_MODES:
+                self.send_error(400, f"Probe must be one of {', '.join(PROBE_MODES)}")
+                return
+            body_budget = int(data.get('body_budget', DEFAULT_BODY_BUDGET))
+            if body_budget < 0:
+                self.send_error(400, "Body budget cannot be negative")
+                return
+            
             # Create new API
             new_api = APIConfig(
                 name=name,
@@ -679,7 +663,10 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                 method=data.get('method', 'GET'),
                 timeout=timeout,
                 expected_status=expected_status,
-                headers=data.get('headers', {})
+                headers=data.get('headers', {}),
+                interval=interval,
+                probe=probe,
+                body_budget=body_budget
             )
             
             server.config.apis.append(new_api)
@@ -698,12 +685,8 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             # Update monitoring data
             MonitoringHandler.monitoring_data['config']['apis_count'] = len(server.config.apis)
             
-            self.send_response(201)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
             response_data = {'success': True, 'message': 'API added successfully', 'api': {'name': name, 'url': url}}
-            self.wfile.write(json.dumps(response_data, ensure_ascii=False).encode('utf-8'))
+            self.send_json(response_data, status=201)
         except ValueError as e:
             self.send_error(400, f"Validation error: {str(e)}")
         except Exception as e:
@@ -711,54 +694,81 @@ class MonitoringHandler(BaseHTTPRequestHandler):
     
     def handle_update_api(self, api_name: str):
         """Handles updating existing API."""
-        from .loader import APIConfig, save_config
-        data = self.read_json_body()
-        if not data:
-            self.send_error(400, "Invalid JSON")
-            return
-        
-        server = MonitoringHandler.monitoring_data.get('server_instance')
-        if not server:
-            self.send_error(500, "Server instance not found")
-            return
-        
-        # Find API
-        api_index = None
-        for i, api in enumerate(server.config.apis):
-            if api.name == api_name:
-                api_index = i
-                break
-        
-        if api_index is None:
-            self.send_error(404, f"API '{api_name}' not found")
-            return
-        
-        # Update API
-        updated_api = APIConfig(
-            name=data.get('name', server.config.apis[api_index].name),
-            url=data.get('url', server.config.apis[api_index].url),
-            method=data.get('method', server.config.apis[api_index].method),
-            timeout=float(data.get('timeout', server.config.apis[api_index].timeout)),
-            expected_status=int(data.get('expected_status', server.config.apis[api_index].expected_status)),
-            headers=data.get('headers', server.config.apis[api_index].headers)
-        )
-        
-        server.config.apis[api_index] = updated_api
-        
-        # Save configuration
-        config_path = MonitoringHandler.monitoring_data.get('config_path')
-        if config_path:
-            try:
-                save_config(server.config, config_path)
-            except Exception as e:
-                self.send_error(500, f"Failed to save config: {str(e)}")
+        from .loader import APIConfig, PROBE_MODES, save_config
+        try:
+            data = self.read_json_body()
+            if not data:
+                self.send_error(400, "Invalid JSON")
                 return
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({'success': True, 'message': 'API updated successfully'}, ensure_ascii=False).encode('utf-8'))
+            
+            server = MonitoringHandler.monitoring_data.get('server_instance')
+            if not server:
+                self.send_error(500, "Server instance not found")
+                return
+            
+            # Find API
+            api_index = None
+            for i, api in enumerate(server.config.apis):
+                if api.name == api_name:
+                    api_index = i
+                    break
+            
+            if api_index is None:
+                self.send_error(404, f"API '{api_name}' not found")
+                return
+            current = server.config.apis[api_index]
+            
+            # Timeout and interval validation
+            timeout = _positive_number(data, 'timeout', current.timeout)
+            interval = _positive_number(data, 'interval', current.interval)
+            
+            # Expected status validation
+            expected_status = int(data.get('expected_status', current.expected_status))
+            if expected_status < 100 or expected_status >= 600:
+                self.send_error(400, "Expected status must be between 100 and 599")
+                return
+            
+            # Probe mode validation
+            probe = data.get('probe', current.probe)
+            if probe not in PROBE_MODES:
+                self.send_error(400, f"Probe must be one of {', '.join(PROBE_MODES)}")
+                return
+            body_budget = int(data.get('body_budget', current.body_budget))
+            if body_budget < 0:
+                self.send_error(400, "Body budget cannot be negative")
+                return
+            
+            # Update API
+            updated_api = APIConfig(
+                name=data.get('name', current.name),
+                url=data.get('url', current.url),
+                method=data.get('method', current.method),
+                timeout=timeout,
+                expected_status=expected_status,
+                headers=data.get('headers', current.headers),
+                interval=interval,
+                probe=probe,
+                body_budget=body_budget
+            )
+            
+            server.config.apis[api_index] = updated_api
+            
+            # Save configuration
+            config_path = MonitoringHandler.monitoring_data.get('config_path')
+            if config_path:
+                try:
+                    save_config(server.config, config_path)
+                except Exception as e:
+                    # Restore previous API if save failed
+                    server.config.apis[api_index] = current
+                    self.send_error(500, f"Failed to save config: {str(e)}")
+                    return
+            
+            self.send_json({'success': True, 'message': 'API updated successfully'})
+        except ValueError as e:
+            self.send_error(400, f"Validation error: {str(e)}")
+        except Exception as e:
+            self.send_error(500, f"Internal server error: {str(e)}")
     
     def handle_delete_api(self, api_name: str):
         """Handles deleting API."""
@@ -797,59 +807,56 @@ class MonitoringHandler(BaseHTTPRequestHandler):
         # Update monitoring data
         MonitoringHandler.monitoring_data['config']['apis_count'] = len(server.config.apis)
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps({'success': True, 'message': 'API deleted successfully'}, ensure_ascii=False).encode('utf-8'))
+        self.send_json({'success': True, 'message': 'API deleted successfully'})
     
     def handle_refresh_monitoring(self):
-        """Forces refresh of monitoring for all APIs."""
-        from .checker import check_all_apis
+        """
+        Queues refresh of all APIs on the monitoring worker.
+        
+        Responds 202 at once with a job id; clicks arriving while a refresh is
+        still pending join it instead of queueing another sweep.
+        """
+        server = MonitoringHandler.monitoring_data.get('server_instance')
+        if not server:
+            self.send_error(500, "Server instance not found")
+            return
+        
+        job, created = server.refresh_jobs.request(len(server.config.apis))
+        response_data = {
+            'success': True,
+            'message': 'Refresh queued' if created else 'Refresh already pending',
+            'job_id': job.id,
+            'status_url': f"/api/refresh/{job.id}",
+            'coalesced': not created
+        }
+        self.send_json(response_data, status=202)
+    
+    def serve_refresh_job(self, job_id: str):
+        """
+        Serves progress of a refresh job.
+        
+        Args:
+            job_id: Job id returned by /api/refresh
+        """
         server = MonitoringHandler.monitoring_data.get('server_instance')
-        if not server:
-            self.send_error(500, "Server instance not found")
+        job = server.refresh_jobs.snapshot(job_id) if server else None
+        if job is None:
+            self.send_error(404, "Refresh job not found")
             return
-        
-        try:
-            # Perform check for all APIs
-            results = check_all_apis(server.config.apis)
-            
-            # Update data
-            MonitoringHandler.monitoring_data['results'] = results
-            MonitoringHandler.monitoring_data['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'results': [self.result_to_dict(r) for r in results]
-            })
-            
-            # Update statistics
-            stats = MonitoringHandler.monitoring_data['stats']
-            stats['total_checks'] = stats.get('total_checks', 0) + 1
-            stats['last_check'] = datetime.now().isoformat()
-            successful = sum(1 for r in results if r.success)
-            stats['successful_checks'] = stats.get('successful_checks', 0) + successful
-            stats['failed_checks'] = stats.get('failed_checks', 0) + (len(results) - successful)
-            
-            # Limit history (last 100 checks)
-            if len(MonitoringHandler.monitoring_data['history']) > 100:
-                MonitoringHandler.monitoring_data['history'].pop(0)
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json; charset=utf-8')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            response_data = {
-                'success': True,
-                'message': 'Monitoring refreshed',
-                'results_count': len(results)
-            }
-            self.wfile.write(json.dumps(response_data, ensure_ascii=False).encode('utf-8'))
-        except Exception as e:
-            self.send_error(500, f"Failed to refresh monitoring: {str(e)}")
+        self.send_json(job)
     
     def serve_openapi_spec(self):
         """Serves OpenAPI specification."""
-        openapi_spec = {
+        self.send_cached('openapi')
+    
+    def serve_swagger_ui(self):
+        """Serves Swagger UI for interactive documentation."""
+        self.send_cached('docs')
+    
+    @staticmethod
+    def get_openapi_spec():
+        """Builds OpenAPI specification."""
+        return {
             'openapi': '3.0.0',
             'info': {
                 'title': 'API Health Monitor API',
@@ -903,6 +910,30 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                         }
                     }
                 },
+                '/api/events': {
+                    'get': {
+                        'summary': 'Stream monitoring updates',
+                        'description': 'Server-Sent Events stream: a "snapshot" event with all results, then '
+                                       'one "update" event per sweep with changed and removed results, '
+                                       'stats and order changes. Reconnecting with Last-Event-ID resumes '
+                                       'from the missed updates',
+                        'parameters': [
+                            {
+                                'name': 'Last-Event-ID',
+                                'in': 'header',
+                                'required': False,
+                                'schema': {'type': 'integer'}
+                            }
+                        ],
+                        'responses': {
+                            '200': {
+                                'description': 'Event stream',
+                                'content': {'text/event-stream': {'schema': {'type': 'string'}}}
+                            },
+                            '503': {'description': 'Too many event streams (poll /api/data instead)'}
+                        }
+                    }
+                },
                 '/api/stats': {
                     'get': {
                         'summary': 'Get statistics',
@@ -919,7 +950,21 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                                                 'successful_checks': {'type': 'integer'},
                                                 'failed_checks': {'type': 'integer'},
                                                 'last_check': {'type': 'string', 'format': 'date-time'},
-                                                'start_time': {'type': 'string', 'format': 'date-time'}
+                                                'start_time': {'type': 'string', 'format': 'date-time'},
+                                                'latency': {
+                                                    'type': 'object',
+                                                    'description': 'API name -> count, p50, p95, p99 (ms)'
+                                                },
+                                                'windows': {
+                                                    'type': 'object',
+                                                    'description': 'Uptime %, error rate and mean latency over '
+                                                                   '1h/24h/7d/30d, overall and per API'
+                                                },
+                                                'hedging': {
+                                                    'type': 'object',
+                                                    'description': 'Hedged requests: probes, hedges, hedge_rate, '
+                                                                   'wins, saved_ms, saved_ms_per_win'
+                                                }
                                             }
                                         }
                                     }
@@ -928,6 +973,72 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                         }
                     }
                 },
+                '/api/history': {
+                    'get': {
+                        'summary': 'Get check history',
+                        'description': 'Returns stored results of one API in a time range (oldest first); '
+                                       'requires the history store to be configured',
+                        'parameters': [
+                            {
+                                'name': 'api',
+                                'in': 'query',
+                                'required': True,
+                                'schema': {'type': 'string'}
+                            },
+                            {
+                                'name': 'from',
+                                'in': 'query',
+                                'description': 'Range start, Unix time (default: 24 hours before to)',
+                                'schema': {'type': 'number'}
+                            },
+                            {
+                                'name': 'to',
+                                'in': 'query',
+                                'description': 'Range end, Unix time (default: now)',
+                                'schema': {'type': 'number'}
+                            },
+                            {
+                                'name': 'limit',
+                                'in': 'query',
+                                'description': 'Maximum number of results (newest are kept)',
+                                'schema': {'type': 'integer'}
+                            }
+                        ],
+                        'responses': {
+                            '200': {
+                                'description': 'Success response',
+                                'content': {
+                                    'application/json': {
+                                        'schema': {
+                                            'type': 'object',
+                                            'properties': {
+                                                'api': {'type': 'string'},
+                                                'from': {'type': 'number'},
+                                                'to': {'type': 'number'},
+                                                'results': {
+                                                    'type': 'array',
+                                                    'items': {
+                                                        'type': 'object',
+                                                        'properties': {
+                                                            'timestamp': {'type': 'number'},
+                                                            'status_code': {'type': 'integer', 'nullable': True},
+                                                            'latency_ms': {'type': 'number'},
+                                                            'success': {'type': 'boolean'},
+                                                            'timeout': {'type': 'boolean'},
+                                                            'error': {'type': 'string', 'nullable': True}
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            },
+                            '400': {'description': 'Missing api or invalid range'},
+                            '404': {'description': 'History store not configured'}
+                        }
+                    }
+                },
                 '/api/apis': {
                     'get': {
                         'summary': 'Get API list',
@@ -1059,10 +1170,11 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                 '/api/refresh': {
                     'get': {
                         'summary': 'Refresh monitoring',
-                        'description': 'Forces refresh of monitoring results for all APIs',
+                        'description': 'Queues refresh of monitoring results for all APIs on the '
+                                       'monitoring worker; requests made while a refresh is pending join it',
                         'responses': {
-                            '200': {
-                                'description': 'Monitoring refreshed',
+                            '202': {
+                                'description': 'Refresh queued',
                                 'content': {
                                     'application/json': {
                                         'schema': {
@@ -1070,7 +1182,9 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                                             'properties': {
                                                 'success': {'type': 'boolean'},
                                                 'message': {'type': 'string'},
-                                                'results_count': {'type': 'integer'}
+                                                'job_id': {'type': 'string'},
+                                                'status_url': {'type': 'string'},
+                                                'coalesced': {'type': 'boolean'}
                                             }
                                         }
                                     }
@@ -1080,6 +1194,88 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                         }
                     }
                 },
+                '/api/refresh/{id}': {
+                    'get': {
+                        'summary': 'Refresh progress',
+                        'description': 'Returns status (pending, running, done, failed), progress and '
+                                       'results completed so far of a refresh job',
+                        'parameters': [
+                            {
+                                'name': 'id',
+                                'in': 'path',
+                                'required': True,
+                                'schema': {'type': 'string'}
+                            }
+                        ],
+                        'responses': {
+                            '200': {
+                                'description': 'Job progress',
+                                'content': {
+                                    'application/json': {
+                                        'schema': {
+                                            'type': 'object',
+                                            'properties': {
+                                                'id': {'type': 'string'},
+                                                'status': {'type': 'string'},
+                                                'done': {'type': 'integer'},
+                                                'total': {'type': 'integer'},
+                                                'results': {'type': 'array', 'items': {'type': 'object'}}
+                                            }
+                                        }
+                                    }
+                                }
+                            },
+                            '404': {'description': 'Unknown job'}
+                        }
+                    }
+                },
+                '/metrics': {
+                    'get': {
+                        'summary': 'Prometheus metrics',
+                        'description': 'Per-API up, status code, check counters and latency histograms, '
+                                       'plus sweep duration, in Prometheus text format',
+                        'responses': {
+                            '200': {
+                                'description': 'Metrics',
+                                'content': {'text/plain': {'schema': {'type': 'string'}}}
+                            }
+                        }
+                    }
+                },
+                '/api/ingest': {
+                    'post': {
+                        'summary': 'Ingest agent results',
+                        'description': 'Aggregator mode: accepts one batch of check results from an agent '
+                                       '(gzip-compressed JSON, Bearer token if configured)',
+                        'responses': {
+                            '202': {'description': 'Batch accepted'},
+                            '400': {'description': 'Invalid batch'},
+                            '401': {'description': 'Invalid or missing token'},
+                            '404': {'description': 'Not running as aggregator'}
+                        }
+                    }
+                },
+                '/api/locations': {
+                    'get': {
+                        'summary': 'Location status',
+                        'description': 'Aggregator mode: last report, staleness and failed checks per location',
+                        'responses': {
+                            '200': {'description': 'Success response'},
+                            '404': {'description': 'Not running as aggregator'}
+                        }
+                    }
+                },
+                '/api/consensus': {
+                    'get': {
+                        'summary': 'Consensus status',
+                        'description': 'Aggregator mode: consensus of every check with each location\'s '
+                                       'latest result',
+                        'responses': {
+                            '200': {'description': 'Success response'},
+                            '404': {'description': 'Not running as aggregator'}
+                        }
+                    }
+                },
                 '/api/popular': {
                     'get': {
                         'summary': 'Get popular APIs',
@@ -1110,16 +1306,11 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                 }
             }
         }
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(openapi_spec, ensure_ascii=False, indent=2).encode('utf-8'))
     
-    def serve_swagger_ui(self):
-        """Serves Swagger UI for interactive documentation."""
-        swagger_ui_html = f"""<!DOCTYPE html>
+    @staticmethod
+    def get_swagger_ui_html():
+        """Generates Swagger UI page."""
+        return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -1160,13 +1351,9 @@ class MonitoringHandler(BaseHTTPRequestHandler):
     </script>
 </body>
 </html>"""
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(swagger_ui_html.encode('utf-8'))
     
-    def get_dashboard_html(self):
+    @staticmethod
+    def get_dashboard_html():
         """Generates HTML dashboard."""
         return f"""<!DOCTYPE html>
 <html lang="en">
@@ -1737,6 +1924,10 @@ class MonitoringHandler(BaseHTTPRequestHandler):
     <script>
         let lastResults = [];
         let errorNotifications = new Set();
+        let resultsByName = new Map();
+        let resultOrder = [];
+        let eventSource = null;
+        let pollTimer = null;
         
         function showTab(tabName) {{
             // Hide all tabs
@@ -1763,15 +1954,86 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             fetch('/api/data')
                 .then(response => response.json())
                 .then(data => {{
-                    updateDashboard(data);
-                    checkForErrors(data.results);
-                    document.getElementById('lastUpdate').textContent = new Date().toLocaleString('en-US');
+                    applySnapshot(data);
                 }})
                 .catch(error => {{
                     console.error('Error loading data:', error);
                 }});
         }}
         
+        function applySnapshot(data) {{
+            const results = data.results || [];
+            resultsByName = new Map(results.map(r => [r.name, r]));
+            resultOrder = results.map(r => r.name);
+            renderResults();
+        }}
+        
+        function applyUpdate(data) {{
+            data.changed.forEach(r => resultsByName.set(r.name, r));
+            data.removed.forEach(name => resultsByName.delete(name));
+            if (data.order) {{
+                resultOrder = data.order;
+            }}
+            renderResults();
+        }}
+        
+        function renderResults() {{
+            const results = resultOrder.filter(name => resultsByName.has(name)).map(name => resultsByName.get(name));
+            updateDashboard({{ results: results }});
+            checkForErrors(results);
+            document.getElementById('lastUpdate').textContent = new Date().toLocaleString('en-US');
+        }}
+        
+        async function waitForRefresh(statusUrl, timeoutMs = 60000) {{
+            // Refresh runs on the server's monitoring worker; follow its progress
+            const deadline = Date.now() + timeoutMs;
+            while (Date.now() < deadline) {{
+                const response = await fetch(statusUrl);
+                if (!response.ok) {{
+                    return false;
+                }}
+                const job = await response.json();
+                if (job.status === 'done' || job.status === 'failed') {{
+                    return job.status === 'done';
+                }}
+                await new Promise(resolve => setTimeout(resolve, 500));
+            }}
+            return false;
+        }}
+        
+        function startPolling() {{
+            if (!pollTimer) {{
+                pollTimer = setInterval(loadMonitoringData, 5000);
+            }}
+        }}
+        
+        function stopPolling() {{
+            if (pollTimer) {{
+                clearInterval(pollTimer);
+                pollTimer = null;
+            }}
+        }}
+        
+        function connectEvents() {{
+            // Server pushes changed results after each sweep; poll /api/data only without a stream
+            if (!window.EventSource) {{
+                startPolling();
+                return;
+            }}
+            eventSource = new EventSource('/api/events');
+            eventSource.addEventListener('snapshot', e => applySnapshot(JSON.parse(e.data)));
+            eventSource.addEventListener('update', e => applyUpdate(JSON.parse(e.data)));
+            eventSource.onopen = stopPolling;
+            eventSource.onerror = () => {{
+                startPolling();
+                if (eventSource.readyState === EventSource.CLOSED) {{
+                    // Browser gave up reconnecting; try again later
+                    eventSource = null;
+                    setTimeout(connectEvents, 30000);
+                }}
+            }};
+        }}
+        
         function updateDashboard(data) {{
             const results = data.results || [];
             lastResults = results;
@@ -1803,6 +2065,8 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                                   result.success ? 'OK' : 'FAIL';
                 const statusCode = result.status_code || 'N/A';
                 const latency = result.latency_ms ? result.latency_ms.toFixed(2) + ' ms' : 'N/A';
+                const phases = result.phases ?
+                    `<br><small style="color: #6c757d;">DNS ${{result.phases.dns_ms.toFixed(1)}} · TCP ${{result.phases.connect_ms.toFixed(1)}} · TLS ${{result.phases.tls_ms.toFixed(1)}} · TTFB ${{result.phases.ttfb_ms.toFixed(1)}} · Body ${{result.phases.body_ms.toFixed(1)}}</small>` : '';
                 
                 return `
                     <tr>
@@ -1810,8 +2074,8 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                         <td><strong>${{result.name}}</strong></td>
                         <td><a href="${{result.url}}" target="_blank" style="color: #667eea;">${{result.url}}</a></td>
                         <td>${{statusCode}}</td>
-                        <td>${{latency}}</td>
-                        <td><span class="badge ${{badgeClass}}">${{statusText}}</span></td>
+                        <td>${{latency}}${{phases}}</td>
+                        <td><span class="badge ${{badgeClass}}">${{statusText}}</span>${{result.stale ? ' <small style="color: #6c757d;" title="Refreshing in background">stale</small>' : ''}}</td>
                     </tr>
                 `;
             }}).join('');
@@ -1895,6 +2159,7 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                         <p><strong>Last check:</strong> ${{data.last_check || 'No data'}}</p>
                         <p><strong>Uptime:</strong> ${{hours}}h ${{minutes}}m</p>
                         <p><strong>Monitoring started:</strong> ${{new Date(data.start_time).toLocaleString('en-US')}}</p>
+                        ${{renderWindows(data.windows)}}
                     `;
                 }})
                 .catch(error => {{
@@ -1902,6 +2167,24 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                 }});
         }}
         
+        function renderWindows(windows) {{
+            if (!windows) return '';
+            const labels = ['1h', '24h', '7d', '30d'];
+            const cell = w => w.checks
+                ? `${{w.uptime_percent.toFixed(2)}}% up<br><small>${{(w.error_rate * 100).toFixed(2)}}% errors, ${{w.mean_latency_ms !== null ? w.mean_latency_ms.toFixed(1) + ' ms' : 'no probes'}}</small>`
+                : 'No data';
+            const row = (name, stats) => `<tr><td><strong>${{name}}</strong></td>${{labels.map(l => `<td>${{cell(stats[l])}}</td>`).join('')}}</tr>`;
+            const rows = [row('All APIs', windows.overall)]
+                .concat(Object.entries(windows.apis).map(([name, stats]) => row(name, stats)));
+            return `
+                <h3>Rolling Windows</h3>
+                <table class="api-table">
+                    <tr><th>API</th>${{labels.map(l => `<th>${{l}}</th>`).join('')}}</tr>
+                    ${{rows.join('')}}
+                </table>
+            `;
+        }}
+        
         function showAlert(message, type = 'info') {{
             const alertContainer = document.getElementById('alertContainer');
             if (!alertContainer) {{
@@ -2200,7 +2483,12 @@ class MonitoringHandler(BaseHTTPRequestHandler):
                         try {{
                             const refreshResponse = await fetch('/api/refresh');
                             if (refreshResponse.ok) {{
-                                showAlert('✅ API added and monitoring updated!', 'success');
+                                const job = await refreshResponse.json();
+                                if (await waitForRefresh(job.status_url)) {{
+                                    showAlert('✅ API added and monitoring updated!', 'success');
+                                }} else {{
+                                    showAlert('⚠️ API added, but monitoring will update automatically in a few seconds', 'info');
+                                }}
                                 loadMonitoringData(); // Update data on page
                             }} else {{
                                 showAlert('⚠️ API added, but monitoring will update automatically in a few seconds', 'info');
@@ -2317,8 +2605,8 @@ class MonitoringHandler(BaseHTTPRequestHandler):
             }}
         }};
         
-        // Auto-update every 5 seconds
-        setInterval(loadMonitoringData, 5000);
+        // Live updates (falls back to polling every 5 seconds)
+        connectEvents();
     </script>
 </body>
 </html>
@@ -2332,7 +2620,8 @@ class MonitoringHandler(BaseHTTPRequestHandler):
 class WebMonitoringServer:
     """Web server for API monitoring."""
     
-    def __init__(self, config: Config, port: int = 8080, interval: int = 60, config_path: str = None):
+    def __init__(self, config: Config, port: int = 8080, interval: int = 60, config_path: str = None,
+                 workers: int = DEFAULT_WORKERS, processes: int = 1, clock: Clock = SYSTEM_CLOCK):
         """
         Initializes web server.
         
@@ -2341,14 +2630,70 @@ class WebMonitoringServer:
             port: Port for web server
             interval: API check interval in seconds
             config_path: Path to configuration file for saving changes
+            workers: Maximum number of dashboard connections served at once
+            processes: Worker processes to shard checks across (1: check in this process)
+            clock: Time source of sweep timing, cache expiry, connection pools, circuit breakers and history
         """
         self.config = config
         self.port = port
         self.interval = interval
         self.config_path = config_path
+        self.workers = workers
+        self.clock = clock
         self.server = None
         self.running = False
         
+        # Keep-alive sessions shared by monitoring loop and refresh requests
+        self.sessions = create_session_registry_from_config(config.connection_pool, clock=clock)
+        
+        # Global and per-host concurrency limits of async sweeps
+        self.host_limits = create_host_limits_from_config(config.concurrency)
+        
+        # Endpoints that stopped answering fail fast until a trial probe gets through
+        self.breakers = create_circuit_breakers_from_config(config.circuit_breaker, clock=clock)
+        
+        # Slow probes get a second request (optional, within a budget)
+        self.hedger = create_hedger_from_config(config.hedging)
+        
+        # Worker processes for very large API lists (optional)
+        self.pool = create_worker_pool(processes, config)
+        
+        # Results cache shared by monitoring loop and refresh requests. Periodic
+        # sweeps always probe (TTL is half an interval, like Scheduler); refresh
+        # requests serve expired results stale while a background probe refreshes them
+        check_interval = interval if interval else 60.0
+        stale_window = config.stale_while_revalidate
+        if stale_window is None:
+            stale_window = STALE_WINDOW_INTERVALS * check_interval
+        self.cache = ResultCache(default_ttl=check_interval / 2, stale_while_revalidate=stale_window,
+                                 on_revalidated=self.update_result, clock=clock)
+        self._results_lock = threading.Lock()
+        self._refreshed = {}  # (name, url, method) -> background refresh result not yet published
+        self._publish_timer: Optional[threading.Timer] = None
+        self._job = None  # Refresh job waiting for background refreshes (RefreshJob)
+        self._job_awaited = set()  # APIs of that job served stale, refresh not landed yet
+        self._job_landed = {}  # Refreshes landed while the job's sweep was running
+        
+        # Persistent check history (optional)
+        self.history = create_history_store_from_config(config.history, clock=clock)
+        
+        # Prometheus metrics, updated with every result (/metrics)
+        self.metrics = create_metrics_registry_from_config(config.metrics)
+        
+        # Latency percentiles per API (/api/stats)
+        self.latency = LatencySketches()
+        
+        # Uptime, error rate and mean latency over 1h/24h/7d/30d (/api/stats)
+        self.windows = RollingWindows()
+        
+        # Refresh requests are run by the monitoring worker, not the HTTP handler
+        self.refresh_jobs = RefreshQueue()
+        
+        # Pushes sweep updates to dashboards connected to /api/events
+        self.events = EventBroker()
+        # Half of the workers stay free for regular requests
+        self.stream_slots = threading.BoundedSemaphore(max(1, workers // 2))
+        
         # Initialize monitoring data
         MonitoringHandler.monitoring_data['config'] = {
             'apis_count': len(config.apis),
@@ -2356,11 +2701,16 @@ class WebMonitoringServer:
         }
         MonitoringHandler.monitoring_data['config_path'] = config_path
         MonitoringHandler.monitoring_data['server_instance'] = self
+        MonitoringHandler.render_static_responses()
     
-    def start(self):
-        """Starts web server and monitoring."""
+    def start(self, open_browser: bool = True):
+        """
+        Starts web server and monitoring.
+        
+        Args:
+            open_browser: Open dashboard in the default browser
+        """
         import webbrowser
-        from .checker import check_all_apis
         
         # Event for server startup synchronization
         server_ready = threading.Event()
@@ -2375,7 +2725,7 @@ class WebMonitoringServer:
             for attempt in range(max_attempts):
                 try:
                     server_address = ('', current_port)
-                    self.server = HTTPServer(server_address, MonitoringHandler)
+                    self.server = PooledHTTPServer(server_address, MonitoringHandler, workers=self.workers)
                     actual_port[0] = current_port  # Save actual port
                     self.port = current_port  # Update port
                     self.running = True
@@ -2417,63 +2767,6 @@ class WebMonitoringServer:
                     server_ready.set()  # Unblock even on error
                     raise
         
-        def run_monitoring():
-            """Starts periodic monitoring."""
-            from .notifier import create_notifier_from_config
-            notifier = create_notifier_from_config(self.config.notifications) if self.config.notifications else None
-            
-            # Initialize cache
-            cache_ttl = self.interval if self.interval else 60.0
-            cache = ResultCache(default_ttl=cache_ttl)
-            
-            check_count = 0
-            while self.running:
-                try:
-                    # Use cache and async requests for optimization
-                    use_async = len(self.config.apis) > 5
-                    results = check_all_apis(self.config.apis, cache=cache, use_async=use_async)
-                    check_count += 1
-                    
-                    # Cleanup expired cache entries
-                    cache.cleanup_expired()
-                    
-                    # Send notifications
-                    if notifier:
-                        notifier.notify(results)
-                    
-                    # Push notifications for web interface
-                    failed_apis = [r for r in results if not r.success]
-                    if failed_apis and notifier and notifier.config.push_enabled:
-                        # Save data for push notifications
-                        MonitoringHandler.monitoring_data['pending_push'] = {
-                            'failed_apis': [{'name': r.name, 'error': r.error} for r in failed_apis],
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    
-                    # Update data
-                    MonitoringHandler.monitoring_data['results'] = results
-                    MonitoringHandler.monitoring_data['history'].append({
-                        'timestamp': datetime.now().isoformat(),
-                        'results': [self._result_to_dict(r) for r in results]
-                    })
-                    
-                    # Update statistics
-                    stats = MonitoringHandler.monitoring_data['stats']
-                    stats['total_checks'] = check_count
-                    stats['last_check'] = datetime.now().isoformat()
-                    successful = sum(1 for r in results if r.success)
-                    stats['successful_checks'] += successful
-                    stats['failed_checks'] += len(results) - successful
-                    
-                    # Limit history (last 100 checks)
-                    if len(MonitoringHandler.monitoring_data['history']) > 100:
-                        MonitoringHandler.monitoring_data['history'].pop(0)
-                    
-                    time.sleep(self.interval)
-                except Exception as e:
-                    print(f"Monitoring error: {e}")
-                    time.sleep(self.interval)
-        
         # Start server in separate thread
         server_thread = threading.Thread(target=run_server, daemon=True)
         server_thread.start()
@@ -2487,7 +2780,8 @@ class WebMonitoringServer:
             
             # Open browser
             try:
-                webbrowser.open(f'http://localhost:{final_port}')
+                if open_browser:
+                    webbrowser.open(f'http://localhost:{final_port}')
             except Exception as e:
                 print(f"⚠️  Failed to open browser automatically: {e}")
                 print(f"   Open manually: http://localhost:{final_port}")
@@ -2497,12 +2791,236 @@ class WebMonitoringServer:
         
         # Start monitoring
         try:
-            run_monitoring()
+            self.monitor_loop()
         except KeyboardInterrupt:
             print("\nStopping web server...")
             self.running = False
+            self.refresh_jobs.close()
+            self.events.close()
             if self.server:
                 self.server.shutdown()
+            self.cache.close()
+            if self._publish_timer:
+                self._publish_timer.cancel()
+            self.sessions.close()
+            if self.pool:
+                self.pool.close()
+            if self.history:
+                self.history.close()
+    
+    def monitor_loop(self):
+        """
+        Runs periodic sweeps while the server is running.
+        
+        Between sweeps the worker waits for refresh requests, so a refresh
+        starts right away (or right after the sweep in progress) instead of
+        running inside the HTTP handler.
+        """
+        from .notifier import create_notifier_from_config
+        notifier = create_notifier_from_config(self.config.notifications) if self.config.notifications else None
+        
+        job = None
+        while self.running:
+            try:
+                self.sweep(notifier, job)
+            except Exception as e:
+                print(f"Monitoring error: {e}")
+                if job:
+                    self.refresh_jobs.finish(job, error=str(e))
+            job = self.refresh_jobs.wait(self.interval)
+    
+    def sweep(self, notifier=None, job=None) -> List[CheckResult]:
+        """
+        Checks all APIs once and records the results.
+        
+        Args:
+            notifier: Optional notifier for failed checks
+            job: Refresh job this sweep runs (RefreshJob); progress is reported to it
+            
+        Returns:
+            List of check results
+        """
+        on_result = None
+        if job:
+            self._start_job(job)
+            on_result = lambda result: self._job_result(job, result)
+        
+        # A refresh serves cached results at once and refreshes all of them in background;
+        # periodic sweeps probe every API, so dashboard and notifications are never an interval behind
+        started = self.clock.monotonic()
+        if job:
+            results = self.collect_results(max_age=0, on_result=on_result)
+        else:
+            results = self.collect_results(allow_stale=False)
+        self.metrics.observe_sweep(self.clock.monotonic() - started)
+        
+        # Cleanup expired cache entries and idle connections
+        self.cache.cleanup_expired()
+        self.sessions.evict_idle()
+        
+        # Send notifications
+        if notifier:
+            notifier.notify(results)
+        
+        # Push notifications for web interface
+        failed_apis = [r for r in results if not r.success]
+        if failed_apis and notifier and notifier.config.push_enabled:
+            # Save data for push notifications
+            MonitoringHandler.monitoring_data['pending_push'] = {
+                'failed_apis': [{'name': r.name, 'error': r.error} for r in failed_apis],
+                'timestamp': datetime.now().isoformat()
+            }
+        
+        # Update data, statistics and history
+        self.record_results(results)
+        
+        if job:
+            # Done now, or when the last background refresh lands (see update_result)
+            with self._results_lock:
+                self._job_landed = {}
+                if not self._job_awaited:
+                    self._job = None
+                    self.refresh_jobs.finish(job)
+        return results
+    
+    def _start_job(self, job):
+        """Makes job the one background refreshes report to."""
+        with self._results_lock:
+            if self._job is not None:
+                self.refresh_jobs.finish(self._job, error=f"{len(self._job_awaited)} background refreshes "
+                                                          f"did not finish before the next refresh")
+            self._job = job
+            self._job_awaited = set()
+            self._job_landed = {}
+    
+    def _job_result(self, job, result: CheckResult):
+        """
+        Reports one result of a refresh sweep to its job.
+        
+        Stale results are not reported; the job waits for their background
+        refresh instead, so done/total counts real probes.
+        
+        Args:
+            job: Running refresh job
+            result: Result of the sweep
+        """
+        key = (result.name, result.url, result.method)
+        with self._results_lock:
+            if result.stale:
+                result = self._job_landed.pop(key, None)
+                if result is None:
+                    self._job_awaited.add(key)
+                    return
+            self.refresh_jobs.progress(job, self._result_to_dict(result))
+    
+    def collect_results(self, max_age: Optional[float] = None, on_result=None,
+                        allow_stale: bool = True) -> List[CheckResult]:
+        """
+        Checks all configured APIs (overridden by servers that receive results instead).
+        
+        Args:
+            max_age: Cached results older than this are stale (see check_all_apis)
+            on_result: Called with each result as soon as it is available
+            allow_stale: Serve stale cached results (otherwise expired results are checked now)
+            
+        Returns:
+            List of check results
+        """
+        # Use cache and async requests for optimization
+        use_async = len(self.config.apis) > 5
+        return check_all_apis(self.config.apis, cache=self.cache, use_async=use_async,
+                              sessions=self.sessions, phases=self.config.phase_timing,
+                              max_age=max_age, on_result=on_result,
+                              host_limits=self.host_limits, pool=self.pool, breakers=self.breakers,
+                              hedger=self.hedger, allow_stale=allow_stale)
+    
+    def record_results(self, results: List[CheckResult]):
+        """
+        Stores results of one sweep: dashboard data, statistics and history.
+        
+        Args:
+            results: List of check results
+        """
+        now = datetime.now().isoformat()
+        result_dicts = [self._result_to_dict(r) for r in results]
+        with self._results_lock:
+            MonitoringHandler.monitoring_data['results'] = results
+            MonitoringHandler.monitoring_data['history'].append({
+                'timestamp': now,
+                'results': result_dicts
+            })
+            
+            # Update statistics
+            stats = MonitoringHandler.monitoring_data['stats']
+            stats['total_checks'] = stats.get('total_checks', 0) + 1
+            stats['last_check'] = now
+            successful = sum(1 for r in results if r.success)
+            stats['successful_checks'] = stats.get('successful_checks', 0) + successful
+            stats['failed_checks'] = stats.get('failed_checks', 0) + (len(results) - successful)
+            
+            self.events.publish(result_dicts, stats, now)
+        
+        self.metrics.observe_all(results)
+        self.latency.observe_all(results)
+        self.latency.retain(LatencySketches.key_of(r) for r in results)
+        self.windows.observe_all(results)
+        self.windows.retain(LatencySketches.key_of(r) for r in results)
+        if self.history:
+            self.history.record(results)
+    
+    def update_result(self, result: CheckResult):
+        """
+        Queues one API's background refresh result for the dashboard.
+        
+        Results landing within REFRESH_PUBLISH_DELAY of each other are
+        swapped in and pushed to dashboards together (see publish_refreshed).
+        A running refresh job is told about them as they land.
+        
+        Args:
+            result: Fresh check result
+        """
+        key = (result.name, result.url, result.method)
+        with self._results_lock:
+            if self._job is not None:
+                if key in self._job_awaited:
+                    self._job_awaited.discard(key)
+                    self.refresh_jobs.progress(self._job, self._result_to_dict(result))
+                    if not self._job_awaited:
+                        self.refresh_jobs.finish(self._job)
+                        self._job = None
+                else:
+                    self._job_landed[key] = result  # Sweep of the job has not reached this API yet
+            self._refreshed[key] = result
+            if self._publish_timer is None:
+                self._publish_timer = threading.Timer(REFRESH_PUBLISH_DELAY, self.publish_refreshed)
+                self._publish_timer.daemon = True
+                self._publish_timer.start()
+    
+    def publish_refreshed(self):
+        """Replaces refreshed results on the dashboard and pushes them in one update."""
+        with self._results_lock:
+            self._publish_timer = None
+            refreshed, self._refreshed = self._refreshed, {}
+            results = []
+            updated = []
+            for current in MonitoringHandler.monitoring_data['results']:
+                result = refreshed.get((current.name, current.url, current.method))
+                if result is None:
+                    results.append(current)
+                else:
+                    results.append(result)
+                    updated.append(result)
+            if not updated:
+                return
+            MonitoringHandler.monitoring_data['results'] = results
+            self.events.publish([self._result_to_dict(r) for r in results],
+                                MonitoringHandler.monitoring_data['stats'], datetime.now().isoformat())
+        for result in updated:
+            self.metrics.observe(result)
+            self.latency.observe(result)
+            self.windows.observe(result)
+        if self.history:
+            self.history.record(updated)
     
     def _result_to_dict(self, result: CheckResult):
         """Converts CheckResult to dictionary."""
@@ -2513,6 +3031,12 @@ class WebMonitoringServer:
             'latency_ms': result.latency_ms,
             'success': result.success,
             'error': result.error,
-            'timeout': result.timeout
+            'timeout': result.timeout,
+            'connection_reused': result.connection_reused,
+            'phases': result.phases.to_dict() if result.phases else None,
+            'stale': result.stale,
+            'circuit_open': result.circuit_open,
+            'checked_at': format_timestamp(result.checked_at) if result.checked_at is not None else None,
+            'bytes_read': result.bytes_read
         }
 
@@ -0,0 +1,381 @@
+"""Module for sharding sweeps across worker processes."""
+
+import hashlib
+import multiprocessing
+import signal
+import struct
+import threading
+import time
+from dataclasses import replace
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .loader import APIConfig, Config
+from .checker import CheckResult, PhaseTimings, request_fingerprint
+
+
+# Result frame: batch index, status code (-1 = none), latency, check time (0 = unknown),
+# body bytes read (-1 = none), flags; followed by phase timings and/or error message when flagged
+FRAME_HEADER = struct.Struct('<IhddqB')
+FRAME_PHASES = struct.Struct('<5d')
+FRAME_ERROR_LENGTH = struct.Struct('<H')
+END_OF_SWEEP = 0xFFFFFFFF
+
+FLAG_SUCCESS = 0x01
+FLAG_TIMEOUT = 0x02
+FLAG_REUSED = 0x04
+FLAG_STALE = 0x08
+FLAG_PHASES = 0x10
+FLAG_ERROR = 0x20
+FLAG_CIRCUIT_OPEN = 0x40
+
+# Seconds a worker may stay silent beyond the longest timeout of its batch before it is taken as hung
+WORKER_DEADLINE_MARGIN = 10.0
+
+
+def encode_result(index: int, result: CheckResult) -> bytes:
+    """
+    Encodes result as a binary frame.
+
+    Name, URL, method and fingerprint are not sent: the receiver takes them
+    from the API configuration at `index` of the batch.
+
+    Args:
+        index: Position of the API in the batch sent to the worker
+        result: Check result
+
+    Returns:
+        Encoded frame
+    """
+    flags = 0
+    if result.success:
+        flags |= FLAG_SUCCESS
+    if result.timeout:
+        flags |= FLAG_TIMEOUT
+    if result.connection_reused:
+        flags |= FLAG_REUSED
+    if result.stale:
+        flags |= FLAG_STALE
+    if result.phases:
+        flags |= FLAG_PHASES
+    if result.circuit_open:
+        flags |= FLAG_CIRCUIT_OPEN
+    error = result.error.encode('utf-8')[:0xFFFF] if result.error else b''
+    if result.error:
+        flags |= FLAG_ERROR
+
+    status = result.status_code if result.status_code is not None else -1
+    bytes_read = result.bytes_read if result.bytes_read is not None else -1
+    frame = FRAME_HEADER.pack(index, status, result.latency_ms, result.checked_at or 0.0, bytes_read, flags)
+    if result.phases:
+        phases = result.phases
+        frame += FRAME_PHASES.pack(phases.dns_ms, phases.connect_ms, phases.tls_ms, phases.ttfb_ms, phases.body_ms)
+    if result.error:
+        frame += FRAME_ERROR_LENGTH.pack(len(error)) + error
+    return frame
+
+
+def decode_results(data: bytes, apis: List[APIConfig]) -> Iterator[Tuple[int, Optional[CheckResult]]]:
+    """
+    Decodes frames of one message.
+
+    Args:
+        data: Concatenated frames
+        apis: Batch the frames refer to
+
+    Yields:
+        Tuples (batch index, result); (END_OF_SWEEP, None) for the end marker
+    """
+    offset = 0
+    while offset < len(data):
+        index, status, latency_ms, checked_at, bytes_read, flags = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        if index == END_OF_SWEEP:
+            yield index, None
+            continue
+
+        phases = None
+        if flags & FLAG_PHASES:
+            phases = PhaseTimings(*FRAME_PHASES.unpack_from(data, offset))
+            offset += FRAME_PHASES.size
+        error = None
+        if flags & FLAG_ERROR:
+            (length,) = FRAME_ERROR_LENGTH.unpack_from(data, offset)
+            offset += FRAME_ERROR_LENGTH.size
+            error = data[offset:offset + length].decode('utf-8', errors='replace')
+            offset += length
+
+        api = apis[index]
+        yield index, CheckResult(
+            name=api.name,
+            url=api.url,
+            status_code=status if status >= 0 else None,
+            latency_ms=latency_ms,
+            success=bool(flags & FLAG_SUCCESS),
+            error=error,
+            timeout=bool(flags & FLAG_TIMEOUT),
+            connection_reused=bool(flags & FLAG_REUSED),
+            phases=phases,
+            method=api.method.upper(),
+            fingerprint=request_fingerprint(api),
+            stale=bool(flags & FLAG_STALE),
+            circuit_open=bool(flags & FLAG_CIRCUIT_OPEN),
+            checked_at=checked_at or None,
+            bytes_read=bytes_read if bytes_read >= 0 else None
+        )
+
+
+def shard_of(api_config: APIConfig, shards: int) -> int:
+    """
+    Returns worker an API is assigned to (rendezvous hashing).
+
+    The key is the request (method, URL, headers), so duplicate probes land
+    on the same worker and are still deduplicated there. When the number of
+    workers changes, only the APIs of added or removed workers move.
+
+    Args:
+        api_config: API configuration
+        shards: Number of workers
+
+    Returns:
+        Worker index (0 to shards - 1)
+    """
+    key = f"{api_config.method.upper()} {api_config.url} {request_fingerprint(api_config)}".encode('utf-8')
+    return max(range(shards), key=lambda shard: hashlib.blake2b(key, digest_size=8,
+                                                                 salt=shard.to_bytes(8, 'little')).digest())
+
+
+def _worker_main(conn: Connection, phases: bool, concurrency: Optional[Dict[str, Any]],
+                 circuit_breaker: Optional[Dict[str, Any]] = None, hedging: Optional[Dict[str, Any]] = None,
+                 connection_pool: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Worker process: checks every batch it receives, streaming results back.
+
+    Args:
+        conn: Pipe to the parent
+        phases: Record per-phase latency breakdown
+        concurrency: Concurrency settings (see Config.concurrency)
+        circuit_breaker: Circuit breaker settings (see Config.circuit_breaker)
+        hedging: Hedged request settings (see Config.hedging)
+        connection_pool: Keep-alive settings (see Config.connection_pool)
+    """
+    from .checker import check_all_apis
+    from .circuit import create_circuit_breakers_from_config
+    from .dispatch import create_host_limits_from_config
+    from .hedging import create_hedger_from_config
+    from .sessions import create_session_registry_from_config
+
+    # Ctrl+C reaches the whole process group; the parent shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    host_limits = create_host_limits_from_config(concurrency)
+    # Workers keep checking the same endpoints (shard_of), so breaker state stays with them
+    breakers = create_circuit_breakers_from_config(circuit_breaker)
+    hedger = create_hedger_from_config(hedging)
+    # Same endpoints every sweep, so their connections are kept alive between batches
+    sessions = create_session_registry_from_config(connection_pool)
+
+    try:
+        while True:
+            try:
+                apis = conn.recv()
+            except (EOFError, OSError):
+                break
+            if apis is None:
+                break
+
+            # Results only carry the name, so APIs are named by batch index
+            batch = [replace(api, name=str(index)) for index, api in enumerate(apis)]
+            try:
+                check_all_apis(batch, use_async=True, sessions=sessions, phases=phases, host_limits=host_limits,
+                               breakers=breakers, hedger=hedger,
+                               on_result=lambda result: conn.send_bytes(encode_result(int(result.name), result)))
+                conn.send_bytes(FRAME_HEADER.pack(END_OF_SWEEP, -1, 0.0, 0.0, -1, 0))
+            except (EOFError, OSError):
+                break
+            sessions.evict_idle()
+    finally:
+        sessions.close()
+
+
+class WorkerPool:
+    """
+    Worker processes each running its own probe engine.
+
+    Each sweep is split by shard_of, so a worker keeps checking the same
+    endpoints. Workers stream results back as binary frames while the
+    sweep runs; the merged stream is returned in input order. A worker that
+    dies, or sends nothing for longer than the longest timeout of its batch
+    plus WORKER_DEADLINE_MARGIN, is restarted on the next sweep, its
+    unfinished APIs are reported as failed.
+    """
+
+    def __init__(self, processes: int, phases: bool = False, concurrency: Optional[Dict[str, Any]] = None,
+                 circuit_breaker: Optional[Dict[str, Any]] = None, hedging: Optional[Dict[str, Any]] = None,
+                 connection_pool: Optional[Dict[str, Any]] = None):
+        """
+        Initializes pool (workers are started on first sweep).
+
+        Args:
+            processes: Number of worker processes
+            phases: Record per-phase latency breakdown
+            concurrency: Concurrency settings applied by every worker (see Config.concurrency)
+            circuit_breaker: Circuit breaker settings of every worker (see Config.circuit_breaker)
+            hedging: Hedged request settings of every worker (see Config.hedging)
+            connection_pool: Keep-alive settings of every worker (see Config.connection_pool)
+        """
+        if processes < 1:
+            raise ValueError("Number of worker processes must be a positive number")
+
+        self.processes = processes
+        self.phases = phases
+        self.concurrency = concurrency
+        self.circuit_breaker = circuit_breaker
+        self.hedging = hedging
+        self.connection_pool = connection_pool
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: List[Optional[Tuple[Any, Connection]]] = [None] * processes
+        self._lock = threading.Lock()  # One sweep at a time
+
+    def _connection(self, shard: int) -> Connection:
+        """Returns pipe to worker, starting it if needed."""
+        worker = self._workers[shard]
+        if worker is not None and worker[0].is_alive():
+            return worker[1]
+        if worker is not None:
+            worker[1].close()
+
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn, self.phases, self.concurrency,
+                                                                     self.circuit_breaker, self.hedging,
+                                                                     self.connection_pool),
+                                        name=f"api-monitor-worker-{shard}", daemon=True)
+        process.start()
+        child_conn.close()
+        self._workers[shard] = (process, parent_conn)
+        return parent_conn
+
+    def _discard(self, shard: int) -> None:
+        """Stops worker after a failure."""
+        process, conn = self._workers[shard]
+        self._workers[shard] = None
+        conn.close()
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()  # Stopped or stuck processes may not act on SIGTERM
+            process.join(timeout=1)
+
+    def check_all(self, api_configs: List[APIConfig],
+                  on_result: Optional[Callable[[CheckResult], None]] = None) -> List[CheckResult]:
+        """
+        Checks APIs on the workers.
+
+        Args:
+            api_configs: List of API configurations
+            on_result: Called with each result as soon as it arrives
+
+        Returns:
+            List of check results in the same order as api_configs
+        """
+        results: List[Optional[CheckResult]] = [None] * len(api_configs)
+        shards: List[List[int]] = [[] for _ in range(self.processes)]
+        for index, api_config in enumerate(api_configs):
+            shards[shard_of(api_config, self.processes)].append(index)
+
+        with self._lock:
+            pending: Dict[Connection, Tuple[int, List[APIConfig], List[int], float]] = {}
+            deadlines: Dict[Connection, float] = {}
+            for shard, indices in enumerate(shards):
+                if not indices:
+                    continue
+                batch = [api_configs[index] for index in indices]
+                conn = self._connection(shard)
+                try:
+                    conn.send(batch)
+                except OSError:
+                    self._discard(shard)
+                    continue
+                # Every probe of the batch ends within its timeout, so a worker silent for longer is hung
+                patience = max(api.timeout for api in batch) + WORKER_DEADLINE_MARGIN
+                pending[conn] = (shard, batch, indices, patience)
+                deadlines[conn] = time.monotonic() + patience
+
+            while pending:
+                now = time.monotonic()
+                for conn in [conn for conn in pending if deadlines[conn] <= now]:
+                    # Its unfinished APIs are reported like those of a worker that exited
+                    self._discard(pending.pop(conn)[0])
+                    del deadlines[conn]
+                if not pending:
+                    break
+                for conn in wait(list(pending), timeout=min(deadlines.values()) - now):
+                    shard, batch, indices, patience = pending[conn]
+                    try:
+                        data = conn.recv_bytes()
+                    except (EOFError, OSError):
+                        del pending[conn]
+                        del deadlines[conn]
+                        self._discard(shard)
+                        continue
+                    deadlines[conn] = time.monotonic() + patience
+                    for position, result in decode_results(data, batch):
+                        if position == END_OF_SWEEP:
+                            del pending[conn]
+                            del deadlines[conn]
+                            break
+                        results[indices[position]] = result
+                        if on_result:
+                            on_result(result)
+
+        for index, result in enumerate(results):
+            if result is None:
+                api_config = api_configs[index]
+                results[index] = CheckResult(
+                    name=api_config.name,
+                    url=api_config.url,
+                    status_code=None,
+                    latency_ms=0.0,
+                    success=False,
+                    error="Error during check: worker process exited",
+                    method=api_config.method.upper(),
+                    fingerprint=request_fingerprint(api_config)
+                )
+                if on_result:
+                    on_result(results[index])
+        return results
+
+    def close(self) -> None:
+        """Stops all workers."""
+        with self._lock:
+            for shard, worker in enumerate(self._workers):
+                if worker is None:
+                    continue
+                process, conn = worker
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                process.join(timeout=2)
+                if process.is_alive():
+                    process.terminate()
+                conn.close()
+                self._workers[shard] = None
+
+
+def create_worker_pool(processes: Optional[int], config: Config) -> Optional[WorkerPool]:
+    """
+    Creates worker pool for sharded sweeps.
+
+    Args:
+        processes: Number of worker processes (None or 1: check in this process)
+        config: Monitoring configuration
+
+    Returns:
+        WorkerPool or None
+    """
+    if not processes or processes <= 1:
+        return None
+    return WorkerPool(processes, phases=config.phase_timing, concurrency=config.concurrency,
+                      circuit_breaker=config.circuit_breaker, hedging=config.hedging,
+                      connection_pool=config.connection_pool)
@@ -0,0 +1,78 @@
+"""
+Benchmark: results per second an aggregator ingests over loopback.
+
+Starts an aggregator in this process and `--agents` threads posting
+pre-encoded batches of `--results` records each, as agents would after
+every sweep. Every agent reports the same checks from its own location, so
+each batch also recomputes the consensus and pushes it to dashboards.
+
+Usage:
+    python benchmarks/bench_aggregator.py
+    python benchmarks/bench_aggregator.py --agents 8 --results 2000 --batches 20
+"""
+
+import argparse
+import http.client
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.agent import ResultBatch, encode_batch  # noqa: E402
+from api_monitor.aggregator import AggregatorServer  # noqa: E402
+from api_monitor.checker import CheckResult  # noqa: E402
+from api_monitor.web_server import MonitoringHandler, PooledHTTPServer  # noqa: E402
+
+
+def run_agent(port: int, body: bytes, batches: int, statuses: list) -> None:
+    """Posts the same batch repeatedly over one keep-alive connection."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    for _ in range(batches):
+        conn.request('POST', '/api/ingest', body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        statuses.append(response.status)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', type=int, default=4, help='Concurrent agents (locations)')
+    parser.add_argument('--results', type=int, default=1000, help='Results per batch')
+    parser.add_argument('--batches', type=int, default=10, help='Batches per agent')
+    args = parser.parse_args()
+
+    aggregator = AggregatorServer(port=0, interval=60)
+    httpd = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=max(4, args.agents))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+
+    bodies = []
+    for agent in range(args.agents):
+        results = [CheckResult(f"API {i}", f"https://api.example.com/item/{i}", 200, 10.0 + agent, True)
+                   for i in range(args.results)]
+        bodies.append(encode_batch(ResultBatch(f"location-{agent}", results, interval=60)))
+
+    statuses = []
+    threads = [threading.Thread(target=run_agent, args=(port, body, args.batches, statuses)) for body in bodies]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    httpd.shutdown()
+    aggregator.cache.close()
+    total = args.agents * args.batches * args.results
+    print(f"{args.agents} agents x {args.batches} batches x {args.results} results "
+          f"({len(bodies[0]) / 1024:.1f} KiB per batch)")
+    print(f"  {total} results in {elapsed:.2f} s: {total / elapsed:,.0f} results/s, "
+          f"{statuses.count(202)}/{len(statuses)} batches accepted")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: asyncio check engine vs the old thread-pool sweep.
+
+Starts a local stub server that answers every request after a fixed delay,
+then runs one sweep per engine in a fresh subprocess and reports wall time
+and peak RSS.
+
+Usage:
+    python benchmarks/bench_async_checker.py
+    python benchmarks/bench_async_checker.py --apis 2000 --delay 0.05 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def peak_rss_mb() -> float:
+    """Returns peak resident set size of this process in MB (Unix only)."""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_stub_server(port: int, delay: float, ready) -> None:
+    """Minimal asyncio HTTP server answering 200 after `delay` seconds."""
+
+    async def handle(reader, writer):
+        try:
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            await asyncio.sleep(delay)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, '127.0.0.1', port, backlog=8192)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def sweep(engine: str, base_url: str, apis: int, concurrency: int) -> dict:
+    """Runs one sweep with the given engine and returns measurements."""
+    import concurrent.futures
+    from api_monitor.checker import check_api, check_all_apis
+    from api_monitor.loader import APIConfig
+
+    configs = [APIConfig(f"API {i}", f"{base_url}/item/{i}", timeout=30.0) for i in range(apis)]
+
+    start = time.perf_counter()
+    if engine == 'threads':
+        # Thread-pool path as it was before the asyncio engine
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(10, len(configs))) as executor:
+            results = list(executor.map(check_api, configs))
+    else:
+        results = check_all_apis(configs, use_async=True, max_concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'engine': engine,
+        'seconds': round(elapsed, 3),
+        'ok': sum(1 for r in results if r.success),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apis', type=int, default=2000, help='Number of endpoints per sweep')
+    parser.add_argument('--delay', type=float, default=0.05, help='Stub server response delay (seconds)')
+    parser.add_argument('--concurrency', type=int, default=500, help='Asyncio engine concurrency limit')
+    parser.add_argument('--engine', choices=['threads', 'asyncio'], help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        # Child process: run a single sweep
+        print(json.dumps(sweep(args.engine, args.base_url, args.apis, args.concurrency)))
+        return
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=run_stub_server, args=(port, args.delay, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+
+    print(f"{args.apis} endpoints, {args.delay * 1000:.0f} ms server delay, asyncio concurrency {args.concurrency}")
+    print(f"{'engine':<10}{'wall (s)':>10}{'ok':>8}{'peak RSS (MB)':>16}")
+    try:
+        for engine in ('threads', 'asyncio'):
+            output = subprocess.check_output([
+                sys.executable, __file__,
+                '--engine', engine,
+                '--base-url', f"http://127.0.0.1:{port}",
+                '--apis', str(args.apis),
+                '--concurrency', str(args.concurrency),
+            ])
+            row = json.loads(output.decode().strip().splitlines()[-1])
+            print(f"{row['engine']:<10}{row['seconds']:>10}{row['ok']:>8}{row['peak_rss_mb']:>16}")
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Microbenchmark: ResultCache operations at 100k entries.
+
+Measures per-operation cost of get (hit and miss), set (with LRU eviction
+once full), cleanup_expired with nothing and with everything expired, and
+stats().
+
+Usage:
+    python benchmarks/bench_cache.py
+    python benchmarks/bench_cache.py --entries 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.cache import ResultCache  # noqa: E402
+from api_monitor.checker import CheckResult  # noqa: E402
+
+
+def per_op(seconds: float, count: int) -> str:
+    return f"{seconds / count * 1e9:8.0f} ns/op"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100_000, help='Cache entries')
+    args = parser.parse_args()
+    n = args.entries
+
+    results = [CheckResult(f"API {i}", f"https://api{i}.example.com", 200, 100.0, True) for i in range(n)]
+    cache = ResultCache(default_ttl=3600.0, max_size=n)
+
+    began = time.perf_counter()
+    for result in results:
+        cache.set(result)
+    print(f"set (fill):             {per_op(time.perf_counter() - began, n)}")
+
+    began = time.perf_counter()
+    for result in results:
+        cache.get(result.name, result.url)
+    print(f"get (hit):              {per_op(time.perf_counter() - began, n)}")
+
+    began = time.perf_counter()
+    for result in results:
+        cache.get(result.name, result.url, "POST")
+    print(f"get (miss):             {per_op(time.perf_counter() - began, n)}")
+
+    extra = [CheckResult(f"New {i}", "https://new.example.com", 200, 100.0, True) for i in range(n)]
+    began = time.perf_counter()
+    for result in extra:
+        cache.set(result)
+    print(f"set (evicting LRU):     {per_op(time.perf_counter() - began, n)}")
+
+    rounds = 1000
+    began = time.perf_counter()
+    for _ in range(rounds):
+        cache.cleanup_expired()
+    print(f"cleanup (none expired): {(time.perf_counter() - began) / rounds * 1e6:8.2f} us/call")
+
+    began = time.perf_counter()
+    for _ in range(rounds):
+        cache.stats()
+    print(f"stats:                  {(time.perf_counter() - began) / rounds * 1e6:8.2f} us/call")
+
+    expiring = ResultCache(default_ttl=0.0, max_size=n)
+    for result in results:
+        expiring.set(result)
+    time.sleep(0.01)
+    began = time.perf_counter()
+    removed = expiring.cleanup_expired()
+    print(f"cleanup (all expired):  {per_op(time.perf_counter() - began, removed)} ({removed:,} removed)")
+    print(f"counters: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: dashboard polling vs Server-Sent Events.
+
+Simulates `--tabs` open dashboards over `--sweeps` monitoring sweeps of
+`--apis` endpoints where `--change-rate` of results change per sweep, and
+compares the bytes and encoding CPU the server spends on
+  1. polling: every tab downloads /api/data every 5 seconds,
+  2. SSE: each sweep is diffed and encoded once, every tab receives it.
+
+Usage:
+    python benchmarks/bench_events.py
+    python benchmarks/bench_events.py --tabs 50 --apis 200 --interval 60 --change-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.events import EventBroker  # noqa: E402
+
+POLL_INTERVAL = 5.0  # Dashboard polling period (seconds)
+
+
+def make_result(name: str, success: bool, latency: float):
+    return {'name': name, 'url': f"https://{name}.example.com/health", 'status_code': 200 if success else 503,
+            'latency_ms': latency, 'success': success, 'error': None if success else "HTTP 503",
+            'timeout': False, 'connection_reused': True, 'phases': None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tabs', type=int, default=50, help='Open dashboards')
+    parser.add_argument('--apis', type=int, default=100, help='Monitored endpoints')
+    parser.add_argument('--sweeps', type=int, default=10, help='Monitoring sweeps to simulate')
+    parser.add_argument('--interval', type=float, default=60, help='Seconds between sweeps')
+    parser.add_argument('--change-rate', type=float, default=0.05, help='Fraction of results changing per sweep')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    names = [f"api-{i}" for i in range(args.apis)]
+    state = {name: (True, rng.uniform(50, 300)) for name in names}
+    stats = {'total_checks': 0, 'successful_checks': 0, 'failed_checks': 0, 'last_check': None}
+    polls_per_sweep = int(args.interval / POLL_INTERVAL)
+
+    broker = EventBroker()
+    poll_bytes = sse_bytes = 0
+    poll_cpu = sse_cpu = 0.0
+    for sweep in range(args.sweeps):
+        for name in rng.sample(names, int(args.apis * args.change_rate)):
+            success, latency = state[name]
+            state[name] = (not success, latency * rng.uniform(0.5, 2.0))
+        # Unchanged endpoints still jitter a little
+        results = [make_result(name, success, latency * rng.uniform(0.97, 1.03))
+                   for name, (success, latency) in state.items()]
+        stats['total_checks'] += 1
+        timestamp = f"2026-01-01T00:{sweep:02d}:00"
+
+        began = time.perf_counter()
+        for _ in range(polls_per_sweep * args.tabs):
+            body = json.dumps({'results': results, 'stats': stats, 'timestamp': timestamp},
+                              ensure_ascii=False, indent=2).encode('utf-8')
+            poll_bytes += len(body)
+        poll_cpu += time.perf_counter() - began
+
+        began = time.perf_counter()
+        seq = broker.publish(results, stats, timestamp)
+        _, frames = broker.next_frames(seq - 1, timeout=0)
+        sse_bytes += sum(len(frame) for frame in frames) * args.tabs
+        sse_cpu += time.perf_counter() - began
+
+    print(f"{args.tabs} tabs, {args.apis} APIs, {args.sweeps} sweeps every {args.interval:.0f} s, "
+          f"{args.change_rate:.0%} changing per sweep")
+    print(f"  polling: {poll_bytes / 1e6:9.2f} MB sent, {poll_cpu * 1000:8.1f} ms encoding")
+    print(f"  SSE:     {sse_bytes / 1e6:9.2f} MB sent, {sse_cpu * 1000:8.1f} ms encoding "
+          f"({poll_bytes / max(sse_bytes, 1):.0f}x fewer bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: hedged requests against a server with tail latency.
+
+Starts a loopback HTTP server that answers after `--base-ms`, but holds a
+`--tail-rate` share of requests for `--tail-ms` instead. The same number of
+probes is sent one after another on the asyncio engine, once plain and
+once with hedging, and latency percentiles, hedge rate and latency saved
+are compared.
+
+Usage:
+    python benchmarks/bench_hedging.py
+    python benchmarks/bench_hedging.py --probes 2000 --tail-rate 0.02 --budget 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.async_checker import AsyncChecker  # noqa: E402
+from api_monitor.hedging import Hedger  # noqa: E402
+from api_monitor.loader import APIConfig  # noqa: E402
+from api_monitor.sketch import DDSketch  # noqa: E402
+
+
+class TailHandler(BaseHTTPRequestHandler):
+    """Answers 200 after the base delay, or after the tail delay for some requests."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            slow = server.rng.random() < server.tail_rate
+        time.sleep((server.tail_ms if slow else server.base_ms) / 1000)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TailServer(ThreadingHTTPServer):
+    """Threaded server; slow requests do not hold up the others."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+async def probe_all(checker, api, probes, hedged):
+    """Probes the API one request after another; returns latencies in ms."""
+    latencies = []
+    for _ in range(probes):
+        if hedged:
+            result = await checker.check_api_hedged(api)
+        else:
+            result = await checker.check_api(api)
+        latencies.append(result.latency_ms)
+    await asyncio.sleep(0.5)  # Let abandoned requests finish so savings are measured
+    return latencies
+
+
+def summary(latencies):
+    """Returns p50, p95 and p99 of latencies."""
+    sketch = DDSketch(0.01)
+    for latency in latencies:
+        sketch.add(latency)
+    return {q: sketch.quantile(q) for q in (0.5, 0.95, 0.99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--probes', type=int, default=1000, help='Probes per run')
+    parser.add_argument('--base-ms', type=float, default=5.0, help='Usual server latency')
+    parser.add_argument('--tail-ms', type=float, default=250.0, help='Latency of slow requests')
+    parser.add_argument('--tail-rate', type=float, default=0.03, help='Share of slow requests')
+    parser.add_argument('--percentile', type=float, default=0.95, help='Hedge after this latency percentile')
+    parser.add_argument('--budget', type=float, default=0.05, help='Hedges allowed per probe')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = TailServer(('127.0.0.1', 0), TailHandler)
+    server.lock = threading.Lock()
+    server.rng = random.Random(args.seed)
+    server.base_ms, server.tail_ms, server.tail_rate = args.base_ms, args.tail_ms, args.tail_rate
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api = APIConfig("Tail", f"http://127.0.0.1:{server.server_address[1]}/", timeout=5)
+
+    print(f"{args.probes} probes, {args.base_ms} ms usual, {args.tail_rate:.0%} at {args.tail_ms} ms")
+    for hedged in (False, True):
+        hedger = Hedger(percentile=args.percentile, budget=args.budget)
+        checker = AsyncChecker(hedger=hedger)
+        latencies = asyncio.run(probe_all(checker, api, args.probes, hedged))
+        quantiles = summary(latencies)
+        line = (f"{'hedged' if hedged else 'plain':7} p50 {quantiles[0.5]:7.1f} ms   p95 {quantiles[0.95]:7.1f} ms   "
+                f"p99 {quantiles[0.99]:7.1f} ms")
+        if hedged:
+            stats = hedger.stats()
+            line += (f"   hedge rate {stats['hedge_rate']:.1%}   wins {stats['wins']}   "
+                     f"saved {stats['saved_ms_per_win']:.1f} ms/win")
+        print(line)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: HistoryStore write throughput and range-query latency.
+
+Fills a store with `--apis` endpoints checked every `--interval` seconds
+for `--days` days (one batched transaction per sweep), then times range
+queries for a single API. Rows are clustered by (api, timestamp), so query
+time depends on the rows returned, not on the number of endpoints.
+
+Usage:
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --apis 1000 --days 30 --interval 30   # full target size
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.checker import CheckResult  # noqa: E402
+from api_monitor.history import HistoryStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apis', type=int, default=1000, help='Number of endpoints')
+    parser.add_argument('--days', type=float, default=2, help='Days of history to generate')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between sweeps')
+    parser.add_argument('--path', help='Database file (default: temporary file)')
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), 'history.db')
+    store = HistoryStore(path, retention_days=0)
+    rng = random.Random(1)
+
+    sweeps = int(args.days * 86400 / args.interval)
+    end = time.time()
+    start = end - sweeps * args.interval
+    names = [f"API {i}" for i in range(args.apis)]
+
+    began = time.perf_counter()
+    for sweep in range(sweeps):
+        results = [CheckResult(name, "https://example.com", 200, rng.uniform(20, 500), True) for name in names]
+        store.record(results, timestamp=start + sweep * args.interval)
+    write_seconds = time.perf_counter() - began
+    rows = sweeps * args.apis
+    print(f"Wrote {rows:,} results ({sweeps:,} sweeps) in {write_seconds:.1f} s "
+          f"({rows / write_seconds:,.0f} rows/s), file {os.path.getsize(path) / 1e6:.0f} MB")
+
+    for label, span in (('1 hour', 3600), ('1 day', 86400), ('full range', end - start)):
+        timings = []
+        for _ in range(20):
+            name = rng.choice(names)
+            began = time.perf_counter()
+            returned = store.query(name, end - span, end)
+            timings.append(time.perf_counter() - began)
+        timings.sort()
+        print(f"Query {label:<11} {len(returned):>7,} rows  median {timings[len(timings) // 2] * 1000:7.2f} ms")
+
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
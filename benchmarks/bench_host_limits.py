@@ -0,0 +1,126 @@
+"""
+Benchmark: sweep time with one global pool vs per-host limits.
+
+Starts stub servers on several loopback addresses (127.0.0.2, 127.0.0.3, ...;
+Linux routes the whole 127/8 block to loopback). The first one plays an
+internal gateway that `--gateway-share` of the endpoints sit behind: it
+serves `--capacity` requests at a time at full speed, and its latency grows
+quadratically once more connections than that are open. The others answer
+after `--delay` seconds regardless of load.
+
+The same sweep runs twice with the global cap `--concurrency`:
+  1. global: only the global cap, so the gateway may hold every slot,
+  2. per-host: at most `--per-host` probes per host.
+Both runs serve hosts round-robin, so other hosts are not stuck behind the
+gateway's queue; the per-host cap keeps the gateway out of overload.
+
+Usage:
+    python benchmarks/bench_host_limits.py
+    python benchmarks/bench_host_limits.py --apis 300 --gateway-share 0.9 --concurrency 10 --per-host 2
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.checker import check_all_apis  # noqa: E402
+from api_monitor.dispatch import HostLimits, HostPolicy  # noqa: E402
+from api_monitor.loader import APIConfig  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_stub_servers(hosts: list, port: int, delay: float, capacity: int, ready) -> None:
+    """Serves every host; the first one slows down when overloaded."""
+    in_flight = {host: 0 for host in hosts}
+
+    def handler(host: str, overloaded: bool):
+        async def handle(reader, writer):
+            in_flight[host] += 1
+            try:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                load = max(1.0, in_flight[host] / capacity) if overloaded else 1.0
+                await asyncio.sleep(delay * load ** 2)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+                await writer.drain()
+            finally:
+                in_flight[host] -= 1
+                writer.close()
+        return handle
+
+    async def main():
+        servers = [await asyncio.start_server(handler(host, i == 0), host, port, backlog=4096)
+                   for i, host in enumerate(hosts)]
+        ready.set()
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+
+    asyncio.run(main())
+
+
+def sweep(apis: list, concurrency: int, limits: HostLimits, gateway: str) -> dict:
+    """Runs one sweep; returns total time and time until all non-gateway results were in."""
+    began = time.perf_counter()
+    finished = {}
+    results = check_all_apis(apis, use_async=True, max_concurrency=concurrency, host_limits=limits,
+                             on_result=lambda r: finished.__setitem__(r.name, time.perf_counter() - began))
+    elapsed = time.perf_counter() - began
+    others = [finished[api.name] for api in apis if gateway not in api.url]
+    return {
+        'seconds': elapsed,
+        'others_done': max(others) if others else 0.0,
+        'ok': sum(1 for r in results if r.success)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apis', type=int, default=200, help='Endpoints checked per sweep')
+    parser.add_argument('--hosts', type=int, default=5, help='Hosts (the first one is the gateway)')
+    parser.add_argument('--gateway-share', type=float, default=0.8, help='Fraction of endpoints behind the gateway')
+    parser.add_argument('--delay', type=float, default=0.02, help='Response delay (seconds)')
+    parser.add_argument('--capacity', type=int, default=2, help='Requests the gateway serves at full speed')
+    parser.add_argument('--concurrency', type=int, default=10, help='Global cap')
+    parser.add_argument('--per-host', type=int, default=2, help='Per-host cap')
+    args = parser.parse_args()
+
+    hosts = [f"127.0.0.{i + 2}" for i in range(args.hosts)]
+    port = free_port()
+    ready = multiprocessing.Event()
+    stub = multiprocessing.Process(target=run_stub_servers,
+                                   args=(hosts, port, args.delay, args.capacity, ready), daemon=True)
+    stub.start()
+    ready.wait(10)
+
+    # Gateway endpoints come first, as they would in a config grouped by team
+    behind_gateway = int(args.apis * args.gateway_share)
+    apis = [APIConfig(f"API {i}", f"http://{hosts[0]}:{port}/item/{i}", timeout=60.0) for i in range(behind_gateway)]
+    apis += [APIConfig(f"API {i}", f"http://{hosts[1 + i % (args.hosts - 1)]}:{port}/item/{i}", timeout=60.0)
+             for i in range(behind_gateway, args.apis)]
+
+    print(f"{args.apis} APIs, {behind_gateway} behind the gateway, {args.hosts} hosts, "
+          f"global cap {args.concurrency}")
+    policies = [
+        ('global', HostLimits()),
+        (f"per-host {args.per_host}", HostLimits(default=HostPolicy(max_in_flight=args.per_host)))
+    ]
+    for label, limits in policies:
+        outcome = sweep(apis, args.concurrency, limits, hosts[0])
+        print(f"  {label:<12} sweep {outcome['seconds']:6.2f} s, other hosts done after "
+              f"{outcome['others_done']:6.2f} s, {outcome['ok']}/{args.apis} ok")
+
+    stub.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: cost of /metrics scrapes with many APIs.
+
+Feeds one sweep of `--apis` results into a MetricsRegistry and measures:
+  - recording the sweep (done by the monitoring loop, not the scrape),
+  - a scrape right after an update (joins prerendered samples),
+  - repeated scrapes until the next update (served from the rendered body),
+  - the gzip copy Prometheus asks for.
+
+Usage:
+    python benchmarks/bench_metrics.py
+    python benchmarks/bench_metrics.py --apis 20000 --scrapes 10000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.checker import CheckResult  # noqa: E402
+from api_monitor.metrics import MetricsRegistry  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apis', type=int, default=5000, help='Monitored APIs')
+    parser.add_argument('--scrapes', type=int, default=1000, help='Scrapes between updates')
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    results = [CheckResult(f"API {i}", f"https://api.example.com/item/{i}", 200, 10.0 + i % 500, i % 50 != 0)
+               for i in range(args.apis)]
+
+    began = time.perf_counter()
+    registry.observe_all(results)
+    record_ms = (time.perf_counter() - began) * 1000
+
+    began = time.perf_counter()
+    body = registry.render()
+    rebuild_ms = (time.perf_counter() - began) * 1000
+
+    began = time.perf_counter()
+    for _ in range(args.scrapes):
+        registry.render()
+    cached_us = (time.perf_counter() - began) / args.scrapes * 1e6
+
+    began = time.perf_counter()
+    compressed = registry.render('gzip')
+    gzip_ms = (time.perf_counter() - began) * 1000
+
+    print(f"{args.apis} APIs, body {len(body) / 1e6:.1f} MB ({len(compressed) / 1e6:.2f} MB gzip)")
+    print(f"  record sweep          {record_ms:8.2f} ms")
+    print(f"  scrape after update   {rebuild_ms:8.2f} ms")
+    print(f"  scrape (unchanged)    {cached_us:8.2f} us")
+    print(f"  gzip after update     {gzip_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Microbenchmark: cost of per-phase latency timing.
+
+Measures
+  1. bookkeeping cost of one instrumented probe (timestamps + PhaseTimings),
+  2. per-probe wall time of loopback sweeps with phase timing off and on.
+
+Usage:
+    python benchmarks/bench_phase_timing.py
+    python benchmarks/bench_phase_timing.py --probes 1000 --rounds 5
+"""
+
+import argparse
+import multiprocessing
+import socket
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_async_checker import run_stub_server  # noqa: E402
+from api_monitor.async_checker import AsyncChecker, _round_timings  # noqa: E402
+from api_monitor.checker import PhaseTimings  # noqa: E402
+from api_monitor.loader import APIConfig  # noqa: E402
+
+
+def bookkeeping() -> None:
+    """Everything phase mode adds to a probe, without the network."""
+    timings = PhaseTimings()
+    t0 = time.perf_counter()
+    t1 = time.perf_counter()
+    timings.dns_ms += (t1 - t0) * 1000
+    t2 = time.perf_counter()
+    timings.connect_ms += (t2 - t1) * 1000
+    t3 = time.perf_counter()
+    timings.ttfb_ms += (t3 - t2) * 1000
+    timings.body_ms += (time.perf_counter() - t3) * 1000
+    _round_timings(timings)
+
+
+def sweep_seconds(checker: AsyncChecker, configs) -> float:
+    start = time.perf_counter()
+    checker.run(configs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--probes', type=int, default=500, help='Probes per sweep')
+    parser.add_argument('--rounds', type=int, default=5, help='Sweeps per mode (best is reported)')
+    parser.add_argument('--concurrency', type=int, default=50, help='Engine concurrency limit')
+    args = parser.parse_args()
+
+    iterations = 200_000
+    seconds = min(timeit.repeat(bookkeeping, number=iterations, repeat=3))
+    print(f"Phase bookkeeping: {seconds / iterations * 1e6:.2f} us per probe")
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=run_stub_server, args=(port, 0.0, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+
+    configs = [APIConfig(f"API {i}", f"http://127.0.0.1:{port}/item/{i}") for i in range(args.probes)]
+    try:
+        plain = AsyncChecker(concurrency=args.concurrency)
+        instrumented = AsyncChecker(concurrency=args.concurrency, phases=True)
+        sweep_seconds(plain, configs)  # Warm up
+        best_plain = min(sweep_seconds(plain, configs) for _ in range(args.rounds))
+        best_phases = min(sweep_seconds(instrumented, configs) for _ in range(args.rounds))
+    finally:
+        server.terminate()
+
+    per_plain = best_plain / args.probes * 1e6
+    per_phases = best_phases / args.probes * 1e6
+    print(f"Loopback sweep, {args.probes} probes, best of {args.rounds}:")
+    print(f"  phases off: {per_plain:8.1f} us per probe")
+    print(f"  phases on:  {per_phases:8.1f} us per probe ({per_phases - per_plain:+.1f} us)")
+
+
+if __name__ == '__main__':
+    main()
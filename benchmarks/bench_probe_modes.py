@@ -0,0 +1,130 @@
+"""
+Benchmark: probe modes against a large response body.
+
+Starts a loopback HTTP server whose health page is `--size` bytes (it
+supports HEAD and Range requests) and probes it in every probe mode on
+both engines (requests and asyncio). Reports, per mode, the median
+latency, body bytes read by the probe and bytes the server managed to
+send before the probe closed the connection (the bandwidth used):
+  - full: whole body (behaviour before body budgets),
+  - budget: at most `--budget` bytes, then the connection is closed,
+  - range: GET with a Range header for `--budget` bytes,
+  - head: HEAD request, no body.
+
+Usage:
+    python benchmarks/bench_probe_modes.py
+    python benchmarks/bench_probe_modes.py --size 20000000 --budget 16384 --probes 20
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.async_checker import AsyncChecker  # noqa: E402
+from api_monitor.checker import check_api  # noqa: E402
+from api_monitor.loader import PROBE_MODES, APIConfig  # noqa: E402
+
+WRITE_CHUNK_SIZE = 64 * 1024
+
+
+class LargeBodyHandler(BaseHTTPRequestHandler):
+    """Serves one large body; counts bytes actually sent."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.active += 1
+        body = self.server.body
+        ranged = self.headers.get('Range', '')
+        if ranged.startswith('bytes=0-'):
+            end = min(int(ranged[len('bytes=0-'):]), len(body) - 1)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes 0-{end}/{len(body)}")
+            body = body[:end + 1]
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        sent = 0
+        if self.command == 'HEAD':
+            body = b''
+        try:
+            for start in range(0, len(body), WRITE_CHUNK_SIZE):
+                self.wfile.write(body[start:start + WRITE_CHUNK_SIZE])
+                sent += min(WRITE_CHUNK_SIZE, len(body) - start)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            with self.server.lock:
+                self.server.bytes_sent += sent
+                self.server.active -= 1
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LargeBodyServer(ThreadingHTTPServer):
+    """Threaded server with a byte counter."""
+
+    daemon_threads = True
+
+
+def measure(server, probe, api):
+    """Runs probe once; returns latency, bytes read and bytes sent by the server."""
+    with server.lock:
+        server.bytes_sent = 0
+    result = probe(api)
+    if not result.success:
+        raise RuntimeError(f"{api.probe} probe failed: {result.error or result.status_code}")
+    # The server finishes writing (or notices the closed connection) after the probe returns
+    while server.active:
+        time.sleep(0.001)
+    return result.latency_ms, result.bytes_read, server.bytes_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=5_000_000, help='Body size of the health page in bytes')
+    parser.add_argument('--budget', type=int, default=65536, help='Body budget of budget and range probes')
+    parser.add_argument('--probes', type=int, default=10, help='Probes per mode and engine')
+    args = parser.parse_args()
+
+    server = LargeBodyServer(('127.0.0.1', 0), LargeBodyHandler)
+    server.body = b'{"data": "' + b'x' * max(0, args.size - 12) + b'"}'
+    server.lock = threading.Lock()
+    server.bytes_sent = server.active = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/health.json"
+
+    engines = {
+        'requests': check_api,
+        'asyncio': lambda api: AsyncChecker().run([api])[0],
+    }
+    print(f"body {len(server.body)} bytes, budget {args.budget} bytes, {args.probes} probes per mode")
+    try:
+        for engine, probe in engines.items():
+            print(f"\n{engine}")
+            for mode in PROBE_MODES:
+                api = APIConfig(mode, url, timeout=30, probe=mode, body_budget=args.budget)
+                runs = [measure(server, probe, api) for _ in range(args.probes)]
+                latency = statistics.median(run[0] for run in runs)
+                read = statistics.median(run[1] for run in runs)
+                sent = statistics.median(run[2] for run in runs)
+                print(f"  {mode:6} latency {latency:8.2f} ms   read {read:10.0f} B   sent {sent:10.0f} B")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
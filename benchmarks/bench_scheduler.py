@@ -0,0 +1,56 @@
+"""
+Benchmark: DueQueue dispatch cost as the number of endpoints grows.
+
+Schedules N endpoints with random intervals (10 s - 10 min) and replays
+dispatches on a virtual clock. With a binary heap the cost per dispatch
+grows with log(N), not N.
+
+Usage:
+    python benchmarks/bench_scheduler.py
+    python benchmarks/bench_scheduler.py --sizes 1000 50000 --dispatches 500000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_monitor.loader import APIConfig  # noqa: E402
+from api_monitor.scheduler import DueQueue  # noqa: E402
+
+
+def run(size: int, dispatches: int, seed: int = 1):
+    rng = random.Random(seed)
+    queue = DueQueue(jitter=1.0, rng=rng)
+
+    start = time.perf_counter()
+    for i in range(size):
+        queue.add(APIConfig(f"API {i}", f"https://host{i % 100}.example.com/{i}"), rng.uniform(10, 600), now=0.0)
+    build_seconds = time.perf_counter() - start
+
+    done = 0
+    start = time.perf_counter()
+    while done < dispatches:
+        done += len(queue.pop_due(queue.next_due()))
+    dispatch_seconds = time.perf_counter() - start
+
+    return build_seconds, dispatch_seconds / done * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000], help='Endpoint counts')
+    parser.add_argument('--dispatches', type=int, default=200_000, help='Dispatches replayed per size')
+    args = parser.parse_args()
+
+    print(f"{'endpoints':>10}{'build (ms)':>12}{'us/dispatch':>14}")
+    for size in args.sizes:
+        build_seconds, per_dispatch = run(size, args.dispatches)
+        print(f"{size:>10}{build_seconds * 1000:>12.1f}{per_dispatch:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
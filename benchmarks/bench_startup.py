@@ -0,0 +1,90 @@
+"""
+Benchmark: CLI startup cost.
+
+Starts the CLI in fresh interpreters under `python -X importtime` and
+reports, per scenario, the median wall time, the total import time and the
+slowest modules (cumulative). Scenarios:
+  - help: `api-monitor --help`,
+  - run: `api-monitor run <config> --format json` against a loopback API,
+  - web: importing what `watch --web` needs (web server and scheduler).
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 20 --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    """Answers every request with 200."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def profile(command):
+    """Runs command under -X importtime; returns wall ms, import ms and {module: cumulative us}."""
+    began = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *command], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - began) * 1000
+    total_us = 0
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith('import time:') and 'self [us]' not in line:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            total_us += int(self_us)
+            cumulative[name.strip()] = int(cumulative_us)
+    return wall_ms, total_us / 1000, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='Interpreter starts per scenario')
+    parser.add_argument('--top', type=int, default=8, help='Slowest modules to list')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Path(tmp) / 'config.yaml'
+        config.write_text(f"apis:\n  - name: Local\n    url: http://127.0.0.1:{server.server_address[1]}/\n",
+                          encoding='utf-8')
+        scenarios = {
+            'help': ['-m', 'api_monitor.cli', '--help'],
+            'run': ['-m', 'api_monitor.cli', 'run', str(config), '--format', 'json'],
+            'web': ['-c', 'import api_monitor.cli, api_monitor.web_server, api_monitor.scheduler'],
+        }
+        profile(scenarios['help'])  # Warm up bytecode caches
+
+        for name, command in scenarios.items():
+            runs = [profile(command) for _ in range(args.repeat)]
+            wall_ms = statistics.median(run[0] for run in runs)
+            import_ms = statistics.median(run[1] for run in runs)
+            print(f"{name:5} wall {wall_ms:7.1f} ms   imports {import_ms:7.1f} ms   modules {len(runs[-1][2])}")
+            slowest = sorted(runs[-1][2].items(), key=lambda item: item[1], reverse=True)[:args.top]
+            for module, cumulative_us in slowest:
+                print(f"        {cumulative_us / 1000:7.1f} ms  {module}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: sweep time on one process vs sharded across worker processes.
+
+Starts `--stubs` stub server processes (so the servers are not the
+bottleneck) and checks `--apis` endpoints spread over them, first in this
+process, then on WorkerPools of increasing size. Worker start-up is
+excluded: each pool runs a warm-up sweep first.
+
+Usage:
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --apis 10000 --workers 1 2 4 8 --stubs 8
+"""
+
+import argparse
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_async_checker import run_stub_server  # noqa: E402
+from api_monitor.checker import check_all_apis  # noqa: E402
+from api_monitor.loader import APIConfig  # noqa: E402
+from api_monitor.workers import WorkerPool  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apis', type=int, default=5000, help='Endpoints checked per sweep')
+    parser.add_argument('--delay', type=float, default=0.01, help='Stub server response delay (seconds)')
+    parser.add_argument('--stubs', type=int, default=4, help='Stub server processes')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4], help='Pool sizes to measure')
+    parser.add_argument('--concurrency', type=int, default=200, help='Concurrency limit per engine')
+    args = parser.parse_args()
+
+    ports = []
+    stubs = []
+    for _ in range(args.stubs):
+        port = free_port()
+        ready = multiprocessing.Event()
+        stub = multiprocessing.Process(target=run_stub_server, args=(port, args.delay, ready), daemon=True)
+        stub.start()
+        ready.wait(10)
+        ports.append(port)
+        stubs.append(stub)
+
+    apis = [APIConfig(f"API {i}", f"http://127.0.0.1:{ports[i % len(ports)]}/item/{i}", timeout=60.0)
+            for i in range(args.apis)]
+    concurrency = {'max_in_flight': args.concurrency}
+
+    print(f"{args.apis} endpoints on {args.stubs} stub servers, {args.delay * 1000:.0f} ms delay, "
+          f"concurrency {args.concurrency} per engine")
+    try:
+        began = time.perf_counter()
+        results = check_all_apis(apis, use_async=True, max_concurrency=args.concurrency)
+        elapsed = time.perf_counter() - began
+        print(f"  in process  {elapsed:6.2f} s  {sum(r.success for r in results)}/{args.apis} ok")
+
+        for workers in args.workers:
+            pool = WorkerPool(workers, concurrency=concurrency)
+            try:
+                pool.check_all(apis[:workers * 10])  # Start workers
+                began = time.perf_counter()
+                results = check_all_apis(apis, pool=pool)
+                elapsed = time.perf_counter() - began
+            finally:
+                pool.close()
+            print(f"  {workers} workers   {elapsed:6.2f} s  {sum(r.success for r in results)}/{args.apis} ok")
+    finally:
+        for stub in stubs:
+            stub.terminate()
+
+
+if __name__ == '__main__':
+    main()
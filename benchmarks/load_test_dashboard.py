@@ -0,0 +1,143 @@
+"""
+Load test: dashboard /api/data throughput and latency during a sweep.
+
+Starts a loopback stub API (answering after `--delay` seconds) and the
+dashboard server with its monitoring worker. One client keeps requesting
+/api/refresh and following the job until it is done, so a sweep of
+`--apis` endpoints is always in progress. Meanwhile
+`--clients` keep-alive clients request /api/data for `--duration` seconds.
+The script reports requests per second and p50/p99 latency.
+
+`--server single` runs the same test against a plain single-threaded
+HTTPServer (the previous behaviour) for comparison.
+
+Usage:
+    python benchmarks/load_test_dashboard.py
+    python benchmarks/load_test_dashboard.py --server single
+    python benchmarks/load_test_dashboard.py --clients 50 --apis 100 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_async_checker import run_stub_server  # noqa: E402
+from api_monitor.loader import APIConfig, Config  # noqa: E402
+from api_monitor.web_server import MonitoringHandler, PooledHTTPServer, WebMonitoringServer  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def refresh_loop(port: int, stop: threading.Event, sweeps: list) -> None:
+    """Keeps a sweep running via /api/refresh, waiting for each job to finish."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    while not stop.is_set():
+        began = time.perf_counter()
+        conn.request('GET', '/api/refresh')
+        status_url = json.loads(conn.getresponse().read())['status_url']
+        while not stop.is_set():
+            conn.request('GET', status_url)
+            if json.loads(conn.getresponse().read())['status'] in ('done', 'failed'):
+                sweeps.append(time.perf_counter() - began)
+                break
+            time.sleep(0.05)
+    conn.close()
+
+
+def data_client(port: int, deadline: float, latencies: list, errors: list) -> None:
+    """Requests /api/data over one keep-alive connection until deadline."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        try:
+            conn.request('GET', '/api/data')
+            conn.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            continue
+        latencies.append(time.perf_counter() - began)
+    conn.close()
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('pooled', 'single'), default='pooled', help='Server implementation')
+    parser.add_argument('--clients', type=int, default=20, help='Concurrent /api/data clients')
+    parser.add_argument('--apis', type=int, default=50, help='Endpoints checked per sweep')
+    parser.add_argument('--delay', type=float, default=0.05, help='Stub API response delay (seconds)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Test duration (seconds)')
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    ready = multiprocessing.Event()
+    stub = multiprocessing.Process(target=run_stub_server, args=(stub_port, args.delay, ready), daemon=True)
+    stub.start()
+    ready.wait(10)
+
+    apis = [APIConfig(f"API {i}", f"http://127.0.0.1:{stub_port}/item/{i}", timeout=30.0) for i in range(args.apis)]
+    monitor = WebMonitoringServer(Config(apis=apis), interval=3600)
+    monitor.record_results([])
+    monitor.running = True
+    threading.Thread(target=monitor.monitor_loop, daemon=True).start()
+
+    if args.server == 'pooled':
+        server = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=monitor.workers)
+    else:
+        server = HTTPServer(('127.0.0.1', 0), MonitoringHandler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    sweeps, latencies, errors = [], [], []
+    threading.Thread(target=refresh_loop, args=(port, stop, sweeps), daemon=True).start()
+    time.sleep(0.2)  # Let the first sweep start
+
+    deadline = time.perf_counter() + args.duration
+    clients = [threading.Thread(target=data_client, args=(port, deadline, latencies, errors))
+               for _ in range(args.clients)]
+    began = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - began
+    stop.set()
+
+    monitor.running = False
+    monitor.refresh_jobs.close()
+    server.shutdown()
+    stub.terminate()
+
+    latencies.sort()
+    print(f"{args.server} server, {args.clients} clients, sweep of {args.apis} APIs in progress, {elapsed:.1f} s")
+    if not latencies:
+        print("  no /api/data request completed")
+        return
+    print(f"  /api/data: {len(latencies) / elapsed:,.0f} req/s, "
+          f"p50 {percentile(latencies, 0.50) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+          f"{len(errors)} errors")
+    if sweeps:
+        print(f"  sweeps completed: {len(sweeps)} (last {sweeps[-1]:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,128 @@
 
 import pytest
 import sys
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 
 # Add project root directory to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from api_monitor.clock import ManualClock  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Loopback HTTP handler for checker tests.
+
+    Routes:
+        /status/<code>    - responds with given status
+        /delay/<seconds>  - responds 200 after a delay
+        /redirect         - 302 to /status/200
+        /bytes/<n>        - 200 with n-byte body (206 for a Range header, 416 if n is 0)
+        /nohead           - 405 for HEAD, 200 otherwise
+        /chunked          - 200 with chunked body
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status: int, body: bytes = b'', headers: dict = None):
+        self.server.requests_seen.append((self.command, self.path, dict(self.headers)))
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _handle(self):
+        # Drain request body so keep-alive connections stay in sync
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        path = self.path.split('?', 1)[0]
+        parts = path.strip('/').split('/')
+
+        if parts[0] == 'status' and len(parts) == 2:
+            self._respond(int(parts[1]))
+        elif parts[0] == 'delay' and len(parts) == 2:
+            with self.server.lock:
+                self.server.in_flight += 1
+                self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            time.sleep(float(parts[1]))
+            with self.server.lock:
+                self.server.in_flight -= 1
+            self._respond(200, b'ok')
+        elif parts[0] == 'redirect':
+            self._respond(302, headers={'Location': '/status/200'})
+        elif parts[0] == 'bytes' and len(parts) == 2:
+            body = b'x' * int(parts[1])
+            ranged = self.headers.get('Range', '')
+            if ranged.startswith('bytes=0-'):
+                if not body:
+                    self._respond(416)
+                else:
+                    end = min(int(ranged[len('bytes=0-'):]), len(body) - 1)
+                    self._respond(206, body[:end + 1], {'Content-Range': f"bytes 0-{end}/{len(body)}"})
+            else:
+                self._respond(200, body)
+        elif parts[0] == 'nohead':
+            self._respond(405 if self.command == 'HEAD' else 200, b'ok')
+        elif parts[0] == 'chunked':
+            self.server.requests_seen.append((self.command, self.path, dict(self.headers)))
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in (b'hello', b' ', b'world'):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self._respond(404)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        """Disables HTTP request logging."""
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server with a listen backlog large enough for concurrency tests."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        """Ignores clients that hung up early (timeout tests)."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+@pytest.fixture
+def stub_server():
+    """Runs StubHandler on a free loopback port; yields base URL and server."""
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    server.requests_seen = []
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield base_url, server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def clock():
+    """
+    Manually advanced clock for components that take a `clock` argument.
+
+    sleep() returns at once, so expiry, scheduling and latency logic run
+    deterministically without waiting.
+    """
+    return ManualClock()
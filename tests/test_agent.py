@@ -0,0 +1,313 @@
+"""Tests for probe agents and the aggregator."""
+
+import gzip
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch
+from api_monitor.agent import Agent, ResultBatch, decode_batch, encode_batch
+from api_monitor.aggregator import INGEST_PUBLISH_DELAY, AggregatorServer, consensus_result
+from api_monitor.checker import CheckResult
+from api_monitor.loader import APIConfig, Config
+from api_monitor.web_server import MonitoringHandler, PooledHTTPServer
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def get_json(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request('GET', path)
+    response = conn.getresponse()
+    data = json.loads(response.read())
+    conn.close()
+    return response.status, data
+
+
+class TestBatchEncoding:
+    """Tests for batch encoding."""
+
+    def test_round_trip(self):
+        """Test batch survives encoding."""
+        results = [
+            CheckResult("A", "https://a.com", 200, 12.345, True, method="POST"),
+            CheckResult("B ✓", "https://b.com", None, 5000.0, False, error="Timeout (>5.0s)", timeout=True)
+        ]
+        body = encode_batch(ResultBatch("eu-west", results, interval=30, sent_at=1700000000.0))
+
+        batch = decode_batch(body)
+
+        assert (batch.location, batch.interval, batch.sent_at) == ("eu-west", 30.0, 1700000000.0)
+        a, b = batch.results
+        assert (a.name, a.url, a.method, a.status_code, a.latency_ms, a.success) == \
+            ("A", "https://a.com", "POST", 200, 12.35, True)
+        assert (b.name, b.status_code, b.error, b.timeout, b.success) == \
+            ("B ✓", None, "Timeout (>5.0s)", True, False)
+
+    def test_compact(self):
+        """Test repeated records compress well."""
+        results = [CheckResult(f"API {i}", f"https://api.example.com/item/{i}", 200, 10.0, True)
+                   for i in range(1000)]
+
+        body = encode_batch(ResultBatch("eu-west", results))
+
+        assert len(body) < 20 * len(results)
+
+    @pytest.mark.parametrize("body", [
+        b"not gzip",
+        gzip.compress(b"[1, 2]"),
+        gzip.compress(json.dumps({'version': 99, 'location': 'x', 'fields': [], 'records': []}).encode()),
+        gzip.compress(json.dumps({'version': 1, 'location': '', 'fields': [], 'records': []}).encode()),
+        gzip.compress(json.dumps({'version': 1, 'location': 'x', 'fields': ['name'], 'records': [[]]}).encode()),
+        gzip.compress(json.dumps({'version': 1, 'location': 'x', 'fields': ['url'], 'records': [['u']]}).encode())
+    ])
+    def test_invalid(self, body):
+        """Test invalid batches are rejected."""
+        with pytest.raises(ValueError):
+            decode_batch(body)
+
+    def test_decompressed_size_limit(self):
+        """Test compressed batches cannot expand without bound."""
+        body = encode_batch(ResultBatch("x", [CheckResult("A" * 10000, "https://a.com", 200, 1.0, True)]))
+
+        with pytest.raises(ValueError, match="larger than"):
+            decode_batch(body, max_size=1000)
+
+
+class TestConsensus:
+    """Tests for merging results of several locations."""
+
+    def test_majority(self):
+        """Test check is up when most locations see it up."""
+        key = ("A", "https://a.com", "GET")
+        reports = {
+            'eu': CheckResult("A", "https://a.com", 200, 10.0, True),
+            'us': CheckResult("A", "https://a.com", 200, 30.0, True),
+            'ap': CheckResult("A", "https://a.com", 503, 50.0, False, error="HTTP 503")
+        }
+
+        merged = consensus_result(key, reports)
+
+        assert (merged.success, merged.status_code, merged.latency_ms, merged.error) == (True, 200, 30.0, None)
+
+    def test_split_is_down(self):
+        """Test a tie counts as down and names the failing locations."""
+        key = ("A", "https://a.com", "GET")
+        reports = {
+            'eu': CheckResult("A", "https://a.com", 200, 10.0, True),
+            'us': CheckResult("A", "https://a.com", None, 20.0, False, error="Connection error")
+        }
+
+        merged = consensus_result(key, reports)
+
+        assert merged.success is False
+        assert merged.error == "Down in 1/2 locations: us"
+
+
+class TestAggregatorServer:
+    """Tests for ingest over HTTP."""
+
+    @pytest.fixture
+    def aggregator(self):
+        saved = dict(MonitoringHandler.monitoring_data)
+        server = AggregatorServer(port=0, interval=60, token="secret", location_ttl=60)
+        yield server
+        server.cache.close()
+        if server._ingest_timer:
+            server._ingest_timer.cancel()
+        MonitoringHandler.monitoring_data.clear()
+        MonitoringHandler.monitoring_data.update(saved)
+
+    @pytest.fixture
+    def port(self, aggregator):
+        httpd = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=4)
+        thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        yield httpd.server_address[1]
+        httpd.shutdown()
+        httpd.server_close()
+
+    def _post(self, port, body, token="secret", encoding='gzip'):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        headers = {'Content-Type': 'application/json', 'Content-Encoding': encoding}
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        conn.request('POST', '/api/ingest', body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        return response.status
+
+    def test_ingest_updates_consensus(self, aggregator, port):
+        """Test pushed results show up per location and merged."""
+        for location, status in (('eu', 200), ('us', 200), ('ap', 500)):
+            result = CheckResult("A", "https://a.com", status, 10.0, status == 200)
+            assert self._post(port, encode_batch(ResultBatch(location, [result], interval=30))) == 202
+
+        aggregator.publish_consensus()
+        locations = get_json(port, '/api/locations')[1]['locations']
+        checks = get_json(port, '/api/consensus')[1]['checks']
+
+        assert [(l['location'], l['failed'], l['stale']) for l in locations] == \
+            [('ap', 1, False), ('eu', 0, False), ('us', 0, False)]
+        assert (checks[0]['success'], checks[0]['up'], checks[0]['down']) == (True, 2, 1)
+        assert checks[0]['locations']['ap']['status_code'] == 500
+        assert [r.success for r in MonitoringHandler.monitoring_data['results']] == [True]
+        assert aggregator.ingested == 3
+
+    def test_rejects_bad_requests(self, aggregator, port):
+        """Test token, encoding and body are checked."""
+        body = encode_batch(ResultBatch("eu", [CheckResult("A", "https://a.com", 200, 1.0, True)]))
+
+        assert self._post(port, body, token=None) == 401
+        assert self._post(port, body, token="wrong") == 401
+        assert self._post(port, body, encoding='br') == 415
+        assert self._post(port, b"garbage") == 400
+        assert aggregator.ingested == 0
+
+    def test_stale_location_ignored(self, aggregator):
+        """Test locations that stopped reporting leave the consensus."""
+        aggregator.ingest(ResultBatch("eu", [CheckResult("A", "https://a.com", 200, 1.0, True)]))
+        aggregator.ingest(ResultBatch("us", [CheckResult("A", "https://a.com", 500, 1.0, False)]))
+        aggregator.locations["eu"].last_seen -= 120
+
+        assert [r.success for r in aggregator.consensus()] == [False]
+        assert [l['stale'] for l in aggregator.location_summary()] == [True, False]
+
+    def test_snapshot_counted_once(self, aggregator):
+        """Test sweeps without new agent results do not count the consensus again."""
+        aggregator.ingest(ResultBatch("eu", [CheckResult("A", "https://a.com", 200, 1.0, True)]))
+        aggregator.ingest(ResultBatch("us", [CheckResult("A", "https://a.com", 200, 3.0, True)]))
+        first = aggregator.collect_results()
+        aggregator.record_results(first)
+        aggregator.record_results(aggregator.collect_results())
+
+        assert aggregator.collect_results()[0] is first[0]
+        assert aggregator.windows.summary()['overall']['1h']['checks'] == 1
+
+        aggregator.ingest(ResultBatch("eu", [CheckResult("A", "https://a.com", 500, 1.0, False)]))
+        aggregator.record_results(aggregator.collect_results())
+
+        assert aggregator.collect_results()[0] is not first[0]
+        assert aggregator.windows.summary()['overall']['1h']['checks'] == 2
+
+    def test_ingest_publish_debounced(self, aggregator):
+        """Test batches landing together are pushed to dashboards in one update."""
+        with patch.object(aggregator.events, 'publish') as mock_publish:
+            for location in ('eu', 'us', 'ap'):
+                aggregator.ingest(ResultBatch(location, [CheckResult("A", "https://a.com", 200, 1.0, True)]))
+            mock_publish.assert_not_called()
+
+            aggregator._ingest_timer.join(timeout=5)
+
+        mock_publish.assert_called_once()
+        assert [r.success for r in MonitoringHandler.monitoring_data['results']] == [True]
+
+    def test_not_aggregator(self):
+        """Test aggregator endpoints are 404 on a plain dashboard."""
+        saved = dict(MonitoringHandler.monitoring_data)
+        MonitoringHandler.monitoring_data['server_instance'] = None
+        httpd = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=2)
+        thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', httpd.server_address[1], timeout=5)
+            conn.request('GET', '/api/locations')
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            MonitoringHandler.monitoring_data.clear()
+            MonitoringHandler.monitoring_data.update(saved)
+
+        assert response.status == 404
+
+
+class TestAgent:
+    """Tests for Agent delivery."""
+
+    def test_keeps_batches_until_delivered(self, stub_server):
+        """Test undelivered batches are retried in order."""
+        base_url, server = stub_server
+        agent = Agent(Config(apis=[APIConfig("A", f"{base_url}/status/200")]), "http://127.0.0.1:9", "eu")
+        try:
+            agent.sweep(30)
+            agent.sweep(30)
+            assert agent.push() is False
+            assert len(agent.pending) == 2
+
+            agent.ingest_url = f"{base_url}/status/202"
+            assert agent.push() is True
+        finally:
+            agent.close()
+
+        posts = [path for method, path, _ in server.requests_seen if method == 'POST']
+        assert posts == ["/status/202", "/status/202"]
+        assert not agent.pending
+
+
+class TestLoopback:
+    """Agents and aggregator as separate processes."""
+
+    def _spawn(self, *args):
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        return subprocess.Popen([sys.executable, '-m', 'api_monitor.cli', *args], cwd=PROJECT_ROOT, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def test_agents_push_to_aggregator(self, stub_server, tmp_path):
+        """Test three agents reporting the same checks are merged per check."""
+        base_url, _ = stub_server
+        port = free_port()
+        aggregator = self._spawn('aggregator', '--port', str(port), '--token', 'secret')
+        try:
+            deadline = time.time() + 15
+            while time.time() < deadline:
+                try:
+                    if get_json(port, '/api/locations')[0] == 200:
+                        break
+                except OSError:
+                    time.sleep(0.1)
+            else:
+                pytest.fail("Aggregator did not start")
+
+            # The third location expects another status, so it sees the API down
+            agents = []
+            for location, expected in (('eu', 200), ('us', 200), ('ap', 204)):
+                config = tmp_path / f"{location}.yaml"
+                config.write_text(
+                    "apis:\n"
+                    f"  - name: Orders\n    url: {base_url}/status/200\n    expected_status: {expected}\n"
+                    f"  - name: Search\n    url: {base_url}/status/503\n",
+                    encoding='utf-8')
+                agents.append(self._spawn('agent', str(config), '--aggregator', f"http://127.0.0.1:{port}",
+                                          '--location', location, '--token', 'secret', '--once'))
+            assert [agent.wait(timeout=30) for agent in agents] == [0, 0, 0]
+
+            locations = get_json(port, '/api/locations')[1]['locations']
+            checks = {c['name']: c for c in get_json(port, '/api/consensus')[1]['checks']}
+            time.sleep(2 * INGEST_PUBLISH_DELAY)  # Dashboard gets the last batches after the publish delay
+            results = {r['name']: r for r in get_json(port, '/api/data')[1]['results']}
+        finally:
+            aggregator.terminate()
+            aggregator.wait(timeout=10)
+
+        assert [l['location'] for l in locations] == ['ap', 'eu', 'us']
+        assert (checks['Orders']['success'], checks['Orders']['up'], checks['Orders']['down']) == (True, 2, 1)
+        assert (checks['Search']['success'], checks['Search']['down']) == (False, 3)
+        assert results['Orders']['success'] is True
+        assert results['Search']['error'] == "Down in 3/3 locations: ap, eu, us"
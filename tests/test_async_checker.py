@@ -0,0 +1,276 @@
+"""Tests for asyncio check engine."""
+
+import asyncio
+import socket
+import pytest
+from unittest.mock import patch
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.checker import check_api, check_all_apis, CheckResult, PhaseTimings
+from api_monitor.cache import ResultCache
+from api_monitor.loader import APIConfig
+
+
+def unused_port() -> int:
+    """Returns a loopback port with nothing listening on it."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class TestAsyncChecker:
+    """Tests for AsyncChecker."""
+
+    def test_invalid_concurrency(self):
+        """Test concurrency validation."""
+        with pytest.raises(ValueError):
+            AsyncChecker(concurrency=0)
+
+    def test_check_success(self, stub_server):
+        """Test successful request."""
+        base_url, _ = stub_server
+        result = AsyncChecker().run([APIConfig("OK", f"{base_url}/status/200")])[0]
+
+        assert result.success is True
+        assert result.status_code == 200
+        assert result.error is None
+        assert result.timeout is False
+        assert result.latency_ms >= 0
+
+    def test_check_wrong_status(self, stub_server):
+        """Test wrong status code."""
+        base_url, _ = stub_server
+        result = AsyncChecker().run([APIConfig("Missing", f"{base_url}/status/404")])[0]
+
+        assert result.success is False
+        assert result.status_code == 404
+        assert result.error is None
+
+    def test_check_method_and_headers(self, stub_server):
+        """Test custom method and headers are sent."""
+        base_url, server = stub_server
+        api = APIConfig("Post", f"{base_url}/status/201", method="POST",
+                        expected_status=201, headers={"X-Token": "abc"})
+        result = AsyncChecker().run([api])[0]
+
+        assert result.success is True
+        method, path, headers = server.requests_seen[0]
+        assert method == 'POST'
+        assert path == '/status/201'
+        assert headers['X-Token'] == 'abc'
+
+    def test_follows_redirect(self, stub_server):
+        """Test redirects are followed like requests does."""
+        base_url, server = stub_server
+        result = AsyncChecker().run([APIConfig("Redirect", f"{base_url}/redirect")])[0]
+
+        assert result.status_code == 200
+        assert [path for _, path, _ in server.requests_seen] == ['/redirect', '/status/200']
+
+    def test_chunked_body(self, stub_server):
+        """Test chunked response body is drained."""
+        base_url, _ = stub_server
+        result = AsyncChecker().run([APIConfig("Chunked", f"{base_url}/chunked")])[0]
+
+        assert result.success is True
+
+    def test_timeout(self, stub_server):
+        """Test timeout handling."""
+        base_url, _ = stub_server
+        api = APIConfig("Slow", f"{base_url}/delay/1", timeout=0.1)
+        result = AsyncChecker().run([api])[0]
+
+        assert result.success is False
+        assert result.timeout is True
+        assert result.status_code is None
+        assert "Timeout" in result.error
+
+    def test_connection_error(self):
+        """Test connection error handling."""
+        api = APIConfig("Down", f"http://127.0.0.1:{unused_port()}/")
+        result = AsyncChecker().run([api])[0]
+
+        assert result.success is False
+        assert result.error == "Connection error"
+        assert result.timeout is False
+
+    def test_unsupported_scheme(self):
+        """Test non-HTTP URL handling."""
+        result = AsyncChecker().run([APIConfig("FTP", "ftp://example.com/")])[0]
+
+        assert result.success is False
+        assert "No connection adapters" in result.error
+
+    def test_results_keep_input_order(self, stub_server):
+        """Test results are returned in configuration order."""
+        base_url, _ = stub_server
+        apis = [
+            APIConfig("Slow", f"{base_url}/delay/0.2"),
+            APIConfig("Fast", f"{base_url}/status/200"),
+            APIConfig("Missing", f"{base_url}/status/404"),
+        ]
+        results = AsyncChecker().run(apis)
+
+        assert [r.name for r in results] == ["Slow", "Fast", "Missing"]
+
+    def test_concurrency_limit(self, stub_server):
+        """Test global concurrency limit is respected."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.1?i={i}") for i in range(12)]
+        results = AsyncChecker(concurrency=3).run(apis)
+
+        assert all(r.success for r in results)
+        assert server.max_in_flight <= 3
+
+    def test_probes_run_concurrently(self, stub_server):
+        """Test probes overlap instead of running in waves of ten."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.2?i={i}") for i in range(30)]
+        AsyncChecker(concurrency=100).run(apis)
+
+        assert server.max_in_flight > 10
+
+    def test_uses_cache(self, stub_server):
+        """Test cached results skip the request."""
+        base_url, server = stub_server
+        cache = ResultCache(default_ttl=60.0)
+        api = APIConfig("Cached", f"{base_url}/status/200")
+        checker = AsyncChecker(cache=cache)
+
+        checker.run([api])
+        checker.run([api])
+
+        assert len(server.requests_seen) == 1
+        assert cache.size() == 1
+
+    def test_run_inside_event_loop(self, stub_server):
+        """Test sync wrapper works when called from a running loop."""
+        base_url, _ = stub_server
+
+        async def call_sync():
+            return AsyncChecker().run([APIConfig("OK", f"{base_url}/status/200")])
+
+        results = asyncio.run(call_sync())
+        assert results[0].success is True
+
+    def test_check_all_apis_async(self, stub_server):
+        """Test check_all_apis(use_async=True) uses the asyncio engine."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200") for i in range(3)]
+
+        with patch('api_monitor.checker.check_api') as mock_check_api:
+            results = check_all_apis(apis, use_async=True, max_concurrency=2)
+
+        mock_check_api.assert_not_called()
+        assert [r.name for r in results] == ["API 0", "API 1", "API 2"]
+        assert all(isinstance(r, CheckResult) and r.success for r in results)
+
+
+class TestEnvironment:
+    """Tests for proxy and CA bundle environment variables (honoured like requests does)."""
+
+    @pytest.fixture(autouse=True)
+    def no_proxies(self, monkeypatch):
+        """Clears proxy settings of the environment running the tests."""
+        for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'NO_PROXY'):
+            monkeypatch.delenv(name, raising=False)
+            monkeypatch.delenv(name.lower(), raising=False)
+
+    def test_proxied_api_goes_through_proxy(self, stub_server, monkeypatch):
+        """Test API behind HTTP_PROXY is sent to the proxy."""
+        base_url, server = stub_server
+        monkeypatch.setenv('HTTP_PROXY', base_url)
+        result = AsyncChecker().run([APIConfig("Proxied", "http://api.example.invalid/status/200")])[0]
+
+        assert result.status_code == 404  # The stub server does not forward
+        assert server.requests_seen[0][1] == "http://api.example.invalid/status/200"
+
+    def test_no_proxy_connects_directly(self, stub_server, monkeypatch):
+        """Test NO_PROXY hosts bypass the proxy."""
+        base_url, server = stub_server
+        monkeypatch.setenv('HTTP_PROXY', f"http://127.0.0.1:{unused_port()}")
+        monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+        result = AsyncChecker(phases=True).run([APIConfig("OK", f"{base_url}/status/200")])[0]
+
+        assert result.success is True
+        assert result.phases is not None
+        assert server.requests_seen[0][1] == '/status/200'
+
+    def test_ca_bundle(self, monkeypatch, tmp_path):
+        """Test REQUESTS_CA_BUNDLE selects the trusted certificates."""
+        from api_monitor import async_checker
+
+        monkeypatch.setenv('REQUESTS_CA_BUNDLE', str(tmp_path))
+        with patch('api_monitor.async_checker.ssl.create_default_context') as mock_context:
+            async_checker._ssl_context.cache_clear()
+            try:
+                async_checker._default_ssl_context()
+            finally:
+                async_checker._ssl_context.cache_clear()
+
+        mock_context.assert_called_once_with(capath=str(tmp_path))
+
+
+class TestPhaseTimings:
+    """Tests for instrumented probe mode."""
+
+    def test_phases_off_by_default(self, stub_server):
+        """Test plain probes do not record phases."""
+        base_url, _ = stub_server
+        result = AsyncChecker().run([APIConfig("OK", f"{base_url}/status/200")])[0]
+
+        assert result.phases is None
+
+    def test_phases_recorded(self, stub_server):
+        """Test instrumented probe records every phase."""
+        base_url, _ = stub_server
+        result = AsyncChecker(phases=True).run([APIConfig("Slow", f"{base_url}/delay/0.1")])[0]
+
+        assert result.success is True
+        phases = result.phases
+        assert isinstance(phases, PhaseTimings)
+        assert phases.dns_ms >= 0
+        assert phases.connect_ms >= 0
+        assert phases.tls_ms == 0.0  # Plain HTTP
+        assert phases.ttfb_ms >= 90
+        total = phases.dns_ms + phases.connect_ms + phases.ttfb_ms + phases.body_ms
+        assert total <= result.latency_ms + 1
+
+    def test_phases_kept_on_timeout(self, stub_server):
+        """Test phases measured before a timeout are kept."""
+        base_url, _ = stub_server
+        api = APIConfig("Slow", f"{base_url}/delay/1", timeout=0.1)
+        result = AsyncChecker(phases=True).run([api])[0]
+
+        assert result.timeout is True
+        assert result.phases is not None
+        assert result.phases.connect_ms >= 0
+
+    def test_check_api_phases(self, stub_server):
+        """Test sync check_api instrumented mode."""
+        base_url, _ = stub_server
+        result = check_api(APIConfig("OK", f"{base_url}/status/200"), phases=True)
+
+        assert result.success is True
+        assert result.phases is not None
+
+    def test_check_all_apis_phases(self, stub_server):
+        """Test phases flag is passed through both sweep paths."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200") for i in range(2)]
+
+        assert all(r.phases is not None for r in check_all_apis(apis, phases=True))
+        assert all(r.phases is not None for r in check_all_apis(apis, use_async=True, phases=True))
+
+    def test_sequential_phases_sweep_uses_one_loop(self, stub_server):
+        """Test instrumented sequential sweep runs on one event loop, one probe at a time."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200") for i in range(3)]
+
+        with patch('api_monitor.async_checker.asyncio.run', wraps=asyncio.run) as mock_run, \
+                patch('api_monitor.async_checker.AsyncChecker.__init__', autospec=True,
+                      side_effect=AsyncChecker.__init__) as mock_init:
+            results = check_all_apis(apis, phases=True)
+
+        assert all(r.phases is not None for r in results)
+        assert mock_run.call_count == 1
+        assert mock_init.call_args.kwargs['concurrency'] == 1
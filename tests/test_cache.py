@@ -1,9 +1,13 @@
 """Tests for caching module."""
 
+import logging
 import pytest
+import threading
 import time
+from unittest.mock import patch
 from api_monitor.cache import ResultCache, CacheEntry
-from api_monitor.checker import CheckResult
+from api_monitor.checker import CheckResult, check_all_apis
+from api_monitor.loader import APIConfig
 
 
 class TestResultCache:
@@ -138,3 +142,228 @@ class TestResultCache:
         # Now entry should expire
         cached = cache.get('Test', 'https://test.com')
         assert cached is None
+
+
+class TestBoundedCache:
+    """Tests for LRU eviction, expiry buckets and counters."""
+    
+    def test_invalid_max_size(self):
+        """Test max_size validation."""
+        with pytest.raises(ValueError):
+            ResultCache(max_size=0)
+    
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted."""
+        cache = ResultCache(max_size=2)
+        cache.set(CheckResult('A', 'https://a.com', 200, 1.0, True))
+        cache.set(CheckResult('B', 'https://b.com', 200, 1.0, True))
+        assert cache.get('A', 'https://a.com') is not None  # A becomes most recent
+        
+        cache.set(CheckResult('C', 'https://c.com', 200, 1.0, True))
+        
+        assert cache.size() == 2
+        assert cache.get('B', 'https://b.com') is None
+        assert cache.get('A', 'https://a.com') is not None
+        assert cache.stats()['evictions'] == 1
+    
+    def test_counters(self, clock):
+        """Test hit, miss and expiration counters."""
+        cache = ResultCache(default_ttl=10.0, clock=clock)
+        cache.set(CheckResult('A', 'https://a.com', 200, 1.0, True))
+        
+        cache.get('A', 'https://a.com')
+        cache.get('B', 'https://b.com')
+        clock.advance(11)
+        cache.get('A', 'https://a.com')
+        
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['expirations']) == (1, 2, 1)
+        assert stats['hit_rate'] == pytest.approx(1 / 3)
+    
+    def test_cleanup_mixed_ttls(self, clock):
+        """Test cleanup removes only expired entries across TTL buckets."""
+        cache = ResultCache(default_ttl=10.0, clock=clock)
+        cache.set(CheckResult('A', 'https://a.com', 200, 1.0, True), ttl=5.0)
+        cache.set(CheckResult('B', 'https://b.com', 200, 1.0, True))
+        clock.advance(1)
+        cache.set(CheckResult('C', 'https://c.com', 200, 1.0, True), ttl=5.0)
+        
+        clock.advance(4.5)
+        stats = cache.stats()
+        assert (stats['valid'], stats['expired']) == (2, 1)
+        assert cache.cleanup_expired() == 1
+        assert cache.get('C', 'https://c.com') is not None
+        
+        clock.advance(10)
+        assert cache.cleanup_expired() == 2
+        assert cache.size() == 0
+        assert cache.stats()['expirations'] == 3
+    
+    def test_overwrite_not_expired_by_old_deadline(self, clock):
+        """Test re-set entry is not removed when its previous deadline passes."""
+        cache = ResultCache(default_ttl=10.0, clock=clock)
+        result = CheckResult('A', 'https://a.com', 200, 1.0, True)
+        cache.set(result)
+        clock.advance(8)
+        cache.set(result)
+        
+        clock.advance(5)
+        assert cache.cleanup_expired() == 0
+        assert cache.get('A', 'https://a.com') is not None
+    
+    def test_wall_clock_jump_does_not_expire_entries(self, clock):
+        """Test entries expire by monotonic age only."""
+        cache = ResultCache(default_ttl=10.0, clock=clock)
+        cache.set(CheckResult('A', 'https://a.com', 200, 1.0, True))
+        
+        clock.step_wall(86400)
+        assert cache.get('A', 'https://a.com') is not None
+        
+        clock.advance(10.5)
+        assert cache.get('A', 'https://a.com') is None
+    
+    def test_compaction_bounds_queue(self, clock):
+        """Test repeated sets of the same keys do not grow expiry buckets."""
+        cache = ResultCache(default_ttl=60.0, max_size=10, clock=clock)
+        for i in range(1000):
+            cache.set(CheckResult(f'API{i % 5}', 'https://a.com', 200, 1.0, True))
+            clock.advance(0.001)
+        
+        assert cache.size() == 5
+        assert cache._queued <= 2 * cache.max_size
+        clock.advance(61)
+        assert cache.cleanup_expired() == 5
+
+
+class TestStaleWhileRevalidate:
+    """Tests for stale-while-revalidate mode."""
+    
+    def test_invalid_window(self):
+        """Test window validation."""
+        with pytest.raises(ValueError):
+            ResultCache(stale_while_revalidate=-1)
+    
+    def test_stale_result_served_in_window(self, clock):
+        """Test expired entry is served flagged stale, then dropped after window."""
+        cache = ResultCache(default_ttl=10.0, stale_while_revalidate=30.0, clock=clock)
+        cache.set(CheckResult('A', 'https://a.com', 200, 1.0, True))
+        
+        clock.advance(20)
+        result, stale = cache.lookup('A', 'https://a.com')
+        assert stale is True
+        assert result.stale is True
+        assert cache.get('A', 'https://a.com') is None  # get() never returns stale results
+        assert cache.cleanup_expired() == 0  # Kept while in window
+        
+        clock.advance(30)
+        assert cache.lookup('A', 'https://a.com') == (None, False)
+        assert cache.stats()['stale_hits'] == 1
+    
+    def test_max_age_zero_forces_stale(self, clock):
+        """Test max_age=0 treats fresh entries as stale."""
+        cache = ResultCache(default_ttl=10.0, stale_while_revalidate=30.0, clock=clock)
+        cache.set(CheckResult('A', 'https://a.com', 200, 1.0, True))
+        clock.advance(1)
+        
+        assert cache.lookup('A', 'https://a.com')[1] is False
+        assert cache.lookup('A', 'https://a.com', max_age=0)[1] is True
+    
+    def test_single_refresh_in_flight(self):
+        """Test concurrent revalidations of one key share one probe."""
+        refreshed = []
+        cache = ResultCache(default_ttl=10.0, stale_while_revalidate=30.0, on_revalidated=refreshed.append)
+        release = threading.Event()
+        calls = []
+        
+        def probe(api):
+            calls.append(api.name)
+            release.wait(5)
+            return CheckResult(api.name, api.url, 503, 2.0, False, "HTTP 503")
+        
+        api = APIConfig('A', 'https://a.com')
+        assert cache.revalidate(api, probe) is True
+        assert cache.revalidate(api, probe) is False
+        release.set()
+        deadline = time.time() + 5
+        while not refreshed and time.time() < deadline:
+            time.sleep(0.01)
+        cache.close()
+        
+        assert calls == ['A']
+        assert refreshed[0].status_code == 503
+        assert cache.get('A', 'https://a.com').success is False  # Failure replaces stale success
+        assert cache.stats()['revalidations'] == 1
+    
+    @patch('api_monitor.checker.check_api')
+    def test_sweep_does_not_wait_for_slow_endpoint(self, mock_check_api, clock):
+        """Test check_all_apis returns stale result at once and refreshes in background."""
+        release = threading.Event()
+        
+        def slow_check(api, sessions=None, phases=False):
+            release.wait(5)
+            return CheckResult(api.name, api.url, 200, 3000.0, True)
+        
+        mock_check_api.side_effect = slow_check
+        cache = ResultCache(default_ttl=10.0, stale_while_revalidate=60.0, clock=clock)
+        cache.set(CheckResult('Slow', 'https://slow.com', 200, 3000.0, True))
+        clock.advance(15)
+        
+        started = time.perf_counter()
+        results = check_all_apis([APIConfig('Slow', 'https://slow.com')], cache=cache)
+        elapsed = time.perf_counter() - started
+        release.set()
+        cache.close()
+        
+        assert elapsed < 0.5
+        assert results[0].stale is True
+        assert cache.stats()['revalidations'] == 1
+    
+    @patch('api_monitor.checker.check_api')
+    def test_sweep_without_stale_probes_now(self, mock_check_api, clock):
+        """Test allow_stale=False checks expired results instead of serving them stale."""
+        mock_check_api.return_value = CheckResult('A', 'https://a.com', 503, 12.0, False)
+        cache = ResultCache(default_ttl=10.0, stale_while_revalidate=60.0, clock=clock)
+        cache.set(CheckResult('A', 'https://a.com', 200, 10.0, True))
+        clock.advance(15)
+        
+        results = check_all_apis([APIConfig('A', 'https://a.com')], cache=cache, allow_stale=False)
+        
+        assert results[0].status_code == 503 and results[0].stale is False
+        assert cache.stats()['revalidations'] == 0
+        assert cache.get('A', 'https://a.com').status_code == 503
+    
+    def test_refresh_error_logged(self, caplog, capsys):
+        """Test a failing background refresh is logged, not printed."""
+        def broken_probe(api):
+            raise RuntimeError("boom")
+        
+        cache = ResultCache(stale_while_revalidate=60.0)
+        api = APIConfig('A', 'https://a.com')
+        with caplog.at_level(logging.WARNING):
+            cache.revalidate(api, broken_probe)
+            deadline = time.time() + 5
+            while not caplog.records and time.time() < deadline:
+                time.sleep(0.01)
+        cache.close()
+        
+        assert "Cache refresh error for A: boom" in caplog.text
+        assert capsys.readouterr().out == ""
+    
+    def test_close_cancels_queued_refreshes(self):
+        """Test close() cancels refreshes still waiting for a thread."""
+        release = threading.Event()
+        calls = []
+        
+        def slow_probe(api):
+            calls.append(api.name)
+            release.wait(5)
+            return CheckResult(api.name, api.url, 200, 10.0, True)
+        
+        cache = ResultCache(stale_while_revalidate=60.0, refresh_workers=1)
+        for name in ('A', 'B', 'C'):
+            cache.revalidate(APIConfig(name, f"https://{name.lower()}.com"), slow_probe)
+        cache.close()
+        release.set()
+        time.sleep(0.1)
+        
+        assert calls == ['A']
@@ -1,19 +1,29 @@
 """Tests for API checking module."""
 
+import io
+import threading
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from api_monitor.checker import check_api, check_all_apis, CheckResult
+from api_monitor.checker import (
+    check_api, check_all_apis, request_fingerprint, CheckResult, SingleFlight, probe_flights
+)
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.cache import ResultCache
 from api_monitor.loader import APIConfig
 
 
+def fake_response(status_code: int, body: bytes = b'') -> Mock:
+    """Returns stand-in for a streamed requests response."""
+    return Mock(status_code=status_code, raw=io.BytesIO(body))
+
+
 class TestCheckAPI:
     """Tests for check_api function."""
     
     @patch('api_monitor.checker.requests.request')
     def test_check_api_success(self, mock_request):
         """Test successful request."""
-        mock_response = Mock()
-        mock_response.status_code = 200
+        mock_response = fake_response(200)
         mock_request.return_value = mock_response
         
         api_config = APIConfig(
@@ -33,14 +43,14 @@ class TestCheckAPI:
             method='GET',
             url='https://example.com',
             headers={},
-            timeout=5.0
+            timeout=5.0,
+            stream=True
         )
     
     @patch('api_monitor.checker.requests.request')
     def test_check_api_wrong_status(self, mock_request):
         """Test wrong status code."""
-        mock_response = Mock()
-        mock_response.status_code = 404
+        mock_response = fake_response(404)
         mock_request.return_value = mock_response
         
         api_config = APIConfig(
@@ -132,8 +142,7 @@ class TestCheckAPI:
     @patch('api_monitor.checker.requests.request')
     def test_check_api_with_headers(self, mock_request):
         """Test request with headers."""
-        mock_response = Mock()
-        mock_response.status_code = 200
+        mock_response = fake_response(200)
         mock_request.return_value = mock_response
         
         api_config = APIConfig(
@@ -149,14 +158,14 @@ class TestCheckAPI:
             method='GET',
             url='https://example.com',
             headers={"User-Agent": "test"},
-            timeout=5.0
+            timeout=5.0,
+            stream=True
         )
     
     @patch('api_monitor.checker.requests.request')
     def test_check_api_custom_method(self, mock_request):
         """Test custom HTTP method."""
-        mock_response = Mock()
-        mock_response.status_code = 201
+        mock_response = fake_response(201)
         mock_request.return_value = mock_response
         
         api_config = APIConfig(
@@ -170,11 +179,13 @@ class TestCheckAPI:
         
         assert result.success is True
         assert result.status_code == 201
+        assert result.method == "POST"
         mock_request.assert_called_once_with(
             method='POST',
             url='https://example.com',
             headers={},
-            timeout=5.0
+            timeout=5.0,
+            stream=True
         )
 
 
@@ -212,3 +223,176 @@ class TestCheckAllAPIs:
         assert len(results) == 0
         mock_check_api.assert_not_called()
 
+
+class TestCacheKeying:
+    """Tests for per-method and per-header cache keys."""
+    
+    def test_request_fingerprint(self):
+        """Test fingerprint ignores header name case and order."""
+        assert request_fingerprint(APIConfig("A", "https://a.com")) == ""
+        first = APIConfig("A", "https://a.com", headers={"X-Token": "1", "Accept": "json"})
+        second = APIConfig("A", "https://a.com", headers={"accept": "json", "x-token": "1"})
+        other = APIConfig("A", "https://a.com", headers={"X-Token": "2", "Accept": "json"})
+        
+        assert request_fingerprint(first) == request_fingerprint(second)
+        assert request_fingerprint(first) != request_fingerprint(other)
+    
+    @patch('api_monitor.checker.requests.request')
+    def test_multi_method_endpoints_hit_cache(self, mock_request):
+        """Test POST and HEAD probes are cached per method (previously always missed)."""
+        mock_request.side_effect = lambda method, **kwargs: fake_response(201 if method == 'POST' else 200)
+        api_configs = [
+            APIConfig("Orders", "https://api.com/orders"),
+            APIConfig("Orders", "https://api.com/orders", method="POST", expected_status=201),
+            APIConfig("Orders", "https://api.com/orders", method="HEAD"),
+            APIConfig("Orders", "https://api.com/orders", headers={"Authorization": "Bearer x"})
+        ]
+        cache = ResultCache(default_ttl=60.0)
+        
+        first = check_all_apis(api_configs, cache=cache)
+        second = check_all_apis(api_configs, cache=cache)
+        
+        assert mock_request.call_count == 4  # Second sweep served from cache
+        assert cache.size() == 4
+        assert cache.stats()['hit_rate'] == 0.5  # 4 misses, then 4 hits
+        assert [r.method for r in second] == ["GET", "POST", "HEAD", "GET"]
+        assert [r.status_code for r in second] == [r.status_code for r in first] == [200, 201, 200, 200]
+    
+    def test_result_not_shared_across_methods(self):
+        """Test GET entry is not returned for HEAD lookup."""
+        cache = ResultCache()
+        cache.set(CheckResult("A", "https://a.com", 200, 1.0, True, method="GET"))
+        
+        assert cache.get("A", "https://a.com", "HEAD") is None
+        assert cache.get("A", "https://a.com", "get") is not None
+
+
+class TestSingleFlight:
+    """Tests for deduplication of concurrent probes."""
+    
+    def test_leader_and_followers(self):
+        """Test only the first caller runs the probe and later callers share it."""
+        flights = SingleFlight()
+        future, leader = flights.begin(("GET", "https://a.com", "", False))
+        joined, follower_leads = flights.begin(("GET", "https://a.com", "", False))
+        _, other_leads = flights.begin(("HEAD", "https://a.com", "", False))
+        
+        assert leader and other_leads and not follower_leads
+        assert joined is future
+        
+        result = CheckResult("A", "https://a.com", 200, 1.0, True)
+        flights.finish(("GET", "https://a.com", "", False), future, result)
+        
+        assert joined.result() is result
+        assert flights.stats() == {'probes': 2, 'shared': 1, 'dedup_rate': 1 / 3, 'in_flight': 1}
+        assert flights.begin(("GET", "https://a.com", "", False))[1]  # Finished probe is not reused
+    
+    def test_concurrent_threads_share_request(self, stub_server):
+        """Test threads checking the same endpoint send one request."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.3", expected_status=200 if i % 2 else 201)
+                for i in range(8)]
+        shared_before = probe_flights.shared
+        results = [None] * len(apis)
+        
+        def run(i):
+            results[i] = check_api(apis[i])
+        
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(apis))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(server.requests_seen) == 1
+        assert probe_flights.shared - shared_before == 7
+        assert [r.name for r in results] == [api.name for api in apis]
+        assert [r.success for r in results] == [i % 2 == 1 for i in range(8)]
+        assert {r.latency_ms for r in results} == {results[0].latency_ms}
+    
+    def test_async_sweep_deduplicates(self, stub_server):
+        """Test APIs sharing a request in one sweep send it once."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.1") for i in range(5)]
+        apis.append(APIConfig("Other headers", f"{base_url}/delay/0.1", headers={"X-Token": "1"}))
+        
+        results = check_all_apis(apis, use_async=True)
+        
+        assert all(r.success for r in results)
+        assert [r.name for r in results] == [api.name for api in apis]
+        assert len(server.requests_seen) == 2
+
+
+ENGINES = {
+    'requests': lambda api: check_api(api),
+    'asyncio': lambda api: AsyncChecker().run([api])[0]
+}
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+class TestProbeModes:
+    """Tests for body budget, range and HEAD-first probes on both engines."""
+    
+    def test_body_budget(self, stub_server, engine):
+        """Test large bodies are read up to the budget only; small ones completely."""
+        base_url, _ = stub_server
+        
+        large = ENGINES[engine](APIConfig("Large", f"{base_url}/bytes/500000"))
+        small = ENGINES[engine](APIConfig("Small", f"{base_url}/bytes/100"))
+        
+        assert (large.success, large.status_code, large.bytes_read) == (True, 200, 65536)
+        assert small.bytes_read == 100
+    
+    def test_chunked_budget(self, stub_server, engine):
+        """Test the budget also cuts chunked bodies."""
+        base_url, _ = stub_server
+        
+        result = ENGINES[engine](APIConfig("Chunked", f"{base_url}/chunked", body_budget=3))
+        
+        assert result.success and result.bytes_read == 3
+    
+    def test_full(self, stub_server, engine):
+        """Test full probes download the whole body."""
+        base_url, _ = stub_server
+        
+        result = ENGINES[engine](APIConfig("Large", f"{base_url}/bytes/500000", probe='full'))
+        
+        assert result.bytes_read == 500000
+    
+    def test_range(self, stub_server, engine):
+        """Test range probes ask for the budget only and report the plain status."""
+        base_url, server = stub_server
+        
+        result = ENGINES[engine](APIConfig("Large", f"{base_url}/bytes/500000", probe='range', body_budget=1000))
+        empty = ENGINES[engine](APIConfig("Empty", f"{base_url}/bytes/0", probe='range'))
+        
+        assert (result.success, result.status_code, result.bytes_read) == (True, 200, 1000)
+        assert server.requests_seen[0][2]['Range'] == 'bytes=0-999'
+        assert (empty.success, empty.status_code, empty.bytes_read) == (True, 200, 0)
+    
+    def test_head_first(self, stub_server, engine):
+        """Test HEAD probes read no body."""
+        base_url, server = stub_server
+        
+        result = ENGINES[engine](APIConfig("Large", f"{base_url}/bytes/500000", probe='head'))
+        
+        assert (result.success, result.bytes_read) == (True, 0)
+        assert [request[0] for request in server.requests_seen] == ['HEAD']
+    
+    def test_head_fallback(self, stub_server, engine):
+        """Test servers rejecting HEAD get a GET with body budget."""
+        base_url, server = stub_server
+        
+        result = ENGINES[engine](APIConfig("No HEAD", f"{base_url}/nohead", probe='head'))
+        
+        assert (result.success, result.status_code, result.bytes_read) == (True, 200, 2)
+        assert [request[0] for request in server.requests_seen] == ['HEAD', 'GET']
+    
+    def test_other_methods_not_changed(self, stub_server, engine):
+        """Test HEAD-first and Range apply to GET probes only."""
+        base_url, server = stub_server
+        
+        result = ENGINES[engine](APIConfig("Post", f"{base_url}/bytes/10", method='POST', probe='range'))
+        
+        assert result.status_code == 200 and result.bytes_read == 10
+        assert server.requests_seen[0][0] == 'POST' and 'Range' not in server.requests_seen[0][2]
@@ -0,0 +1,215 @@
+"""Tests for circuit breakers."""
+
+import random
+import socket
+import time
+from unittest.mock import patch
+
+import pytest
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.cache import ResultCache
+from api_monitor.checker import CheckResult, check_all_apis, check_api, probe_key
+from api_monitor.clock import ManualClock
+from api_monitor.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreakers, create_circuit_breakers_from_config
+from api_monitor.loader import APIConfig, Config
+from api_monitor.notifier import NotificationConfig, NotificationService
+from api_monitor.scheduler import Scheduler
+from api_monitor.workers import decode_results, encode_result
+
+
+def dead_url() -> str:
+    """Returns URL of a loopback port nobody listens on."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+
+KEY = ('GET', 'https://a.com', '', False)
+
+
+class TestCircuitBreakers:
+    """Tests for CircuitBreakers state machine."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit; a response resets the count."""
+        breakers = CircuitBreakers(failure_threshold=3, clock=ManualClock())
+        breakers.record(KEY, False)
+        breakers.record(KEY, False)
+        breakers.record(KEY, True)
+        breakers.record(KEY, False)
+        breakers.record(KEY, False)
+        assert breakers.state(KEY) == CLOSED
+        assert breakers.allow(KEY) is None
+
+        breakers.record(KEY, False)
+
+        assert breakers.state(KEY) == OPEN
+        assert breakers.allow(KEY) == pytest.approx(30.0, rel=0.2)
+        assert breakers.stats() == {'open': 1, 'half_open': 0, 'fast_failures': 1}
+
+    def test_half_open_trial(self):
+        """Test one trial probe after the backoff; a response closes the circuit."""
+        clock = ManualClock()
+        breakers = CircuitBreakers(failure_threshold=1, backoff=10, jitter=0, clock=clock)
+        breakers.record(KEY, False)
+
+        clock.now += 10
+        assert breakers.allow(KEY) is None  # Trial probe
+        assert breakers.state(KEY) == HALF_OPEN
+        assert breakers.allow(KEY) == 0.0  # Others fail fast while it runs
+
+        breakers.record(KEY, True)
+        assert breakers.state(KEY) == CLOSED
+        assert breakers.allow(KEY) is None
+
+    def test_backoff_doubles_and_is_capped(self):
+        """Test failed trial probes double the wait up to max_backoff."""
+        clock = ManualClock()
+        breakers = CircuitBreakers(failure_threshold=1, backoff=10, max_backoff=35, jitter=0, clock=clock)
+        waits = []
+        breakers.record(KEY, False)
+        for _ in range(4):
+            waits.append(breakers.allow(KEY))
+            clock.now += waits[-1]
+            assert breakers.allow(KEY) is None
+            breakers.record(KEY, False)
+
+        assert waits == [10, 20, 35, 35]
+
+    def test_jitter_spreads_backoff(self):
+        """Test waits stay within the jitter range and differ between endpoints."""
+        breakers = CircuitBreakers(failure_threshold=1, backoff=100, jitter=0.2, clock=ManualClock(),
+                                   rng=random.Random(3))
+        waits = set()
+        for index in range(50):
+            key = ('GET', f'https://{index}.com', '', False)
+            breakers.record(key, False)
+            waits.add(breakers.allow(key))
+
+        assert all(80 <= wait <= 120 for wait in waits)
+        assert len(waits) > 40
+
+    def test_interrupted_trial_reopens(self):
+        """Test a trial probe without outcome does not leave the circuit half-open."""
+        clock = ManualClock()
+        breakers = CircuitBreakers(failure_threshold=1, backoff=5, jitter=0, clock=clock)
+        breakers.record(KEY, False)
+        clock.now += 5
+        breakers.allow(KEY)
+
+        breakers.release(KEY)
+
+        assert breakers.state(KEY) == OPEN
+        assert breakers.allow(KEY) is None  # Next caller may try again
+
+    @pytest.mark.parametrize("kwargs", [{'failure_threshold': 0}, {'backoff': 0},
+                                        {'backoff': 10, 'max_backoff': 5}, {'jitter': 1.0}])
+    def test_invalid(self, kwargs):
+        """Test settings are validated."""
+        with pytest.raises(ValueError):
+            CircuitBreakers(**kwargs)
+
+    def test_create_from_config(self):
+        """Test defaults, custom settings and disabling."""
+        assert create_circuit_breakers_from_config({'backoff': 30}).failure_threshold == 3
+        custom = create_circuit_breakers_from_config({'failure_threshold': 5, 'backoff': 2, 'max_backoff': 8})
+        assert (custom.failure_threshold, custom.backoff, custom.max_backoff) == (5, 2.0, 8.0)
+        assert create_circuit_breakers_from_config({'enabled': False}) is None
+
+    def test_off_without_section(self):
+        """Test a config without a circuit_breaker section probes every endpoint."""
+        config = Config(apis=[APIConfig("A", "https://a.com")])
+
+        assert create_circuit_breakers_from_config(None) is None
+        assert create_circuit_breakers_from_config({}) is None
+        assert Scheduler(config).breakers is None
+
+
+class TestCheckerIntegration:
+    """Tests for circuit breakers in the probe engines."""
+
+    def test_check_api_fails_fast(self):
+        """Test an unreachable endpoint is not probed while its circuit is open."""
+        api = APIConfig("Dead", "https://dead.example.com", timeout=5)
+        breakers = CircuitBreakers(failure_threshold=2, clock=ManualClock())
+        refused = CheckResult("Dead", api.url, None, 5000.0, False, error="Timeout after 5.0s", timeout=True)
+
+        with patch('api_monitor.checker._probe_api', return_value=refused) as probe:
+            results = [check_api(api, breakers=breakers) for _ in range(5)]
+
+        assert probe.call_count == 2
+        assert [r.circuit_open for r in results] == [False, False, True, True, True]
+        fast = results[-1]
+        assert (fast.success, fast.status_code, fast.latency_ms) == (False, None, 0.0)
+        assert fast.error.startswith("Circuit open")
+
+    def test_error_status_keeps_circuit_closed(self):
+        """Test endpoints that answer (even with errors) are always probed."""
+        api = APIConfig("Broken", "https://broken.example.com")
+        breakers = CircuitBreakers(failure_threshold=1, clock=ManualClock())
+        answer = CheckResult("Broken", api.url, 503, 3.0, False)
+
+        with patch('api_monitor.checker._probe_api', return_value=answer) as probe:
+            for _ in range(3):
+                check_api(api, breakers=breakers)
+
+        assert probe.call_count == 3
+        assert breakers.state(probe_key(api)) == CLOSED
+
+    def test_async_sweep_skips_dead_endpoint(self, stub_server):
+        """Test the asyncio engine fails fast on an open circuit and still checks the rest."""
+        base_url, server = stub_server
+        apis = [APIConfig("Dead", dead_url(), timeout=2), APIConfig("Alive", f"{base_url}/status/200")]
+        breakers = CircuitBreakers(failure_threshold=1)
+        checker = AsyncChecker(concurrency=10, breakers=breakers)
+
+        first = checker.run(apis)
+        started = time.perf_counter()
+        second = checker.run(apis)
+
+        assert first[0].error == "Connection error" and not first[0].circuit_open
+        assert second[0].circuit_open
+        assert second[1].success and not second[1].circuit_open
+        assert len(server.requests_seen) == 2
+        assert time.perf_counter() - started < 1.0
+
+    def test_fast_failures_not_cached(self):
+        """Test circuit-open results do not replace cached probe results."""
+        api = APIConfig("Dead", "https://dead.example.com")
+        cache = ResultCache(default_ttl=60, stale_while_revalidate=60)
+        breakers = CircuitBreakers(failure_threshold=1, clock=ManualClock())
+        breakers.record(probe_key(api), False)
+        try:
+            results = check_all_apis([api], cache=cache, breakers=breakers)
+            assert results[0].circuit_open
+            assert cache.get(api.name, api.url) is None
+        finally:
+            cache.close()
+
+    def test_worker_frame_keeps_flag(self):
+        """Test the flag survives the worker result encoding."""
+        api = APIConfig("Dead", "https://dead.example.com")
+        result = CheckResult("0", api.url, None, 0.0, False, error="Circuit open", circuit_open=True)
+
+        (_, decoded), = decode_results(encode_result(0, result), [api])
+
+        assert decoded.circuit_open
+
+
+class TestNotifications:
+    """Tests for notification state with open circuits."""
+
+    def test_fast_failures_do_not_renotify(self):
+        """Test fast failures of an open circuit do not repeat the failure alert."""
+        service = NotificationService(NotificationConfig(email_enabled=True, notify_on_all_failures=True))
+        probed = CheckResult("A", "https://a.com", None, 5000.0, False, error="Timeout", timeout=True)
+        fast = CheckResult("A", "https://a.com", None, 0.0, False, error="Circuit open", circuit_open=True)
+
+        with patch.object(service, 'send_email', return_value=True) as send:
+            assert service.notify([probed]) is True
+            assert service.notify([fast]) is False
+            assert service.notify([fast]) is False
+            assert service.notify([probed]) is True  # A probe that fails again is reported
+
+        assert service.last_notified_state == {"A": True}
+        assert send.call_count == 2
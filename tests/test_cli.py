@@ -1,6 +1,7 @@
 """Tests for CLI module."""
 
 import pytest
+import subprocess
 import sys
 import tempfile
 import yaml
@@ -9,6 +10,31 @@ from unittest.mock import patch, MagicMock
 from api_monitor.cli import run_command, setup_logging
 
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Total import time of `api-monitor run --format json` (python -X importtime, best of 3)
+IMPORT_BUDGET_MS = 400
+
+# Modules a single run must not import
+DEFERRED_MODULES = (
+    'api_monitor.web_server', 'api_monitor.scheduler', 'api_monitor.notifier', 'api_monitor.workers',
+    'api_monitor.agent', 'api_monitor.aggregator', 'api_monitor.history',
+    'tabulate', 'smtplib', 'email.mime', 'multiprocessing', 'sqlite3'
+)
+
+
+def import_profile(*args):
+    """Runs the CLI under -X importtime; returns exit code and {module: self time in us}."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'api_monitor.cli', *args],
+                               cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60)
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith('import time:') and 'self [us]' not in line:
+            self_us, _, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = int(self_us)
+    return completed.returncode, modules
+
+
 class TestRunCommand:
     """Tests for run_command function."""
     
@@ -136,3 +162,30 @@ class TestSetupLogging:
         setup_logging(str(log_file))
         # If function executed without errors, test passed
 
+
+class TestStartupImports:
+    """Tests for CLI startup cost."""
+    
+    @pytest.fixture
+    def json_config(self, stub_server, tmp_path):
+        """Configuration with one loopback API and JSON output."""
+        base_url, _ = stub_server
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(f"apis:\n  - name: Stub\n    url: {base_url}/status/200\n", encoding='utf-8')
+        return str(config_file)
+    
+    def test_run_json_skips_deferred_modules(self, json_config):
+        """Test single JSON run does not import other subcommands' modules."""
+        exit_code, modules = import_profile('run', json_config, '--format', 'json')
+        
+        assert exit_code == 0
+        assert 'api_monitor.checker' in modules
+        loaded = [name for name in modules if name.startswith(DEFERRED_MODULES)]
+        assert loaded == []
+    
+    def test_run_json_import_budget(self, json_config):
+        """Test import time of a single JSON run stays within budget."""
+        best_ms = min(sum(import_profile('run', json_config, '--format', 'json')[1].values()) / 1000
+                      for _ in range(3))
+        
+        assert best_ms < IMPORT_BUDGET_MS, f"Imports took {best_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
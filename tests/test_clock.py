@@ -0,0 +1,112 @@
+"""Tests for time sources and clock injection."""
+
+import io
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.checker import CheckResult, check_api
+from api_monitor.clock import SYSTEM_CLOCK, ManualClock, elapsed_ms
+from api_monitor.loader import APIConfig
+from api_monitor.reporter import result_to_record
+from api_monitor.workers import decode_results, encode_result
+
+
+class TestClocks:
+    """Tests for Clock and ManualClock."""
+
+    def test_system_clock(self):
+        """Test the system clock's counters move forward."""
+        start = SYSTEM_CLOCK.perf_counter_ns()
+        before = SYSTEM_CLOCK.monotonic()
+        SYSTEM_CLOCK.sleep(0.001)
+
+        assert elapsed_ms(start, SYSTEM_CLOCK.perf_counter_ns()) >= 1.0
+        assert SYSTEM_CLOCK.monotonic() > before
+
+    def test_manual_clock(self):
+        """Test sleep advances all readings; wall steps leave monotonic time alone."""
+        clock = ManualClock(start=10.0, wall=1000.0)
+        clock.sleep(2.5)
+        clock.step_wall(-3600)
+
+        assert clock.monotonic() == 12.5
+        assert clock.perf_counter_ns() == 12_500_000_000
+        assert clock.time() == 1000.0 + 2.5 - 3600
+        assert clock.sleeps == 1
+        with pytest.raises(ValueError):
+            clock.advance(-1)
+
+
+class TestLatency:
+    """Tests for latency measured on the injected clock."""
+
+    def test_wall_clock_step_does_not_change_latency(self, clock):
+        """Test an NTP step during a probe neither shortens nor inflates latency."""
+        def respond(**kwargs):
+            clock.advance(0.25)
+            clock.step_wall(-3600)
+            return Mock(status_code=200, raw=io.BytesIO(b''))
+
+        started = clock.time()
+        with patch('api_monitor.checker.requests.request', side_effect=respond):
+            result = check_api(APIConfig("A", "https://a.example.com"), clock=clock)
+
+        assert result.latency_ms == 250.0
+        assert result.checked_at == started
+
+    def test_timeout_latency(self, clock):
+        """Test failed probes are timed on the same clock."""
+        def time_out(**kwargs):
+            clock.advance(5)
+            raise requests.exceptions.Timeout()
+
+        with patch('api_monitor.checker.requests.request', side_effect=time_out):
+            result = check_api(APIConfig("A", "https://a.example.com", timeout=5), clock=clock)
+
+        assert result.timeout and result.latency_ms == 5000.0
+
+    def test_async_engine(self, clock):
+        """Test the asyncio engine times probes on the injected clock."""
+        async def fetch(api_config, timings):
+            clock.advance(0.04)
+            clock.step_wall(120)
+            return 200, 0, False
+
+        checker = AsyncChecker(clock=clock)
+        with patch.object(checker, '_fetch', side_effect=fetch):
+            result, = checker.run([APIConfig("A", "https://a.example.com")])
+
+        assert result.latency_ms == 40.0
+        assert result.checked_at == 1_700_000_000.0
+
+
+    def test_async_phase_timings(self, stub_server):
+        """Test phase timings of the asyncio engine are read from the injected clock."""
+        class StepClock(ManualClock):
+            def perf_counter_ns(self):
+                self.advance(0.001)  # Every reading is one millisecond after the previous one
+                return super().perf_counter_ns()
+
+        base_url, _ = stub_server
+        result, = AsyncChecker(phases=True, clock=StepClock()).run([APIConfig("A", f"{base_url}/status/200")])
+
+        assert result.phases.to_dict() == {'dns_ms': 1.0, 'connect_ms': 1.0, 'tls_ms': 0.0,
+                                           'ttfb_ms': 1.0, 'body_ms': 1.0}
+        assert result.latency_ms == 7.0
+
+
+class TestTimestamps:
+    """Tests for the wall-clock timestamp kept on results."""
+
+    def test_record_and_worker_frame(self):
+        """Test checked_at is reported in JSON Lines and survives worker frames."""
+        api = APIConfig("A", "https://a.com")
+        result = CheckResult("0", api.url, 200, 1.0, True, checked_at=1_700_000_000.5)
+
+        (_, decoded), = decode_results(encode_result(0, result), [api])
+
+        assert decoded.checked_at == 1_700_000_000.5
+        assert result_to_record(result)["checked_at"] == "2023-11-14T22:13:20.500+00:00"
+        assert "checked_at" not in result_to_record(CheckResult("A", api.url, 200, 1.0, True))
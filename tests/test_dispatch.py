@@ -0,0 +1,104 @@
+"""Tests for host-aware dispatcher."""
+
+import asyncio
+import pytest
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.dispatch import (
+    HostDispatcher, HostLimits, HostPolicy, create_host_limits_from_config, host_of
+)
+from api_monitor.loader import APIConfig
+
+
+async def run_probes(dispatcher, hosts, duration=0.02):
+    """Runs one probe per host entry; returns start order and peak in-flight counts."""
+    started = []
+    peak = {'total': 0}
+    current = {}
+
+    async def probe(host):
+        async with dispatcher.slot(host):
+            started.append((host, asyncio.get_running_loop().time()))
+            current[host] = current.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), current[host])
+            peak['total'] = max(peak['total'], dispatcher.in_flight)
+            await asyncio.sleep(duration)
+            current[host] -= 1
+
+    await asyncio.gather(*(probe(host) for host in hosts))
+    return started, peak
+
+
+class TestHostDispatcher:
+    """Tests for HostDispatcher."""
+
+    def test_host_of(self):
+        """Test host key ignores case, port and path."""
+        assert host_of("https://API.Example.com:8443/health?x=1") == "api.example.com"
+
+    def test_invalid_limit(self):
+        """Test global limit validation."""
+        with pytest.raises(ValueError):
+            HostDispatcher(0)
+
+    def test_global_and_per_host_caps(self):
+        """Test neither cap is exceeded."""
+        limits = HostLimits(default=HostPolicy(max_in_flight=2))
+        hosts = ["gateway"] * 20 + ["a", "b", "c"] * 3
+        _, peak = asyncio.run(run_probes(HostDispatcher(5, limits), hosts))
+
+        assert peak['total'] == 5
+        assert peak['gateway'] == 2
+        assert all(peak[host] <= 2 for host in "abc")
+
+    def test_round_robin_across_hosts(self):
+        """Test busy host does not starve hosts listed after it."""
+        hosts = ["gateway"] * 6 + ["a", "b"]
+        started, _ = asyncio.run(run_probes(HostDispatcher(1), hosts, duration=0))
+
+        assert [host for host, _ in started[:3]] == ["gateway", "a", "b"]
+
+    def test_min_interval(self):
+        """Test probe starts to one host are spaced."""
+        limits = HostLimits(hosts={"slow": HostPolicy(min_interval=0.05)})
+        started, _ = asyncio.run(run_probes(HostDispatcher(10, limits), ["slow"] * 3 + ["fast"] * 3, duration=0))
+
+        slow = [at for host, at in started if host == "slow"]
+        fast = [at for host, at in started if host == "fast"]
+        assert all(later - earlier >= 0.045 for earlier, later in zip(slow, slow[1:]))
+        assert fast[-1] - fast[0] < 0.03
+
+    def test_cancelled_waiter_frees_queue(self):
+        """Test cancelled waiter is skipped and does not leak a slot."""
+        async def scenario():
+            dispatcher = HostDispatcher(1)
+            await dispatcher.acquire("a")
+            waiter = asyncio.ensure_future(dispatcher.acquire("a"))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            dispatcher.release("a")
+            await asyncio.wait_for(dispatcher.acquire("a"), timeout=1)
+            return dispatcher.in_flight
+
+        assert asyncio.run(scenario()) == 1
+
+    def test_create_from_config(self):
+        """Test host overrides inherit defaults."""
+        limits = create_host_limits_from_config({
+            'max_in_flight': 50, 'per_host': 4, 'min_interval': 0.1,
+            'hosts': {'Gateway.internal': {'per_host': 2}}
+        })
+
+        assert limits.max_in_flight == 50
+        assert limits.policy("other.com") == HostPolicy(max_in_flight=4, min_interval=0.1)
+        assert limits.policy("gateway.internal") == HostPolicy(max_in_flight=2, min_interval=0.1)
+        assert create_host_limits_from_config(None) == HostLimits()
+
+    def test_async_checker_respects_per_host_cap(self, stub_server):
+        """Test sweep sends at most per_host probes to one host at a time."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.1?i={i}") for i in range(8)]
+        limits = HostLimits(default=HostPolicy(max_in_flight=2))
+        results = AsyncChecker(concurrency=10, host_limits=limits).run(apis)
+
+        assert all(r.success for r in results)
+        assert server.max_in_flight == 2
@@ -0,0 +1,203 @@
+"""Tests for dashboard event stream."""
+
+import json
+import socket
+import threading
+import pytest
+from api_monitor.events import EventBroker, format_event
+from api_monitor.web_server import MonitoringHandler, PooledHTTPServer
+
+
+def result(name: str, latency: float = 100.0, success: bool = True):
+    return {'name': name, 'url': f"https://{name}.com", 'status_code': 200 if success else 500,
+            'latency_ms': latency, 'success': success, 'error': None, 'timeout': False}
+
+
+def parse(frame: bytes):
+    fields = dict(line.split(': ', 1) for line in frame.decode('utf-8').strip().split('\n'))
+    return fields['event'], int(fields['id']), json.loads(fields['data'])
+
+
+class TestEventBroker:
+    """Tests for EventBroker."""
+
+    def test_format_event(self):
+        """Test SSE frame encoding."""
+        assert format_event('update', {'a': 1}, 7) == b'id: 7\nevent: update\ndata: {"a":1}\n\n'
+
+    def test_new_stream_gets_snapshot(self):
+        """Test stream without Last-Event-ID starts with full state."""
+        broker = EventBroker()
+        broker.publish([result("A"), result("B")], {'total_checks': 1}, "t1")
+
+        seq, frames = broker.next_frames(None)
+        event, event_id, data = parse(frames[0])
+
+        assert (event, event_id, seq) == ('snapshot', 1, 1)
+        assert [r['name'] for r in data['results']] == ["A", "B"]
+        assert data['stats'] == {'total_checks': 1}
+
+    def test_update_contains_only_changes(self):
+        """Test unchanged results and small latency jitter are not resent."""
+        broker = EventBroker(latency_tolerance=0.1)
+        broker.publish([result("A"), result("B"), result("C")], {}, "t1")
+        broker.publish([result("A", latency=105.0), result("B", success=False), result("C", latency=150.0)], {}, "t2")
+
+        seq, frames = broker.next_frames(1, timeout=0)
+        event, event_id, data = parse(frames[0])
+
+        assert (event, seq) == ('update', 2)
+        assert [r['name'] for r in data['changed']] == ["B", "C"]
+        assert data['removed'] == []
+        assert 'order' not in data
+
+    def test_per_check_metadata_not_a_change(self):
+        """Test a result differing only in checked_at and similar fields is not resent."""
+        broker = EventBroker()
+        first = dict(result("A"), checked_at="2025-01-15T10:29:59.998+00:00", connection_reused=False,
+                     bytes_read=120)
+        second = dict(result("A"), checked_at="2025-01-15T10:30:59.998+00:00", connection_reused=True,
+                      bytes_read=118)
+        broker.publish([first], {}, "t1")
+        broker.publish([second], {}, "t2")
+
+        _, frames = broker.next_frames(1, timeout=0)
+
+        assert parse(frames[0])[2]['changed'] == []
+
+    def test_jitter_compared_with_published_value(self):
+        """Test latency drift accumulates until it exceeds tolerance."""
+        broker = EventBroker(latency_tolerance=0.1)
+        broker.publish([result("A", latency=100.0)], {}, "t1")
+        broker.publish([result("A", latency=108.0)], {}, "t2")
+        broker.publish([result("A", latency=116.0)], {}, "t3")
+
+        _, frames = broker.next_frames(1, timeout=0)
+
+        assert [parse(f)[2]['changed'] for f in frames] == [[], [result("A", latency=116.0)]]
+
+    def test_removed_and_reordered(self):
+        """Test removed APIs and new order are sent."""
+        broker = EventBroker()
+        broker.publish([result("A"), result("B")], {}, "t1")
+        broker.publish([result("C"), result("A")], {}, "t2")
+
+        _, frames = broker.next_frames(1, timeout=0)
+        data = parse(frames[0])[2]
+
+        assert data['removed'] == ["B"]
+        assert data['order'] == ["C", "A"]
+        assert [r['name'] for r in data['changed']] == ["C"]
+
+    def test_stale_stream_resyncs_with_snapshot(self):
+        """Test stream behind the backlog gets a snapshot."""
+        broker = EventBroker(backlog=2)
+        for i in range(5):
+            broker.publish([result("A", latency=100.0 * (i + 1))], {}, f"t{i}")
+
+        seq, frames = broker.next_frames(1, timeout=0)
+
+        assert seq == 5
+        assert parse(frames[0])[0] == 'snapshot'
+        assert parse(broker.next_frames(3, timeout=0)[1][0])[0] == 'update'
+
+    def test_waits_for_next_sweep(self):
+        """Test stream blocks until publish and times out when idle."""
+        broker = EventBroker()
+        broker.publish([result("A")], {}, "t1")
+        assert broker.next_frames(1, timeout=0.01) == (1, [])
+
+        timer = threading.Timer(0.05, broker.publish, args=([result("A", success=False)], {}, "t2"))
+        timer.start()
+        seq, frames = broker.next_frames(1, timeout=5)
+        timer.join()
+
+        assert seq == 2
+        assert len(frames) == 1
+
+    def test_close_releases_streams(self):
+        """Test close wakes waiting streams."""
+        broker = EventBroker()
+        threading.Timer(0.05, broker.close).start()
+
+        assert broker.next_frames(0, timeout=5) == (0, [])
+        assert broker.closed
+
+
+class FakeServerInstance:
+    """Minimal WebMonitoringServer stand-in for handler tests."""
+
+    def __init__(self, max_streams: int = 4):
+        self.events = EventBroker()
+        self.stream_slots = threading.BoundedSemaphore(max_streams)
+
+
+class TestEventsEndpoint:
+    """Tests for /api/events endpoint."""
+
+    @pytest.fixture
+    def dashboard(self):
+        instance = FakeServerInstance()
+        previous = MonitoringHandler.monitoring_data.get('server_instance')
+        MonitoringHandler.monitoring_data['server_instance'] = instance
+        server = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=4)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        yield server.server_address[1], instance
+        instance.events.close()
+        server.shutdown()
+        server.server_close()
+        MonitoringHandler.monitoring_data['server_instance'] = previous
+
+    def _read_event(self, sock, event: bytes) -> bytes:
+        """Reads stream until a complete frame of the given event arrives."""
+        data = b''
+        while event not in data or not data.endswith(b'\n\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def test_stream_snapshot_then_update(self, dashboard):
+        """Test stream sends snapshot on connect and update after sweep."""
+        port, instance = dashboard
+        instance.events.publish([result("A")], {'total_checks': 1}, "t1")
+
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            head = self._read_event(sock, b'event: snapshot')
+            assert b'text/event-stream' in head
+            assert b'retry: ' in head
+
+            instance.events.publish([result("A", success=False)], {'total_checks': 2}, "t2")
+            event, _, data = parse(self._read_event(sock, b'event: update'))
+
+        assert event == 'update'
+        assert data['changed'][0]['success'] is False
+        assert data['stats'] == {'total_checks': 2}
+
+    def test_resume_with_last_event_id(self, dashboard):
+        """Test reconnecting stream receives missed updates only."""
+        port, instance = dashboard
+        instance.events.publish([result("A")], {}, "t1")
+        instance.events.publish([result("A", success=False)], {}, "t2")
+
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\nLast-Event-ID: 1\r\n\r\n")
+            data = self._read_event(sock, b'event: update')
+
+        assert b'event: snapshot' not in data
+        assert b'event: update' in data
+
+    def test_stream_limit(self, dashboard):
+        """Test streams over the limit are rejected so dashboards fall back to polling."""
+        port, instance = dashboard
+        for _ in range(4):
+            instance.stream_slots.acquire()
+
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            status_line = sock.recv(65536).split(b'\r\n')[0]
+
+        assert b'503' in status_line
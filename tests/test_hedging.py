@@ -0,0 +1,183 @@
+"""Tests for hedged requests."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.checker import CheckResult, check_api, probe_key
+from api_monitor.hedging import Hedger, create_hedger_from_config
+from api_monitor.loader import APIConfig
+
+
+API = APIConfig("Slow", "https://slow.example.com")
+KEY = probe_key(API)
+
+
+def answered(latency_ms: float) -> CheckResult:
+    """Returns a successful result with given latency."""
+    return CheckResult(API.name, API.url, 200, latency_ms, True)
+
+
+def fake_probes(*plan):
+    """
+    Returns a stand-in for AsyncChecker.check_api.
+
+    Each call takes the next (seconds, status_code) pair from the plan,
+    sleeps and answers; the calls are counted in `calls`.
+    """
+    calls = []
+
+    async def probe(self, api_config):
+        seconds, status = plan[len(calls)]
+        calls.append(seconds)
+        await asyncio.sleep(seconds)
+        return CheckResult(api_config.name, api_config.url, status, seconds * 1000, status is not None)
+
+    probe.calls = calls
+    return probe
+
+
+def warmed(latency_ms: float = 10.0, **kwargs) -> Hedger:
+    """Returns hedger that has seen enough probes of API to hedge it."""
+    hedger = Hedger(min_samples=5, **kwargs)
+    for _ in range(5):
+        hedger.observe(KEY, answered(latency_ms))
+    return hedger
+
+
+class TestHedger:
+    """Tests for Hedger delay and budget."""
+
+    def test_no_delay_before_min_samples(self):
+        """Test endpoints without enough samples are not hedged."""
+        hedger = Hedger(min_samples=3)
+        hedger.observe(KEY, answered(10.0))
+        hedger.observe(KEY, CheckResult(API.name, API.url, None, 5000.0, False, timeout=True))
+
+        assert hedger.delay(KEY) is None
+        assert hedger.probes == 1
+
+    def test_delay_follows_percentile(self):
+        """Test the hedge delay is the endpoint's latency percentile."""
+        hedger = Hedger(percentile=0.9, min_samples=10)
+        for latency in range(1, 101):
+            hedger.observe(KEY, answered(float(latency)))
+
+        assert hedger.delay(KEY) == pytest.approx(0.090, rel=0.05)
+        assert hedger.delay(('GET', 'https://other.com', '', False)) is None
+
+    def test_min_delay(self):
+        """Test very fast endpoints still wait min_delay_ms."""
+        assert warmed(0.01, min_delay_ms=2.0).delay(KEY) == pytest.approx(0.002)
+
+    def test_budget_caps_hedges(self):
+        """Test hedges stay within budget per probe plus burst."""
+        hedger = Hedger(budget=0.1, burst=2)
+        sent = 0
+        for _ in range(100):
+            hedger.delay(KEY)
+            sent += hedger.acquire()
+
+        assert sent == 11  # Burst, then one per ten probes
+        assert hedger.stats()['hedge_rate'] == pytest.approx(0.11)
+
+    def test_stats(self):
+        """Test wins and saved latency are reported."""
+        hedger = Hedger()
+        hedger.record_win(40.0)
+        hedger.record_win(-5.0)  # Primary answered in the meantime
+
+        assert hedger.stats() == {'probes': 0, 'hedges': 0, 'hedge_rate': 0.0, 'wins': 2,
+                                  'saved_ms': 40.0, 'saved_ms_per_win': 20.0}
+
+    @pytest.mark.parametrize("kwargs", [{'percentile': 1}, {'budget': 0}, {'burst': 0.5},
+                                        {'min_samples': 0}, {'min_delay_ms': -1}])
+    def test_invalid(self, kwargs):
+        """Test settings are validated."""
+        with pytest.raises(ValueError):
+            Hedger(**kwargs)
+
+    def test_create_from_config(self):
+        """Test hedging is off unless configured."""
+        assert create_hedger_from_config(None) is None
+        assert create_hedger_from_config({'enabled': False}) is None
+        hedger = create_hedger_from_config({'percentile': 0.99, 'budget': 0.02, 'min_samples': 50})
+        assert (hedger.percentile, hedger.budget, hedger.min_samples) == (0.99, 0.02, 50)
+
+
+class TestHedgedChecks:
+    """Tests for hedged probes in the asyncio engine."""
+
+    def test_hedge_wins_slow_probe(self):
+        """Test a probe slower than the percentile is answered by the hedge."""
+        hedger = warmed(10.0)
+        probe = fake_probes((0.5, 200), (0.01, 200))
+
+        with patch.object(AsyncChecker, 'check_api', probe):
+            result, = AsyncChecker(hedger=hedger).run([API])
+
+        assert len(probe.calls) == 2
+        assert result.success and result.latency_ms < 200
+        stats = hedger.stats()
+        assert (stats['probes'], stats['hedges'], stats['wins']) == (1, 1, 1)
+        assert stats['saved_ms'] > 0
+
+    def test_fast_probe_not_hedged(self):
+        """Test a probe answered before the delay sends no hedge."""
+        hedger = warmed(100.0)
+        probe = fake_probes((0.01, 200))
+
+        with patch.object(AsyncChecker, 'check_api', probe):
+            result, = AsyncChecker(hedger=hedger).run([API])
+
+        assert len(probe.calls) == 1
+        assert result.latency_ms == 10.0
+        assert hedger.stats()['hedges'] == 0
+
+    def test_primary_can_still_win(self):
+        """Test the first request wins if it answers before the hedge."""
+        hedger = warmed(10.0)
+        probe = fake_probes((0.05, 200), (0.5, 200))
+
+        with patch.object(AsyncChecker, 'check_api', probe):
+            result, = AsyncChecker(hedger=hedger).run([API])
+
+        assert len(probe.calls) == 2
+        assert result.latency_ms < 200
+        assert hedger.stats()['wins'] == 0
+
+    def test_failed_hedge_waits_for_primary(self):
+        """Test a hedge without response does not replace a slower answer."""
+        hedger = warmed(10.0)
+        probe = fake_probes((0.1, 200), (0.01, None))
+
+        with patch.object(AsyncChecker, 'check_api', probe):
+            result, = AsyncChecker(hedger=hedger).run([API])
+
+        assert result.status_code == 200
+        assert result.latency_ms >= 100
+        assert hedger.stats()['wins'] == 0
+
+    def test_budget_exhausted(self):
+        """Test no hedge is sent without budget."""
+        hedger = warmed(10.0, burst=1)
+        hedger.acquire()
+        probe = fake_probes((0.05, 200))
+
+        with patch.object(AsyncChecker, 'check_api', probe):
+            result, = AsyncChecker(hedger=hedger).run([API])
+
+        assert len(probe.calls) == 1
+        assert result.latency_ms == 50.0
+
+    def test_sync_check_api(self):
+        """Test check_api hedges on the asyncio engine."""
+        hedger = warmed(10.0)
+        probe = fake_probes((0.5, 200), (0.01, 200))
+
+        with patch.object(AsyncChecker, 'check_api', probe):
+            result = check_api(API, hedger=hedger)
+
+        assert len(probe.calls) == 2
+        assert result.success and result.latency_ms < 200
@@ -0,0 +1,130 @@
+"""Tests for persistent history store."""
+
+import time
+import pytest
+from dataclasses import replace
+from api_monitor.history import RETENTION_CHECK_INTERVAL, HistoryStore, create_history_store_from_config
+from api_monitor.checker import CheckResult
+
+
+NOW = time.time()
+BASE = int(NOW) - 3600  # Inside default retention window
+
+
+def make_results(success: bool = True):
+    return [
+        CheckResult("API 1", "https://api1.com", 200 if success else 500, 100.0, success),
+        CheckResult("API 2", "https://api2.com", None, 5000.0, False, "Timeout after 5.0s", True),
+    ]
+
+
+class TestHistoryStore:
+    """Tests for HistoryStore."""
+
+    def test_record_and_query(self, tmp_path):
+        """Test saving sweep and reading range of one API."""
+        store = HistoryStore(str(tmp_path / "history.db"))
+        store.record(make_results(), timestamp=BASE)
+        store.record(make_results(success=False), timestamp=BASE + 30)
+
+        rows = store.query("API 1", start=BASE, end=NOW)
+
+        assert [row['timestamp'] for row in rows] == [BASE, BASE + 30]
+        assert rows[0]['success'] is True
+        assert rows[1]['status_code'] == 500
+        timeout_row = store.query("API 2", start=BASE, end=NOW)[0]
+        assert timeout_row['timeout'] is True
+        assert timeout_row['error'] == "Timeout after 5.0s"
+        store.close()
+
+    def test_skips_stale_and_repeated_results(self, tmp_path):
+        """Test stale copies and results served again from cache are not stored."""
+        store = HistoryStore(":memory:")
+        results = make_results()
+        store.record(results, timestamp=BASE)
+        store.record(results, timestamp=BASE + 30)  # Same objects from cache
+        store.record([replace(results[0], stale=True)], timestamp=BASE + 60)
+
+        assert store.count() == 2
+        store.close()
+
+    def test_rows_stamped_with_checked_at(self, tmp_path):
+        """Test rows use the time each check started, not the sweep time."""
+        store = HistoryStore(":memory:")
+        results = make_results()
+        results[0] = replace(results[0], checked_at=BASE + 1.5)
+        store.record(results, timestamp=BASE + 10)
+
+        assert store.query("API 1", start=BASE, end=NOW)[0]['timestamp'] == BASE + 1.5
+        assert store.query("API 2", start=BASE, end=NOW)[0]['timestamp'] == BASE + 10
+        store.close()
+
+    def test_query_range_and_limit(self, tmp_path):
+        """Test range bounds and limit (newest rows kept)."""
+        store = HistoryStore(str(tmp_path / "history.db"))
+        base = BASE
+        for i in range(10):
+            store.record(make_results(), timestamp=base + i * 30)
+
+        assert len(store.query("API 1", start=base + 60, end=base + 150)) == 4
+        limited = store.query("API 1", start=base, end=NOW, limit=3)
+        assert [row['timestamp'] for row in limited] == [base + 210, base + 240, base + 270]
+        assert store.query("Unknown", start=base, end=NOW) == []
+        store.close()
+
+    def test_persists_across_restart(self, tmp_path):
+        """Test history survives reopening the database."""
+        path = str(tmp_path / "history.db")
+        store = HistoryStore(path)
+        store.record(make_results(), timestamp=BASE)
+        store.close()
+
+        reopened = HistoryStore(path)
+        assert reopened.count() == 2
+        assert reopened.api_names() == ["API 1", "API 2"]
+        assert len(reopened.query("API 1", start=BASE, end=NOW)) == 1
+        reopened.close()
+
+    def test_wal_mode(self, tmp_path):
+        """Test database runs in WAL mode."""
+        store = HistoryStore(str(tmp_path / "history.db"))
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+        store.close()
+
+    def test_retention(self, tmp_path):
+        """Test old results are removed."""
+        store = HistoryStore(str(tmp_path / "history.db"), retention_days=1)
+        store.record(make_results(), timestamp=NOW - 2 * 86400)
+        assert store.count() == 0  # Removed by automatic retention pass
+
+        store.record(make_results(), timestamp=NOW - 3600)
+        store.record(make_results(), timestamp=NOW)
+        assert store.apply_retention(now=NOW + 86400 - 60) == 2
+        assert store.count() == 2
+        store.close()
+
+    def test_retention_passes_on_clock(self, clock):
+        """Test automatic retention passes are spaced on the injected clock."""
+        store = HistoryStore(":memory:", retention_days=1, clock=clock)
+        store.record(make_results(), timestamp=clock.time() - 3600)
+        clock.step_wall(86400)  # Rows are now past retention, but the next pass is not due
+        store.record(make_results(success=False))
+        assert store.count() == 4
+
+        clock.advance(RETENTION_CHECK_INTERVAL)
+        store.record([CheckResult("API 1", "https://api1.com", 200, 90.0, True)])
+        assert store.count() == 3
+        store.close()
+
+    def test_invalid_retention(self):
+        """Test retention validation."""
+        with pytest.raises(ValueError):
+            HistoryStore(":memory:", retention_days=-1)
+
+    def test_create_from_config(self, tmp_path):
+        """Test creating store from configuration."""
+        assert create_history_store_from_config(None) is None
+        store = create_history_store_from_config({'path': str(tmp_path / "h.db"), 'retention_days': 7})
+        assert store.retention_days == 7.0
+        store.close()
@@ -0,0 +1,70 @@
+"""Tests for precompressed static responses."""
+
+import gzip
+import zlib
+from api_monitor.http_cache import CachedResponse, choose_encoding, etag_matches
+
+
+class TestChooseEncoding:
+    """Tests for choose_encoding."""
+
+    def test_no_header(self):
+        """Test missing header means identity."""
+        assert choose_encoding(None) == 'identity'
+        assert choose_encoding('') == 'identity'
+
+    def test_prefers_gzip(self):
+        """Test gzip wins on equal quality."""
+        assert choose_encoding('gzip, deflate, br') == 'gzip'
+        assert choose_encoding('deflate, gzip') == 'gzip'
+
+    def test_quality_values(self):
+        """Test q-values and q=0 exclusion."""
+        assert choose_encoding('gzip;q=0.5, deflate') == 'deflate'
+        assert choose_encoding('gzip;q=0, deflate;q=0') == 'identity'
+        assert choose_encoding('*') == 'gzip'
+        assert choose_encoding('br') == 'identity'
+
+
+class TestEtagMatches:
+    """Tests for etag_matches."""
+
+    def test_matching(self):
+        """Test list, weak and wildcard validators."""
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('"x", W/"abc"', '"abc"')
+        assert etag_matches('*', '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+
+class TestCachedResponse:
+    """Tests for CachedResponse."""
+
+    def test_build(self):
+        """Test all encodings decode to the body and have distinct ETags."""
+        body = b"<html>" + b"dashboard " * 1000 + b"</html>"
+        response = CachedResponse.build(body, 'text/html; charset=utf-8')
+
+        assert gzip.decompress(response.bodies['gzip']) == body
+        assert zlib.decompress(response.bodies['deflate']) == body
+        assert len(response.bodies['gzip']) < len(body) / 10
+        assert len(set(response.etags.values())) == 3
+        assert response.cache_control == 'no-cache'
+
+    def test_deterministic(self):
+        """Test same body gives same bytes and ETags (stable across restarts)."""
+        first = CachedResponse.build(b"page", 'text/html')
+        second = CachedResponse.build(b"page", 'text/html')
+
+        assert first.bodies == second.bodies
+        assert first.etags == second.etags
+
+    def test_select(self):
+        """Test representation selection."""
+        response = CachedResponse.build(b"page", 'text/html')
+        encoding, body, etag = response.select('gzip')
+
+        assert encoding == 'gzip'
+        assert body == response.bodies['gzip']
+        assert etag == response.etags['gzip']
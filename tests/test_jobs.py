@@ -0,0 +1,75 @@
+"""Tests for refresh job queue."""
+
+import threading
+from api_monitor.jobs import RefreshQueue
+
+
+class TestRefreshQueue:
+    """Tests for RefreshQueue."""
+
+    def test_pending_job_coalesces_requests(self):
+        """Test requests before the worker picks the job share it."""
+        queue = RefreshQueue()
+        job, created = queue.request(3)
+        again, created_again = queue.request(3)
+
+        assert created and not created_again
+        assert again is job
+        assert job.requests == 2
+
+        assert queue.wait(timeout=0) is job
+        assert job.status == 'running'
+        assert queue.request(3)[0] is not job  # Running sweep does not absorb new requests
+
+    def test_progress_and_finish(self):
+        """Test partial results and final status."""
+        queue = RefreshQueue()
+        job, _ = queue.request(2)
+        queue.wait(timeout=0)
+        queue.progress(job, {'name': "A"})
+
+        partial = queue.snapshot(job.id)
+        assert (partial['done'], partial['total'], partial['status']) == (1, 2, 'running')
+
+        queue.progress(job, {'name': "B"})
+        queue.finish(job)
+        assert queue.snapshot(job.id)['status'] == 'done'
+        assert [r['name'] for r in queue.snapshot(job.id)['results']] == ["A", "B"]
+
+        failed, _ = queue.request(2)
+        queue.wait(timeout=0)
+        queue.finish(failed, error="boom")
+        assert (failed.status, failed.error) == ('failed', "boom")
+
+    def test_wait_wakes_on_request(self):
+        """Test worker waiting between sweeps starts at once on request."""
+        queue = RefreshQueue()
+        assert queue.wait(timeout=0.01) is None
+
+        timer = threading.Timer(0.05, queue.request, args=(1,))
+        timer.start()
+        job = queue.wait(timeout=5)
+        timer.join()
+
+        assert job is not None and job.status == 'running'
+
+    def test_finished_jobs_are_dropped(self):
+        """Test only max_jobs jobs are kept."""
+        queue = RefreshQueue(max_jobs=2)
+        ids = []
+        for _ in range(3):
+            job, _ = queue.request(1)
+            queue.wait(timeout=0)
+            queue.finish(job)
+            ids.append(job.id)
+
+        assert queue.get(ids[0]) is None
+        assert queue.get(ids[2]) is not None
+
+    def test_close_releases_worker(self):
+        """Test close wakes waiting worker without a job."""
+        queue = RefreshQueue()
+        threading.Timer(0.05, queue.close).start()
+
+        assert queue.wait(timeout=5) is None
+        assert queue.closed
@@ -4,7 +4,7 @@ import pytest
 import tempfile
 import yaml
 from pathlib import Path
-from api_monitor.loader import load_config, APIConfig, Config
+from api_monitor.loader import load_config, save_config, APIConfig, Config
 
 
 class TestAPIConfig:
@@ -285,3 +285,348 @@ class TestLoadConfig:
         finally:
             Path(config_path).unlink()
 
+
+
+class TestConnectionPoolConfig:
+    """Tests for connection_pool section."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_connection_pool_loaded(self):
+        """Test connection_pool settings are loaded."""
+        config = self._load({
+            'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+            'connection_pool': {'pool_size': 5, 'idle_timeout': 30, 'max_age': 300}
+        })
+        assert config.connection_pool == {'pool_size': 5, 'idle_timeout': 30, 'max_age': 300}
+    
+    def test_connection_pool_invalid(self):
+        """Test invalid connection_pool settings."""
+        with pytest.raises(ValueError, match="pool_size"):
+            self._load({
+                'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                'connection_pool': {'pool_size': 0}
+            })
+    
+    @pytest.mark.parametrize("pool_size", [0.5, 2.5, "4", True])
+    def test_pool_size_not_integer(self, pool_size):
+        """Test pool_size must be a whole number of connections."""
+        with pytest.raises(ValueError, match="pool_size must be a positive integer"):
+            self._load({
+                'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                'connection_pool': {'pool_size': pool_size}
+            })
+
+
+class TestPhaseTimingConfig:
+    """Tests for phase_timing option."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_phase_timing_default(self):
+        """Test phase timing is off by default."""
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}]})
+        assert config.phase_timing is False
+    
+    def test_phase_timing_enabled(self):
+        """Test phase timing can be enabled."""
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}], 'phase_timing': True})
+        assert config.phase_timing is True
+    
+    def test_phase_timing_invalid(self):
+        """Test phase_timing must be a boolean."""
+        with pytest.raises(ValueError, match="phase_timing"):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}], 'phase_timing': 'yes please'})
+
+
+class TestIntervalConfig:
+    """Tests for per-API interval and jitter options."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_api_interval_loaded(self):
+        """Test per-API interval and jitter are loaded."""
+        config = self._load({
+            'interval': 600,
+            'jitter': 0.5,
+            'apis': [
+                {'name': 'Critical', 'url': 'https://a.com', 'interval': 10},
+                {'name': 'Other', 'url': 'https://b.com'}
+            ]
+        })
+        assert config.apis[0].interval == 10.0
+        assert config.apis[1].interval is None
+        assert config.jitter == 0.5
+    
+    def test_api_interval_invalid(self):
+        """Test interval must be positive."""
+        with pytest.raises(ValueError, match="interval"):
+            self._load({'apis': [{'name': 'Critical', 'url': 'https://a.com', 'interval': -1}]})
+    
+    def test_jitter_invalid(self):
+        """Test jitter must be between 0 and 1."""
+        with pytest.raises(ValueError, match="jitter"):
+            self._load({'apis': [{'name': 'Critical', 'url': 'https://a.com'}], 'jitter': 2})
+
+
+class TestStaleWhileRevalidateConfig:
+    """Tests for stale_while_revalidate option."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_default_and_loaded(self):
+        """Test option is optional and loaded as seconds."""
+        apis = [{'name': 'Test API', 'url': 'https://example.com'}]
+        assert self._load({'apis': apis}).stale_while_revalidate is None
+        assert self._load({'apis': apis, 'stale_while_revalidate': 120}).stale_while_revalidate == 120.0
+    
+    def test_invalid(self):
+        """Test option cannot be negative."""
+        with pytest.raises(ValueError, match="stale_while_revalidate"):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}], 'stale_while_revalidate': -5})
+
+
+class TestOutputRotationConfig:
+    """Tests for output_rotation section."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_loaded(self):
+        """Test jsonl format and rotation settings are accepted."""
+        rotation = {'max_bytes': 1048576, 'interval': 3600, 'backups': 3}
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                             'output_format': 'jsonl', 'output_rotation': rotation})
+        assert config.output_format == 'jsonl'
+        assert config.output_rotation == rotation
+    
+    @pytest.mark.parametrize("rotation, message", [
+        ('daily', "'output_rotation' section"),
+        ({'max_bytes': 0}, "output_rotation.max_bytes"),
+        ({'interval': 'hourly'}, "output_rotation.interval"),
+        ({'backups': -1}, "output_rotation.backups")
+    ])
+    def test_invalid(self, rotation, message):
+        """Test rotation settings are validated."""
+        with pytest.raises(ValueError, match=message):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}], 'output_rotation': rotation})
+
+
+class TestConcurrencyConfig:
+    """Tests for concurrency section."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_loaded_and_saved(self):
+        """Test section is loaded and written back."""
+        concurrency = {'max_in_flight': 50, 'per_host': 4, 'min_interval': 0.1,
+                       'hosts': {'gateway.internal': {'per_host': 2, 'min_interval': 0.5}}}
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                             'concurrency': concurrency})
+        assert config.concurrency == concurrency
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            config_path = f.name
+        try:
+            save_config(config, config_path)
+            assert load_config(config_path).concurrency == concurrency
+        finally:
+            Path(config_path).unlink()
+    
+    @pytest.mark.parametrize("concurrency, message", [
+        ([1], "'concurrency' section"),
+        ({'per_host': 0}, "concurrency.per_host"),
+        ({'max_in_flight': 2.5}, "concurrency.max_in_flight"),
+        ({'min_interval': -1}, "concurrency.min_interval"),
+        ({'hosts': {'a.com': {'per_host': 'x'}}}, "concurrency.hosts.a.com.per_host"),
+        ({'hosts': ['a.com']}, "concurrency.hosts")
+    ])
+    def test_invalid(self, concurrency, message):
+        """Test limits are validated."""
+        with pytest.raises(ValueError, match=message):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}], 'concurrency': concurrency})
+
+
+class TestMetricsConfig:
+    """Tests for metrics section."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_loaded(self):
+        """Test latency buckets are accepted."""
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                             'metrics': {'latency_buckets': [0.05, 0.2, 1]}})
+        assert config.metrics == {'latency_buckets': [0.05, 0.2, 1]}
+    
+    @pytest.mark.parametrize("metrics, message", [
+        ([0.1], "'metrics' section"),
+        ({'latency_buckets': []}, "non-empty list"),
+        ({'latency_buckets': ['fast']}, "non-empty list"),
+        ({'latency_buckets': [1, 0.5]}, "increasing")
+    ])
+    def test_invalid(self, metrics, message):
+        """Test latency buckets are validated."""
+        with pytest.raises(ValueError, match=message):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}], 'metrics': metrics})
+
+
+class TestCircuitBreakerConfig:
+    """Tests for circuit_breaker section."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_loaded_and_saved(self, tmp_path):
+        """Test breaker settings are accepted and written back."""
+        section = {'failure_threshold': 5, 'backoff': 10, 'max_backoff': 300, 'jitter': 0.1}
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                             'circuit_breaker': section})
+        assert config.circuit_breaker == section
+        
+        save_config(config, str(tmp_path / "saved.yaml"))
+        assert load_config(str(tmp_path / "saved.yaml")).circuit_breaker == section
+    
+    @pytest.mark.parametrize("circuit_breaker, message", [
+        (True, "'circuit_breaker' section"),
+        ({'enabled': 'yes'}, "enabled must be true or false"),
+        ({'failure_threshold': 0}, "failure_threshold must be a positive integer"),
+        ({'backoff': -1}, "backoff must be a positive number"),
+        ({'backoff': 60, 'max_backoff': 30}, "cannot be smaller"),
+        ({'jitter': 1}, "jitter must be at least 0")
+    ])
+    def test_invalid(self, circuit_breaker, message):
+        """Test breaker settings are validated."""
+        with pytest.raises(ValueError, match=message):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                        'circuit_breaker': circuit_breaker})
+
+
+class TestHedgingConfig:
+    """Tests for hedging section."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_loaded_and_saved(self, tmp_path):
+        """Test hedging settings are accepted and written back."""
+        section = {'percentile': 0.99, 'budget': 0.02, 'burst': 5, 'min_samples': 50}
+        config = self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                             'hedging': section})
+        assert config.hedging == section
+        
+        save_config(config, str(tmp_path / "saved.yaml"))
+        assert load_config(str(tmp_path / "saved.yaml")).hedging == section
+    
+    @pytest.mark.parametrize("hedging, message", [
+        ([], "'hedging' section"),
+        ({'enabled': 1}, "enabled must be true or false"),
+        ({'percentile': 'p95'}, "percentile must be a number"),
+        ({'percentile': 1.5}, "percentile must be between 0 and 1"),
+        ({'budget': 0}, "budget must be greater than 0"),
+        ({'burst': 0}, "burst must be at least 1"),
+        ({'min_samples': 0}, "min_samples must be a positive integer"),
+        ({'min_delay_ms': -1}, "min_delay_ms cannot be negative")
+    ])
+    def test_invalid(self, hedging, message):
+        """Test hedging settings are validated."""
+        with pytest.raises(ValueError, match=message):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com'}],
+                        'hedging': hedging})
+
+
+class TestProbeModeConfig:
+    """Tests for per-API probe and body_budget options."""
+    
+    def _load(self, config_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump(config_data, f)
+            config_path = f.name
+        try:
+            return load_config(config_path)
+        finally:
+            Path(config_path).unlink()
+    
+    def test_loaded_and_saved(self, tmp_path):
+        """Test probe options are loaded, defaulted and written back only when set."""
+        config = self._load({'apis': [
+            {'name': 'Reddit', 'url': 'https://www.reddit.com/.json', 'probe': 'head'},
+            {'name': 'Docs', 'url': 'https://docs.example.com', 'probe': 'range', 'body_budget': 1024},
+            {'name': 'Plain', 'url': 'https://example.com'}
+        ]})
+        assert [(api.probe, api.body_budget) for api in config.apis] == [
+            ('head', 65536), ('range', 1024), ('budget', 65536)]
+        
+        save_config(config, str(tmp_path / "saved.yaml"))
+        saved = yaml.safe_load((tmp_path / "saved.yaml").read_text(encoding='utf-8'))
+        assert 'probe' not in saved['apis'][2] and 'body_budget' not in saved['apis'][2]
+        assert load_config(str(tmp_path / "saved.yaml")).apis[1].body_budget == 1024
+    
+    @pytest.mark.parametrize("api_options, message", [
+        ({'probe': 'options'}, "probe must be one of"),
+        ({'body_budget': -1}, "body_budget must be a non-negative integer"),
+        ({'body_budget': '64k'}, "body_budget must be a non-negative integer")
+    ])
+    def test_invalid(self, api_options, message):
+        """Test probe options are validated."""
+        with pytest.raises(ValueError, match=message):
+            self._load({'apis': [{'name': 'Test API', 'url': 'https://example.com', **api_options}]})
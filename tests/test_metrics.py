@@ -0,0 +1,171 @@
+"""Tests for Prometheus metrics module."""
+
+import gzip
+import http.client
+import threading
+import pytest
+from api_monitor.checker import CheckResult
+from api_monitor.loader import APIConfig, Config
+from api_monitor.metrics import MetricsRegistry, create_metrics_registry_from_config
+from api_monitor.web_server import MonitoringHandler, PooledHTTPServer, WebMonitoringServer
+
+
+def samples(body: bytes) -> dict:
+    """Parses exposition text into {series: value}."""
+    parsed = {}
+    for line in body.decode('utf-8').splitlines():
+        if line and not line.startswith('#'):
+            series, _, value = line.rpartition(' ')
+            parsed[series] = float(value)
+    return parsed
+
+
+LABELS = 'api="A",url="https://a.com",method="GET"'
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry."""
+
+    def test_gauges_counters_and_histogram(self):
+        """Test results are aggregated per API."""
+        registry = MetricsRegistry(latency_buckets=[0.1, 1.0])
+        registry.observe(CheckResult("A", "https://a.com", 200, 50.0, True))
+        registry.observe(CheckResult("A", "https://a.com", 200, 500.0, True))
+        registry.observe(CheckResult("A", "https://a.com", None, 5000.0, False, error="Timeout", timeout=True))
+
+        metrics = samples(registry.render())
+
+        assert metrics[f"api_monitor_up{{{LABELS}}}"] == 0
+        assert metrics[f"api_monitor_status_code{{{LABELS}}}"] == 0
+        assert metrics[f'api_monitor_checks_total{{{LABELS},result="success"}}'] == 2
+        assert metrics[f'api_monitor_checks_total{{{LABELS},result="failure"}}'] == 1
+        assert metrics[f"api_monitor_timeouts_total{{{LABELS}}}"] == 1
+        assert metrics[f'api_monitor_latency_seconds_bucket{{{LABELS},le="0.1"}}'] == 1
+        assert metrics[f'api_monitor_latency_seconds_bucket{{{LABELS},le="1.0"}}'] == 2
+        assert metrics[f'api_monitor_latency_seconds_bucket{{{LABELS},le="+Inf"}}'] == 3
+        assert metrics[f"api_monitor_latency_seconds_sum{{{LABELS}}}"] == pytest.approx(5.55)
+        assert metrics[f"api_monitor_latency_seconds_count{{{LABELS}}}"] == 3
+        assert metrics["api_monitor_apis"] == 1
+
+    def test_families_are_grouped(self):
+        """Test every family appears once, with all its series together."""
+        registry = MetricsRegistry()
+        registry.observe_all([CheckResult("A", "https://a.com", 200, 1.0, True),
+                              CheckResult("B", "https://b.com", 200, 1.0, True)])
+        registry.observe_sweep(1.5)
+
+        lines = registry.render().decode('utf-8').splitlines()
+        types = [line.split()[2] for line in lines if line.startswith('# TYPE')]
+        assert len(types) == len(set(types))
+        up = [i for i, line in enumerate(lines) if line.startswith('api_monitor_up{')]
+        assert up == [up[0], up[0] + 1]
+        assert samples(registry.render())['api_monitor_sweep_duration_seconds_count'] == 1
+
+    def test_cached_results_not_counted(self):
+        """Test repeated and stale results from cache are not counted as checks."""
+        registry = MetricsRegistry()
+        result = CheckResult("A", "https://a.com", 200, 10.0, True)
+        registry.observe_all([result])
+        registry.observe_all([result])
+        registry.observe(CheckResult("A", "https://a.com", 200, 10.0, True, stale=True))
+
+        metrics = samples(registry.render())
+
+        assert metrics[f'api_monitor_checks_total{{{LABELS},result="success"}}'] == 1
+        assert metrics[f"api_monitor_latency_seconds_count{{{LABELS}}}"] == 1
+
+    def test_circuit_open_results_not_counted(self):
+        """Test fast failures set the circuit gauge but are not checks."""
+        registry = MetricsRegistry()
+        registry.observe(CheckResult("A", "https://a.com", None, 5000.0, False, timeout=True))
+        registry.observe(CheckResult("A", "https://a.com", None, 0.0, False, circuit_open=True))
+
+        metrics = samples(registry.render())
+
+        assert metrics[f"api_monitor_circuit_open{{{LABELS}}}"] == 1
+        assert metrics[f'api_monitor_checks_total{{{LABELS},result="failure"}}'] == 1
+        assert metrics[f"api_monitor_latency_seconds_count{{{LABELS}}}"] == 1
+
+    def test_removed_apis_dropped(self):
+        """Test APIs missing from a sweep disappear."""
+        registry = MetricsRegistry()
+        registry.observe_all([CheckResult("A", "https://a.com", 200, 1.0, True),
+                              CheckResult("B", "https://b.com", 200, 1.0, True)])
+        registry.observe_all([CheckResult("B", "https://b.com", 200, 1.0, True)])
+
+        body = registry.render().decode('utf-8')
+
+        assert 'api="A"' not in body
+        assert samples(registry.render())["api_monitor_apis"] == 1
+
+    def test_label_escaping(self):
+        """Test quotes, backslashes and newlines in names are escaped."""
+        registry = MetricsRegistry()
+        registry.observe(CheckResult('Say "hi"\\\n', "https://a.com", 200, 1.0, True))
+
+        assert 'api="Say \\"hi\\"\\\\\\n"' in registry.render().decode('utf-8')
+
+    def test_render_is_cached_until_update(self):
+        """Test scrapes reuse the rendered body until a result arrives."""
+        registry = MetricsRegistry()
+        registry.observe(CheckResult("A", "https://a.com", 200, 1.0, True))
+
+        first = registry.render()
+        assert registry.render() is first
+        assert gzip.decompress(registry.render('gzip')) == first
+
+        registry.observe(CheckResult("A", "https://a.com", 500, 1.0, False))
+        assert registry.render() != first
+
+    @pytest.mark.parametrize("buckets", [[], [0.5, 0.1], [0, 1]])
+    def test_invalid_buckets(self, buckets):
+        """Test bucket bounds are validated."""
+        with pytest.raises(ValueError):
+            MetricsRegistry(latency_buckets=buckets)
+
+    def test_create_from_config(self):
+        """Test buckets come from config."""
+        assert create_metrics_registry_from_config(None).latency_buckets[0] == 0.005
+        assert create_metrics_registry_from_config({'latency_buckets': [1, 2]}).latency_buckets == (1.0, 2.0)
+
+
+class TestMetricsEndpoint:
+    """Tests for /metrics."""
+
+    @pytest.fixture
+    def port(self):
+        saved = dict(MonitoringHandler.monitoring_data)
+        monitor = WebMonitoringServer(Config(apis=[APIConfig("A", "https://a.com")]), interval=30)
+        monitor.record_results([CheckResult("A", "https://a.com", 200, 10.0, True)])
+        httpd = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=2)
+        thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        yield httpd.server_address[1]
+        httpd.shutdown()
+        httpd.server_close()
+        monitor.cache.close()
+        MonitoringHandler.monitoring_data.clear()
+        MonitoringHandler.monitoring_data.update(saved)
+
+    def _get(self, port, headers=None):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/metrics', headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_scrape(self, port):
+        """Test exposition format and content type."""
+        response, body = self._get(port)
+
+        assert response.status == 200
+        assert response.getheader('Content-Type').startswith('text/plain; version=0.0.4')
+        assert samples(body)[f"api_monitor_up{{{LABELS}}}"] == 1
+
+    def test_scrape_gzip(self, port):
+        """Test compressed scrape."""
+        response, body = self._get(port, {'Accept-Encoding': 'gzip'})
+
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert b"api_monitor_up" in gzip.decompress(body)
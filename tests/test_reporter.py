@@ -6,14 +6,19 @@ import csv
 import io
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 from api_monitor.reporter import (
     format_table,
     format_json,
     format_csv,
+    format_jsonl,
     print_report,
-    get_exit_code
+    get_exit_code,
+    format_html,
+    JsonLinesWriter
 )
-from api_monitor.checker import CheckResult
+from api_monitor.checker import CheckResult, PhaseTimings
+from api_monitor.sketch import LatencySketches
 
 
 class TestFormatTable:
@@ -169,6 +174,38 @@ class TestFormatCSV:
         assert rows[1][2] == ""  # Empty status
 
 
+class TestPhaseOutput:
+    """Tests for phase timing output."""
+    
+    def test_format_json_phases(self):
+        """Test phases are included in JSON only when recorded."""
+        phases = PhaseTimings(dns_ms=1.5, connect_ms=2.0, tls_ms=10.25, ttfb_ms=50.0, body_ms=3.0)
+        results = [
+            CheckResult("API 1", "https://api1.com", 200, 66.75, True, phases=phases),
+            CheckResult("API 2", "https://api2.com", 200, 80.0, True)
+        ]
+        
+        data = json.loads(format_json(results))
+        
+        assert data[0]["phases"] == {
+            "dns_ms": 1.5, "connect_ms": 2.0, "tls_ms": 10.25, "ttfb_ms": 50.0, "body_ms": 3.0
+        }
+        assert "phases" not in data[1]
+    
+    def test_format_csv_phases(self):
+        """Test phase columns are added when any result has phases."""
+        results = [
+            CheckResult("API 1", "https://api1.com", 200, 66.75, True, phases=PhaseTimings(1.0, 2.0, 3.0, 4.0, 5.0)),
+            CheckResult("API 2", "https://api2.com", None, 0.0, False, "Connection error")
+        ]
+        
+        rows = list(csv.reader(io.StringIO(format_csv(results))))
+        
+        assert rows[0][7:] == ["DNS (ms)", "Connect (ms)", "TLS (ms)", "TTFB (ms)", "Body (ms)"]
+        assert rows[1][7:] == ["1.0", "2.0", "3.0", "4.0", "5.0"]
+        assert rows[2][7:] == ["", "", "", "", ""]
+
+
 class TestPrintReport:
     """Tests for print_report function."""
     
@@ -218,6 +255,122 @@ class TestPrintReport:
             assert isinstance(data, list)
 
 
+class TestPercentileColumns:
+    """Tests for latency percentiles in table and HTML reports."""
+    
+    @pytest.fixture
+    def latency(self):
+        latency = LatencySketches()
+        for ms in range(1, 101):
+            latency.observe(CheckResult("API 1", "https://api1.com", 200, float(ms), True))
+        return latency
+    
+    def test_table(self, latency):
+        """Test table gets a p50/p95/p99 column."""
+        results = [CheckResult("API 1", "https://api1.com", 200, 100.0, True),
+                   CheckResult("API 2", "https://api2.com", 200, 10.0, True)]
+        
+        table = format_table(results, latency)
+        
+        assert "p50 / p95 / p99 (ms)" in table
+        assert "49.9 / 94.6 / 98.5" in table
+        assert "N/A" in table
+        assert "p50" not in format_table(results)
+    
+    def test_html(self, latency):
+        """Test HTML report gets a percentile column."""
+        html = format_html([CheckResult("API 1", "https://api1.com", 200, 100.0, True)], latency)
+        
+        assert "<th>p50 / p95 / p99</th>" in html
+        assert "<td>49.9 / 94.6 / 98.5 ms</td>" in html
+        assert "p50" not in format_html([CheckResult("API 1", "https://api1.com", 200, 100.0, True)])
+
+
+class TestJsonLines:
+    """Tests for JSON Lines output."""
+    
+    def test_format_jsonl(self):
+        """Test one compact record per result."""
+        results = [
+            CheckResult("API 1", "https://api1.com", 200, 100.123, True, method="POST"),
+            CheckResult("API 2", "https://api2.com", None, 5000.0, False, error="Timeout", timeout=True,
+                        phases=PhaseTimings(1.0, 2.0, 3.0, 4.0, 5.0))
+        ]
+        
+        lines = format_jsonl(results).splitlines()
+        
+        assert len(lines) == 2
+        assert ", " not in lines[0]
+        first, second = json.loads(lines[0]), json.loads(lines[1])
+        assert (first["name"], first["method"], first["latency_ms"], first["success"]) == \
+            ("API 1", "POST", 100.12, True)
+        assert first["time"].endswith("+00:00")
+        assert (second["timeout"], second["phases"]["ttfb_ms"]) == (True, 4.0)
+    
+    def test_print_report_appends(self, tmp_path):
+        """Test JSON Lines reports accumulate in the output file."""
+        output_file = tmp_path / "results.jsonl"
+        
+        print_report([CheckResult("API 1", "https://api1.com", 200, 1.0, True)], "jsonl", str(output_file))
+        print_report([CheckResult("API 1", "https://api1.com", 500, 1.0, False)], "jsonl", str(output_file))
+        
+        records = [json.loads(line) for line in output_file.read_text(encoding='utf-8').splitlines()]
+        assert [r["status_code"] for r in records] == [200, 500]
+    
+    def test_writer_appends_across_instances(self, tmp_path):
+        """Test writer keeps records of earlier runs."""
+        output_file = tmp_path / "results.jsonl"
+        for status in (200, 503):
+            writer = JsonLinesWriter(str(output_file))
+            writer.write(CheckResult("API", "https://api.com", status, 1.0, status == 200))
+            writer.close()
+        
+        lines = output_file.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)["status_code"] for line in lines] == [200, 503]
+    
+    def test_size_rotation(self, tmp_path):
+        """Test file is rotated before exceeding max_bytes and old copies are pruned."""
+        output_file = tmp_path / "results.jsonl"
+        writer = JsonLinesWriter(str(output_file), max_bytes=600, backups=2)
+        for i in range(20):
+            writer.write(CheckResult(f"API {i}", "https://api.com", 200, 1.0, True))
+        writer.close()
+        
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == ["results.jsonl", "results.jsonl.1", "results.jsonl.2"]
+        for name in files:
+            assert (tmp_path / name).stat().st_size <= 600
+        newest = [json.loads(line)["name"] for line in output_file.read_text(encoding='utf-8').splitlines()]
+        assert newest[-1] == "API 19"
+        older = (tmp_path / "results.jsonl.1").read_text(encoding='utf-8').splitlines()
+        assert json.loads(older[-1])["name"] == f"API {19 - len(newest)}"
+    
+    def test_time_rotation(self, tmp_path):
+        """Test file is rotated when a new period begins."""
+        output_file = tmp_path / "results.jsonl"
+        writer = JsonLinesWriter(str(output_file), interval=3600)
+        clock = [7200.0]
+        with patch('api_monitor.reporter.time.time', lambda: clock[0]):
+            writer.write(CheckResult("A", "https://a.com", 200, 1.0, True))
+            clock[0] = 10799.0
+            writer.write(CheckResult("B", "https://b.com", 200, 1.0, True))
+            clock[0] = 10800.0
+            writer.write(CheckResult("C", "https://c.com", 200, 1.0, True))
+        writer.close()
+        
+        rotated = (tmp_path / "results.jsonl.1").read_text(encoding='utf-8').splitlines()
+        current = output_file.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)["name"] for line in rotated] == ["A", "B"]
+        assert [json.loads(line)["name"] for line in current] == ["C"]
+    
+    def test_invalid_rotation(self):
+        """Test rotation settings are validated."""
+        with pytest.raises(ValueError):
+            JsonLinesWriter("x.jsonl", max_bytes=0)
+        with pytest.raises(ValueError):
+            JsonLinesWriter("x.jsonl", interval=-1)
+
+
 class TestGetExitCode:
     """Tests for get_exit_code function."""
     
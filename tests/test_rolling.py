@@ -0,0 +1,140 @@
+"""Tests for rolling window statistics."""
+
+import pytest
+from api_monitor.checker import CheckResult
+from api_monitor.loader import APIConfig, Config
+from api_monitor.rolling import RingCounter, RollingStats, RollingWindows
+from api_monitor.web_server import MonitoringHandler, WebMonitoringServer
+
+
+NOW = 1_700_000_000.0
+
+
+class TestRingCounter:
+    """Tests for RingCounter."""
+
+    def test_window_sums_recent_buckets(self):
+        """Test only buckets inside the window are counted."""
+        ring = RingCounter(60, 60)
+        ring.add(NOW - 600, False, 100.0)
+        ring.add(NOW - 30, True, 10.0)
+        ring.add(NOW, True, 20.0)
+
+        assert ring.totals(NOW, 300) == (2, 0, 30.0, 2)
+        assert ring.totals(NOW, 3600) == (3, 1, 130.0, 3)
+
+    def test_old_buckets_are_cleared(self):
+        """Test slots are reused once the ring wraps around."""
+        ring = RingCounter(60, 60)
+        ring.add(NOW, False, 10.0)
+        ring.add(NOW + 3600, True, 5.0)  # Same slot, one ring later
+
+        assert ring.totals(NOW + 3600, 3600) == (1, 0, 5.0, 1)
+
+    def test_gap_longer_than_ring(self):
+        """Test a long pause clears the whole ring."""
+        ring = RingCounter(60, 60)
+        for offset in range(0, 600, 60):
+            ring.add(NOW + offset, False, 1.0)
+        ring.add(NOW + 10 * 3600, True, 1.0)
+
+        assert ring.totals(NOW + 10 * 3600, 3600) == (1, 0, 1.0, 1)
+
+    def test_late_and_future_queries(self):
+        """Test checks older than the ring are dropped and quiet periods age out."""
+        ring = RingCounter(60, 60)
+        ring.add(NOW, True, 1.0)
+        ring.add(NOW - 7200, False, 1.0)
+
+        assert ring.totals(NOW, 3600) == (1, 0, 1.0, 1)
+        assert ring.totals(NOW + 7200, 3600) == (0, 0, 0.0, 0)
+        assert RingCounter(60, 60).totals(NOW, 3600) == (0, 0, 0.0, 0)
+
+
+class TestRollingStats:
+    """Tests for RollingStats."""
+
+    def test_windows(self):
+        """Test uptime, error rate and mean latency per window."""
+        stats = RollingStats()
+        stats.add(NOW - 3 * 86400, False, 300.0)
+        stats.add(NOW - 2 * 3600, False, 200.0)
+        stats.add(NOW - 60, True, 100.0)
+        stats.add(NOW, True, 100.0)
+
+        windows = stats.windows(NOW)
+
+        assert windows['1h'] == {'checks': 2, 'failures': 0, 'uptime_percent': 100.0,
+                                 'error_rate': 0.0, 'mean_latency_ms': 100.0}
+        assert windows['24h']['checks'] == 3
+        assert windows['24h']['uptime_percent'] == pytest.approx(66.667)
+        assert windows['7d'] == {'checks': 4, 'failures': 2, 'uptime_percent': 50.0,
+                                 'error_rate': 0.5, 'mean_latency_ms': 175.0}
+        assert windows['30d']['checks'] == 4
+
+    def test_empty_window(self):
+        """Test windows without checks have no rates."""
+        assert RollingStats().window(NOW, 3600) == {'checks': 0, 'failures': 0, 'uptime_percent': None,
+                                                     'error_rate': None, 'mean_latency_ms': None}
+
+
+class TestRollingWindows:
+    """Tests for per-API rolling windows."""
+
+    def test_overall_and_per_api(self):
+        """Test totals are kept per API and over all APIs."""
+        windows = RollingWindows()
+        windows.observe_all([CheckResult("A", "https://a.com", 200, 10.0, True),
+                             CheckResult("B", "https://b.com", 500, 30.0, False)], NOW)
+
+        summary = windows.summary(NOW)
+
+        assert summary['overall']['1h']['checks'] == 2
+        assert summary['overall']['1h']['uptime_percent'] == 50.0
+        assert summary['apis']['A']['24h']['error_rate'] == 0.0
+        assert summary['apis']['B']['30d']['mean_latency_ms'] == 30.0
+
+    def test_cached_results_not_counted(self):
+        """Test the same cached result and stale copies are counted once."""
+        windows = RollingWindows()
+        result = CheckResult("A", "https://a.com", 200, 10.0, True)
+
+        windows.observe_all([result], NOW)
+        windows.observe_all([result], NOW + 30)
+        windows.observe(CheckResult("A", "https://a.com", 200, 10.0, True, stale=True), NOW + 60)
+
+        assert windows.summary(NOW + 60)['apis']['A']['1h']['checks'] == 1
+
+    def test_retain(self):
+        """Test removed APIs are dropped but stay in overall totals."""
+        windows = RollingWindows()
+        windows.observe_all([CheckResult("A", "https://a.com", 200, 1.0, True),
+                             CheckResult("B", "https://b.com", 200, 1.0, True)], NOW)
+
+        windows.retain([("B", "https://b.com", "GET")])
+        summary = windows.summary(NOW)
+
+        assert list(summary['apis']) == ['B']
+        assert summary['overall']['1h']['checks'] == 2
+
+
+class TestWindowsInStats:
+    """Tests for rolling windows in the web server."""
+
+    def test_recorded_results_reach_stats(self):
+        """Test record_results feeds the windows served by /api/stats."""
+        saved = dict(MonitoringHandler.monitoring_data)
+        monitor = WebMonitoringServer(Config(apis=[APIConfig("A", "https://a.com")]), interval=30)
+        try:
+            monitor.record_results([CheckResult("A", "https://a.com", 200, 10.0, True)])
+            monitor.update_result(CheckResult("A", "https://a.com", 503, 20.0, False))
+            monitor.publish_refreshed()
+
+            summary = monitor.windows.summary()
+
+            assert summary['apis']['A']['1h'] == {'checks': 2, 'failures': 1, 'uptime_percent': 50.0,
+                                                  'error_rate': 0.5, 'mean_latency_ms': 15.0}
+        finally:
+            monitor.cache.close()
+            MonitoringHandler.monitoring_data.clear()
+            MonitoringHandler.monitoring_data.update(saved)
@@ -0,0 +1,216 @@
+"""Tests for scheduler module."""
+
+import json
+import random
+import signal
+import pytest
+from unittest.mock import patch
+from api_monitor import checker
+from api_monitor.scheduler import DueQueue, Scheduler
+from api_monitor.loader import APIConfig, Config
+
+
+class TestDueQueue:
+    """Tests for DueQueue."""
+
+    def test_invalid_jitter(self):
+        """Test jitter validation."""
+        with pytest.raises(ValueError):
+            DueQueue(jitter=1.5)
+
+    def test_invalid_interval(self):
+        """Test interval validation."""
+        with pytest.raises(ValueError):
+            DueQueue().add(APIConfig("A", "https://a.com"), 0, now=0.0)
+
+    def test_no_jitter_due_after_one_interval(self):
+        """Test first due time without jitter."""
+        queue = DueQueue(jitter=0)
+        queue.add(APIConfig("A", "https://a.com"), 60, now=100.0)
+
+        assert queue.next_due() == 160.0
+        assert queue.pop_due(159.9) == []
+
+    def test_jitter_spreads_due_times(self):
+        """Test due times are spread across jitter * interval."""
+        queue = DueQueue(jitter=1.0, rng=random.Random(42))
+        for i in range(1000):
+            queue.add(APIConfig(f"API {i}", "https://a.com"), 60, now=0.0)
+
+        assert 60.0 <= queue.next_due() < 61.0
+        first_half = len(queue.pop_due(90.0))
+        assert 400 < first_half < 600
+        assert len(queue.pop_due(120.0)) == 1000 - first_half
+
+    def test_window_batches_jittered_apis(self):
+        """Test APIs spread by jitter are popped together and stay on their grid."""
+        queue = DueQueue(jitter=0.1, rng=random.Random(7))
+        apis = [APIConfig(f"API {i}", "https://a.com") for i in range(10)]
+        for api in apis:
+            queue.add(api, 60, now=0.0)
+        first = queue.next_due()
+
+        assert len(queue.pop_due(first, window=0.1)) == 10
+        assert queue.pop_due(first + 6.0, window=0.1) == []
+        assert 120.0 <= queue.next_due() < 126.0
+        assert len(queue.pop_due(queue.next_due(), window=0.1)) == 10
+
+    def test_drift_free_rescheduling(self):
+        """Test late dispatch does not shift the schedule."""
+        queue = DueQueue(jitter=0)
+        api = APIConfig("A", "https://a.com")
+        queue.add(api, 60, now=0.0)
+
+        assert queue.pop_due(60.7) == [api]
+        assert queue.next_due() == 120.0
+
+    def test_missed_slots_skipped(self):
+        """Test falling behind skips missed slots and stays on grid."""
+        queue = DueQueue(jitter=0)
+        api = APIConfig("A", "https://a.com")
+        queue.add(api, 60, now=0.0)
+
+        assert queue.pop_due(250.0) == [api]
+        assert queue.next_due() == 300.0
+
+    def test_independent_intervals(self):
+        """Test APIs with different intervals share one queue."""
+        queue = DueQueue(jitter=0)
+        fast = APIConfig("Fast", "https://fast.com")
+        slow = APIConfig("Slow", "https://slow.com")
+        queue.add(fast, 10, now=0.0)
+        queue.add(slow, 600, now=0.0)
+
+        dispatched = []
+        while queue.next_due() <= 600.0:
+            dispatched.extend(queue.pop_due(queue.next_due()))
+
+        assert dispatched.count(fast) == 60
+        assert dispatched.count(slow) == 1
+        assert len(queue) == 2
+
+
+class TestScheduler:
+    """Tests for Scheduler."""
+
+    @pytest.fixture(autouse=True)
+    def restore_signal_handlers(self):
+        """Scheduler installs SIGINT/SIGTERM handlers; restore them after each test."""
+        handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+        yield
+        for sig, handler in handlers.items():
+            signal.signal(sig, handler)
+
+    def test_cache_ttl_shorter_than_intervals(self):
+        """Test cache never outlives the shortest interval."""
+        config = Config(apis=[APIConfig("A", "https://a.com", interval=10)], interval=60)
+        scheduler = Scheduler(config)
+
+        assert scheduler.cache.default_ttl == 5.0
+
+    def test_clock_passed_down(self, clock, tmp_path):
+        """Test time-dependent components of the scheduler share its clock."""
+        config = Config(apis=[APIConfig("A", "https://a.com")], history={'path': str(tmp_path / "h.db")},
+                        circuit_breaker={'failure_threshold': 3})
+        scheduler = Scheduler(config, clock=clock)
+
+        assert scheduler.cache.clock is clock
+        assert scheduler.sessions.clock is clock
+        assert scheduler.sessions.connections.clock is clock
+        assert scheduler.breakers.clock is clock
+        assert scheduler.history.clock is clock
+        scheduler.history.close()
+
+    def test_run_dispatches_per_api_intervals(self, clock):
+        """Test run() checks each API on its own interval."""
+        fast = APIConfig("Fast", "https://fast.com", interval=1)
+        slow = APIConfig("Slow", "https://slow.com")
+        config = Config(apis=[fast, slow], jitter=0)
+        scheduler = Scheduler(config, clock=clock)
+        batches = []
+
+        def fake_run_once(apis=None):
+            batches.append(list(apis) if apis is not None else list(config.apis))
+            if clock.now >= 1000.0 + 6:
+                scheduler.running = False
+
+        with patch.object(scheduler, 'run_once', side_effect=fake_run_once):
+            scheduler.run(3)
+
+        checked = [api.name for batch in batches for api in batch]
+        assert batches[0] == [fast, slow]  # First check immediately
+        assert checked.count("Fast") == 7  # t = 0..6
+        assert checked.count("Slow") == 3  # t = 0, 3, 6
+
+    def test_run_checks_jittered_apis_in_one_batch(self, clock):
+        """Test default jitter still gives one run_once call per interval."""
+        config = Config(apis=[APIConfig(f"API {i}", f"https://{i}.example.com") for i in range(10)])
+        scheduler = Scheduler(config, clock=clock)
+        batches = []
+
+        def fake_run_once(apis=None):
+            batches.append(len(config.apis if apis is None else apis))
+            if len(batches) == 4:
+                scheduler.running = False
+
+        with patch.object(scheduler, 'run_once', side_effect=fake_run_once):
+            scheduler.run(60)
+
+        assert batches == [10, 10, 10, 10]
+        assert clock.now < 1000.0 + 3 * 60 + 6
+
+    def test_wall_clock_jump_keeps_schedule(self, clock):
+        """Test checks stay on their interval when the wall clock steps back."""
+        config = Config(apis=[APIConfig("A", "https://a.com", interval=10)], jitter=0)
+        scheduler = Scheduler(config, clock=clock)
+        checked_at = []
+
+        def fake_run_once(apis=None):
+            checked_at.append(clock.monotonic())
+            clock.step_wall(-3600)
+            if len(checked_at) == 4:
+                scheduler.running = False
+
+        with patch.object(scheduler, 'run_once', side_effect=fake_run_once):
+            scheduler.run(10)
+
+        assert checked_at == [1000.0, 1010.0, 1020.0, 1030.0]
+        assert clock.sleeps == 30  # Wakes up once a second to notice shutdown
+
+    def test_jsonl_streams_results(self, stub_server, tmp_path, capsys):
+        """Test jsonl output appends one record per check and sweep."""
+        base_url, _ = stub_server
+        output_file = tmp_path / "results.jsonl"
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(3)]
+        scheduler = Scheduler(Config(apis=apis), output_format='jsonl', output_file=str(output_file))
+        scheduler.cache.default_ttl = 0  # Check again on the second sweep
+
+        scheduler.run_once()
+        scheduler.run_once(apis[:1])
+        scheduler.stream.close()
+        scheduler.sessions.close()
+
+        lines = output_file.read_text(encoding='utf-8').splitlines()
+        assert sorted(json.loads(line)["name"] for line in lines) == ["API 0", "API 0", "API 1", "API 2"]
+        assert "Report saved" not in capsys.readouterr().out
+
+    def test_async_sweeps_reuse_connections(self, stub_server, capsys):
+        """Test sweeps of more than 5 APIs (asyncio engine) keep connections to one host alive."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(8)]
+        scheduler = Scheduler(Config(apis=apis))
+        scheduler.cache.default_ttl = 0  # Check again on the second sweep
+        sweeps = []
+
+        def check_all_apis(*args, **kwargs):
+            sweeps.append(checker.check_all_apis(*args, **kwargs))
+            return sweeps[-1]
+
+        with patch('api_monitor.scheduler.check_all_apis', side_effect=check_all_apis):
+            scheduler.run_once()
+            scheduler.run_once()
+        scheduler.sessions.close()
+
+        assert all(r.success for sweep in sweeps for r in sweep)
+        assert not any(r.connection_reused for r in sweeps[0])
+        assert all(r.connection_reused for r in sweeps[1])
@@ -0,0 +1,179 @@
+"""Tests for keep-alive session registry."""
+
+import pytest
+from api_monitor.sessions import SessionRegistry, create_session_registry_from_config
+from api_monitor.async_checker import AsyncChecker
+from api_monitor.checker import check_api, check_all_apis
+from api_monitor.loader import APIConfig
+
+
+class TestSessionRegistry:
+    """Tests for SessionRegistry."""
+
+    def test_invalid_settings(self):
+        """Test settings validation."""
+        with pytest.raises(ValueError):
+            SessionRegistry(pool_size=0)
+        with pytest.raises(ValueError):
+            SessionRegistry(idle_timeout=0)
+
+    def test_same_host_shares_session(self):
+        """Test sessions are keyed by scheme, host and port."""
+        registry = SessionRegistry()
+        session = registry.get('https://example.com/a')
+
+        assert registry.get('https://EXAMPLE.com:443/b?x=1') is session
+        assert registry.get('http://example.com/a') is not session
+        assert registry.get('https://example.com:8443/a') is not session
+        assert registry.size() == 3
+        registry.close()
+        assert registry.size() == 0
+
+    def test_max_age_recycles_session(self, clock):
+        """Test sessions older than max_age are replaced."""
+        registry = SessionRegistry(idle_timeout=1000.0, max_age=10.0, clock=clock)
+        session = registry.get('https://example.com')
+        clock.advance(5)
+        assert registry.get('https://example.com') is session
+        clock.advance(6)
+        assert registry.get('https://example.com') is not session
+
+    def test_evict_idle(self, clock):
+        """Test idle sessions are closed."""
+        registry = SessionRegistry(idle_timeout=30.0, max_age=1000.0, clock=clock)
+        registry.get('https://a.example.com')
+        clock.advance(20)
+        registry.get('https://b.example.com')
+        clock.advance(20)
+        assert registry.evict_idle() == 1
+        assert registry.size() == 1
+
+    def test_create_from_config(self):
+        """Test creating registry from configuration."""
+        registry = create_session_registry_from_config({'pool_size': 4, 'idle_timeout': 15, 'max_age': 120})
+        assert registry.pool_size == 4
+        assert registry.idle_timeout == 15.0
+        assert registry.max_age == 120.0
+
+        defaults = create_session_registry_from_config(None)
+        assert defaults.pool_size == 10
+
+
+class TestConnectionReuse:
+    """Tests for keep-alive checks against a local server."""
+
+    def test_check_api_reuses_connection(self, stub_server):
+        """Test second check to the same host reuses the connection."""
+        base_url, _ = stub_server
+        registry = SessionRegistry()
+        api = APIConfig("Local", f"{base_url}/status/200")
+
+        first = check_api(api, registry)
+        second = check_api(api, registry)
+        registry.close()
+
+        assert first.success is True and second.success is True
+        assert first.connection_reused is False
+        assert second.connection_reused is True
+
+    def test_body_budget_and_reuse(self, stub_server):
+        """Test fully read bodies keep the connection; a body cut by the budget drops it."""
+        base_url, _ = stub_server
+        registry = SessionRegistry()
+        small = APIConfig("Small", f"{base_url}/bytes/1000")
+        head = APIConfig("Head", f"{base_url}/bytes/500000", probe='head')
+        large = APIConfig("Large", f"{base_url}/bytes/500000")
+
+        results = [check_api(api, registry) for api in (small, small, head, large, small)]
+        registry.close()
+
+        assert [r.connection_reused for r in results] == [False, True, True, True, False]
+        assert [r.bytes_read for r in results] == [1000, 1000, 0, 65536, 1000]
+
+    def test_check_api_without_registry_is_cold(self, stub_server):
+        """Test checks without registry always open a new connection."""
+        base_url, _ = stub_server
+        api = APIConfig("Local", f"{base_url}/status/200")
+
+        assert check_api(api).connection_reused is False
+        assert check_api(api).connection_reused is False
+
+    def test_check_all_apis_with_sessions(self, stub_server):
+        """Test sequential sweep shares connections between endpoints of one host."""
+        base_url, _ = stub_server
+        registry = SessionRegistry()
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200") for i in range(3)]
+
+        results = check_all_apis(apis, sessions=registry)
+        registry.close()
+
+        assert [r.connection_reused for r in results] == [False, True, True]
+
+    def test_async_engine_reuses_connections(self, stub_server):
+        """Test asyncio sweeps keep connections alive in the registry between sweeps."""
+        base_url, _ = stub_server
+        registry = SessionRegistry()
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(8)]
+
+        first = check_all_apis(apis, use_async=True, max_concurrency=1, sessions=registry)
+        second = check_all_apis(apis, use_async=True, max_concurrency=1, sessions=registry)
+        registry.close()
+
+        assert all(r.success for r in first + second)
+        assert [r.connection_reused for r in first] == [False] + [True] * 7
+        assert all(r.connection_reused for r in second)
+
+    def test_async_engine_body_budget_and_reuse(self, stub_server):
+        """Test the asyncio engine drops connections whose body was cut by the budget."""
+        base_url, _ = stub_server
+        registry = SessionRegistry()
+        small = APIConfig("Small", f"{base_url}/bytes/1000")
+        large = APIConfig("Large", f"{base_url}/bytes/500000")
+
+        results = [AsyncChecker(sessions=registry).run([api])[0] for api in (small, small, large, small)]
+        registry.close()
+
+        assert [r.connection_reused for r in results] == [False, True, True, False]
+        assert [r.bytes_read for r in results] == [1000, 1000, 65536, 1000]
+
+    def test_async_pool_size(self, stub_server):
+        """Test at most pool_size idle connections are kept per host."""
+        base_url, _ = stub_server
+        registry = SessionRegistry(pool_size=2)
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.1?i={i}") for i in range(5)]
+
+        AsyncChecker(sessions=registry).run(apis)
+        kept = registry.connections.size()
+        registry.close()
+
+        assert kept == 2
+
+    def test_async_idle_connections_evicted(self, stub_server, clock):
+        """Test idle asyncio connections are closed after idle_timeout."""
+        base_url, _ = stub_server
+        registry = SessionRegistry(idle_timeout=30.0, max_age=1000.0, clock=clock)
+        api = APIConfig("Local", f"{base_url}/status/200")
+
+        AsyncChecker(sessions=registry).run([api])
+        clock.advance(40)
+        evicted = registry.evict_idle()
+        result = AsyncChecker(sessions=registry).run([api])[0]
+        registry.close()
+
+        assert evicted == 1
+        assert result.connection_reused is False
+
+    def test_async_max_age_recycles_connection(self, stub_server, clock):
+        """Test asyncio connections older than max_age are not reused."""
+        base_url, _ = stub_server
+        registry = SessionRegistry(idle_timeout=1000.0, max_age=10.0, clock=clock)
+        api = APIConfig("Local", f"{base_url}/status/200")
+
+        results = [AsyncChecker(sessions=registry).run([api])[0]]
+        clock.advance(5)
+        results.append(AsyncChecker(sessions=registry).run([api])[0])
+        clock.advance(6)
+        results.append(AsyncChecker(sessions=registry).run([api])[0])
+        registry.close()
+
+        assert [r.connection_reused for r in results] == [False, True, False]
@@ -0,0 +1,135 @@
+"""Tests for latency quantile sketches."""
+
+import json
+import random
+import pytest
+from api_monitor.checker import CheckResult
+from api_monitor.sketch import DDSketch, LatencySketches
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class TestDDSketch:
+    """Tests for DDSketch."""
+
+    @pytest.mark.parametrize("q", [0.0, 0.5, 0.9, 0.95, 0.99, 1.0])
+    def test_relative_accuracy(self, q):
+        """Test quantiles are within the relative accuracy."""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(4, 1) for _ in range(20000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        expected = exact_quantile(values, q)
+
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_constant_memory(self):
+        """Test bin count depends on value range, not number of values."""
+        rng = random.Random(1)
+        sketch = DDSketch()
+        for _ in range(100000):
+            sketch.add(rng.uniform(10, 1000))
+
+        assert sketch.count == 100000
+        assert len(sketch.bins) < 250
+
+    def test_bin_limit_keeps_upper_quantiles(self):
+        """Test collapsing merges the lowest bins only."""
+        sketch = DDSketch(max_bins=50)
+        for value in range(1, 10001):
+            sketch.add(float(value))
+
+        assert len(sketch.bins) == 50
+        assert sketch.quantile(0.99) == pytest.approx(9900, rel=0.01)
+
+    def test_merge_equals_single_sketch(self):
+        """Test merged sketches answer like one sketch of all values."""
+        rng = random.Random(7)
+        values = [rng.expovariate(1 / 200) for _ in range(5000)]
+        whole, first, second = DDSketch(), DDSketch(), DDSketch()
+        for index, value in enumerate(values):
+            whole.add(value)
+            (first if index % 2 else second).add(value)
+
+        first.merge(second)
+
+        assert first.count == whole.count
+        assert first.bins == whole.bins
+        assert first.quantile(0.95) == whole.quantile(0.95)
+
+    def test_merge_requires_same_accuracy(self):
+        """Test sketches with different bins cannot be merged."""
+        with pytest.raises(ValueError):
+            DDSketch(0.01).merge(DDSketch(0.05))
+
+    def test_serialization_round_trip(self):
+        """Test sketch survives JSON (merging across processes)."""
+        sketch = DDSketch()
+        for value in (0.0, 1.5, 20.0, 300.0):
+            sketch.add(value)
+
+        restored = DDSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        assert restored.bins == sketch.bins
+        assert (restored.count, restored.zero_count, restored.min, restored.max) == (4, 1, 0.0, 300.0)
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+    def test_empty_and_invalid(self):
+        """Test empty sketch and invalid input."""
+        sketch = DDSketch()
+
+        assert sketch.quantile(0.5) is None
+        assert sketch.percentiles() == {'p50': None, 'p95': None, 'p99': None}
+        with pytest.raises(ValueError):
+            sketch.add(-1.0)
+        with pytest.raises(ValueError):
+            sketch.quantile(1.5)
+        with pytest.raises(ValueError):
+            DDSketch(relative_accuracy=0)
+
+
+class TestLatencySketches:
+    """Tests for per-API sketches."""
+
+    def test_percentiles_per_api(self):
+        """Test each API gets its own percentiles."""
+        latency = LatencySketches()
+        for ms in range(1, 101):
+            latency.observe(CheckResult("A", "https://a.com", 200, float(ms), True))
+            latency.observe(CheckResult("B", "https://b.com", 200, 1000.0, True))
+
+        a = latency.percentiles(CheckResult("A", "https://a.com", 200, 0.0, True))
+        summary = latency.summary()
+
+        assert a['p50'] == pytest.approx(50, rel=0.02)
+        assert a['p99'] == pytest.approx(99, rel=0.02)
+        assert summary['B'] == {'count': 100, 'p50': pytest.approx(1000, rel=0.01),
+                                'p95': pytest.approx(1000, rel=0.01), 'p99': pytest.approx(1000, rel=0.01)}
+
+    def test_cached_results_not_added(self):
+        """Test the same cached result and stale copies are added once."""
+        latency = LatencySketches()
+        result = CheckResult("A", "https://a.com", 200, 10.0, True)
+
+        latency.observe_all([result, result])
+        latency.observe(CheckResult("A", "https://a.com", 200, 10.0, True, stale=True))
+
+        assert latency.summary()['A']['count'] == 1
+
+    def test_merge_and_retain(self):
+        """Test sets of sketches merge per API and removed APIs are dropped."""
+        first, second = LatencySketches(), LatencySketches()
+        first.observe(CheckResult("A", "https://a.com", 200, 10.0, True))
+        second.observe(CheckResult("A", "https://a.com", 200, 30.0, True))
+        second.observe(CheckResult("B", "https://b.com", 200, 5.0, True))
+
+        first.merge(second)
+        assert {name: s['count'] for name, s in first.summary().items()} == {'A': 2, 'B': 1}
+
+        first.retain([("B", "https://b.com", "GET")])
+        assert list(first.summary()) == ['B']
@@ -0,0 +1,408 @@
+"""Tests for web server module."""
+
+import gzip
+import http.client
+import json
+import socket
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from api_monitor.checker import CheckResult
+from api_monitor.history import HistoryStore
+from api_monitor.loader import APIConfig, Config
+from api_monitor.web_server import MonitoringHandler, PooledHTTPServer, WebMonitoringServer
+
+
+@pytest.fixture
+def dashboard_port():
+    """Dashboard server on a loopback port."""
+    server = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=4)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledHTTPServer:
+    """Tests for PooledHTTPServer."""
+
+    def test_invalid_workers(self):
+        """Test workers validation."""
+        with pytest.raises(ValueError):
+            PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=0)
+
+    def test_close_drops_queued_connections(self):
+        """Test server_close closes connections still waiting for a worker."""
+        server = PooledHTTPServer(('127.0.0.1', 0), MonitoringHandler, workers=1)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        thread.start()
+        address = server.server_address
+        with socket.create_connection(address, timeout=5) as busy, \
+                socket.create_connection(address, timeout=5) as queued:
+            busy.sendall(b"GET /api/da")  # Holds the only worker
+            deadline = time.time() + 5
+            while len(server._queued) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            server.shutdown()
+            server.server_close()
+
+            assert queued.recv(1) == b''
+        assert server._queued == {}
+
+    def test_keep_alive(self, dashboard_port):
+        """Test several requests share one connection."""
+        conn = http.client.HTTPConnection('127.0.0.1', dashboard_port, timeout=5)
+        conn.request('GET', '/api/data')
+        first = conn.getresponse()
+        body = first.read()
+        sock = conn.sock
+
+        conn.request('GET', '/api/stats')
+        second = conn.getresponse()
+        second.read()
+
+        assert first.status == 200
+        assert int(first.getheader('Content-Length')) == len(body)
+        assert first.getheader('Connection') is None
+        assert second.status == 200
+        assert conn.sock is sock
+        conn.close()
+
+    def test_slow_client_does_not_block_others(self, dashboard_port):
+        """Test unfinished request does not stall other clients."""
+        with socket.create_connection(('127.0.0.1', dashboard_port), timeout=5) as slow:
+            slow.sendall(b"GET /api/da")  # Request line never completed
+
+            conn = http.client.HTTPConnection('127.0.0.1', dashboard_port, timeout=5)
+            started = time.perf_counter()
+            conn.request('GET', '/api/stats')
+            response = conn.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - started
+            conn.close()
+
+        assert response.status == 200
+        assert elapsed < 1.0
+
+    def test_error_closes_connection(self, dashboard_port):
+        """Test error responses close connection (request body may be unread)."""
+        conn = http.client.HTTPConnection('127.0.0.1', dashboard_port, timeout=5)
+        conn.request('POST', '/unknown', body=b'{"a": 1}')
+        response = conn.getresponse()
+        response.read()
+
+        assert response.status == 404
+        assert response.getheader('Connection') == 'close'
+        conn.close()
+
+
+class TestStaticResponses:
+    """Tests for cached dashboard, docs and OpenAPI spec."""
+
+    def _get(self, port, path, headers=None):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_dashboard_gzip_and_etag(self, dashboard_port):
+        """Test dashboard is served compressed with validators."""
+        response, body = self._get(dashboard_port, '/', {'Accept-Encoding': 'gzip'})
+
+        assert response.status == 200
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert response.getheader('Vary') == 'Accept-Encoding'
+        assert response.getheader('Cache-Control') == 'no-cache'
+        assert b'connectEvents' in gzip.decompress(body)
+        assert response.getheader('ETag').startswith('"')
+
+    def test_if_none_match_returns_304(self, dashboard_port):
+        """Test revalidation with current ETag."""
+        first, _ = self._get(dashboard_port, '/')
+        response, body = self._get(dashboard_port, '/', {'If-None-Match': first.getheader('ETag')})
+
+        assert first.getheader('Content-Encoding') is None
+        assert response.status == 304
+        assert body == b''
+        assert response.getheader('ETag') == first.getheader('ETag')
+
+    def test_stale_etag_returns_page(self, dashboard_port):
+        """Test other encoding's ETag does not validate."""
+        gzipped, _ = self._get(dashboard_port, '/', {'Accept-Encoding': 'gzip'})
+        response, body = self._get(dashboard_port, '/', {'If-None-Match': gzipped.getheader('ETag')})
+
+        assert response.status == 200
+        assert body.startswith(b'<!DOCTYPE html>')
+
+    def test_openapi_and_docs_cached(self, dashboard_port):
+        """Test OpenAPI spec and docs go through the cache."""
+        spec, body = self._get(dashboard_port, '/api/openapi.json')
+        docs, _ = self._get(dashboard_port, '/api/docs', {'Accept-Encoding': 'deflate'})
+
+        assert json.loads(body)['openapi'] == '3.0.0'
+        assert {'/api/events', '/api/history'} <= set(json.loads(body)['paths'])
+        assert spec.getheader('Access-Control-Allow-Origin') == '*'
+        assert spec.getheader('Cache-Control') == 'public, max-age=3600'
+        assert docs.getheader('Content-Encoding') == 'deflate'
+        assert docs.getheader('ETag') is not None
+
+
+class TestWebMonitoringServer:
+    """Tests for WebMonitoringServer result bookkeeping."""
+
+    @pytest.fixture
+    def monitor(self):
+        saved = dict(MonitoringHandler.monitoring_data)
+        apis = [APIConfig("A", "https://a.com"), APIConfig("B", "https://b.com")]
+        server = WebMonitoringServer(Config(apis=apis), interval=30)
+        yield server
+        server.cache.close()
+        MonitoringHandler.monitoring_data.clear()
+        MonitoringHandler.monitoring_data.update(saved)
+
+    def test_stale_window_defaults_to_intervals(self, monitor):
+        """Test shared cache serves stale results for several intervals."""
+        assert monitor.cache.default_ttl == 15  # Half an interval: periodic sweeps never hit it
+        assert monitor.cache.stale_while_revalidate == 150
+
+    def test_periodic_sweep_probes_expired_results(self, monitor):
+        """Test periodic sweeps bypass stale-while-revalidate; refreshes use it."""
+        with patch.object(monitor, 'collect_results', return_value=[]) as collect:
+            monitor.sweep()
+            monitor.sweep(job=monitor.refresh_jobs.request(2)[0])
+
+        assert collect.call_args_list[0].kwargs == {'allow_stale': False}
+        assert collect.call_args_list[1].kwargs['max_age'] == 0
+
+    def test_sweep_timed_on_clock(self, clock):
+        """Test sweep duration metric is measured on the injected clock."""
+        saved = dict(MonitoringHandler.monitoring_data)
+        server = WebMonitoringServer(Config(apis=[]), interval=30, clock=clock)
+
+        def collect_results(**kwargs):
+            clock.advance(2.5)
+            return []
+
+        try:
+            with patch.object(server, 'collect_results', side_effect=collect_results):
+                server.sweep()
+        finally:
+            server.cache.close()
+            MonitoringHandler.monitoring_data.clear()
+            MonitoringHandler.monitoring_data.update(saved)
+
+        assert b"api_monitor_last_sweep_duration_seconds 2.500000" in server.metrics.render()
+
+    def test_update_result_replaces_one_api(self, monitor):
+        """Test background refresh result replaces stale one and is pushed."""
+        monitor.record_results([
+            CheckResult("A", "https://a.com", 200, 10.0, True, stale=True),
+            CheckResult("B", "https://b.com", 200, 10.0, True)
+        ])
+        monitor.update_result(CheckResult("A", "https://a.com", 500, 12.0, False))
+        monitor.publish_refreshed()
+
+        results = MonitoringHandler.monitoring_data['results']
+        assert [r.status_code for r in results] == [500, 200]
+        assert results[0].stale is False
+        _, frames = monitor.events.next_frames(1, timeout=0)
+        assert b'"status_code":500' in frames[0]
+
+    def test_refreshes_published_together(self, monitor):
+        """Test background refresh results landing together make one update."""
+        monitor.record_results([
+            CheckResult("A", "https://a.com", 200, 10.0, True, stale=True),
+            CheckResult("B", "https://b.com", 200, 10.0, True, stale=True)
+        ])
+        monitor.update_result(CheckResult("A", "https://a.com", 500, 12.0, False))
+        monitor.update_result(CheckResult("B", "https://b.com", 503, 12.0, False))
+        assert [r.stale for r in MonitoringHandler.monitoring_data['results']] == [True, True]
+
+        deadline = time.time() + 5
+        while monitor.events.next_frames(1, timeout=0)[0] == 1 and time.time() < deadline:
+            time.sleep(0.05)
+
+        seq, frames = monitor.events.next_frames(1, timeout=0)
+        assert seq == 2 and len(frames) == 1
+        assert [r.status_code for r in MonitoringHandler.monitoring_data['results']] == [500, 503]
+
+
+    def test_history_records_checks_not_stale_copies(self, monitor):
+        """Test history stores refreshed results but not the stale copies they replace."""
+        monitor.history = HistoryStore(":memory:")
+        fresh = CheckResult("B", "https://b.com", 200, 10.0, True)
+        monitor.record_results([CheckResult("A", "https://a.com", 200, 10.0, True, stale=True), fresh])
+        monitor.record_results([CheckResult("A", "https://a.com", 200, 10.0, True, stale=True), fresh])
+        monitor.update_result(CheckResult("A", "https://a.com", 500, 12.0, False))
+        monitor.publish_refreshed()
+
+        assert monitor.history.count() == 2
+        assert monitor.history.query("A", start=0)[0]['status_code'] == 500
+        monitor.history.close()
+
+    def test_sweeps_reuse_connections(self, stub_server):
+        """Test sweeps of more than 5 APIs (asyncio engine) keep connections to one host alive."""
+        base_url, _ = stub_server
+        saved = dict(MonitoringHandler.monitoring_data)
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(8)]
+        server = WebMonitoringServer(Config(apis=apis), interval=30)
+        server.cache.default_ttl = 0  # Check again on the second sweep
+        try:
+            first = server.sweep()
+            second = server.sweep()
+        finally:
+            server.cache.close()
+            server.sessions.close()
+            MonitoringHandler.monitoring_data.clear()
+            MonitoringHandler.monitoring_data.update(saved)
+
+        assert all(r.success for r in first + second)
+        assert not any(r.connection_reused for r in first)
+        assert all(r.connection_reused for r in second)
+
+
+class TestRefreshJobs:
+    """Tests for non-blocking /api/refresh."""
+
+    @pytest.fixture
+    def monitor(self, stub_server):
+        saved = dict(MonitoringHandler.monitoring_data)
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/delay/0.3?i={i}") for i in range(3)]
+        server = WebMonitoringServer(Config(apis=apis), interval=300)
+        server.record_results([])
+        yield server
+        server.running = False
+        server.refresh_jobs.close()
+        server.cache.close()
+        MonitoringHandler.monitoring_data.clear()
+        MonitoringHandler.monitoring_data.update(saved)
+
+    def _get(self, port, path):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', path)
+        response = conn.getresponse()
+        data = json.loads(response.read())
+        conn.close()
+        return response.status, data
+
+    def test_refresh_returns_job_at_once(self, monitor, dashboard_port):
+        """Test refresh is queued for the worker and its progress can be followed."""
+        stats = MonitoringHandler.monitoring_data['stats']
+        sweeps = stats['total_checks'] + 1
+        monitor.running = True
+        worker = threading.Thread(target=monitor.monitor_loop, daemon=True)
+        worker.start()
+        deadline = time.time() + 5
+        while stats['total_checks'] < sweeps and time.time() < deadline:
+            time.sleep(0.05)  # Let the first scheduled sweep finish
+
+        started = time.perf_counter()
+        status, job = self._get(dashboard_port, '/api/refresh')
+        elapsed = time.perf_counter() - started
+
+        assert status == 202
+        assert elapsed < 0.3
+        assert job['status_url'] == f"/api/refresh/{job['job_id']}"
+
+        deadline = time.time() + 5
+        progress = self._get(dashboard_port, job['status_url'])[1]
+        while progress['status'] != 'done' and time.time() < deadline:
+            time.sleep(0.05)
+            progress = self._get(dashboard_port, job['status_url'])[1]
+
+        assert progress['done'] == progress['total'] == 3
+        assert sorted(r['name'] for r in progress['results']) == ["API 0", "API 1", "API 2"]
+        assert not any(r['stale'] for r in progress['results'])  # Background refreshes, not cached copies
+        assert MonitoringHandler.monitoring_data['stats']['total_checks'] == sweeps + 1
+
+    def test_job_waits_for_background_refreshes(self, monitor):
+        """Test a refresh job counts background probes, not the stale results served at once."""
+        api = monitor.config.apis[0]
+        stale = CheckResult(api.name, api.url, 200, 10.0, True, stale=True)
+        fresh = CheckResult(api.name, api.url, 500, 12.0, False)
+        monitor.refresh_jobs.request(1)
+        job = monitor.refresh_jobs.wait(0)
+
+        def collect(max_age=None, on_result=None, allow_stale=True):
+            on_result(stale)
+            return [stale]
+
+        with patch.object(monitor, 'collect_results', side_effect=collect):
+            monitor.sweep(job=job)
+        assert (job.status, job.done) == ('running', 0)
+
+        monitor.update_result(fresh)
+
+        assert (job.status, job.done) == ('done', 1)
+        assert job.results[0]['status_code'] == 500
+
+    def test_repeated_clicks_coalesce(self, monitor, dashboard_port):
+        """Test refresh requests join the pending sweep."""
+        first = self._get(dashboard_port, '/api/refresh')[1]
+        second = self._get(dashboard_port, '/api/refresh')[1]
+
+        assert second['job_id'] == first['job_id']
+        assert (first['coalesced'], second['coalesced']) == (False, True)
+        status, job = self._get(dashboard_port, first['status_url'])
+        assert (status, job['status'], job['requests']) == (200, 'pending', 2)
+
+    def test_unknown_job(self, monitor, dashboard_port):
+        """Test progress of unknown job is 404."""
+        conn = http.client.HTTPConnection('127.0.0.1', dashboard_port, timeout=5)
+        conn.request('GET', '/api/refresh/missing')
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+
+        assert response.status == 404
+
+
+class TestAPIManagement:
+    """Tests for adding and updating APIs through the dashboard."""
+
+    @pytest.fixture
+    def monitor(self):
+        saved = dict(MonitoringHandler.monitoring_data)
+        server = WebMonitoringServer(Config(apis=[APIConfig("A", "https://a.com", probe='head')]), interval=30)
+        yield server
+        server.cache.close()
+        MonitoringHandler.monitoring_data.clear()
+        MonitoringHandler.monitoring_data.update(saved)
+
+    def _send(self, port, method, path, data):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request(method, path, body=json.dumps(data), headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        return response.status
+
+    @pytest.mark.parametrize("data", [{'body_budget': -1}, {'body_budget': 'lots'}, {'interval': 'often'},
+                                      {'interval': 0}, {'interval': -5}, {'timeout': 0}, {'timeout': -1},
+                                      {'timeout': 'soon'}, {'expected_status': 42}, {'probe': 'peek'}])
+    def test_update_rejects_invalid_fields(self, monitor, dashboard_port, data):
+        """Test invalid fields are answered with 400 and leave the API unchanged."""
+        assert self._send(dashboard_port, 'PUT', '/api/apis/A', data) == 400
+        assert self._send(dashboard_port, 'POST', '/api/apis', dict(data, name="B", url="https://b.com")) == 400
+        assert [api.name for api in monitor.config.apis] == ["A"]
+        assert monitor.config.apis[0].body_budget == 65536
+
+    def test_interval_saved(self, monitor, dashboard_port):
+        """Test a positive interval is accepted on add and update."""
+        assert self._send(dashboard_port, 'POST', '/api/apis', {'name': "B", 'url': "https://b.com", 'interval': 15}) \
+            == 201
+        assert self._send(dashboard_port, 'PUT', '/api/apis/A', {'interval': 45}) == 200
+
+        assert [api.interval for api in monitor.config.apis] == [45.0, 15.0]
+
+    def test_update_keeps_probe_settings(self, monitor, dashboard_port):
+        """Test fields missing from an update keep their current values."""
+        assert self._send(dashboard_port, 'PUT', '/api/apis/A', {'timeout': 2}) == 200
+
+        api = monitor.config.apis[0]
+        assert (api.timeout, api.probe, api.body_budget) == (2.0, 'head', 65536)
@@ -0,0 +1,153 @@
+"""Tests for sharded sweeps on worker processes."""
+
+import os
+import signal
+import time
+
+import pytest
+from api_monitor import workers
+from api_monitor.cache import ResultCache
+from api_monitor.checker import CheckResult, PhaseTimings, check_all_apis
+from api_monitor.loader import APIConfig, Config
+from api_monitor.workers import (
+    END_OF_SWEEP, FRAME_HEADER, WorkerPool, create_worker_pool, decode_results, encode_result, shard_of
+)
+
+
+class TestResultFrames:
+    """Tests for binary result encoding."""
+
+    def test_round_trip(self):
+        """Test results survive encoding; identity comes from the batch."""
+        apis = [APIConfig("A", "https://a.com", method="post", headers={"X-Token": "1"}),
+                APIConfig("B", "https://b.com")]
+        first = CheckResult("ignored", "ignored", 201, 12.5, True, connection_reused=True,
+                            phases=PhaseTimings(1.0, 2.0, 3.0, 4.0, 5.0))
+        second = CheckResult("ignored", "ignored", None, 5000.0, False, error="Timeout (>5.0s) ✗", timeout=True)
+        data = encode_result(1, second) + encode_result(0, first) + FRAME_HEADER.pack(END_OF_SWEEP, -1, 0.0, 0.0, -1, 0)
+
+        decoded = list(decode_results(data, apis))
+
+        assert [index for index, _ in decoded] == [1, 0, END_OF_SWEEP]
+        b, a = decoded[0][1], decoded[1][1]
+        assert (b.name, b.url, b.status_code, b.error, b.timeout, b.success) == \
+            ("B", "https://b.com", None, "Timeout (>5.0s) ✗", True, False)
+        assert (a.name, a.method, a.status_code, a.connection_reused, a.phases) == \
+            ("A", "POST", 201, True, PhaseTimings(1.0, 2.0, 3.0, 4.0, 5.0))
+        assert a.fingerprint != ""
+        assert len(encode_result(0, CheckResult("A", "https://a.com", 200, 1.0, True))) == FRAME_HEADER.size
+
+
+class TestSharding:
+    """Tests for shard assignment."""
+
+    def test_stable_and_balanced(self):
+        """Test assignment is deterministic and spreads APIs."""
+        apis = [APIConfig(f"API {i}", f"https://host{i % 7}.com/item/{i}") for i in range(1000)]
+        shards = [shard_of(api, 4) for api in apis]
+
+        assert shards == [shard_of(api, 4) for api in apis]
+        assert all(150 < shards.count(shard) < 350 for shard in range(4))
+
+    def test_adding_worker_moves_few_apis(self):
+        """Test only APIs taken by the new worker move."""
+        apis = [APIConfig(f"API {i}", f"https://api.com/item/{i}") for i in range(1000)]
+        moved = [api for api in apis if shard_of(api, 4) != shard_of(api, 5)]
+
+        assert all(shard_of(api, 5) == 4 for api in moved)
+        assert len(moved) < 300
+
+    def test_same_request_same_worker(self):
+        """Test duplicate requests stay together so they are still deduplicated."""
+        first = APIConfig("A", "https://api.com/health")
+        second = APIConfig("B", "https://api.com/health", expected_status=204)
+        assert shard_of(first, 8) == shard_of(second, 8)
+
+
+class TestWorkerPool:
+    """Tests for WorkerPool."""
+
+    @pytest.fixture
+    def pool(self):
+        pool = WorkerPool(2)
+        yield pool
+        pool.close()
+
+    def test_invalid_processes(self):
+        """Test process count validation."""
+        with pytest.raises(ValueError):
+            WorkerPool(0)
+        assert create_worker_pool(1, Config(apis=[])) is None
+        assert isinstance(create_worker_pool(2, Config(apis=[])), WorkerPool)
+
+    def test_sweep_merges_results_in_order(self, pool, stub_server):
+        """Test results from all workers are merged in input order."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/{200 if i % 3 else 500}?i={i}") for i in range(9)]
+        streamed = []
+
+        results = pool.check_all(apis, on_result=streamed.append)
+
+        assert [r.name for r in results] == [api.name for api in apis]
+        assert [r.success for r in results] == [i % 3 != 0 for i in range(9)]
+        assert sorted(r.name for r in streamed) == sorted(api.name for api in apis)
+        assert len(server.requests_seen) == 9
+
+    def test_dead_worker_is_restarted(self, pool, stub_server):
+        """Test next sweep restarts a worker that exited."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(6)]
+        pool.check_all(apis)
+        for process, _ in filter(None, pool._workers):
+            process.kill()
+            process.join()
+
+        results = pool.check_all(apis)
+
+        assert all(r.success for r in results)
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGSTOP'), reason="needs SIGSTOP")
+    def test_hung_worker_is_discarded(self, pool, stub_server, monkeypatch):
+        """Test sweep does not wait forever on a worker that stopped answering."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}", timeout=0.2) for i in range(6)]
+        pool.check_all(apis)
+        shard = shard_of(apis[0], pool.processes)
+        process, _ = pool._workers[shard]
+        os.kill(process.pid, signal.SIGSTOP)
+        monkeypatch.setattr(workers, 'WORKER_DEADLINE_MARGIN', 0.3)
+
+        started = time.monotonic()
+        results = pool.check_all(apis)
+
+        assert time.monotonic() - started < 5
+        assert not process.is_alive()
+        hung = [r for api, r in zip(apis, results) if shard_of(api, pool.processes) == shard]
+        assert all(r.error == "Error during check: worker process exited" for r in hung)
+        assert len(hung) < len(results)
+        assert sum(r.success for r in results) == len(results) - len(hung)
+        assert all(r.success for r in pool.check_all(apis))
+
+    def test_workers_reuse_connections(self, pool, stub_server):
+        """Test workers keep their connections alive between sweeps."""
+        base_url, _ = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(8)]
+
+        first = pool.check_all(apis)
+        second = pool.check_all(apis)
+
+        assert all(r.success for r in first + second)
+        assert not any(r.connection_reused for r in first)
+        assert all(r.connection_reused for r in second)
+
+    def test_check_all_apis_serves_cache_locally(self, pool, stub_server):
+        """Test cached results are not sent to workers."""
+        base_url, server = stub_server
+        apis = [APIConfig(f"API {i}", f"{base_url}/status/200?i={i}") for i in range(4)]
+        cache = ResultCache(default_ttl=60.0)
+
+        check_all_apis(apis, cache=cache, pool=pool)
+        results = check_all_apis(apis, cache=cache, pool=pool)
+
+        assert all(r.success for r in results)
+        assert len(server.requests_seen) == 4